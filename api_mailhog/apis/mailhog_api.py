@@ -1,6 +1,12 @@
-from typing import Optional
-import requests
+from __future__ import annotations
+
+from typing import Optional, Iterator, Sequence, TYPE_CHECKING
 from restclient.client import RestClient
+from restclient.endpoint import Endpoint
+from restclient.streaming import iter_json_items
+
+if TYPE_CHECKING:
+    import requests
 
 
 class MailhogApi(RestClient):
@@ -11,6 +17,10 @@ class MailhogApi(RestClient):
     MailHog, который используется для тестирования email-функциональности.
     """
 
+    GET_API_V2_MESSAGES: Endpoint = Endpoint('GET', '/api/v2/messages')
+    GET_API_V2_SEARCH: Endpoint = Endpoint('GET', '/api/v2/search')
+    DELETE_API_V1_MESSAGE: Endpoint = Endpoint('DELETE', '/api/v1/messages/{message_id}')
+
     def get_api_v2_messages(
             self,
             limit: int = 50
@@ -31,9 +41,108 @@ class MailhogApi(RestClient):
             'limit': limit
         }
 
-        response: requests.Response = self.get(
-            path=f'/api/v2/messages',
+        response: requests.Response = self.call(
+            self.GET_API_V2_MESSAGES,
             params=params,
             verify=False
         )
-        return response
\ No newline at end of file
+        return response
+
+    def iter_api_v2_messages(
+            self,
+            limit: int = 50,
+            fields: Optional[Sequence[str]] = None
+    ) -> Iterator[dict]:
+        """
+        Потоковое получение email-сообщений из MailHog.
+        
+        Сообщения разбираются по одному по мере чтения ответа, страница не
+        загружается в память целиком. Если перебор прекращен досрочно
+        (например, нужное письмо найдено), остаток ответа не читается,
+        а соединение закрывается.
+        
+        Args:
+            limit (int, optional): Максимальное количество сообщений для получения. По умолчанию 50
+            fields (Sequence[str], optional): Поля сообщения через точку, например ('Content.Body',).
+                По умолчанию сообщение возвращается целиком
+            
+        Yields:
+            dict: Сообщение MailHog (ID, Content, Raw и т.д.) или его проекция на fields
+            
+        Raises:
+            requests.HTTPError: Если получение сообщений не удалось
+            requests.JSONDecodeError: Если ответ поврежден
+        """
+        params: dict = {
+            'limit': limit
+        }
+
+        response: requests.Response = self.call(
+            self.GET_API_V2_MESSAGES,
+            params=params,
+            verify=False,
+            stream=True
+        )
+        try:
+            yield from iter_json_items(response, 'items', fields=fields)
+        finally:
+            response.close()
+
+    def get_api_v2_search(
+            self,
+            kind: str,
+            query: str,
+            start: int = 0,
+            limit: int = 50
+    ) -> requests.Response:
+        """
+        Поиск email-сообщений в MailHog.
+        
+        Args:
+            kind (str): Область поиска: 'from', 'to' или 'containing'
+            query (str): Искомая строка
+            start (int, optional): Смещение первого сообщения. По умолчанию 0
+            limit (int, optional): Максимальное количество сообщений. По умолчанию 50
+            
+        Returns:
+            requests.Response: HTTP-ответ с найденными сообщениями
+            
+        Raises:
+            requests.HTTPError: Если поиск не удался
+        """
+        params: dict = {
+            'kind': kind,
+            'query': query,
+            'start': start,
+            'limit': limit
+        }
+
+        response: requests.Response = self.call(
+            self.GET_API_V2_SEARCH,
+            params=params,
+            verify=False
+        )
+        return response
+
+    def delete_api_v1_message(
+            self,
+            message_id: str
+    ) -> requests.Response:
+        """
+        Удаление email-сообщения из MailHog.
+        
+        Args:
+            message_id (str): Идентификатор сообщения (поле ID)
+            
+        Returns:
+            requests.Response: HTTP-ответ от сервера
+            
+        Raises:
+            requests.HTTPError: Если удаление не удалось
+        """
+        response: requests.Response = self.call(
+            self.DELETE_API_V1_MESSAGE,
+            path_params={'message_id': message_id},
+            verify=False
+        )
+        return response
@@ -0,0 +1,275 @@
+import json
+import typing
+from collections import deque
+from typing import Optional, Dict, List, Any, Callable, Tuple, Union, Iterable, Deque, Type
+
+from pydantic import BaseModel
+from requests import Response
+
+from restclient.endpoint import Endpoint
+from restclient.metrics import counters
+
+CHECKED: str = 'expectations.checked'
+MISMATCHED: str = 'expectations.mismatched'
+
+# Разделитель операции и причины в метке счетчика несовпадений
+REASON_SEPARATOR: str = ' | '
+# Число сохраняемых примеров несовпадений
+MAX_SAMPLES: int = 20
+
+_MISSING = object()
+
+Check = Callable[[Any], bool]
+
+
+class Expectation:
+    """
+    Декларативное ожидание к ответу: статус, заголовок ошибки и значения полей.
+
+    Спецификация компилируется один раз при создании: пути полей переводятся
+    в ключи JSON (с учетом alias модели), ожидаемые значения — в функции
+    проверки. Проверка работает с телом ответа без валидации модели и
+    возвращает причину первого несовпадения вместо исключения.
+
+    Значение поля сравнивается со значением JSON (даты — строками); вместо
+    значения можно передать функцию-предикат или matcher hamcrest.
+
+    Example:
+        >>> Expectation(
+        ...     status=200,
+        ...     model=UserEnvelope,
+        ...     fields={'resource.login': starts_with('golovan'), 'resource.rating.enabled': True}
+        ... )
+        >>> Expectation(status=400, title='Validation failed')
+    """
+
+    def __init__(
+            self,
+            status: Union[int, Iterable[int], None] = 200,
+            title: Optional[str] = None,
+            fields: Optional[Dict[str, Any]] = None,
+            model: Optional[Type[BaseModel]] = None
+    ) -> None:
+        """
+        Инициализация и компиляция ожидания.
+
+        Args:
+            status (int или Iterable[int], optional): Допустимые статусы ответа (None — любой). По умолчанию 200
+            title (str, optional): Ожидаемое поле title тела ошибки
+            fields (dict, optional): Ожидаемые значения полей по пути через точку, например 'resource.login'
+            model (Type[BaseModel], optional): Модель ответа, по которой пути полей переводятся в ключи JSON
+
+        Raises:
+            ValueError: Если путь поля не найден в модели
+        """
+        self.statuses: Optional[frozenset] = (
+            None if status is None else frozenset([status] if isinstance(status, int) else status)
+        )
+        self.title: Optional[str] = title
+        self.fields: Dict[str, Any] = dict(fields or {})
+        self.model: Optional[Type[BaseModel]] = model
+        self._checks: Tuple[Tuple[str, Tuple[str, ...], Check], ...] = tuple(
+            (path, _json_keys(model, path), _compile_value(expected)) for path, expected in self.fields.items()
+        )
+        self._needs_body: bool = title is not None or bool(self._checks)
+
+    def check(self, response: Response, streamed: bool = False) -> Optional[str]:
+        """
+        Проверка ответа.
+
+        Args:
+            response (requests.Response): HTTP-ответ
+            streamed (bool, optional): Тело не прочитано (stream=True) — проверяется только статус
+
+        Returns:
+            str или None: Причина несовпадения ('status 500', 'title', путь поля) или None
+        """
+        if self.statuses is not None and response.status_code not in self.statuses:
+            return f'status {response.status_code}'
+        if not self._needs_body or streamed:
+            return None
+        try:
+            body: Any = json.loads(response.content)
+        except ValueError:
+            return 'body'
+        if self.title is not None and (not isinstance(body, dict) or body.get('title') != self.title):
+            return 'title'
+        for path, keys, predicate in self._checks:
+            value: Any = body
+            for key in keys:
+                value = value.get(key, _MISSING) if isinstance(value, dict) else _MISSING
+                if value is _MISSING:
+                    return path
+            try:
+                if not predicate(value):
+                    return path
+            except Exception:
+                return path
+        return None
+
+
+class ExpectationSet:
+    """
+    Ожидания к ответам по операциям API и сводка несовпадений.
+
+    Подключается к клиенту параметром Configuration(expectations=...): каждый
+    ответ операции из набора проверяется до raise_for_status, а результат
+    учитывается в общих счетчиках процесса (restclient.metrics.counters) по
+    операции и причине — несовпадение не прерывает запрос. В нагрузочном
+    прогоне воркеры передают приращения счетчиков родителю вместе с
+    гистограммами, и отчет показывает долю несовпадений по каждой операции.
+
+    Example:
+        >>> expectations = ExpectationSet({
+        ...     AccountApi.GET_V1_ACCOUNT: Expectation(model=UserDetailsEnvelope, fields={'resource.login': 'golovan'}),
+        ...     'POST /v1/account': Expectation(status=201),
+        ... })
+    """
+
+    def __init__(
+            self,
+            expectations: Dict[Union[str, Endpoint], Expectation],
+            default: Optional[Expectation] = None
+    ) -> None:
+        """
+        Инициализация набора ожиданий.
+
+        Args:
+            expectations (dict): Ожидания по операции ('GET /v1/account') или описанию метода (Endpoint)
+            default (Expectation, optional): Ожидание для операций, не указанных в наборе (None — не проверять)
+        """
+        self.expectations: Dict[str, Expectation] = {
+            key.operation if isinstance(key, Endpoint) else key: expectation
+            for key, expectation in expectations.items()
+        }
+        self.default: Optional[Expectation] = default
+        self.samples: Deque[Tuple[str, str, int]] = deque(maxlen=MAX_SAMPLES)
+
+    def verify(self, operation: str, response: Response, streamed: bool = False) -> Optional[str]:
+        """
+        Проверка ответа операции и учет результата.
+
+        Args:
+            operation (str): Операция, например 'GET /v1/account'
+            response (requests.Response): HTTP-ответ
+            streamed (bool, optional): Тело не прочитано (stream=True)
+
+        Returns:
+            str или None: Причина несовпадения или None (в том числе если ожидание не задано)
+        """
+        expectation: Optional[Expectation] = self.expectations.get(operation, self.default)
+        if expectation is None:
+            return None
+        counters.increment(CHECKED, operation)
+        reason: Optional[str] = expectation.check(response, streamed=streamed)
+        if reason is not None:
+            counters.increment(MISMATCHED, f'{operation}{REASON_SEPARATOR}{reason}')
+            self.samples.append((operation, reason, response.status_code))
+        return reason
+
+
+def drain_stats() -> Dict[str, float]:
+    """
+    Приращения счетчиков проверок с момента прошлого вызова в виде плоского словаря.
+
+    Используется процессами-воркерами нагрузки для передачи счетчиков родителю.
+
+    Returns:
+        dict: Значения по ключам '<имя счетчика>|<метка>'
+    """
+    stats: Dict[str, float] = {}
+    for name in (CHECKED, MISMATCHED):
+        for label, value in counters.drain(name).items():
+            stats[f'{name}|{label}'] = value
+    return stats
+
+
+def format_stats(stats: Dict[str, float]) -> str:
+    """
+    Таблица несовпадений по операциям.
+
+    Args:
+        stats (dict): Счетчики в формате drain_stats (посторонние ключи игнорируются)
+
+    Returns:
+        str: Таблица или пустая строка, если проверок не было
+    """
+    checked: Dict[str, float] = {}
+    reasons: Dict[str, Dict[str, float]] = {}
+    for key, value in stats.items():
+        name, _, label = key.partition('|')
+        if name == CHECKED:
+            checked[label] = checked.get(label, 0) + value
+        elif name == MISMATCHED:
+            operation, _, reason = label.partition(REASON_SEPARATOR)
+            operation_reasons: Dict[str, float] = reasons.setdefault(operation, {})
+            operation_reasons[reason] = operation_reasons.get(reason, 0) + value
+    if not checked:
+        return ''
+    width: int = max(len('операция'), *(len(operation) for operation in checked))
+    lines: List[str] = [
+        'Проверка ответов:',
+        f'{"операция":<{width}} {"проверено":>10} {"несовпад.":>10} {"%":>7}  причины'
+    ]
+    for operation in sorted(checked):
+        operation_reasons = reasons.get(operation, {})
+        mismatched: float = sum(operation_reasons.values())
+        details: str = ', '.join(
+            f'{reason}: {int(count)}' for reason, count in sorted(operation_reasons.items(), key=lambda item: -item[1])
+        )
+        lines.append(
+            f'{operation:<{width}} {int(checked[operation]):>10} {int(mismatched):>10} '
+            f'{100 * mismatched / checked[operation]:>6.2f}%  {details}'.rstrip()
+        )
+    return '\n'.join(lines)
+
+
+def _compile_value(expected: Any) -> Check:
+    """
+    Функция проверки ожидаемого значения: предикат, matcher hamcrest или равенство.
+    """
+    if hasattr(expected, 'matches') and callable(expected.matches):
+        return expected.matches
+    if callable(expected):
+        return expected
+    return lambda value: value == expected
+
+
+def _json_keys(model: Optional[Type[BaseModel]], path: str) -> Tuple[str, ...]:
+    """
+    Ключи JSON по пути поля модели с учетом alias.
+
+    Args:
+        model (Type[BaseModel], optional): Модель ответа (None — путь уже задан ключами JSON)
+        path (str): Путь через точку
+
+    Returns:
+        tuple: Ключи JSON
+
+    Raises:
+        ValueError: Если поле не найдено в модели
+    """
+    keys: List[str] = []
+    for name in path.split('.'):
+        if model is None:
+            keys.append(name)
+            continue
+        field = model.model_fields.get(name)
+        if field is None:
+            raise ValueError(f'Поле {name!r} пути {path!r} не найдено в модели {model.__name__}')
+        keys.append(field.alias or name)
+        model = _nested_model(field.annotation)
+    return tuple(keys)
+
+
+def _nested_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    """
+    Вложенная модель из аннотации поля (с разворачиванием Optional); None — поле не модель.
+    """
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for argument in typing.get_args(annotation):
+        model: Optional[Type[BaseModel]] = _nested_model(argument)
+        if model is not None:
+            return model
+    return None
@@ -1,13 +1,18 @@
-from typing import Union, Any, Dict
-from requests import Response
+from __future__ import annotations
+
+from typing import Union, Any, TYPE_CHECKING
 from dm_api_account.models.change_email import ChangeEmail
 from dm_api_account.models.change_password import ChangePassword
 from dm_api_account.models.reset_password import ResetPassword
 from dm_api_account.models.user_details_envelope import UserDetailsEnvelope
 from dm_api_account.models.user_envelope import UserEnvelope
 from restclient.client import RestClient
+from restclient.endpoint import Endpoint
 from dm_api_account.models.registration import Registration
 
+if TYPE_CHECKING:
+    from requests import Response
+
 class AccountApi(RestClient):
     """
     API-клиент для работы с аккаунтами пользователей.
@@ -16,6 +21,15 @@ class AccountApi(RestClient):
     и другими операциями с аккаунтами пользователей.
     """
 
+    POST_V1_ACCOUNT: Endpoint = Endpoint('POST', '/v1/account')
+    POST_V1_ACCOUNT_PASSWORD: Endpoint = Endpoint('POST', '/v1/account/password')
+    PUT_V1_ACCOUNT_PASSWORD: Endpoint = Endpoint('PUT', '/v1/account/password')
+    GET_V1_ACCOUNT: Endpoint = Endpoint('GET', '/v1/account')
+    PUT_V1_ACCOUNT_TOKEN: Endpoint = Endpoint('PUT', '/v1/account/{token}', headers={'accept': 'text/plain'})
+    PUT_V1_ACCOUNT_EMAIL: Endpoint = Endpoint('PUT', '/v1/account/email')
+    DELETE_V1_ACCOUNT_LOGIN: Endpoint = Endpoint('DELETE', '/v1/account/login')
+    DELETE_V1_ACCOUNT_LOGIN_ALL: Endpoint = Endpoint('DELETE', '/v1/account/login/all')
+
     def post_v1_account(self, registration: Registration) -> Response:
         """
         Регистрация нового пользователя.
@@ -29,10 +43,7 @@ class AccountApi(RestClient):
         Raises:
             requests.HTTPError: Если регистрация не удалась
         """
-        response: Response = self.post(
-            path=f'/v1/account',
-            json=registration.model_dump(exclude_none=True, by_alias=True)
-        )
+        response: Response = self.call(self.POST_V1_ACCOUNT, body=registration)
         return response
 
     def post_v1_account_password(
@@ -55,11 +66,7 @@ class AccountApi(RestClient):
         Raises:
             requests.HTTPError: Если сброс пароля не удался
         """
-        response: Response = self.post(
-            path=f'/v1/account/password',
-            json=reset_password.model_dump(exclude_none=True, by_alias=True),
-            **kwargs
-        )
+        response: Response = self.call(self.POST_V1_ACCOUNT_PASSWORD, body=reset_password, **kwargs)
         if validate_response:
             return UserEnvelope(**response.json())
         return response
@@ -84,11 +91,7 @@ class AccountApi(RestClient):
         Raises:
             requests.HTTPError: Если изменение пароля не удалось
         """
-        response: Response = self.put(
-            path=f'/v1/account/password',
-            json=change_password.model_dump(exclude_none=True, by_alias=True),
-            **kwargs
-        )
+        response: Response = self.call(self.PUT_V1_ACCOUNT_PASSWORD, body=change_password, **kwargs)
         if validate_response:
             return UserEnvelope(**response.json())
         return response
@@ -111,10 +114,7 @@ class AccountApi(RestClient):
         Raises:
             requests.HTTPError: Если получение данных не удалось
         """
-        response: Response = self.get(
-            path=f'/v1/account',
-            **kwargs
-        )
+        response: Response = self.call(self.GET_V1_ACCOUNT, **kwargs)
         if validate_response:
            return UserDetailsEnvelope(**response.json())
         return response
@@ -137,11 +137,7 @@ class AccountApi(RestClient):
         Raises:
             requests.HTTPError: Если активация не удалась
         """
-        headers: Dict[str, str] = {'accept': 'text/plain',}
-        response: Response = self.put(
-            path=f'/v1/account/{token}',
-            headers=headers
-        )
+        response: Response = self.call(self.PUT_V1_ACCOUNT_TOKEN, path_params={'token': token})
         if validate_response:
            return UserEnvelope(**response.json())
         return response
@@ -162,10 +158,7 @@ class AccountApi(RestClient):
         Raises:
             requests.HTTPError: Если изменение email не удалось
         """
-        response: Response = self.put(
-            path=f'/v1/account/email',
-            json=change_email.model_dump(exclude_none=True, by_alias=True)
-        )
+        response: Response = self.call(self.PUT_V1_ACCOUNT_EMAIL, body=change_email)
         return response
 
     def delete_v1_account_login(
@@ -181,10 +174,7 @@ class AccountApi(RestClient):
         Raises:
             requests.HTTPError: Если выход не удался
         """
-        self.delete(
-            path=f'/v1/account/login',
-            **kwargs
-        )
+        self.call(self.DELETE_V1_ACCOUNT_LOGIN, **kwargs)
 
     def delete_v1_account_login_all(
             self,
@@ -199,7 +189,4 @@ class AccountApi(RestClient):
         Raises:
             requests.HTTPError: Если выход не удался
         """
-        self.delete(
-            path=f'/v1/account/login/all',
-            **kwargs
-        )
\ No newline at end of file
+        self.call(self.DELETE_V1_ACCOUNT_LOGIN_ALL, **kwargs)
\ No newline at end of file
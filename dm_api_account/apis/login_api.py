@@ -1,8 +1,13 @@
-from typing import Union
-from requests import Response
+from __future__ import annotations
+
+from typing import Union, TYPE_CHECKING
 from dm_api_account.models.login_credentials import LoginCredentials
 from dm_api_account.models.user_envelope import UserEnvelope
 from restclient.client import RestClient
+from restclient.endpoint import Endpoint
+
+if TYPE_CHECKING:
+    from requests import Response
 
 class LoginApi(RestClient):
     """
@@ -12,6 +17,8 @@ class LoginApi(RestClient):
     учетных данных (логин/пароль).
     """
 
+    POST_V1_ACCOUNT_LOGIN: Endpoint = Endpoint('POST', '/v1/account/login')
+
     def post_v1_account_login(
             self,
             login_credentials: LoginCredentials,
@@ -30,10 +37,7 @@ class LoginApi(RestClient):
         Raises:
             requests.HTTPError: Если аутентификация не удалась
         """
-        response: Response = self.post(
-            path=f'/v1/account/login',
-            json=login_credentials.model_dump(exclude_none=True, by_alias=True)
-        )
+        response: Response = self.call(self.POST_V1_ACCOUNT_LOGIN, body=login_credentials)
         if validate_response:
            return UserEnvelope(**response.json())
         return response
\ No newline at end of file
@@ -7,7 +7,7 @@ class ChangeEmail(BaseModel):
     
     Содержит данные, необходимые для смены email-адреса пользователя.
     """
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', defer_build=True)
     
     login: str = Field(..., description='Логин пользователя')
     password: str = Field(..., description='Пароль пользователя')
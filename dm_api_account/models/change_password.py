@@ -8,7 +8,7 @@ class ChangePassword(BaseModel):
     Содержит данные, необходимые для смены пароля пользователя,
     включая токен активации и старый/новый пароли.
     """
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', defer_build=True)
     
     login: str = Field(..., description='Логин пользователя')
     token: str = Field(..., description='Токен активации')
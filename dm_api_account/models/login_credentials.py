@@ -7,7 +7,7 @@ class LoginCredentials(BaseModel):
     
     Содержит учетные данные пользователя для входа в систему.
     """
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', defer_build=True)
     
     login: str = Field(..., description='Логин пользователя')
     password: str = Field(..., description='Пароль пользователя')
@@ -7,7 +7,7 @@ class Registration(BaseModel):
     
     Содержит обязательные поля для создания нового аккаунта в системе.
     """
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', defer_build=True)
     
     login: str = Field(..., description='Логин пользователя')
     password: str = Field(..., description='Пароль пользователя')
@@ -7,7 +7,7 @@ class ResetPassword(BaseModel):
     
     Содержит данные, необходимые для инициации процесса сброса пароля.
     """
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', defer_build=True)
     
     login: str = Field(..., description='Логин пользователя')
     email: str = Field(..., description='Email пользователя для отправки инструкций')
\ No newline at end of file
@@ -50,6 +50,8 @@ class InfoBbText(BaseModel):
     
     Содержит текст и режим его парсинга.
     """
+    model_config = ConfigDict(defer_build=True)
+    
     value: Optional[str] = Field(None, description='Текстовое содержимое')
     parse_mode: Optional[BbParseMode] = Field(None, description='Режим парсинга BB-кода')
 
@@ -60,7 +62,7 @@ class PagingSettings(BaseModel):
     
     Определяет количество элементов на странице для разных разделов.
     """
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', defer_build=True)
     
     posts_per_page: int = Field(..., alias='postsPerPage', description='Количество постов на странице')
     comments_per_page: int = Field(..., alias='commentsPerPage', description='Количество комментариев на странице')
@@ -76,7 +78,7 @@ class UserSettings(BaseModel):
     Содержит персональные настройки пользователя, включая цветовую схему,
     приветственное сообщение и настройки пагинации.
     """
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', defer_build=True)
     
     color_schema: ColorSchema = Field(None, alias='colorSchema', description='Цветовая схема интерфейса')
     nanny_greetings_message: str = Field(None, alias='nannyGreetingsMessage', description='Приветственное сообщение')
@@ -90,7 +92,7 @@ class UserDetails(BaseModel):
     Расширенная модель пользователя, содержащая дополнительную информацию
     о профиле, настройках и контактных данных.
     """
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', defer_build=True)
     
     login: str = Field(..., description='Логин пользователя')
     roles: List[UserRole] = Field(..., description='Список ролей пользователя')
@@ -116,7 +118,7 @@ class UserDetailsEnvelope(BaseModel):
     Стандартная структура ответа API, содержащая детальную информацию
     о пользователе и дополнительные метаданные.
     """
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', defer_build=True)
     
     resource: Optional[UserDetails] = Field(None, description='Детальная информация о пользователе')
     metadata: Optional[str] = Field(None, description='Дополнительные метаданные')
\ No newline at end of file
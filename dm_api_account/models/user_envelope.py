@@ -34,6 +34,8 @@ class Rating(BaseModel):
     Содержит информацию о рейтинге пользователя, включая его статус
     и количественные показатели.
     """
+    model_config = ConfigDict(defer_build=True)
+    
     enabled: bool = Field(..., description='Включен ли рейтинг для пользователя')
     quality: int = Field(..., description='Качественный показатель рейтинга')
     quantity: int = Field(..., description='Количественный показатель рейтинга')
@@ -46,6 +48,8 @@ class User(BaseModel):
     Содержит основную информацию о пользователе, включая его роли,
     рейтинг и базовые данные профиля.
     """
+    model_config = ConfigDict(defer_build=True)
+    
     login: str = Field(..., description='Логин пользователя')
     roles: List[UserRole] = Field(..., description='Список ролей пользователя')
     medium_picture_url: str = Field(None, alias='mediumPictureUrl', description='URL средней аватарки')
@@ -65,7 +69,7 @@ class UserEnvelope(BaseModel):
     Стандартная структура ответа API, содержащая данные пользователя
     и дополнительные метаданные.
     """
-    model_config = ConfigDict(extra='forbid')
+    model_config = ConfigDict(extra='forbid', defer_build=True)
     
     resource: Optional[User] = Field(None, description='Данные пользователя')
     metadata: Optional[Any] = Field(None, description='Дополнительные метаданные')
\ No newline at end of file
@@ -1,7 +1,8 @@
+from __future__ import annotations
+
 import time
 from json import loads
-from requests import JSONDecodeError, Response
-from typing import Optional, Union, Any
+from typing import Optional, Union, Any, Iterable, List, Tuple, TYPE_CHECKING
 from dm_api_account.models.change_email import ChangeEmail
 from dm_api_account.models.change_password import ChangePassword
 from dm_api_account.models.login_credentials import LoginCredentials
@@ -10,7 +11,23 @@ from dm_api_account.models.reset_password import ResetPassword
 from dm_api_account.models.user_envelope import UserEnvelope
 from services.api_mailhog import MailHogApi
 from services.dm_api_account import DMApiAccount
-from retrying import retry
+from helpers.bulk import BULK_WORKERS, BulkResult, Progress, run_bulk
+from restclient.deadline import Deadline, use_deadline, stage
+from restclient.lazy import lazy_import
+from restclient.tracing import traced
+
+if TYPE_CHECKING:
+    from requests import Response
+
+retrying = lazy_import('retrying')
+
+# Ожидание письма в MailHog: число опросов и интервал между ними
+MAIL_WAIT_ATTEMPTS: int = 5
+MAIL_WAIT_INTERVAL_MS: int = 1000
+# Размер страницы поиска писем при очистке MailHog
+MAIL_SEARCH_PAGE: int = 250
+# Поля письма, нужные для поиска токена активации: Raw и MIME не сохраняются
+MESSAGE_FIELDS: Tuple[str, ...] = ('Content.Headers', 'Content.Body')
 
 
 def retry_if_result_none(result: Any) -> bool:
@@ -49,6 +66,7 @@ class AccountHelper:
         self.dm_account_api: DMApiAccount = dm_account_api
         self.mailhog: MailHogApi = mailhog
 
+    @traced()
     def auth_client(
             self,
             login: str,
@@ -71,12 +89,14 @@ class AccountHelper:
         self.dm_account_api.account_api.set_headers(auth_token)
         self.dm_account_api.login_api.set_headers(auth_token)
 
+    @traced()
     def change_password(
             self,
             login: str,
             email: str,
             old_password: str,
-            new_password: str
+            new_password: str,
+            deadline: Optional[Deadline] = None
     ) -> str:
         """
         Изменение пароля пользователя с автоматическим получением токена активации.
@@ -86,25 +106,32 @@ class AccountHelper:
             email (str): Email пользователя
             old_password (str): Старый пароль
             new_password (str): Новый пароль
+            deadline (Deadline, optional): Общий бюджет времени сброса, ожидания письма и смены пароля
             
         Returns:
             str: Новый пароль
             
         Raises:
             requests.HTTPError: Если изменение пароля не удалось
+            DeadlineExceeded: Если дедлайн истек (с указанием этапа)
         """
-        self.reset_user_password(login=login, email=email)
-        token: str = self.fetch_activation_token(login=login)
+        with use_deadline(deadline):
+            with stage('reset_password'):
+                self.reset_user_password(login=login, email=email)
+            with stage('mail_wait'):
+                token: str = self.fetch_activation_token(login=login)
 
-        change_password: ChangePassword = ChangePassword(
-            login=login,
-            token=token,
-            oldPassword=old_password,
-            newPassword=new_password
-        )
-        self.dm_account_api.account_api.put_v1_account_password(change_password)
+            change_password: ChangePassword = ChangePassword(
+                login=login,
+                token=token,
+                oldPassword=old_password,
+                newPassword=new_password
+            )
+            with stage('put_password'):
+                self.dm_account_api.account_api.put_v1_account_password(change_password)
         return new_password
 
+    @traced()
     def reset_user_password(
             self,
             login: str,
@@ -126,11 +153,13 @@ class AccountHelper:
         )
         self.dm_account_api.account_api.post_v1_account_password(reset_password)
 
+    @traced()
     def register_new_user(
             self,
             login: str,
             password: str,
-            email: str
+            email: str,
+            deadline: Optional[Deadline] = None
     ) -> Response:
         """
         Регистрация нового пользователя с автоматической активацией.
@@ -139,6 +168,7 @@ class AccountHelper:
             login (str): Логин пользователя
             password (str): Пароль пользователя
             email (str): Email пользователя
+            deadline (Deadline, optional): Общий бюджет времени регистрации, ожидания письма и активации
             
         Returns:
             requests.Response: Ответ от сервера после активации
@@ -146,22 +176,28 @@ class AccountHelper:
         Raises:
             AssertionError: Если регистрация или активация не удались
             requests.HTTPError: Если запрос к API не удался
+            DeadlineExceeded: Если дедлайн истек (с указанием этапа)
         """
         registration: Registration = Registration(
             login=login,
             password=password,
             email=email
         )
-        response: Response = self.dm_account_api.account_api.post_v1_account(registration=registration)
-        assert response.status_code == 201, f'Пользователь не создан {response.json()}'
-        start_time: float = time.time()
-        token: Optional[str] = self.get_activation_token_by_login(login=login)
-        end_time: float = time.time()
-        assert end_time - start_time < 3, "Время ожидания активации превышено"
-        assert token is not None, f'Токен для пользователя {login} не был получен'
-        response = self.dm_account_api.account_api.put_v1_account_token(token=token, validate_response=False)
+        with use_deadline(deadline):
+            with stage('register'):
+                response: Response = self.dm_account_api.account_api.post_v1_account(registration=registration)
+            assert response.status_code == 201, f'Пользователь не создан {response.json()}'
+            start_time: float = time.time()
+            with stage('mail_wait'):
+                token: Optional[str] = self.get_activation_token_by_login(login=login)
+            end_time: float = time.time()
+            assert end_time - start_time < 3, "Время ожидания активации превышено"
+            assert token is not None, f'Токен для пользователя {login} не был получен'
+            with stage('activate'):
+                response = self.dm_account_api.account_api.put_v1_account_token(token=token, validate_response=False)
         return response
 
+    @traced()
     def user_login(
             self,
             login: str,
@@ -200,6 +236,7 @@ class AccountHelper:
             assert response.headers["x-dm-auth-token"], "Токен для пользователя не был получен"
         return response
 
+    @traced()
     def user_logout(self) -> None:
         """
         Выход текущего пользователя из системы.
@@ -209,6 +246,7 @@ class AccountHelper:
         """
         self.dm_account_api.account_api.delete_v1_account_login()
 
+    @traced()
     def user_logout_every_device(self) -> None:
         """
         Выход пользователя со всех устройств.
@@ -218,13 +256,168 @@ class AccountHelper:
         """
         self.dm_account_api.account_api.delete_v1_account_login_all()
 
-    @retry(stop_max_attempt_number=5, retry_on_result=retry_if_result_none, wait_fixed=1000)
-    def get_activation_token_by_login(self, login: str) -> Optional[str]:
+    @traced()
+    def logout_users(
+            self,
+            tokens: Iterable[str],
+            every_device: bool = False,
+            max_workers: int = BULK_WORKERS,
+            progress: Optional[Progress] = None
+    ) -> BulkResult:
+        """
+        Параллельный выход пользователей по их токенам.
+        
+        Токен передается заголовком конкретного запроса, поэтому заголовки
+        сессии клиента не меняются. Уже недействительный токен (401)
+        считается пропущенным, а не ошибкой.
+        
+        Args:
+            tokens (Iterable[str]): Токены авторизации (x-dm-auth-token)
+            every_device (bool, optional): Выход со всех устройств. По умолчанию False
+            max_workers (int, optional): Число параллельных запросов. По умолчанию BULK_WORKERS
+            progress (Callable, optional): Обработчик промежуточного итога
+            
+        Returns:
+            BulkResult: Итог операции
+        """
+        account_api = self.dm_account_api.account_api
+        logout = account_api.delete_v1_account_login_all if every_device else account_api.delete_v1_account_login
+
+        def action(token: str) -> None:
+            logout(headers={'x-dm-auth-token': token})
+
+        return run_bulk(
+            'logout', set(tokens), action, max_workers=max_workers, progress=progress, skip_statuses=(401,)
+        )
+
+    @traced()
+    def purge_user_mails(
+            self,
+            emails: Iterable[str],
+            max_workers: int = BULK_WORKERS,
+            progress: Optional[Progress] = None
+    ) -> BulkResult:
+        """
+        Параллельное удаление писем пользователей из MailHog.
+        
+        Для каждого адреса письма находятся поиском по получателю и
+        удаляются по идентификатору. Поиск MailHog ищет подстроку, поэтому
+        удаляются только письма, где адрес совпадает с получателем целиком.
+        Адрес без писем считается пропущенным.
+        
+        Args:
+            emails (Iterable[str]): Адреса пользователей
+            max_workers (int, optional): Число параллельных запросов. По умолчанию BULK_WORKERS
+            progress (Callable, optional): Обработчик промежуточного итога
+            
+        Returns:
+            BulkResult: Итог операции (по адресам)
+        """
+        mailhog_api = self.mailhog.mailhog_api
+
+        def action(email: str) -> bool:
+            message_ids: List[str] = self._find_mail_ids(email)
+            for message_id in message_ids:
+                mailhog_api.delete_api_v1_message(message_id)
+            return bool(message_ids)
+
+        return run_bulk('purge_mails', set(emails), action, max_workers=max_workers, progress=progress)
+
+    def _find_mail_ids(self, email: str) -> List[str]:
+        """
+        Идентификаторы всех писем, адресованных пользователю.
+        
+        Args:
+            email (str): Адрес пользователя
+            
+        Returns:
+            List[str]: Идентификаторы писем
+        """
+        address: str = email.lower()
+        message_ids: List[str] = []
+        start: int = 0
+        while True:
+            response: Response = self.mailhog.mailhog_api.get_api_v2_search(
+                kind='to', query=email, start=start, limit=MAIL_SEARCH_PAGE
+            )
+            items: list = response.json().get('items') or []
+            for item in items:
+                recipients: list = item.get('Content', {}).get('Headers', {}).get('To') or []
+                if any(address in (part.strip().lower() for part in recipient.split(',')) for recipient in recipients):
+                    message_ids.append(item['ID'])
+            if len(items) < MAIL_SEARCH_PAGE:
+                return message_ids
+            start += len(items)
+
+    @traced()
+    def cleanup_users(
+            self,
+            tokens: Iterable[str] = (),
+            emails: Iterable[str] = (),
+            max_workers: int = BULK_WORKERS,
+            progress: Optional[Progress] = None
+    ) -> List[BulkResult]:
+        """
+        Массовая очистка после тестов: выход пользователей и удаление их писем.
+        
+        Args:
+            tokens (Iterable[str], optional): Токены авторизации пользователей
+            emails (Iterable[str], optional): Адреса пользователей
+            max_workers (int, optional): Число параллельных запросов. По умолчанию BULK_WORKERS
+            progress (Callable, optional): Обработчик промежуточного итога
+            
+        Returns:
+            List[BulkResult]: Итоги выхода и удаления писем
+        """
+        return [
+            self.logout_users(tokens, max_workers=max_workers, progress=progress),
+            self.purge_user_mails(emails, max_workers=max_workers, progress=progress)
+        ]
+
+    @traced()
+    def get_activation_token_by_login(
+            self,
+            login: str,
+            deadline: Optional[Deadline] = None
+    ) -> Optional[str]:
         """
         Получение токена активации для пользователя по логину.
         
         Метод выполняет повторные попытки до 5 раз с интервалом 1 секунда,
-        если токен не найден.
+        если токен не найден. При активном дедлайне интервал и число попыток
+        сокращаются так, чтобы ожидание письма не вышло за оставшееся время.
+        
+        Args:
+            login (str): Логин пользователя
+            deadline (Deadline, optional): Бюджет времени ожидания письма
+            
+        Returns:
+            str или None: Токен активации или None если не найден
+            
+        Raises:
+            DeadlineExceeded: Если дедлайн истек до получения токена
+        """
+        with use_deadline(deadline) as active_deadline:
+
+            def stop(attempt_number: int, delay_since_first_attempt_ms: int) -> bool:
+                if active_deadline is not None:
+                    active_deadline.check(stage='mail_wait')
+                return attempt_number >= MAIL_WAIT_ATTEMPTS
+
+            def wait(attempt_number: int, delay_since_first_attempt_ms: int) -> float:
+                if active_deadline is None:
+                    return MAIL_WAIT_INTERVAL_MS
+                return min(MAIL_WAIT_INTERVAL_MS, active_deadline.remaining() * 1000)
+
+            retrier = retrying.Retrying(stop_func=stop, wait_func=wait, retry_on_result=retry_if_result_none)
+            return retrier.call(self._find_activation_token, login)
+
+    def _find_activation_token(self, login: str) -> Optional[str]:
+        """
+        Однократный поиск токена активации в письмах MailHog.
+        
+        Письма читаются потоком от новых к старым, чтение прекращается
+        на первом письме пользователя со ссылкой подтверждения.
         
         Args:
             login (str): Логин пользователя
@@ -232,20 +425,19 @@ class AccountHelper:
         Returns:
             str или None: Токен активации или None если не найден
         """
-        token: Optional[str] = None
-        response: Response = self.mailhog.mailhog_api.get_api_v2_messages()
-        for item in response.json()['items']:
+        for item in self.mailhog.mailhog_api.iter_api_v2_messages(fields=MESSAGE_FIELDS):
             try:
                 user_data: dict = loads(item['Content']['Body'])
-            except (JSONDecodeError, KeyError):
-                print("Ошибка декодирования JSON")
-            user_login: str = user_data['Login']
-            if user_login == login and user_data.get('ConfirmationLinkUrl'):
-                token = user_data['ConfirmationLinkUrl'].split('/')[-1]
-            else:
-                token = user_data['ConfirmationLinkUri'].split('/')[-1]
-            return token
+            except (ValueError, KeyError, TypeError):
+                continue
+            if not isinstance(user_data, dict) or user_data.get('Login') != login:
+                continue
+            link: Optional[str] = user_data.get('ConfirmationLinkUrl') or user_data.get('ConfirmationLinkUri')
+            if link:
+                return link.split('/')[-1]
+        return None
 
+    @traced()
     def change_email_user(
             self,
             login: str,
@@ -276,26 +468,31 @@ class AccountHelper:
         assert response.status_code == 200, f'Не успешная попытка изменить email {response.json()}'
         return response
 
+    @traced()
     def fetch_activation_token(
             self,
-            login: str
+            login: str,
+            deadline: Optional[Deadline] = None
     ) -> str:
         """
         Получение токена активации с проверкой его наличия.
         
         Args:
             login (str): Логин пользователя
+            deadline (Deadline, optional): Бюджет времени ожидания письма
             
         Returns:
             str: Токен активации
             
         Raises:
             AssertionError: Если токен не найден
+            DeadlineExceeded: Если дедлайн истек до получения токена
         """
-        token: Optional[str] = self.get_activation_token_by_login(login=login)
+        token: Optional[str] = self.get_activation_token_by_login(login=login, deadline=deadline)
         assert token is not None, f'Токен для пользователя {login} не был получен'
         return token
 
+    @traced()
     def activate_user(
             self,
             token: str,
@@ -0,0 +1,289 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Tuple, Any, Generator
+
+from helpers.profiling import SamplingProfiler, categorize_stack
+from restclient import tracing
+from restclient.client import ROUND_TRIP_ATTRIBUTE, ROUND_TRIP_CPU_ATTRIBUTE
+
+# Span ожидания письма: сон между опросами MailHog и сами опросы
+MAIL_WAIT_SPAN: str = 'get_activation_token_by_login'
+
+# Категории клиентского CPU из профилировщика: валидация моделей, логирование, cURL, разбор JSON
+CPU_CATEGORIES: Tuple[str, ...] = ('pydantic', 'structlog', 'curlify', 'json')
+
+# Составляющие времени теста и их подписи в таблице
+COMPONENTS: Dict[str, str] = {'network': 'Сеть', 'mail_wait': 'Письма', 'cpu': 'CPU', 'other': 'Прочее'}
+
+
+class Breakdown:
+    """
+    Разбивка времени одного теста (setup, call и teardown).
+
+    network — время передачи запросов RestClient вне ожидания писем,
+    mail_wait — время в get_activation_token_by_login (опросы MailHog и сон
+    между ними), cpu — процессорное время потока теста за вычетом времени
+    внутри передачи запросов (network_cpu: requests, urllib3, сжатие уже
+    учтены в network или mail_wait), other — остаток (ожидание ограничителя
+    частоты и фикстур, накладные расходы pytest). Процессорное время разбора
+    писем входит и в mail_wait, и в cpu, поэтому сумма составляющих может
+    немного превышать wall, а остаток ограничен снизу нулем.
+    """
+
+    def __init__(self, nodeid: str) -> None:
+        """
+        Инициализация пустой разбивки.
+
+        Args:
+            nodeid (str): Идентификатор теста
+        """
+        self.nodeid: str = nodeid
+        self.wall: float = 0.0
+        self.network: float = 0.0
+        self.requests: int = 0
+        self.mail_wait: float = 0.0
+        self.mail_network: float = 0.0
+        self.mail_polls: int = 0
+        self.cpu: float = 0.0
+        self.network_cpu: float = 0.0
+        self.cpu_categories: Dict[str, float] = {}
+
+    @property
+    def other(self) -> float:
+        """
+        Время теста, не попавшее в сеть, ожидание писем и CPU.
+        """
+        return max(0.0, self.wall - self.network - self.mail_wait - self.cpu)
+
+    @property
+    def bottleneck(self) -> str:
+        """
+        Наибольшая составляющая времени теста.
+        """
+        return max(COMPONENTS, key=lambda name: getattr(self, name))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Представление разбивки для JSON-артефакта и передачи между процессами.
+
+        Returns:
+            dict: Значения в секундах
+        """
+        return {
+            'nodeid': self.nodeid,
+            'wall': round(self.wall, 6),
+            'network': round(self.network, 6),
+            'requests': self.requests,
+            'mail_wait': round(self.mail_wait, 6),
+            'mail_sleep': round(max(0.0, self.mail_wait - self.mail_network), 6),
+            'mail_polls': self.mail_polls,
+            'cpu': round(self.cpu, 6),
+            'network_cpu': round(self.network_cpu, 6),
+            'cpu_categories': {name: round(value, 6) for name, value in self.cpu_categories.items()},
+            'other': round(self.other, 6),
+            'bottleneck': self.bottleneck,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Breakdown':
+        """
+        Восстановление разбивки из to_dict().
+
+        Args:
+            data (dict): Значения в секундах
+
+        Returns:
+            Breakdown: Разбивка теста
+        """
+        breakdown: Breakdown = cls(data['nodeid'])
+        breakdown.wall = data['wall']
+        breakdown.network = data['network']
+        breakdown.requests = data['requests']
+        breakdown.mail_wait = data['mail_wait']
+        breakdown.mail_network = data['mail_wait'] - data['mail_sleep']
+        breakdown.mail_polls = data['mail_polls']
+        breakdown.cpu = data['cpu']
+        breakdown.network_cpu = data['network_cpu']
+        breakdown.cpu_categories = dict(data['cpu_categories'])
+        return breakdown
+
+
+class BreakdownRecorder:
+    """
+    Сбор разбивки времени тестов на сеть, ожидание писем и клиентский CPU.
+
+    Подключается как экспортер трассировки (restclient.tracing.add_exporter):
+    span HTTP-запросов несут время обращения к сервису, span
+    get_activation_token_by_login — время ожидания письма. Процессорное время
+    потока теста измеряется time.thread_time() за вычетом процессорного времени
+    внутри передачи запросов (атрибут span ROUND_TRIP_CPU_ATTRIBUTE), а его
+    доли pydantic, structlog, curlify и json оцениваются сэмплирующим
+    профилировщиком.
+
+    Example:
+        >>> recorder = BreakdownRecorder()
+        >>> tracing.add_exporter(recorder)
+        >>> with recorder.measure('test_login'):
+        ...     account_helper.user_login(login=login, password=password)
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        """
+        Инициализация сборщика.
+
+        Args:
+            interval (float, optional): Интервал сэмплирования в секундах. По умолчанию 5 мс
+        """
+        self.profiler: SamplingProfiler = SamplingProfiler(interval=interval)
+        self.results: List[Breakdown] = []
+        self._current: Optional[Breakdown] = None
+        self._lock: threading.Lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, nodeid: str) -> Generator[Breakdown, None, None]:
+        """
+        Контекстный менеджер, измеряющий время теста.
+
+        Args:
+            nodeid (str): Идентификатор теста
+
+        Yields:
+            Breakdown: Разбивка, заполняемая по выходе из блока
+        """
+        breakdown: Breakdown = Breakdown(nodeid)
+        with self._lock:
+            self._current = breakdown
+        self.profiler.samples.clear()
+        started: float = time.perf_counter()
+        cpu_started: float = time.thread_time()
+        try:
+            with self.profiler.activate():
+                yield breakdown
+        finally:
+            breakdown.cpu = max(0.0, time.thread_time() - cpu_started - breakdown.network_cpu)
+            breakdown.wall = time.perf_counter() - started
+            with self._lock:
+                self._current = None
+            self._add_samples(breakdown, dict(self.profiler.samples))
+            self.results.append(breakdown)
+
+    def export(self, span: tracing.Span) -> None:
+        """
+        Учет завершенного span в разбивке текущего теста (интерфейс экспортера трассировки).
+
+        Args:
+            span (Span): Завершенный span
+        """
+        waiting: bool = False
+        parent: Optional[tracing.Span] = span.parent
+        while parent is not None and not waiting:
+            waiting = parent.name == MAIL_WAIT_SPAN
+            parent = parent.parent
+        with self._lock:
+            breakdown: Optional[Breakdown] = self._current
+            if breakdown is None:
+                return
+            if span.name == MAIL_WAIT_SPAN:
+                if not waiting:
+                    breakdown.mail_wait += span.duration
+                return
+            round_trip: Optional[float] = span.attributes.get(ROUND_TRIP_ATTRIBUTE)
+            if round_trip is None:
+                return
+            breakdown.network_cpu += span.attributes.get(ROUND_TRIP_CPU_ATTRIBUTE, 0.0)
+            if waiting:
+                breakdown.mail_network += round_trip
+                breakdown.mail_polls += 1
+            else:
+                breakdown.network += round_trip
+                breakdown.requests += 1
+
+    def close(self) -> None:
+        """
+        Остановка профилировщика.
+        """
+        self.profiler.close()
+
+    def _add_samples(self, breakdown: Breakdown, samples: Dict[tuple, int]) -> None:
+        """
+        Оценка долей клиентского CPU по сэмплам стеков потока теста.
+        """
+        for stack, count in samples.items():
+            category: str = categorize_stack(stack)
+            if category in CPU_CATEGORIES:
+                breakdown.cpu_categories[category] = (
+                    breakdown.cpu_categories.get(category, 0.0) + count * self.profiler.interval
+                )
+
+
+def format_table(results: List[Breakdown], top: int = 15) -> str:
+    """
+    Форматирование таблицы самых долгих тестов с разбивкой времени.
+
+    Args:
+        results (list): Разбивки тестов
+        top (int, optional): Количество тестов в таблице. По умолчанию 15
+
+    Returns:
+        str: Текст таблицы с итоговой строкой
+    """
+    ordered: List[Breakdown] = sorted(results, key=lambda breakdown: -breakdown.wall)[:top]
+    header: str = f"{'Тест':<60}{'Всего, с':>10}" + ''.join(f'{label:>9}' for label in COMPONENTS.values())
+    lines: List[str] = [header + f"{'Узкое место':>14}"]
+    for breakdown in ordered:
+        name: str = breakdown.nodeid if len(breakdown.nodeid) <= 58 else '…' + breakdown.nodeid[-57:]
+        values: str = ''.join(f'{getattr(breakdown, component):>9.3f}' for component in COMPONENTS)
+        lines.append(f'{name:<60}{breakdown.wall:>10.3f}{values}{COMPONENTS[breakdown.bottleneck]:>14}')
+    totals: Dict[str, float] = totals_of(results)
+    lines.append(
+        f"{f'Итого ({len(results)} тестов)':<60}{totals['wall']:>10.3f}"
+        + ''.join(f'{totals[component]:>9.3f}' for component in COMPONENTS)
+    )
+    categories: str = ', '.join(
+        f'{name} {totals.get(name, 0.0):.3f} с' for name in CPU_CATEGORIES if totals.get(name)
+    )
+    if categories:
+        lines.append(f'Клиентский CPU по сэмплам: {categories}')
+    return '\n'.join(lines)
+
+
+def totals_of(results: List[Breakdown]) -> Dict[str, float]:
+    """
+    Суммарное время составляющих и категорий CPU по всем тестам.
+
+    Args:
+        results (list): Разбивки тестов
+
+    Returns:
+        dict: Секунды по имени составляющей или категории CPU
+    """
+    names: Tuple[str, ...] = ('wall', *COMPONENTS)
+    totals: Dict[str, float] = {name: 0.0 for name in names}
+    for breakdown in results:
+        for name in names:
+            totals[name] += getattr(breakdown, name)
+        for category, value in breakdown.cpu_categories.items():
+            totals[category] = totals.get(category, 0.0) + value
+    return totals
+
+
+def write_report(path: str, results: List[Breakdown]) -> None:
+    """
+    Запись JSON-артефакта с разбивкой времени всех тестов.
+
+    Args:
+        path (str): Путь к файлу
+        results (list): Разбивки тестов
+    """
+    directory: str = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    report: Dict[str, Any] = {
+        'tests': [breakdown.to_dict() for breakdown in sorted(results, key=lambda breakdown: -breakdown.wall)],
+        'totals': {name: round(value, 6) for name, value in totals_of(results).items()},
+    }
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
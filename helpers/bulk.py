@@ -0,0 +1,109 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from typing import Optional, List, Callable, Iterable, Any, Tuple
+
+from restclient.lazy import lazy_import
+
+# Нужен только для разбора ошибок: загружается при первом обращении
+requests = lazy_import('requests')
+
+# Число параллельных запросов по умолчанию — размер пула соединений requests на хост
+BULK_WORKERS: int = 10
+
+Progress = Callable[['BulkResult'], None]
+
+
+class BulkResult:
+    """
+    Итог массовой операции: число обработанных, успешных, пропущенных и неудачных элементов.
+    """
+
+    def __init__(self, name: str, total: int) -> None:
+        """
+        Инициализация итога.
+
+        Args:
+            name (str): Имя операции для отчета
+            total (int): Число элементов
+        """
+        self.name: str = name
+        self.total: int = total
+        self.succeeded: int = 0
+        self.skipped: int = 0
+        self.failed: int = 0
+        self.errors: List[Tuple[Any, str]] = []
+        self.started: float = time.monotonic()
+        self.elapsed: float = 0.0
+
+    @property
+    def done(self) -> int:
+        """
+        Число обработанных элементов.
+        """
+        return self.succeeded + self.skipped + self.failed
+
+    def __str__(self) -> str:
+        return (
+            f'{self.name}: {self.done}/{self.total} за {self.elapsed:.1f} с — '
+            f'успешно {self.succeeded}, пропущено {self.skipped}, ошибок {self.failed}'
+        )
+
+
+def run_bulk(
+        name: str,
+        items: Iterable[Any],
+        action: Callable[[Any], Optional[bool]],
+        max_workers: int = BULK_WORKERS,
+        progress: Optional[Progress] = None,
+        progress_every: int = 100,
+        skip_statuses: Tuple[int, ...] = ()
+) -> BulkResult:
+    """
+    Параллельное выполнение действия над элементами с ограничением числа потоков.
+
+    Ошибка одного элемента не прерывает операцию: она учитывается в итоге
+    (первые 20 ошибок сохраняются в errors). Действия выполняются в
+    контексте вызывающего потока (трассировка, дедлайн).
+
+    Args:
+        name (str): Имя операции для отчета
+        items (Iterable): Элементы
+        action (Callable): Действие над элементом; False — элемент пропущен
+        max_workers (int, optional): Число параллельных потоков. По умолчанию BULK_WORKERS
+        progress (Callable, optional): Вызывается с текущим итогом каждые progress_every элементов и в конце
+        progress_every (int, optional): Периодичность вызова progress. По умолчанию 100
+        skip_statuses (tuple, optional): HTTP-статусы ошибок, при которых элемент считается пропущенным
+            (например, 401 для уже недействительного токена)
+
+    Returns:
+        BulkResult: Итог операции
+    """
+    items = list(items)
+    result: BulkResult = BulkResult(name, len(items))
+
+    def finish(item: Any, outcome: Optional[bool], error: Optional[BaseException]) -> None:
+        if error is None:
+            if outcome is False:
+                result.skipped += 1
+            else:
+                result.succeeded += 1
+        elif isinstance(error, requests.HTTPError) and error.response is not None \
+                and error.response.status_code in skip_statuses:
+            result.skipped += 1
+        else:
+            result.failed += 1
+            if len(result.errors) < 20:
+                result.errors.append((item, repr(error)))
+        result.elapsed = time.monotonic() - result.started
+        if progress is not None and (result.done % progress_every == 0 or result.done == result.total):
+            progress(result)
+
+    # Итог обновляется только в вызывающем потоке по мере завершения задач
+    with ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix=name) as executor:
+        futures = {executor.submit(copy_context().run, action, item): item for item in items}
+        for future in as_completed(futures):
+            error: Optional[BaseException] = future.exception()
+            finish(futures[future], None if error is not None else future.result(), error)
+    result.elapsed = time.monotonic() - result.started
+    return result
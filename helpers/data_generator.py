@@ -0,0 +1,256 @@
+import random
+import string
+import time
+from collections import namedtuple
+from typing import Optional, List, Tuple, Set, Dict
+
+User = namedtuple('User', ['login', 'password', 'email'])
+
+# Символы логина и пароля; логин в нижнем регистре, чтобы совпадать с адресом в MailHog
+LOGIN_ALPHABET: str = string.ascii_lowercase + string.digits
+PASSWORD_ALPHABET: str = string.ascii_letters + string.digits
+
+# Длина случайной части логина: около 36 ** 8 вариантов на пространство имен
+LOGIN_TOKEN_LENGTH: int = 8
+
+# Границы длины пароля, принимаемого DM API
+MIN_PASSWORD_LENGTH: int = 6
+MAX_PASSWORD_LENGTH: int = 12
+
+INVALID_FIELDS: Tuple[str, ...] = ('login', 'password', 'email')
+
+
+class CredentialPool:
+    """
+    Пул заранее сгенерированных учетных данных пользователей.
+
+    Логины, пароли и адреса генерируются пачками: случайные символы всей
+    пачки получаются одним вызовом randbytes с переводом байтов в алфавит
+    (bytes.translate) и нарезаются из одной строки. Выдача очередного
+    пользователя — взятие элемента с конца списка за O(1); при исчерпании
+    генерируется следующая пачка без повторения ранее выданных логинов.
+    Пользователи с невалидными полями генерируются при первом запросе.
+
+    При заданном seed последовательность данных воспроизводима. Логины
+    уникальны в пределах пула; между запусками их разделяет пространство
+    имен (по умолчанию — время создания пула), поэтому для полностью
+    детерминированных данных передаются и seed, и namespace.
+
+    Пул не потокобезопасен и не переживает fork: каждому потоку и процессу
+    нагрузки нужен свой пул со своим пространством имен.
+
+    Example:
+        >>> pool = CredentialPool(size=1000, seed=42, prefix='load')
+        >>> user = pool.user()
+        >>> invalid = pool.invalid('password')
+    """
+
+    def __init__(
+            self,
+            size: int = 1000,
+            seed: Optional[int] = None,
+            prefix: str = 'golovan',
+            namespace: Optional[str] = None,
+            domain: str = 'mail.ru'
+    ) -> None:
+        """
+        Инициализация пула и генерация первой пачки.
+
+        Args:
+            size (int, optional): Размер пачки. По умолчанию 1000
+            seed (int, optional): Начальное значение генератора для воспроизводимых данных
+            prefix (str, optional): Префикс логинов. По умолчанию 'golovan'
+            namespace (str, optional): Пространство имен логинов. По умолчанию — время создания пула
+            domain (str, optional): Домен адресов. По умолчанию 'mail.ru'
+
+        Raises:
+            ValueError: Если размер пачки не положительный
+        """
+        if size <= 0:
+            raise ValueError('Размер пачки должен быть положительным')
+        self.size: int = size
+        self.prefix: str = prefix
+        self.namespace: str = namespace if namespace is not None else _base36(time.time_ns() // 1000)
+        self.domain: str = domain
+        self._random: random.Random = random.Random(seed)
+        self._issued: Set[str] = set()
+        self._users: List[User] = []
+        self._invalid: Dict[str, List[User]] = {field: [] for field in INVALID_FIELDS}
+        self._fill()
+
+    def user(self) -> User:
+        """
+        Данные нового уникального пользователя.
+
+        Returns:
+            User: Логин, пароль и email, проходящие валидацию DM API
+        """
+        if not self._users:
+            self._fill()
+        return self._users.pop()
+
+    def users(self, count: int) -> List[User]:
+        """
+        Данные нескольких уникальных пользователей.
+
+        Args:
+            count (int): Число пользователей
+
+        Returns:
+            List[User]: Пользователи в порядке выдачи
+        """
+        return [self.user() for _ in range(count)]
+
+    def invalid(self, field: str) -> User:
+        """
+        Данные пользователя с одним невалидным полем.
+
+        Невалидный логин короче двух символов, пароль короче MIN_PASSWORD_LENGTH,
+        адрес не содержит '@'. Остальные поля валидны.
+
+        Args:
+            field (str): Невалидное поле: 'login', 'password' или 'email'
+
+        Returns:
+            User: Данные пользователя
+
+        Raises:
+            ValueError: Если поле неизвестно
+        """
+        if field not in self._invalid:
+            raise ValueError(f'Неизвестное поле {field!r}, ожидается одно из {INVALID_FIELDS}')
+        pool: List[User] = self._invalid[field]
+        if not pool:
+            self._fill_invalid(field)
+        return pool.pop()
+
+    def _fill(self) -> None:
+        """
+        Генерация пачки валидных пользователей.
+        """
+        logins: List[str] = self._logins(self.size)
+        passwords: List[str] = self._passwords(len(logins), MIN_PASSWORD_LENGTH, MAX_PASSWORD_LENGTH)
+        # Выдача идет с конца списка, поэтому пачка разворачивается для сохранения порядка генерации
+        self._users[:0] = [
+            User(login=login, password=password, email=f'{login}@{self.domain}')
+            for login, password in zip(reversed(logins), reversed(passwords))
+        ]
+
+    def _fill_invalid(self, field: str) -> None:
+        """
+        Генерация пачки пользователей с невалидным полем.
+
+        Args:
+            field (str): Невалидное поле
+        """
+        logins: List[str] = self._logins(self.size)
+        count: int = len(logins)
+        if field == 'password':
+            passwords: List[str] = self._passwords(count, 1, MIN_PASSWORD_LENGTH - 1)
+        else:
+            passwords = self._passwords(count, MIN_PASSWORD_LENGTH, MAX_PASSWORD_LENGTH)
+        if field == 'login':
+            users: List[User] = [
+                User(login=char, password=password, email=f'{login}@{self.domain}')
+                for char, login, password in zip(self._chars(count, LOGIN_ALPHABET), logins, passwords)
+            ]
+        elif field == 'email':
+            users = [
+                User(login=login, password=password, email=f'{login}.{self.domain}')
+                for login, password in zip(logins, passwords)
+            ]
+        else:
+            users = [
+                User(login=login, password=password, email=f'{login}@{self.domain}')
+                for login, password in zip(logins, passwords)
+            ]
+        self._invalid[field][:0] = reversed(users)
+
+    def _logins(self, count: int) -> List[str]:
+        """
+        Уникальные логины, не выданные ранее.
+
+        Args:
+            count (int): Число логинов
+
+        Returns:
+            List[str]: Логины (может быть меньше count, если часть совпала с выданными)
+        """
+        tokens: str = self._chars(count * LOGIN_TOKEN_LENGTH, LOGIN_ALPHABET)
+        logins: List[str] = []
+        for offset in range(0, len(tokens), LOGIN_TOKEN_LENGTH):
+            token: str = tokens[offset:offset + LOGIN_TOKEN_LENGTH]
+            if token not in self._issued:
+                self._issued.add(token)
+                logins.append(f'{self.prefix}_{self.namespace}_{token}')
+        return logins
+
+    def _passwords(self, count: int, min_length: int, max_length: int) -> List[str]:
+        """
+        Случайные пароли заданной длины.
+
+        Args:
+            count (int): Число паролей
+            min_length (int): Минимальная длина
+            max_length (int): Максимальная длина
+
+        Returns:
+            List[str]: Пароли
+        """
+        lengths: bytes = self._random.randbytes(count).translate(_length_table(min_length, max_length))
+        chars: str = self._chars(sum(lengths), PASSWORD_ALPHABET)
+        passwords: List[str] = []
+        offset: int = 0
+        for length in lengths:
+            passwords.append(chars[offset:offset + length])
+            offset += length
+        return passwords
+
+    def _chars(self, count: int, alphabet: str) -> str:
+        """
+        Строка случайных символов алфавита.
+
+        Случайные байты отображаются на алфавит одной таблицей перевода;
+        небольшая неравномерность распределения для тестовых данных неважна.
+
+        Args:
+            count (int): Длина строки
+            alphabet (str): Алфавит (ASCII)
+
+        Returns:
+            str: Строка случайных символов
+        """
+        table: bytes = bytes(ord(alphabet[index % len(alphabet)]) for index in range(256))
+        return self._random.randbytes(count).translate(table).decode('ascii')
+
+
+def _length_table(min_length: int, max_length: int) -> bytes:
+    """
+    Таблица перевода случайного байта в длину из диапазона.
+
+    Args:
+        min_length (int): Минимальная длина
+        max_length (int): Максимальная длина
+
+    Returns:
+        bytes: Таблица для bytes.translate
+    """
+    return bytes(min_length + index % (max_length - min_length + 1) for index in range(256))
+
+
+def _base36(value: int, width: int = 0) -> str:
+    """
+    Запись числа в системе счисления с основанием 36.
+
+    Args:
+        value (int): Неотрицательное число
+        width (int, optional): Минимальная длина, дополняется нулями слева
+
+    Returns:
+        str: Запись числа
+    """
+    digits: List[str] = []
+    while value:
+        value, remainder = divmod(value, 36)
+        digits.append(LOGIN_ALPHABET[(remainder + 26) % 36])
+    return ''.join(reversed(digits)).rjust(width, '0') or '0'
@@ -0,0 +1,359 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from types import CodeType, FrameType
+from typing import Optional, Dict, List, Tuple, Iterable, Callable, Generator, Any
+
+# Категории времени: сетевое ожидание, сон при опросе и клиентский CPU по библиотекам.
+# Категория определяется по первому совпадению при обходе стека от вершины к корню.
+CATEGORIES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ('network', ('socket.py', 'ssl.py', 'selectors.py', 'util/wait.py', '_socket', '_ssl', 'select.')),
+    ('sleep', ('retrying', 'time.sleep')),
+    ('pydantic', ('pydantic',)),
+    ('curlify', ('curlify',)),
+    ('structlog', ('structlog',)),
+    ('json', ('json',)),
+)
+OTHER_CATEGORY: str = 'other'
+
+
+def categorize(locations: Iterable[str]) -> str:
+    """
+    Определение категории времени по стеку вызовов.
+
+    Args:
+        locations: Места вызова ('файл:функция') от вершины стека к корню
+
+    Returns:
+        str: Имя категории из CATEGORIES или 'other' (код фреймворка и тестов)
+    """
+    for depth, location in enumerate(locations):
+        for category, markers in CATEGORIES:
+            # Сон относится только к самому вложенному фрейму: код, вызванный
+            # из retrying, не должен считаться ожиданием
+            if category == 'sleep' and depth:
+                continue
+            if any(marker in location for marker in markers):
+                return category
+    return OTHER_CATEGORY
+
+
+def categorize_stack(stack: Iterable[CodeType]) -> str:
+    """
+    Определение категории времени по сэмплу стека SamplingProfiler.
+
+    Args:
+        stack: Объекты кода фреймов от вершины стека к корню (ключ SamplingProfiler.samples)
+
+    Returns:
+        str: Имя категории из CATEGORIES или 'other'
+    """
+    return categorize(_location(code) for code in stack)
+
+
+class SamplingProfiler:
+    """
+    Сэмплирующий профилировщик по реальному времени.
+
+    Фоновый поток с заданным интервалом снимает стеки активных потоков.
+    Поскольку учитывается реальное время, сэмплы, пришедшиеся на ожидание
+    сокета, попадают в категорию network, а работа pydantic, structlog,
+    curlify и json — в соответствующие категории клиентского CPU.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        """
+        Инициализация профилировщика.
+
+        Args:
+            interval (float, optional): Интервал сэмплирования в секундах. По умолчанию 5 мс
+        """
+        self.interval: float = interval
+        self.samples: Counter = Counter()
+        self._active: Dict[int, int] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._stopped: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @contextmanager
+    def activate(self) -> Generator[None, None, None]:
+        """
+        Контекстный менеджер, включающий сэмплирование текущего потока.
+
+        Допускает вложенные вызовы: поток сэмплируется, пока не завершен внешний блок.
+        """
+        ident: int = threading.get_ident()
+        with self._lock:
+            self._active[ident] = self._active.get(ident, 0) + 1
+            if self._thread is None:
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+                self._thread.start()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active[ident] -= 1
+                if not self._active[ident]:
+                    del self._active[ident]
+
+    def close(self) -> None:
+        """
+        Остановка фонового потока сэмплирования.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """
+        Цикл сэмплирования стеков активных потоков.
+        """
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                idents: List[int] = list(self._active)
+            frames: Dict[int, FrameType] = sys._current_frames()
+            for ident in idents:
+                frame: Optional[FrameType] = frames.get(ident)
+                stack: List[CodeType] = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                if stack:
+                    self.samples[tuple(stack)] += 1
+
+    def write(self, output_dir: str, label: str, top: int = 20) -> str:
+        """
+        Запись результатов профилирования.
+
+        Создает файл свернутых стеков (формат flamegraph.pl / speedscope)
+        и текстовую сводку с разбивкой по категориям и топом функций.
+
+        Args:
+            output_dir (str): Каталог для результатов
+            label (str): Метка профиля, используется в именах файлов
+            top (int, optional): Количество функций в топе. По умолчанию 20
+
+        Returns:
+            str: Текст сводки
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        collapsed_path: str = os.path.join(output_dir, f'{label}.collapsed')
+        categories: Counter = Counter()
+        functions: Counter = Counter()
+        with open(collapsed_path, 'w', encoding='utf-8') as file:
+            for stack, count in self.samples.items():
+                locations: List[str] = [_location(code) for code in stack]
+                categories[categorize(locations)] += count
+                functions[locations[0]] += count
+                file.write(f"{';'.join(reversed(locations))} {count}\n")
+        summary: str = _format_summary(
+            title=f'Профиль {label}: {sum(self.samples.values())} сэмплов, интервал {self.interval * 1000:g} мс',
+            categories={name: count * self.interval for name, count in categories.items()},
+            functions={name: count * self.interval for name, count in functions.most_common(top)},
+            artifacts=[collapsed_path]
+        )
+        _write_summary(output_dir, label, summary)
+        return summary
+
+
+class DeterministicProfiler:
+    """
+    Детерминированный профилировщик на основе cProfile.
+
+    Учитывает каждый вызов функции (с заметными накладными расходами),
+    собственное время функций измеряется по реальному времени, поэтому
+    ожидание в методах сокета попадает в категорию network.
+    """
+
+    def __init__(self) -> None:
+        """
+        Инициализация профилировщика.
+        """
+        self._profiles: List[cProfile.Profile] = []
+        self._local: threading.local = threading.local()
+        self._lock: threading.Lock = threading.Lock()
+
+    @contextmanager
+    def activate(self) -> Generator[None, None, None]:
+        """
+        Контекстный менеджер, включающий профилирование текущего потока.
+
+        Допускает вложенные вызовы: профилирование выключается при выходе из внешнего блока.
+        """
+        depth: int = getattr(self._local, 'depth', 0)
+        if not depth:
+            if not hasattr(self._local, 'profile'):
+                self._local.profile = cProfile.Profile()
+                with self._lock:
+                    self._profiles.append(self._local.profile)
+            self._local.profile.enable()
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+            if not self._local.depth:
+                self._local.profile.disable()
+
+    def close(self) -> None:
+        """
+        Завершение профилирования (для совместимости с SamplingProfiler).
+        """
+
+    def write(self, output_dir: str, label: str, top: int = 20) -> str:
+        """
+        Запись результатов профилирования.
+
+        Создает файл pstats (.prof, открывается snakeviz, flameprof, gprof2dot)
+        и текстовую сводку с разбивкой по категориям и топом функций.
+
+        Args:
+            output_dir (str): Каталог для результатов
+            label (str): Метка профиля, используется в именах файлов
+            top (int, optional): Количество функций в топе. По умолчанию 20
+
+        Returns:
+            str: Текст сводки
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        if not self._profiles:
+            return f'Профиль {label}: нет данных'
+        stats: pstats.Stats = pstats.Stats(self._profiles[0])
+        for profile in self._profiles[1:]:
+            stats.add(profile)
+        prof_path: str = os.path.join(output_dir, f'{label}.prof')
+        stats.dump_stats(prof_path)
+        categories: Counter = Counter()
+        functions: Counter = Counter()
+        for (filename, _, function_name), (_, _, tottime, _, _) in stats.stats.items():
+            location: str = f'{filename}:{function_name}' if filename != '~' else function_name
+            categories[categorize([location])] += tottime
+            functions[location] += tottime
+        summary: str = _format_summary(
+            title=f'Профиль {label}: {stats.total_calls} вызовов, {stats.total_tt:.3f} с',
+            categories=dict(categories),
+            functions=dict(functions.most_common(top)),
+            artifacts=[prof_path]
+        )
+        _write_summary(output_dir, label, summary)
+        return summary
+
+
+def create_profiler(mode: str = 'sampling', interval: float = 0.005) -> Any:
+    """
+    Создание профилировщика по имени режима.
+
+    Args:
+        mode (str, optional): 'sampling' или 'deterministic'. По умолчанию 'sampling'
+        interval (float, optional): Интервал сэмплирования в секундах
+
+    Returns:
+        SamplingProfiler или DeterministicProfiler: Профилировщик
+
+    Raises:
+        ValueError: Если режим неизвестен
+    """
+    if mode == 'sampling':
+        return SamplingProfiler(interval=interval)
+    if mode == 'deterministic':
+        return DeterministicProfiler()
+    raise ValueError(f'Неизвестный режим профилирования: {mode}')
+
+
+def profile_methods(
+        cls: type,
+        method_names: Iterable[str],
+        profiler: Any
+) -> Callable[[], None]:
+    """
+    Оборачивание методов класса в профилировщик.
+
+    Используется для профилирования выбранных методов AccountHelper:
+    каждый вызов метода выполняется внутри profiler.activate().
+
+    Args:
+        cls (type): Класс, методы которого профилируются
+        method_names: Имена методов
+        profiler: Профилировщик (SamplingProfiler или DeterministicProfiler)
+
+    Returns:
+        Callable: Функция, восстанавливающая исходные методы
+
+    Raises:
+        AttributeError: Если у класса нет метода с указанным именем
+    """
+    originals: Dict[str, Callable[..., Any]] = {}
+    for name in method_names:
+        original: Callable[..., Any] = getattr(cls, name)
+        originals[name] = original
+        setattr(cls, name, _wrap(original, profiler))
+
+    def restore() -> None:
+        for method_name, method in originals.items():
+            setattr(cls, method_name, method)
+
+    return restore
+
+
+def _wrap(method: Callable[..., Any], profiler: Any) -> Callable[..., Any]:
+    """
+    Обертка метода, выполняющая его внутри profiler.activate().
+    """
+
+    @wraps(method)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with profiler.activate():
+            return method(*args, **kwargs)
+
+    return wrapper
+
+
+def _location(code: CodeType) -> str:
+    """
+    Короткое имя места вызова: 'каталог/файл.py:функция'.
+    """
+    parts: List[str] = code.co_filename.replace('\\', '/').rsplit('/', 2)
+    return f"{'/'.join(parts[-2:])}:{code.co_name}"
+
+
+def _format_summary(
+        title: str,
+        categories: Dict[str, float],
+        functions: Dict[str, float],
+        artifacts: List[str]
+) -> str:
+    """
+    Форматирование текстовой сводки профиля.
+    """
+    total: float = sum(categories.values()) or 1.0
+    client_cpu: float = sum(
+        value for name, value in categories.items() if name not in ('network', 'sleep')
+    )
+    lines: List[str] = [title, '', f"{'Категория':<12}{'Время, с':>12}{'Доля':>9}"]
+    for name, value in sorted(categories.items(), key=lambda item: -item[1]):
+        lines.append(f'{name:<12}{value:>12.3f}{value / total:>9.1%}')
+    lines.append(
+        f"Сеть: {categories.get('network', 0.0):.3f} с, "
+        f"ожидание писем: {categories.get('sleep', 0.0):.3f} с, "
+        f'клиентский CPU: {client_cpu:.3f} с'
+    )
+    lines += ['', 'Топ функций по собственному времени:']
+    for name, value in functions.items():
+        lines.append(f'{value:>10.3f} с  {name}')
+    lines += ['', 'Файлы: ' + ', '.join(artifacts)]
+    return '\n'.join(lines)
+
+
+def _write_summary(output_dir: str, label: str, summary: str) -> None:
+    """
+    Запись текстовой сводки рядом с данными профиля.
+    """
+    with open(os.path.join(output_dir, f'{label}-summary.txt'), 'w', encoding='utf-8') as file:
+        file.write(summary + '\n')
@@ -0,0 +1,577 @@
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional, Dict, List, Callable, Any, Tuple
+
+from helpers.account_helper import AccountHelper
+from load.driver import (
+    AccountHelperFactory, LoadDriver, Scenario, flush_records, load_scenario, process_context
+)
+from load.histogram import LatencyHistogram, HistogramRecorder
+from load.history import save_run
+from restclient import tracing
+from restclient.balancer import close_balancers
+from restclient.configuration import Configuration
+
+# HTTP-методы: по ним span запросов RestClient ('POST /v1/account') отличаются от шагов AccountHelper
+HTTP_METHODS = frozenset({'GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD', 'OPTIONS'})
+
+# Пауза виртуального пользователя, не входящего в текущий предел параллельности
+IDLE_PAUSE: float = 0.05
+
+# Предел параллельности, действовавший при старте текущей итерации виртуального пользователя
+_iteration_limit: ContextVar[int] = ContextVar('iteration_limit', default=0)
+
+
+class ConcurrencyPolicy:
+    """
+    Параметры регулятора параллельности (AIMD).
+
+    Пока перцентиль задержки HTTP-запросов RestClient укладывается в цель,
+    а доля ошибок — в допустимую, предел параллельности растет на increase
+    за интервал (в начале — удваивается, как медленный старт TCP). При
+    нарушении цели предел умножается на decrease. Так предел колеблется
+    вокруг наибольшей параллельности, при которой цель еще выполняется.
+    """
+
+    def __init__(
+            self,
+            latency_target: float = 0.5,
+            percentile: float = 95.0,
+            max_error_rate: float = 0.01,
+            initial: int = 1,
+            minimum: int = 1,
+            maximum: int = 200,
+            increase: int = 1,
+            decrease: float = 0.7,
+            interval: float = 3.0,
+            min_samples: int = 20
+    ) -> None:
+        """
+        Инициализация параметров.
+
+        Args:
+            latency_target (float, optional): Цель по перцентилю задержки запросов в секундах. По умолчанию 0.5
+            percentile (float, optional): Перцентиль задержки. По умолчанию 95
+            max_error_rate (float, optional): Допустимая доля ошибочных запросов. По умолчанию 0.01
+            initial (int, optional): Начальный предел параллельности. По умолчанию 1
+            minimum (int, optional): Наименьший предел. По умолчанию 1
+            maximum (int, optional): Наибольший предел (число виртуальных пользователей). По умолчанию 200
+            increase (int, optional): Прирост предела за интервал. По умолчанию 1
+            decrease (float, optional): Множитель предела при нарушении цели. По умолчанию 0.7
+            interval (float, optional): Интервал регулирования в секундах. По умолчанию 3
+            min_samples (int, optional): Наименьшее число запросов для решения; интервал продлевается,
+                пока их меньше (но не более чем в 5 раз). По умолчанию 20
+
+        Raises:
+            ValueError: Если параметры противоречат друг другу
+        """
+        if not 1 <= minimum <= initial <= maximum or not 0 < decrease < 1 or increase < 1:
+            raise ValueError(
+                f'Некорректные параметры регулятора: предел {minimum}..{initial}..{maximum}, '
+                f'прирост {increase}, множитель {decrease}'
+            )
+        self.latency_target: float = latency_target
+        self.percentile: float = percentile
+        self.max_error_rate: float = max_error_rate
+        self.initial: int = initial
+        self.minimum: int = minimum
+        self.maximum: int = maximum
+        self.increase: int = increase
+        self.decrease: float = decrease
+        self.interval: float = interval
+        self.min_samples: int = min_samples
+
+    def meets(self, latency: float, error_rate: float) -> bool:
+        """
+        Проверка, что замеры укладываются в цель.
+
+        Args:
+            latency (float): Перцентиль задержки в секундах
+            error_rate (float): Доля ошибочных запросов
+
+        Returns:
+            bool: True, если цель выполняется
+        """
+        return latency <= self.latency_target and error_rate <= self.max_error_rate
+
+    def next_limit(self, limit: int, latency: float, error_rate: float, slow_start: bool) -> int:
+        """
+        Новый предел параллельности по замерам интервала.
+
+        Args:
+            limit (int): Текущий предел
+            latency (float): Перцентиль задержки в секундах
+            error_rate (float): Доля ошибочных запросов
+            slow_start (bool): Цель еще ни разу не нарушалась
+
+        Returns:
+            int: Новый предел
+        """
+        if not self.meets(latency, error_rate):
+            return max(self.minimum, math.floor(limit * self.decrease))
+        return min(self.maximum, limit * 2 if slow_start else limit + self.increase)
+
+
+class CurvePoint:
+    """
+    Точка кривой пропускной способности: замеры при одном пределе параллельности.
+    """
+
+    def __init__(self, concurrency: int) -> None:
+        """
+        Инициализация пустой точки.
+
+        Args:
+            concurrency (int): Предел параллельности
+        """
+        self.concurrency: int = concurrency
+        self.elapsed: float = 0.0
+        self.requests: LatencyHistogram = LatencyHistogram()
+        self.iterations: LatencyHistogram = LatencyHistogram()
+
+    @property
+    def throughput(self) -> float:
+        """
+        Успешных итераций сценария в секунду.
+        """
+        return (self.iterations.count - self.iterations.errors) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """
+        Доля ошибочных HTTP-запросов.
+        """
+        return self.requests.errors / self.requests.count if self.requests.count else 0.0
+
+    def to_dict(self, percentile: float) -> Dict[str, Any]:
+        """
+        Представление точки для JSON-файла кривой.
+
+        Args:
+            percentile (float): Перцентиль задержки регулятора
+
+        Returns:
+            dict: Параллельность, пропускная способность, задержки в миллисекундах и доля ошибок
+        """
+        return {
+            'concurrency': self.concurrency,
+            'seconds': round(self.elapsed, 3),
+            'throughput': round(self.throughput, 3),
+            'requests': self.requests.count,
+            'error_rate': round(self.error_rate, 5),
+            'request_p50_ms': round(self.requests.percentile(50) * 1000, 1),
+            f'request_p{percentile:g}_ms': round(self.requests.percentile(percentile) * 1000, 1),
+            'iteration_p50_ms': round(self.iterations.percentile(50) * 1000, 1),
+        }
+
+
+class AdaptiveDriver(LoadDriver):
+    """
+    Генератор нагрузки с регулятором параллельности, ищущий точку насыщения сервиса.
+
+    Процессы-воркеры держат по users_per_worker виртуальных пользователей,
+    но итерации сценария выполняют только пользователи в пределах общего
+    предела параллельности (разделяемое значение multiprocessing). Родитель
+    раз в интервал регулирования оценивает перцентиль задержки и долю ошибок
+    HTTP-запросов RestClient и меняет предел по ConcurrencyPolicy. Замеры
+    складываются в кривую «параллельность — пропускная способность —
+    задержка»; колено кривой — точка с наибольшей пропускной способностью,
+    при которой цель по задержке и ошибкам еще выполняется.
+
+    Воркеры помечают замеры пределом, действовавшим при старте итерации
+    (LimitTaggedRecorder), поэтому итерации, начатые до смены предела и
+    пришедшие с запаздывающей отправкой, засчитываются прежнему пределу,
+    а решение регулятора принимается только по замерам текущего предела.
+    """
+
+    def __init__(
+            self,
+            scenario: Scenario,
+            helper_factory: Callable[[], AccountHelper],
+            policy: Optional[ConcurrencyPolicy] = None,
+            workers: Optional[int] = None,
+            duration: float = 120.0,
+            flush_interval: float = 0.5,
+            name: Optional[str] = None,
+            output: Callable[[str], None] = print
+    ) -> None:
+        """
+        Инициализация генератора нагрузки.
+
+        Args:
+            scenario (Callable): Сценарий — функция, принимающая AccountHelper
+            helper_factory (Callable): Фабрика AccountHelper
+            policy (ConcurrencyPolicy, optional): Параметры регулятора. По умолчанию ConcurrencyPolicy()
+            workers (int, optional): Число процессов. По умолчанию — число ядер, но не больше policy.maximum
+            duration (float, optional): Длительность поиска в секундах. По умолчанию 120
+            flush_interval (float, optional): Интервал отправки замеров воркером в секундах. По умолчанию 0.5
+            name (str, optional): Имя сценария в отчете. По умолчанию — имя функции
+            output (Callable, optional): Функция вывода отчета. По умолчанию print
+        """
+        self.policy: ConcurrencyPolicy = policy or ConcurrencyPolicy()
+        workers = min(workers or os.cpu_count() or 1, self.policy.maximum)
+        super().__init__(
+            scenario=scenario,
+            helper_factory=helper_factory,
+            workers=workers,
+            users_per_worker=math.ceil(self.policy.maximum / workers),
+            duration=duration,
+            report_interval=math.inf,
+            flush_interval=flush_interval,
+            name=name,
+            output=output
+        )
+        self.curve: Dict[int, CurvePoint] = {}
+        self.limits: List[int] = []
+        self._limit: Any = None
+        self._window: Dict[str, LatencyHistogram] = {}
+        self._window_started: float = 0.0
+        self._slow_start: bool = True
+
+    @property
+    def knee(self) -> Optional[CurvePoint]:
+        """
+        Точка кривой с наибольшей пропускной способностью, выполняющая цель (None, если таких нет).
+        """
+        passing: List[CurvePoint] = [
+            point for point in self.points
+            if point.requests.count and self.policy.meets(
+                point.requests.percentile(self.policy.percentile), point.error_rate
+            )
+        ]
+        return max(passing, key=lambda point: point.throughput, default=None)
+
+    @property
+    def points(self) -> List[CurvePoint]:
+        """
+        Точки кривой, по которым закрыт хотя бы один интервал регулирования, в порядке параллельности.
+        """
+        return [point for _, point in sorted(self.curve.items()) if point.elapsed]
+
+    @property
+    def converged(self) -> Optional[int]:
+        """
+        Медиана пределов за вторую половину поиска — значение, вокруг которого колеблется регулятор.
+        """
+        tail: List[int] = sorted(self.limits[len(self.limits) // 2:])
+        return tail[len(tail) // 2] if tail else None
+
+    def run(self) -> Dict[str, LatencyHistogram]:
+        """
+        Запуск поиска и вывод кривой пропускной способности.
+
+        Returns:
+            dict: Итоговые гистограммы задержек по имени операции
+        """
+        self._limit = process_context().Value('i', self.policy.initial)
+        self.curve, self.limits = {}, []
+        self._window, self._window_started, self._slow_start = {}, 0.0, True
+        total: Dict[str, LatencyHistogram] = super().run()
+        self.output(format_curve(self.name, self.points, self.knee, self.converged, self.policy))
+        return total
+
+    def result(self) -> Dict[str, Any]:
+        """
+        Кривая и колено для JSON-файла.
+
+        Returns:
+            dict: Цель регулятора, точки кривой, колено и значение сходимости
+        """
+        knee: Optional[CurvePoint] = self.knee
+        return {
+            'target': {
+                'percentile': self.policy.percentile,
+                'latency_ms': self.policy.latency_target * 1000,
+                'max_error_rate': self.policy.max_error_rate,
+            },
+            'curve': [point.to_dict(self.policy.percentile) for point in self.points],
+            'knee': knee.to_dict(self.policy.percentile) if knee is not None else None,
+            'converged_concurrency': self.converged,
+        }
+
+    def _worker(self, index: int, records: Any, stop: Any) -> Tuple[Callable[..., None], tuple]:
+        """
+        Точка входа и аргументы процесса-воркера с общим пределом параллельности.
+        """
+        return _adaptive_worker_main, (
+            self.scenario, self.helper_factory, self.users_per_worker, self.name, self.flush_interval,
+            records, stop, self._limit, index, self.workers
+        )
+
+    def _observe(self, histograms: Dict[str, LatencyHistogram]) -> Dict[str, LatencyHistogram]:
+        """
+        Учет замеров в точках кривой по пределу, действовавшему при старте итерации.
+
+        Замеры текущего предела накапливаются и в интервале регулирования.
+        Для отчетов и итога возвращаются гистограммы без пометок.
+        """
+        current: int = self._limit.value
+        untagged: Dict[str, LatencyHistogram] = {}
+        for tagged, histogram in histograms.items():
+            limit, name = _split_tag(tagged)
+            untagged.setdefault(name, LatencyHistogram()).merge(histogram)
+            if not limit:
+                continue
+            point: CurvePoint = self.curve.setdefault(limit, CurvePoint(limit))
+            if name == self.name:
+                point.iterations.merge(histogram)
+            elif name.partition(' ')[0] in HTTP_METHODS:
+                point.requests.merge(histogram)
+            if limit == current:
+                self._window.setdefault(name, LatencyHistogram()).merge(histogram)
+        return untagged
+
+    def _tick(self, elapsed: float) -> None:
+        """
+        Изменение предела параллельности по замерам интервала.
+        """
+        window: float = elapsed - self._window_started
+        if window < self.policy.interval:
+            return
+        requests: LatencyHistogram = LatencyHistogram()
+        for name, histogram in self._window.items():
+            if name.partition(' ')[0] in HTTP_METHODS:
+                requests.merge(histogram)
+        if requests.count < self.policy.min_samples and window < self.policy.interval * 5:
+            return
+        limit: int = self._limit.value
+        point: CurvePoint = self.curve.setdefault(limit, CurvePoint(limit))
+        point.elapsed += window
+        latency: float = requests.percentile(self.policy.percentile)
+        error_rate: float = requests.errors / requests.count if requests.count else 0.0
+        new_limit: int = self.policy.next_limit(limit, latency, error_rate, self._slow_start)
+        if new_limit < limit:
+            self._slow_start = False
+        self._limit.value = new_limit
+        self.limits.append(limit)
+        self.output(
+            f'[{elapsed:.0f} с] параллельность {limit} -> {new_limit}: '
+            f'{point.throughput:.1f} итераций/с, '
+            f'p{self.policy.percentile:g} запросов {latency * 1000:.0f} мс, ошибки {error_rate:.1%}'
+        )
+        self._window, self._window_started = {}, elapsed
+
+
+class LimitTaggedRecorder(HistogramRecorder):
+    """
+    Набор гистограмм воркера, помечающий замеры пределом параллельности при старте итерации.
+
+    Имя гистограммы имеет вид '<предел>:<операция>'; замеры вне итераций
+    (например, создание клиентов) помечаются пределом 0.
+    """
+
+    def record(self, name: str, seconds: float, error: bool = False) -> None:
+        """
+        Добавление замера операции с пометкой предела текущей итерации.
+
+        Args:
+            name (str): Имя операции
+            seconds (float): Задержка в секундах
+            error (bool, optional): Операция завершилась ошибкой
+        """
+        super().record(f'{_iteration_limit.get()}:{name}', seconds, error)
+
+
+def _split_tag(tagged: str) -> Tuple[int, str]:
+    """
+    Предел параллельности и имя операции из имени гистограммы LimitTaggedRecorder.
+    """
+    limit, _, name = tagged.partition(':')
+    return int(limit), name
+
+
+def allowed_users(limit: int, worker: int, workers: int) -> int:
+    """
+    Доля общего предела параллельности, приходящаяся на воркер.
+
+    Args:
+        limit (int): Общий предел
+        worker (int): Номер воркера
+        workers (int): Число воркеров
+
+    Returns:
+        int: Число активных виртуальных пользователей воркера
+    """
+    return limit // workers + (1 if worker < limit % workers else 0)
+
+
+def format_curve(
+        name: str,
+        points: List[CurvePoint],
+        knee: Optional[CurvePoint],
+        converged: Optional[int],
+        policy: ConcurrencyPolicy
+) -> str:
+    """
+    Форматирование кривой пропускной способности и колена.
+
+    Args:
+        name (str): Имя сценария
+        points (list): Точки кривой
+        knee (CurvePoint, optional): Колено кривой
+        converged (int, optional): Предел, вокруг которого колебался регулятор
+        policy (ConcurrencyPolicy): Параметры регулятора
+
+    Returns:
+        str: Текст таблицы
+    """
+    quantile: str = f'p{policy.percentile:g}'
+    lines: List[str] = [
+        f'Кривая {name}: цель {quantile} {policy.latency_target * 1000:.0f} мс, '
+        f'ошибки не более {policy.max_error_rate:.1%}',
+        f"{'Параллельность':>16}{'Итераций/с':>12}{f'{quantile}, мс':>12}{'p50, мс':>10}{'Ошибки':>10}{'Секунд':>9}",
+    ]
+    peak: float = max((point.throughput for point in points), default=0.0) or 1.0
+    for point in sorted(points, key=lambda point: point.concurrency):
+        mark: str = ' <- колено' if point is knee else ''
+        bar: str = '#' * round(point.throughput / peak * 20)
+        lines.append(
+            f'{point.concurrency:>16}{point.throughput:>12.1f}'
+            f'{point.requests.percentile(policy.percentile) * 1000:>12.1f}'
+            f'{point.requests.percentile(50) * 1000:>10.1f}{point.error_rate:>10.1%}{point.elapsed:>9.0f}'
+            f'  {bar}{mark}'
+        )
+    if knee is None:
+        lines.append('Колено не найдено: цель не выполняется даже при наименьшей параллельности')
+    else:
+        lines.append(
+            f'Колено: параллельность {knee.concurrency}, {knee.throughput:.1f} итераций/с, '
+            f'{quantile} {knee.requests.percentile(policy.percentile) * 1000:.0f} мс'
+        )
+    if converged is not None:
+        lines.append(f'Регулятор сошелся к параллельности {converged}')
+    return '\n'.join(lines)
+
+
+def _adaptive_worker_main(
+        scenario: Scenario,
+        helper_factory: Callable[[], AccountHelper],
+        users: int,
+        name: str,
+        flush_interval: float,
+        records: Any,
+        stop: Any,
+        limit: Any,
+        worker: int,
+        workers: int
+) -> None:
+    """
+    Точка входа процесса-воркера: пользователи в пределах общей параллельности и отправка замеров.
+    """
+    recorder: HistogramRecorder = LimitTaggedRecorder()
+    tracing.add_exporter(recorder)
+    threads: List[threading.Thread] = [
+        threading.Thread(
+            target=_adaptive_user,
+            args=(scenario, helper_factory, name, recorder, stop, limit, slot, worker, workers),
+            daemon=True
+        )
+        for slot in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(flush_interval)
+        flush_records(recorder, records)
+    flush_records(recorder, records)
+    close_balancers()
+    records.put(None)
+
+
+def _adaptive_user(
+        scenario: Scenario,
+        helper_factory: Callable[[], AccountHelper],
+        name: str,
+        recorder: HistogramRecorder,
+        stop: Any,
+        limit: Any,
+        slot: int,
+        worker: int,
+        workers: int
+) -> None:
+    """
+    Виртуальный пользователь, выполняющий итерации, только пока его номер в пределах доли воркера.
+    """
+    helper: Optional[AccountHelper] = None
+    while not stop.is_set():
+        current: int = limit.value
+        if slot >= allowed_users(current, worker, workers):
+            stop.wait(IDLE_PAUSE)
+            continue
+        if helper is None:
+            helper = helper_factory()
+        _iteration_limit.set(current)
+        started: float = time.perf_counter()
+        try:
+            scenario(helper)
+        except Exception:
+            recorder.record(name, time.perf_counter() - started, error=True)
+        else:
+            recorder.record(name, time.perf_counter() - started)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Поиск точки насыщения DM API для сценариев из командной строки.
+
+    Пример:
+        python -m load.adaptive --scenario load.scenarios:register_user load.scenarios:register_and_login \\
+            --latency-target 0.3 --max-concurrency 100 --duration 180 --curve-file curve.json
+    """
+    parser = argparse.ArgumentParser(description='Поиск наибольшей пропускной способности DM API при цели по задержке')
+    parser.add_argument('--scenario', nargs='+', default=['load.scenarios:register_and_login'],
+                        help='Сценарии вида модуль:функция или файлы .toml/.yaml, ищутся по очереди')
+    parser.add_argument('--dm-host', default=os.getenv('API_HOST', 'http://5.63.153.31:5051'), help='URL DM API')
+    parser.add_argument('--mailhog-host', default=os.getenv('MAILHOG_HOST', 'http://5.63.153.31:5025'),
+                        help='URL MailHog')
+    parser.add_argument('--workers', type=int, default=None, help='Число процессов (по умолчанию — число ядер)')
+    parser.add_argument('--duration', type=float, default=120.0, help='Длительность поиска на сценарий в секундах')
+    parser.add_argument('--latency-target', type=float, default=0.5, help='Цель по перцентилю задержки в секундах')
+    parser.add_argument('--percentile', type=float, default=95.0, help='Перцентиль задержки запросов')
+    parser.add_argument('--max-error-rate', type=float, default=0.01, help='Допустимая доля ошибочных запросов')
+    parser.add_argument('--initial-concurrency', type=int, default=1, help='Начальный предел параллельности')
+    parser.add_argument('--max-concurrency', type=int, default=200, help='Наибольший предел параллельности')
+    parser.add_argument('--interval', type=float, default=3.0, help='Интервал регулирования в секундах')
+    parser.add_argument('--curve-file', default=None, help='JSON-файл с кривыми и коленами сценариев')
+    parser.add_argument('--history', default=os.getenv('RUN_HISTORY'),
+                        help='Файл SQLite истории прогонов для итоговых задержек (env RUN_HISTORY)')
+    args = parser.parse_args(argv)
+
+    policy: ConcurrencyPolicy = ConcurrencyPolicy(
+        latency_target=args.latency_target,
+        percentile=args.percentile,
+        max_error_rate=args.max_error_rate,
+        initial=args.initial_concurrency,
+        maximum=args.max_concurrency,
+        interval=args.interval
+    )
+    helper_factory: AccountHelperFactory = AccountHelperFactory(
+        dm_api_configuration=Configuration(host=args.dm_host.split(',')),
+        mailhog_configuration=Configuration(host=args.mailhog_host)
+    )
+    results: Dict[str, Dict[str, Any]] = {}
+    for reference in args.scenario:
+        driver: AdaptiveDriver = AdaptiveDriver(
+            scenario=load_scenario(reference),
+            helper_factory=helper_factory,
+            policy=policy,
+            workers=args.workers,
+            duration=args.duration
+        )
+        started: float = time.time()
+        total: Dict[str, LatencyHistogram] = driver.run()
+        results[driver.name] = driver.result()
+        if args.history:
+            print(save_run(args.history, total, kind='load', label=f'{driver.name} [adaptive]', started_at=started))
+    if args.curve_file:
+        with open(args.curve_file, 'w', encoding='utf-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
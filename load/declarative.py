@@ -0,0 +1,382 @@
+import bisect
+import importlib
+import itertools
+import operator
+import os
+import random
+import re
+import time
+import uuid
+from collections.abc import Mapping
+from typing import Optional, Dict, List, Callable, Any, Tuple
+
+from checkers.http_checkers import check_status_code_http
+from helpers.account_helper import AccountHelper
+from load.scenarios import new_user
+from restclient import tracing
+
+Resolver = Callable[[Dict[str, Any]], Any]
+
+# Каталог файлов сценариев проекта
+FLOWS_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'flows')
+
+# Объекты, методы которых вызываются шагами: путь от AccountHelper и класс для проверки имени метода
+TARGETS: Dict[str, Tuple[str, str]] = {
+    'helper': ('', 'helpers.account_helper:AccountHelper'),
+    'account': ('dm_account_api.account_api', 'dm_api_account.apis.account_api:AccountApi'),
+    'login': ('dm_account_api.login_api', 'dm_api_account.apis.login_api:LoginApi'),
+    'mailhog': ('mailhog.mailhog_api', 'api_mailhog.apis.mailhog_api:MailhogApi'),
+}
+
+# Источники данных потока: значение вычисляется заново в каждом запуске
+DATA_SOURCES: Dict[str, Callable[[], Any]] = {
+    'user': new_user,
+    'uuid': lambda: uuid.uuid4().hex,
+}
+
+# Ключ таблицы аргумента, задающий модель тела запроса ('модуль:класс')
+MODEL_KEY: str = '$model'
+
+FLOW_KEYS = frozenset({'name', 'weight', 'data', 'think', 'steps'})
+STEP_KEYS = frozenset({'call', 'args', 'save', 'think', 'expect'})
+
+_REFERENCE = re.compile(r'\$\{([^}]+)\}')
+
+
+class Step:
+    """
+    Скомпилированный шаг потока: вызов метода AccountHelper или API-клиента.
+
+    Цель вызова, аргументы-шаблоны и пауза разбираются один раз при загрузке
+    файла; при выполнении остаются подстановка значений из контекста потока
+    и сам вызов.
+    """
+
+    def __init__(self, spec: Dict[str, Any], default_think: Any = None, location: str = '') -> None:
+        """
+        Компиляция шага.
+
+        Args:
+            spec (dict): Описание шага: call, args, save, think, expect
+            default_think (float или list, optional): Пауза потока для шагов без собственной
+            location (str, optional): Положение шага в файле для сообщений об ошибках
+
+        Raises:
+            ValueError: Если описание шага некорректно
+        """
+        unknown = set(spec) - STEP_KEYS
+        if unknown:
+            raise ValueError(f'{location}: неизвестные поля шага {sorted(unknown)}')
+        self.call: str = spec.get('call', '')
+        target, _, method = self.call.partition('.')
+        if target not in TARGETS or not method:
+            raise ValueError(
+                f'{location}: call должен иметь вид <{"|".join(TARGETS)}>.<метод>, получено {self.call!r}'
+            )
+        path, owner = TARGETS[target]
+        if not callable(getattr(_import(owner), method, None)):
+            raise ValueError(f'{location}: метод {method!r} не найден в {owner}')
+        self.target: Callable[[AccountHelper], Callable[..., Any]] = operator.attrgetter(
+            f'{path}.{method}' if path else method
+        )
+        self.args: Tuple[Tuple[str, Resolver], ...] = tuple(
+            (name, compile_value(value)) for name, value in (spec.get('args') or {}).items()
+        )
+        self.save: Optional[str] = spec.get('save')
+        self.think: Optional[Callable[[], float]] = _think(spec.get('think', default_think), location)
+        expect: Optional[Dict[str, Any]] = spec.get('expect')
+        self.expect: Optional[Tuple[int, str]] = (
+            (int(expect['status']), expect.get('title', '')) if expect is not None else None
+        )
+
+    def run(self, helper: AccountHelper, context: Dict[str, Any], think: bool = True) -> Any:
+        """
+        Выполнение шага.
+
+        Args:
+            helper (AccountHelper): Helper пользователя
+            context (dict): Значения потока (данные и сохраненные результаты шагов)
+            think (bool, optional): Выдерживать паузу после шага. По умолчанию True
+
+        Returns:
+            Результат вызова (None, если ожидалась ошибка)
+
+        Raises:
+            AssertionError: Если ожидаемая ошибка не получена или отличается статусом или title
+        """
+        method: Callable[..., Any] = self.target(helper)
+        kwargs: Dict[str, Any] = {name: resolve(context) for name, resolve in self.args}
+        result: Any = None
+        if self.expect is None:
+            result = method(**kwargs)
+        else:
+            with check_status_code_http(*self.expect):
+                result = method(**kwargs)
+        if self.save:
+            context[self.save] = result
+        if think and self.think is not None:
+            time.sleep(self.think())
+        return result
+
+
+class Flow:
+    """
+    Скомпилированный поток: последовательность шагов с привязкой данных.
+    """
+
+    def __init__(self, spec: Dict[str, Any], location: str = '') -> None:
+        """
+        Компиляция потока.
+
+        Args:
+            spec (dict): Описание потока: name, weight, data, think, steps
+            location (str, optional): Положение потока в файле для сообщений об ошибках
+
+        Raises:
+            ValueError: Если описание потока некорректно
+        """
+        unknown = set(spec) - FLOW_KEYS
+        if unknown:
+            raise ValueError(f'{location}: неизвестные поля потока {sorted(unknown)}')
+        self.name: str = spec.get('name') or location
+        location = f'{location} ({self.name})'
+        self.weight: float = float(spec.get('weight', 1))
+        if self.weight <= 0:
+            raise ValueError(f'{location}: вес потока должен быть положительным')
+        self.data: Tuple[Tuple[str, Callable[[], Any]], ...] = tuple(
+            (name, _source(source, location)) for name, source in (spec.get('data') or {}).items()
+        )
+        steps: List[Dict[str, Any]] = spec.get('steps') or []
+        if not steps:
+            raise ValueError(f'{location}: поток без шагов')
+        self.steps: Tuple[Step, ...] = tuple(
+            Step(step, default_think=spec.get('think'), location=f'{location} шаг {index + 1}')
+            for index, step in enumerate(steps)
+        )
+
+    def run(
+            self,
+            helper: AccountHelper,
+            bindings: Optional[Dict[str, Any]] = None,
+            think: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Выполнение потока.
+
+        Данные потока берутся из источников (например, новый пользователь из
+        пула), если не переданы в bindings: так pytest подставляет данные фикстур.
+        Выполнение оформляется span 'flow <имя>', поэтому нагрузочный отчет
+        показывает задержку каждого потока смеси.
+
+        Args:
+            helper (AccountHelper): Helper пользователя
+            bindings (dict, optional): Готовые значения данных потока
+            think (bool, optional): Выдерживать паузы между шагами. По умолчанию True
+
+        Returns:
+            dict: Контекст потока с данными и сохраненными результатами шагов
+        """
+        context: Dict[str, Any] = dict(bindings or {})
+        for name, source in self.data:
+            if name not in context:
+                context[name] = source()
+        with tracing.start_span(name=f'flow {self.name}'):
+            for step in self.steps:
+                step.run(helper, context, think=think)
+        return context
+
+
+class ScenarioFile:
+    """
+    Смесь потоков из файла сценария (TOML или YAML), скомпилированная один раз.
+
+    Экземпляр — сценарий генераторов нагрузки (вызывается с AccountHelper):
+    каждый запуск выбирает поток пропорционально весу. В pytest потоки
+    выполняются по отдельности через Flow.run.
+
+    Example:
+        >>> scenario = load_scenario_file('load/flows/account.toml')
+        >>> scenario(helper)  # поток, выбранный по весу
+        >>> scenario.flow('change_email').run(account_helper, bindings={'user': prepare_user}, think=False)
+    """
+
+    def __init__(self, spec: Dict[str, Any], path: str = '') -> None:
+        """
+        Компиляция сценария.
+
+        Args:
+            spec (dict): Содержимое файла: name и список flows
+            path (str, optional): Путь к файлу (для сообщений об ошибках и передачи в процессы)
+
+        Raises:
+            ValueError: Если описание сценария некорректно
+        """
+        self.path: str = path
+        self.__name__: str = spec.get('name') or os.path.splitext(os.path.basename(path))[0] or 'scenario'
+        flows: List[Dict[str, Any]] = spec.get('flows') or []
+        if not flows:
+            raise ValueError(f'{path}: сценарий без потоков')
+        self.flows: Tuple[Flow, ...] = tuple(
+            Flow(flow, location=f'{path} поток {index + 1}') for index, flow in enumerate(flows)
+        )
+        self._cumulative: List[float] = list(itertools.accumulate(flow.weight for flow in self.flows))
+
+    def __call__(self, helper: AccountHelper) -> Dict[str, Any]:
+        """
+        Выполнение потока, выбранного по весу.
+
+        Args:
+            helper (AccountHelper): Helper виртуального пользователя
+
+        Returns:
+            dict: Контекст выполненного потока
+        """
+        return self.choose().run(helper)
+
+    def __reduce__(self) -> Tuple[Callable[[str], 'ScenarioFile'], Tuple[str]]:
+        # В процессы-воркеры (spawn) передается путь, сценарий компилируется заново
+        return load_scenario_file, (self.path,)
+
+    def choose(self) -> Flow:
+        """
+        Выбор потока пропорционально весу.
+
+        Returns:
+            Flow: Поток
+        """
+        return self.flows[bisect.bisect_right(self._cumulative, random.random() * self._cumulative[-1])]
+
+    def flow(self, name: str) -> Flow:
+        """
+        Поток по имени.
+
+        Args:
+            name (str): Имя потока
+
+        Returns:
+            Flow: Поток
+
+        Raises:
+            KeyError: Если потока нет в сценарии
+        """
+        for flow in self.flows:
+            if flow.name == name:
+                return flow
+        raise KeyError(name)
+
+
+def load_scenario_file(path: str) -> ScenarioFile:
+    """
+    Загрузка и компиляция файла сценария.
+
+    Формат определяется расширением: .toml (tomllib) или .yaml/.yml
+    (требуется PyYAML).
+
+    Args:
+        path (str): Путь к файлу
+
+    Returns:
+        ScenarioFile: Скомпилированный сценарий
+
+    Raises:
+        ValueError: Если формат файла не поддерживается или описание некорректно
+    """
+    extension: str = os.path.splitext(path)[1].lower()
+    if extension == '.toml':
+        import tomllib
+        with open(path, 'rb') as file:
+            spec: Dict[str, Any] = tomllib.load(file)
+    elif extension in ('.yaml', '.yml'):
+        import yaml
+        with open(path, encoding='utf-8') as file:
+            spec = yaml.safe_load(file) or {}
+    else:
+        raise ValueError(f'{path}: поддерживаются файлы .toml, .yaml и .yml')
+    return ScenarioFile(spec, path=path)
+
+
+def compile_value(value: Any) -> Resolver:
+    """
+    Компиляция значения аргумента в функцию от контекста потока.
+
+    Строка '${user.login}' заменяется значением из контекста (атрибуты и
+    ключи через точку), строка с подстановками внутри — текстом, таблица
+    с ключом '$model' — моделью тела запроса.
+
+    Args:
+        value: Значение из файла сценария
+
+    Returns:
+        Callable: Функция, возвращающая значение по контексту
+    """
+    if isinstance(value, str):
+        match = _REFERENCE.fullmatch(value)
+        if match:
+            return _reference(match.group(1))
+        if '${' not in value:
+            return lambda context: value
+        parts: List[Resolver] = [
+            _reference(part) if index % 2 else (lambda context, text=part: text)
+            for index, part in enumerate(_REFERENCE.split(value))
+        ]
+        return lambda context: ''.join(str(part(context)) for part in parts)
+    if isinstance(value, dict):
+        fields: Tuple[Tuple[str, Resolver], ...] = tuple(
+            (name, compile_value(item)) for name, item in value.items() if name != MODEL_KEY
+        )
+        if MODEL_KEY in value:
+            model: Callable[..., Any] = _import(value[MODEL_KEY])
+            return lambda context: model(**{name: resolve(context) for name, resolve in fields})
+        return lambda context: {name: resolve(context) for name, resolve in fields}
+    if isinstance(value, list):
+        items: Tuple[Resolver, ...] = tuple(compile_value(item) for item in value)
+        return lambda context: [resolve(context) for resolve in items]
+    return lambda context: value
+
+
+def _reference(path: str) -> Resolver:
+    """
+    Функция, возвращающая значение контекста по пути через точку (атрибут или ключ).
+    """
+    root, *names = path.strip().split('.')
+
+    def resolve(context: Dict[str, Any]) -> Any:
+        value: Any = context[root]
+        for name in names:
+            value = value[name] if isinstance(value, Mapping) else getattr(value, name)
+        return value
+
+    return resolve
+
+
+def _think(spec: Any, location: str) -> Optional[Callable[[], float]]:
+    """
+    Пауза шага: число секунд или диапазон [min, max] (равномерно).
+    """
+    if spec is None or spec == 0:
+        return None
+    if isinstance(spec, (int, float)):
+        seconds: float = float(spec)
+        return lambda: seconds
+    if isinstance(spec, list) and len(spec) == 2:
+        low, high = float(spec[0]), float(spec[1])
+        return lambda: random.uniform(low, high)
+    raise ValueError(f'{location}: think должен быть числом или диапазоном [min, max], получено {spec!r}')
+
+
+def _source(name: str, location: str) -> Callable[[], Any]:
+    """
+    Источник данных потока по имени.
+    """
+    source: Optional[Callable[[], Any]] = DATA_SOURCES.get(name)
+    if source is None:
+        raise ValueError(f'{location}: неизвестный источник данных {name!r}, доступны {sorted(DATA_SOURCES)}')
+    return source
+
+
+def _import(reference: str) -> Any:
+    """
+    Объект модуля по ссылке вида 'модуль:имя'.
+    """
+    module_name, _, name = reference.partition(':')
+    return getattr(importlib.import_module(module_name), name)
@@ -0,0 +1,388 @@
+import argparse
+import copy
+import importlib
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Optional, Dict, List, Callable, Any, Tuple
+
+from checkers.expectations import drain_stats, format_stats
+from helpers.account_helper import AccountHelper
+from load.declarative import load_scenario_file
+from load.histogram import LatencyHistogram, HistogramRecorder, format_report
+from load.history import save_run
+from load.soak import SoakMonitor, SoakPolicy, analyze
+from restclient import tracing
+from restclient.balancer import close_balancers
+from restclient.configuration import Configuration
+from services.api_mailhog import MailHogApi
+from services.dm_api_account import DMApiAccount
+
+Scenario = Callable[[AccountHelper], Any]
+
+# Расширения файлов декларативных сценариев
+SCENARIO_FILE_EXTENSIONS: Tuple[str, ...] = ('.toml', '.yaml', '.yml')
+
+
+class AccountHelperFactory:
+    """
+    Фабрика AccountHelper для виртуальных пользователей.
+
+    Каждый вызов создает независимый AccountHelper со своими сессиями
+    RestClient, чтобы заголовки авторизации одного виртуального пользователя
+    не влияли на другого. Объект сериализуем и передается в процессы-воркеры.
+    """
+
+    def __init__(
+            self,
+            dm_api_configuration: Configuration,
+            mailhog_configuration: Configuration
+    ) -> None:
+        """
+        Инициализация фабрики.
+
+        Args:
+            dm_api_configuration (Configuration): Конфигурация API аккаунтов
+            mailhog_configuration (Configuration): Конфигурация MailHog
+        """
+        self.dm_api_configuration: Configuration = dm_api_configuration
+        self.mailhog_configuration: Configuration = mailhog_configuration
+
+    def __call__(self) -> AccountHelper:
+        """
+        Создание AccountHelper.
+
+        Returns:
+            AccountHelper: Новый helper
+        """
+        return AccountHelper(
+            dm_account_api=DMApiAccount(configuration=self.dm_api_configuration),
+            mailhog=MailHogApi(configuration=self.mailhog_configuration)
+        )
+
+
+class LoadDriver:
+    """
+    Многопроцессный генератор нагрузки на основе AccountHelper.
+
+    Запускает N процессов-воркеров, в каждом — заданное число виртуальных
+    пользователей (потоков), выполняющих сценарий в цикле. Воркеры раз в
+    flush_interval отправляют родителю приращения гистограмм задержек по
+    каждому HTTP-запросу, шагу AccountHelper и сценарию целиком; родитель
+    объединяет их и выводит сводный отчет. Так клиентская пропускная
+    способность растет с числом ядер, а не упирается в GIL одного процесса.
+    """
+
+    def __init__(
+            self,
+            scenario: Scenario,
+            helper_factory: Callable[[], AccountHelper],
+            workers: Optional[int] = None,
+            users_per_worker: int = 10,
+            duration: float = 60.0,
+            report_interval: float = 5.0,
+            flush_interval: float = 1.0,
+            name: Optional[str] = None,
+            output: Callable[[str], None] = print,
+            soak: Optional[SoakPolicy] = None
+    ) -> None:
+        """
+        Инициализация генератора нагрузки.
+
+        Args:
+            scenario (Callable): Сценарий — функция, принимающая AccountHelper
+            helper_factory (Callable): Фабрика AccountHelper (например, AccountHelperFactory)
+            workers (int, optional): Число процессов. По умолчанию — число ядер
+            users_per_worker (int, optional): Виртуальных пользователей на процесс. По умолчанию 10
+            duration (float, optional): Длительность нагрузки в секундах. По умолчанию 60
+            report_interval (float, optional): Интервал вывода отчета в секундах. По умолчанию 5
+            flush_interval (float, optional): Интервал отправки замеров воркером в секундах. По умолчанию 1
+            name (str, optional): Имя сценария в отчете. По умолчанию — имя функции
+            output (Callable, optional): Функция вывода отчета. По умолчанию print
+            soak (SoakPolicy, optional): Снимки ресурсов воркеров для поиска утечек в длительном прогоне
+        """
+        self.scenario: Scenario = scenario
+        self.helper_factory: Callable[[], AccountHelper] = helper_factory
+        self.workers: int = workers or os.cpu_count() or 1
+        self.users_per_worker: int = users_per_worker
+        self.duration: float = duration
+        self.report_interval: float = report_interval
+        self.flush_interval: float = flush_interval
+        self.name: str = name or f'scenario {getattr(scenario, "__name__", "scenario")}'
+        self.output: Callable[[str], None] = output
+        self.stats: Dict[str, float] = {}
+        self.soak: Optional[SoakPolicy] = soak
+        self._soak_run: Optional[SoakPolicy] = None
+
+    def run(self) -> Dict[str, LatencyHistogram]:
+        """
+        Запуск нагрузки и ожидание ее завершения.
+
+        Returns:
+            dict: Итоговые гистограммы задержек по имени операции
+        """
+        context: Any = process_context()
+        self._soak_run = None
+        if self.soak is not None:
+            # Ряды каждого прогона пишутся в отдельный каталог, чтобы анализ не смешивал прогоны;
+            # суффикс различает прогоны, начатые в одну секунду
+            self._soak_run = copy.copy(self.soak)
+            self._soak_run.output_dir = os.path.join(
+                self.soak.output_dir, f'{time.strftime("%Y%m%d-%H%M%S")}-{uuid.uuid4().hex[:6]}'
+            )
+        records = context.Queue()
+        stop = context.Event()
+        processes: List[Any] = []
+        for index in range(self.workers):
+            target, args = self._worker(index, records, stop)
+            processes.append(context.Process(target=target, args=args, name=f'load-worker-{index}', daemon=True))
+        for process in processes:
+            process.start()
+
+        total: Dict[str, LatencyHistogram] = {}
+        interval: Dict[str, LatencyHistogram] = {}
+        self.stats = {}
+        interval_stats: Dict[str, float] = {}
+        started: float = time.monotonic()
+        last_report: float = started
+        finished: int = 0
+        while finished < self.workers:
+            now: float = time.monotonic()
+            if not stop.is_set() and now - started >= self.duration:
+                stop.set()
+            self._tick(now - started)
+            if now - last_report >= self.report_interval:
+                self.output(self._report(interval, interval_stats, now - last_report, f'[{now - started:.0f} с] за интервал'))
+                interval, interval_stats = {}, {}
+                last_report = now
+            try:
+                message: Optional[Tuple[Dict[str, Dict[str, Any]], Dict[str, float]]] = records.get(timeout=0.2)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+            if message is None:
+                finished += 1
+                continue
+            delta, stats = message
+            histograms: Dict[str, LatencyHistogram] = self._observe({
+                name: LatencyHistogram.from_dict(data) for name, data in delta.items()
+            })
+            for name, histogram in histograms.items():
+                total.setdefault(name, LatencyHistogram()).merge(histogram)
+                interval.setdefault(name, LatencyHistogram()).merge(histogram)
+            for name, value in stats.items():
+                self.stats[name] = self.stats.get(name, 0) + value
+                interval_stats[name] = interval_stats.get(name, 0) + value
+
+        for process in processes:
+            process.join()
+        self.output(self._report(total, self.stats, time.monotonic() - started, 'Итог'))
+        if self._soak_run is not None:
+            self.output(analyze(self._soak_run.output_dir, self._soak_run))
+        return total
+
+    def _worker(self, index: int, records: Any, stop: Any) -> Tuple[Callable[..., None], tuple]:
+        """
+        Точка входа и аргументы процесса-воркера.
+
+        Args:
+            index (int): Номер воркера
+            records: Очередь замеров
+            stop: Событие остановки
+
+        Returns:
+            tuple: Функция процесса и ее аргументы
+        """
+        return _worker_main, (self.scenario, self.helper_factory, self.users_per_worker,
+                              self.name, self.flush_interval, records, stop, self._soak_run)
+
+    def _observe(self, histograms: Dict[str, LatencyHistogram]) -> Dict[str, LatencyHistogram]:
+        """
+        Обработка приращения гистограмм от воркера (для генераторов, управляющих нагрузкой на ходу).
+
+        Args:
+            histograms (dict): Приращение гистограмм по имени, как его отправил воркер
+
+        Returns:
+            dict: Гистограммы по имени операции для отчетов и итога
+        """
+        return histograms
+
+    def _tick(self, elapsed: float) -> None:
+        """
+        Шаг цикла родительского процесса (не реже пяти раз в секунду).
+
+        Args:
+            elapsed (float): Время от начала нагрузки в секундах
+        """
+
+    def _report(
+            self,
+            histograms: Dict[str, LatencyHistogram],
+            stats: Dict[str, float],
+            elapsed: float,
+            title: str
+    ) -> str:
+        """
+        Текст отчета за период: таблица задержек и, если есть, несовпадения ожиданий к ответам.
+        """
+        report: str = format_report(histograms, elapsed, title=title)
+        expectations: str = format_stats(stats)
+        return f'{report}\n{expectations}' if expectations else report
+
+
+def _worker_main(
+        scenario: Scenario,
+        helper_factory: Callable[[], AccountHelper],
+        users: int,
+        name: str,
+        flush_interval: float,
+        records: Any,
+        stop: Any,
+        soak: Optional[SoakPolicy] = None
+) -> None:
+    """
+    Точка входа процесса-воркера: виртуальные пользователи и отправка замеров.
+    """
+    recorder: HistogramRecorder = HistogramRecorder()
+    tracing.add_exporter(recorder)
+    monitor: Optional[SoakMonitor] = start_soak_monitor(soak)
+    threads: List[threading.Thread] = [
+        threading.Thread(target=_virtual_user, args=(scenario, helper_factory, name, recorder, stop), daemon=True)
+        for _ in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(flush_interval)
+        flush_records(recorder, records)
+    flush_records(recorder, records)
+    if monitor is not None:
+        monitor.stop()
+    close_balancers()
+    records.put(None)
+
+
+def process_context() -> Any:
+    """
+    Контекст multiprocessing для процессов-воркеров: fork, если он доступен, иначе spawn.
+    """
+    return multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+
+
+def start_soak_monitor(soak: Optional[SoakPolicy]) -> Optional[SoakMonitor]:
+    """
+    Запуск монитора ресурсов процесса-воркера, если задан длительный прогон.
+    """
+    if soak is None:
+        return None
+    monitor: SoakMonitor = SoakMonitor(soak, label=f'worker-{os.getpid()}')
+    monitor.start()
+    return monitor
+
+
+def _virtual_user(
+        scenario: Scenario,
+        helper_factory: Callable[[], AccountHelper],
+        name: str,
+        recorder: HistogramRecorder,
+        stop: Any
+) -> None:
+    """
+    Цикл одного виртуального пользователя (закрытая модель нагрузки).
+    """
+    helper: AccountHelper = helper_factory()
+    while not stop.is_set():
+        started: float = time.perf_counter()
+        try:
+            scenario(helper)
+        except Exception:
+            recorder.record(name, time.perf_counter() - started, error=True)
+        else:
+            recorder.record(name, time.perf_counter() - started)
+
+
+def flush_records(recorder: HistogramRecorder, records: Any, stats: Optional[Dict[str, float]] = None) -> None:
+    """
+    Отправка накопленных приращений гистограмм и счетчиков (в том числе проверок ответов) родительскому процессу.
+
+    Используется воркерами всех генераторов нагрузки (LoadDriver, OpenLoopDriver, AdaptiveDriver).
+
+    Args:
+        recorder (HistogramRecorder): Гистограммы воркера, приращения забираются через drain()
+        records (Queue): Очередь замеров родительского процесса
+        stats (dict, optional): Дополнительные счетчики воркера
+    """
+    delta: Dict[str, LatencyHistogram] = recorder.drain()
+    stats = {**(stats or {}), **drain_stats()}
+    if delta or stats:
+        records.put(({name: histogram.to_dict() for name, histogram in delta.items()}, stats or {}))
+
+
+def load_scenario(reference: str) -> Scenario:
+    """
+    Загрузка сценария (или другого объекта модуля, например ожиданий) по ссылке вида 'модуль:функция'.
+
+    Путь к файлу .toml, .yaml или .yml загружается как декларативный
+    сценарий (load.declarative): смесь потоков с весами.
+
+    Args:
+        reference (str): Ссылка на функцию сценария или путь к файлу сценария
+
+    Returns:
+        Callable: Функция сценария
+    """
+    if reference.endswith(SCENARIO_FILE_EXTENSIONS):
+        return load_scenario_file(reference)
+    module_name, _, function_name = reference.partition(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Запуск генератора нагрузки из командной строки.
+
+    Пример:
+        python -m load.driver --scenario load.scenarios:register_and_login --workers 4 --users 20
+    """
+    parser = argparse.ArgumentParser(description='Многопроцессный генератор нагрузки на DM API')
+    parser.add_argument('--scenario', default='load.scenarios:register_and_login',
+                        help='Сценарий вида модуль:функция или файл .toml/.yaml')
+    parser.add_argument('--dm-host', default=os.getenv('API_HOST', 'http://5.63.153.31:5051'), help='URL DM API')
+    parser.add_argument('--mailhog-host', default=os.getenv('MAILHOG_HOST', 'http://5.63.153.31:5025'), help='URL MailHog')
+    parser.add_argument('--workers', type=int, default=None, help='Число процессов (по умолчанию — число ядер)')
+    parser.add_argument('--users', type=int, default=10, help='Виртуальных пользователей на процесс')
+    parser.add_argument('--duration', type=float, default=60.0, help='Длительность в секундах')
+    parser.add_argument('--report-interval', type=float, default=5.0, help='Интервал отчета в секундах')
+    parser.add_argument('--expectations', default=None,
+                        help='Ожидания к ответам DM API вида модуль:имя (например, load.scenarios:EXPECTATIONS)')
+    parser.add_argument('--history', default=os.getenv('RUN_HISTORY'),
+                        help='Файл SQLite истории прогонов для итоговых задержек (env RUN_HISTORY)')
+    args = parser.parse_args(argv)
+
+    driver: LoadDriver = LoadDriver(
+        scenario=load_scenario(args.scenario),
+        helper_factory=AccountHelperFactory(
+            dm_api_configuration=Configuration(
+                host=args.dm_host.split(','),
+                expectations=load_scenario(args.expectations) if args.expectations else None
+            ),
+            mailhog_configuration=Configuration(host=args.mailhog_host)
+        ),
+        workers=args.workers,
+        users_per_worker=args.users,
+        duration=args.duration,
+        report_interval=args.report_interval
+    )
+    started: float = time.time()
+    total: Dict[str, LatencyHistogram] = driver.run()
+    if args.history:
+        print(save_run(args.history, total, kind='load', label=driver.name, started_at=started))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+import threading
+from collections import Counter
+from typing import Optional, Dict, Any, Tuple
+
+from restclient import tracing
+
+# Число бакетов на каждую степень двойки: относительная погрешность не более 1/32 (~3%)
+SUB_BUCKETS: int = 32
+
+
+def _bucket_index(value: int) -> int:
+    """
+    Номер бакета для значения в микросекундах (логарифмически-линейная шкала).
+    """
+    length: int = value.bit_length()
+    if length <= 6:
+        return value
+    shift: int = length - 6
+    return shift * SUB_BUCKETS + (value >> shift)
+
+
+def _bucket_value(index: int) -> int:
+    """
+    Представительное значение бакета (середина интервала) в микросекундах.
+    """
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift: int = index // SUB_BUCKETS - 1
+    mantissa: int = index - shift * SUB_BUCKETS
+    return (mantissa << shift) + (1 << (shift - 1))
+
+
+class LatencyHistogram:
+    """
+    Гистограмма задержек с логарифмически-линейными бакетами.
+
+    Хранит только счетчики бакетов, поэтому гистограммы разных потоков
+    и процессов дешево сериализуются и объединяются без потери точности
+    перцентилей (погрешность не превышает 3%).
+    """
+
+    def __init__(self) -> None:
+        """
+        Инициализация пустой гистограммы.
+        """
+        self.buckets: Counter = Counter()
+        self.count: int = 0
+        self.errors: int = 0
+        self.total_us: int = 0
+        self.max_us: int = 0
+
+    def record(self, seconds: float, error: bool = False) -> None:
+        """
+        Добавление замера.
+
+        Args:
+            seconds (float): Задержка в секундах
+            error (bool, optional): Замер относится к неуспешной операции
+        """
+        value: int = max(int(seconds * 1_000_000), 0)
+        self.buckets[_bucket_index(value)] += 1
+        self.count += 1
+        self.total_us += value
+        if value > self.max_us:
+            self.max_us = value
+        if error:
+            self.errors += 1
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        """
+        Добавление замеров другой гистограммы.
+
+        Args:
+            other (LatencyHistogram): Гистограмма для объединения
+        """
+        self.buckets.update(other.buckets)
+        self.count += other.count
+        self.errors += other.errors
+        self.total_us += other.total_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Оценка перцентиля задержки.
+
+        Args:
+            percent (float): Перцентиль от 0 до 100
+
+        Returns:
+            float: Задержка в секундах (0, если замеров нет)
+        """
+        if not self.count:
+            return 0.0
+        rank: float = self.count * percent / 100
+        seen: int = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(_bucket_value(index), self.max_us) / 1_000_000
+        return self.max_us / 1_000_000
+
+    @property
+    def mean(self) -> float:
+        """
+        Средняя задержка в секундах.
+        """
+        return self.total_us / self.count / 1_000_000 if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Компактное представление для передачи между процессами и сохранения.
+
+        Returns:
+            dict: Счетчики бакетов и агрегаты
+        """
+        return {
+            'buckets': dict(self.buckets),
+            'count': self.count,
+            'errors': self.errors,
+            'total_us': self.total_us,
+            'max_us': self.max_us,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LatencyHistogram':
+        """
+        Восстановление гистограммы из to_dict().
+
+        Args:
+            data (dict): Представление гистограммы
+
+        Returns:
+            LatencyHistogram: Гистограмма
+        """
+        histogram: LatencyHistogram = cls()
+        histogram.buckets.update({int(index): count for index, count in data['buckets'].items()})
+        histogram.count = data['count']
+        histogram.errors = data['errors']
+        histogram.total_us = data['total_us']
+        histogram.max_us = data['max_us']
+        return histogram
+
+
+class HistogramRecorder:
+    """
+    Потокобезопасный набор гистограмм, сгруппированных по имени операции.
+
+    Может подключаться как экспортер трассировки (restclient.tracing.add_exporter):
+    тогда каждый завершенный span — HTTP-запрос RestClient или шаг AccountHelper —
+    записывается в гистограмму с именем span.
+    """
+
+    def __init__(self) -> None:
+        """
+        Инициализация пустого набора гистограмм.
+        """
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, error: bool = False) -> None:
+        """
+        Добавление замера операции.
+
+        Args:
+            name (str): Имя операции
+            seconds (float): Задержка в секундах
+            error (bool, optional): Операция завершилась ошибкой
+        """
+        with self._lock:
+            histogram: Optional[LatencyHistogram] = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.record(seconds, error)
+
+    def export(self, span: tracing.Span) -> None:
+        """
+        Запись завершенного span (интерфейс экспортера трассировки).
+
+        Args:
+            span (Span): Завершенный span
+        """
+        self.record(span.name, span.duration, error=span.status_code == tracing.STATUS_ERROR)
+
+    def merge(self, histograms: Dict[str, LatencyHistogram]) -> None:
+        """
+        Добавление замеров из набора гистограмм.
+
+        Args:
+            histograms (dict): Гистограммы по имени операции
+        """
+        with self._lock:
+            for name, histogram in histograms.items():
+                self.histograms.setdefault(name, LatencyHistogram()).merge(histogram)
+
+    def drain(self) -> Dict[str, LatencyHistogram]:
+        """
+        Получение накопленных гистограмм с очисткой набора.
+
+        Returns:
+            dict: Гистограммы по имени операции
+        """
+        with self._lock:
+            histograms: Dict[str, LatencyHistogram] = self.histograms
+            self.histograms = {}
+        return histograms
+
+    def snapshot(self) -> Dict[str, LatencyHistogram]:
+        """
+        Копия накопленных гистограмм без очистки.
+
+        Returns:
+            dict: Гистограммы по имени операции
+        """
+        with self._lock:
+            copies: Dict[str, LatencyHistogram] = {}
+            for name, histogram in self.histograms.items():
+                copies[name] = LatencyHistogram()
+                copies[name].merge(histogram)
+            return copies
+
+
+def format_report(
+        histograms: Dict[str, LatencyHistogram],
+        elapsed: float,
+        title: str = ''
+) -> str:
+    """
+    Форматирование таблицы задержек и пропускной способности.
+
+    Args:
+        histograms (dict): Гистограммы по имени операции
+        elapsed (float): Длительность периода измерения в секундах
+        title (str, optional): Заголовок таблицы
+
+    Returns:
+        str: Текст таблицы
+    """
+    header: Tuple[str, ...] = ('Операция', 'Кол-во', 'RPS', 'Ошибки', 'p50, мс', 'p95, мс', 'p99, мс', 'max, мс')
+    lines = [title] if title else []
+    lines.append(f'{header[0]:<40}' + ''.join(f'{column:>10}' for column in header[1:]))
+    for name in sorted(histograms):
+        histogram: LatencyHistogram = histograms[name]
+        lines.append(
+            f'{name[:39]:<40}{histogram.count:>10}{histogram.count / elapsed if elapsed else 0:>10.1f}'
+            f'{histogram.errors:>10}'
+            f'{histogram.percentile(50) * 1000:>10.1f}{histogram.percentile(95) * 1000:>10.1f}'
+            f'{histogram.percentile(99) * 1000:>10.1f}{histogram.max_us / 1000:>10.1f}'
+        )
+    return '\n'.join(lines)
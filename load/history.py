@@ -0,0 +1,513 @@
+import argparse
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from typing import Optional, Dict, List, Tuple, Any
+
+from load.histogram import LatencyHistogram
+
+# Файл истории по умолчанию (переменная окружения RUN_HISTORY)
+DEFAULT_PATH: str = os.getenv('RUN_HISTORY', 'run_history.sqlite')
+
+# Метрики агрегатов, доступные для трендов и поиска регрессий
+METRICS: Tuple[str, ...] = ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'error_rate')
+
+# Масштаб MAD, при котором он оценивает стандартное отклонение нормального распределения
+MAD_SCALE: float = 1.4826
+
+# Нижняя граница MAD как доля медианы: перцентили гистограммы хранятся с погрешностью до 3%, поэтому
+# меньший разброс базовой линии — артефакт бакетов, и при MAD = 0 z-оценка любого роста была бы бесконечной
+MIN_MAD_RATIO: float = 0.03
+
+SCHEMA: str = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    kind TEXT NOT NULL,
+    label TEXT NOT NULL,
+    commit_sha TEXT NOT NULL,
+    branch TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS aggregates (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    error_rate REAL NOT NULL,
+    mean_ms REAL NOT NULL,
+    p50_ms REAL NOT NULL,
+    p95_ms REAL NOT NULL,
+    p99_ms REAL NOT NULL,
+    max_ms REAL NOT NULL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS runs_by_kind ON runs (kind, label, started_at);
+'''
+
+
+class Regression:
+    """
+    Операция, задержка которой в прогоне статистически значимо выше базовой линии.
+    """
+
+    def __init__(self, name: str, metric: str, value: float, baseline: float, mad: float, score: float) -> None:
+        """
+        Инициализация результата.
+
+        Args:
+            name (str): Операция
+            metric (str): Метрика (например, p95_ms)
+            value (float): Значение в проверяемом прогоне
+            baseline (float): Медиана базовой линии
+            mad (float): Медианное абсолютное отклонение базовой линии
+            score (float): Робастная z-оценка (разброс ограничен снизу, см. HistoryStore.detect_regressions)
+        """
+        self.name: str = name
+        self.metric: str = metric
+        self.value: float = value
+        self.baseline: float = baseline
+        self.mad: float = mad
+        self.score: float = score
+
+    @property
+    def change(self) -> float:
+        """
+        Относительное изменение к базовой линии.
+        """
+        return self.value / self.baseline - 1 if self.baseline else float('inf')
+
+    def __str__(self) -> str:
+        return (
+            f'{self.name}: {self.metric} {self.value:.1f} против {self.baseline:.1f} '
+            f'({self.change:+.0%}, z={self.score:.1f})'
+        )
+
+
+class HistoryStore:
+    """
+    История задержек прогонов в локальной базе SQLite.
+
+    Каждый прогон (тестовая сессия или нагрузка) сохраняется с коммитом,
+    веткой и временем, а для каждой операции — HTTP-запроса и шага
+    AccountHelper — число замеров, доля ошибок и перцентили задержки.
+    Прогоны сравниваются внутри вида (kind) и метки (label), например
+    'pytest'/'functional' или 'load'/'scenario register_and_login'.
+
+    Регрессия ищется против скользящей базовой линии — предыдущих window
+    прогонов того же вида: значение метрики сравнивается с медианой, а
+    разброс оценивается медианным абсолютным отклонением (MAD), поэтому
+    единичные выбросы в истории не сдвигают порог.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        """
+        Открытие (и при необходимости создание) базы.
+
+        Args:
+            path (str, optional): Путь к файлу базы. По умолчанию RUN_HISTORY или run_history.sqlite
+        """
+        self.path: str = path
+        directory: str = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection: sqlite3.Connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """
+        Закрытие базы.
+        """
+        self.connection.close()
+
+    def record_run(
+            self,
+            histograms: Dict[str, LatencyHistogram],
+            kind: str,
+            label: str = '',
+            duration: float = 0.0,
+            started_at: Optional[float] = None,
+            commit: Optional[str] = None,
+            branch: Optional[str] = None
+    ) -> int:
+        """
+        Сохранение агрегатов прогона.
+
+        Args:
+            histograms (dict): Гистограммы задержек по операции
+            kind (str): Вид прогона ('pytest', 'load')
+            label (str, optional): Метка внутри вида (набор тестов, сценарий)
+            duration (float, optional): Длительность прогона в секундах
+            started_at (float, optional): Время начала (Unix). По умолчанию — текущее минус duration
+            commit (str, optional): Коммит. По умолчанию — HEAD репозитория (или GIT_COMMIT)
+            branch (str, optional): Ветка. По умолчанию — текущая (или GIT_BRANCH)
+
+        Returns:
+            int: Идентификатор прогона
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                'INSERT INTO runs (started_at, duration, kind, label, commit_sha, branch) VALUES (?, ?, ?, ?, ?, ?)',
+                (
+                    started_at if started_at is not None else time.time() - duration, duration, kind, label,
+                    commit or current_commit(), branch or current_branch()
+                )
+            )
+            run_id: int = cursor.lastrowid
+            self.connection.executemany(
+                'INSERT INTO aggregates VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (
+                        run_id, name, histogram.count, histogram.errors, histogram.errors / histogram.count,
+                        histogram.mean * 1000, histogram.percentile(50) * 1000, histogram.percentile(95) * 1000,
+                        histogram.percentile(99) * 1000, histogram.max_us / 1000
+                    )
+                    for name, histogram in histograms.items() if histogram.count
+                ]
+            )
+        return run_id
+
+    def runs(
+            self,
+            kind: Optional[str] = None,
+            label: Optional[str] = None,
+            limit: int = 20
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Последние прогоны (новые в конце).
+
+        Args:
+            kind (str, optional): Вид прогона
+            label (str, optional): Метка
+            limit (int, optional): Число прогонов. По умолчанию 20
+
+        Returns:
+            list: Кортежи (id, started_at, duration, kind, label, commit_sha, branch)
+        """
+        where, parameters = _filter(kind, label)
+        rows = self.connection.execute(
+            f'SELECT id, started_at, duration, kind, label, commit_sha, branch FROM runs {where} '
+            f'ORDER BY started_at DESC, id DESC LIMIT ?', (*parameters, limit)
+        ).fetchall()
+        return rows[::-1]
+
+    def run(self, run_id: int) -> Optional[Tuple[Any, ...]]:
+        """
+        Прогон по идентификатору.
+        """
+        return self.connection.execute(
+            'SELECT id, started_at, duration, kind, label, commit_sha, branch FROM runs WHERE id = ?', (run_id,)
+        ).fetchone()
+
+    def aggregates(self, run_id: int, metric: str = 'p95_ms') -> Dict[str, float]:
+        """
+        Значения метрики по операциям прогона.
+
+        Args:
+            run_id (int): Идентификатор прогона
+            metric (str, optional): Метрика. По умолчанию p95_ms
+
+        Returns:
+            dict: Значение по имени операции
+        """
+        column: str = _metric(metric)
+        return dict(self.connection.execute(
+            f'SELECT name, {column} FROM aggregates WHERE run_id = ?', (run_id,)
+        ).fetchall())
+
+    def trend(
+            self,
+            name: str,
+            metric: str = 'p95_ms',
+            kind: Optional[str] = None,
+            label: Optional[str] = None,
+            limit: int = 30
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Ряд значений метрики операции по прогонам (старые в начале).
+
+        Args:
+            name (str): Операция
+            metric (str, optional): Метрика. По умолчанию p95_ms
+            kind (str, optional): Вид прогона
+            label (str, optional): Метка
+            limit (int, optional): Число прогонов. По умолчанию 30
+
+        Returns:
+            list: Кортежи (run_id, started_at, commit_sha, count, значение)
+        """
+        column: str = _metric(metric)
+        where, parameters = _filter(kind, label, prefix='runs.')
+        where = f'{where} AND' if where else 'WHERE'
+        rows = self.connection.execute(
+            f'SELECT runs.id, runs.started_at, runs.commit_sha, aggregates.count, aggregates.{column} '
+            f'FROM aggregates JOIN runs ON runs.id = aggregates.run_id {where} aggregates.name = ? '
+            f'ORDER BY runs.started_at DESC, runs.id DESC LIMIT ?', (*parameters, name, limit)
+        ).fetchall()
+        return rows[::-1]
+
+    def detect_regressions(
+            self,
+            run_id: Optional[int] = None,
+            metric: str = 'p95_ms',
+            window: int = 10,
+            min_runs: int = 5,
+            threshold: float = 3.5,
+            min_change: float = 0.2,
+            min_count: int = 5,
+            min_mad_ratio: float = MIN_MAD_RATIO
+    ) -> List[Regression]:
+        """
+        Поиск операций прогона, медленнее базовой линии.
+
+        Базовая линия — до window предыдущих прогонов того же вида и метки, в
+        которых операция выполнялась не реже min_count раз. Регрессией
+        считается значение, робастная z-оценка которого (отклонение от медианы
+        в единицах MAD * 1.4826) больше threshold, а относительный рост больше
+        min_change: второе условие отсекает статистически значимые, но
+        несущественные изменения стабильных операций. MAD ограничен снизу
+        долей медианы min_mad_ratio (при нулевой медиане — самим значением
+        min_mad_ratio в единицах метрики), чтобы у базовой линии из одинаковых
+        значений z-оценка оставалась конечной.
+
+        Args:
+            run_id (int, optional): Проверяемый прогон. По умолчанию — последний
+            metric (str, optional): Метрика. По умолчанию p95_ms
+            window (int, optional): Размер базовой линии в прогонах. По умолчанию 10
+            min_runs (int, optional): Минимум прогонов в базовой линии. По умолчанию 5
+            threshold (float, optional): Порог робастной z-оценки. По умолчанию 3.5
+            min_change (float, optional): Минимальный относительный рост. По умолчанию 0.2
+            min_count (int, optional): Минимум замеров операции в прогоне. По умолчанию 5
+            min_mad_ratio (float, optional): Нижняя граница MAD как доля медианы. По умолчанию 0.03
+
+        Returns:
+            list: Регрессии, упорядоченные по убыванию z-оценки
+        """
+        column: str = _metric(metric)
+        if run_id is None:
+            latest = self.connection.execute('SELECT id FROM runs ORDER BY started_at DESC, id DESC LIMIT 1').fetchone()
+            if latest is None:
+                return []
+            run_id = latest[0]
+        current = self.run(run_id)
+        if current is None:
+            raise ValueError(f'Прогон {run_id} не найден')
+        _, started_at, _, kind, label, _, _ = current
+        baseline_runs: List[int] = [
+            row[0] for row in self.connection.execute(
+                'SELECT id FROM runs WHERE kind = ? AND label = ? AND (started_at < ? OR (started_at = ? AND id < ?)) '
+                'ORDER BY started_at DESC, id DESC LIMIT ?', (kind, label, started_at, started_at, run_id, window)
+            )
+        ]
+        if len(baseline_runs) < min_runs:
+            return []
+        history: Dict[str, List[float]] = {}
+        for name, value in self.connection.execute(
+                f'SELECT name, {column} FROM aggregates WHERE count >= ? AND run_id IN '
+                f'({",".join("?" * len(baseline_runs))})', (min_count, *baseline_runs)
+        ):
+            history.setdefault(name, []).append(value)
+        regressions: List[Regression] = []
+        for name, value in self.connection.execute(
+                f'SELECT name, {column} FROM aggregates WHERE run_id = ? AND count >= ?', (run_id, min_count)
+        ):
+            values: List[float] = history.get(name, [])
+            if len(values) < min_runs:
+                continue
+            median: float = statistics.median(values)
+            mad: float = statistics.median(abs(item - median) for item in values)
+            if value <= median or (median and value / median - 1 < min_change):
+                continue
+            spread: float = max(mad, min_mad_ratio * median) or min_mad_ratio
+            score: float = (value - median) / (MAD_SCALE * spread)
+            if score > threshold:
+                regressions.append(Regression(name, metric, value, median, mad, score))
+        return sorted(regressions, key=lambda regression: -regression.score)
+
+
+def current_commit() -> str:
+    """
+    Коммит рабочей копии: GIT_COMMIT или git rev-parse HEAD ('unknown' вне репозитория).
+    """
+    return os.getenv('GIT_COMMIT') or _git('rev-parse', '--short=12', 'HEAD')
+
+
+def current_branch() -> str:
+    """
+    Ветка рабочей копии: GIT_BRANCH или git rev-parse --abbrev-ref HEAD ('unknown' вне репозитория).
+    """
+    return os.getenv('GIT_BRANCH') or _git('rev-parse', '--abbrev-ref', 'HEAD')
+
+
+def save_run(path: str, histograms: Dict[str, LatencyHistogram], kind: str, label: str, started_at: float) -> str:
+    """
+    Сохранение прогона в историю и проверка его на регрессии с настройками по умолчанию.
+
+    Args:
+        path (str): Файл истории
+        histograms (dict): Гистограммы задержек по операции
+        kind (str): Вид прогона ('pytest', 'load')
+        label (str): Метка прогона
+        started_at (float): Время начала прогона (Unix)
+
+    Returns:
+        str: Текст для отчета: номер прогона и найденные регрессии
+    """
+    store: HistoryStore = HistoryStore(path)
+    try:
+        run_id: int = store.record_run(
+            histograms, kind=kind, label=label, duration=time.time() - started_at, started_at=started_at
+        )
+        regressions: str = format_regressions(store.detect_regressions(run_id))
+    finally:
+        store.close()
+    return f'Прогон {run_id} сохранен в {path}\n{regressions or "Регрессий задержек нет"}'
+
+
+def format_regressions(regressions: List[Regression], title: str = 'Регрессии задержек') -> str:
+    """
+    Текст списка регрессий.
+
+    Args:
+        regressions (list): Регрессии
+        title (str, optional): Заголовок
+
+    Returns:
+        str: Текст или пустая строка, если регрессий нет
+    """
+    if not regressions:
+        return ''
+    return '\n'.join([f'{title}:'] + [f'  {regression}' for regression in regressions])
+
+
+def format_trend(rows: List[Tuple[Any, ...]], name: str, metric: str, width: int = 40) -> str:
+    """
+    Таблица ряда значений с полосой относительно максимума.
+
+    Args:
+        rows (list): Результат HistoryStore.trend
+        name (str): Операция
+        metric (str): Метрика
+        width (int, optional): Ширина полосы в символах. По умолчанию 40
+
+    Returns:
+        str: Текст таблицы
+    """
+    if not rows:
+        return f'{name}: нет данных'
+    peak: float = max(row[4] for row in rows) or 1.0
+    lines: List[str] = [f'{name} ({metric})']
+    for run_id, started_at, commit, count, value in rows:
+        moment: str = time.strftime('%Y-%m-%d %H:%M', time.localtime(started_at))
+        bar: str = '#' * max(1, round(value / peak * width)) if value else ''
+        lines.append(f'{run_id:>6} {moment} {commit[:10]:<10} {count:>8} {value:>10.1f}  {bar}')
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Просмотр истории прогонов и поиск регрессий из командной строки.
+
+    Пример:
+        python -m load.history runs
+        python -m load.history trend 'POST /v1/account' --metric p95_ms
+        python -m load.history check --window 10 --threshold 3.5
+    """
+    parser = argparse.ArgumentParser(description='История задержек прогонов и поиск регрессий')
+    parser.add_argument('--db', default=DEFAULT_PATH, help='Файл истории (env RUN_HISTORY)')
+    parser.add_argument('--kind', default=None, help='Вид прогона (pytest, load)')
+    parser.add_argument('--label', default=None, help='Метка прогона (набор тестов, сценарий)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    runs_parser = commands.add_parser('runs', help='Последние прогоны')
+    runs_parser.add_argument('--limit', type=int, default=20)
+    show_parser = commands.add_parser('show', help='Агрегаты прогона')
+    show_parser.add_argument('run_id', type=int, nargs='?', default=None, help='Прогон (по умолчанию последний)')
+    show_parser.add_argument('--metric', choices=METRICS, default='p95_ms')
+    trend_parser = commands.add_parser('trend', help='Тренд метрики операции')
+    trend_parser.add_argument('name', help="Операция, например 'POST /v1/account' или register_new_user")
+    trend_parser.add_argument('--metric', choices=METRICS, default='p95_ms')
+    trend_parser.add_argument('--limit', type=int, default=30)
+    check_parser = commands.add_parser('check', help='Регрессии прогона против скользящей базовой линии')
+    check_parser.add_argument('run_id', type=int, nargs='?', default=None, help='Прогон (по умолчанию последний)')
+    check_parser.add_argument('--metric', choices=METRICS, default='p95_ms')
+    check_parser.add_argument('--window', type=int, default=10, help='Прогонов в базовой линии')
+    check_parser.add_argument('--min-runs', type=int, default=5, help='Минимум прогонов в базовой линии')
+    check_parser.add_argument('--threshold', type=float, default=3.5, help='Порог робастной z-оценки')
+    check_parser.add_argument('--min-change', type=float, default=0.2, help='Минимальный относительный рост')
+    args = parser.parse_args(argv)
+
+    store: HistoryStore = HistoryStore(args.db)
+    try:
+        if args.command == 'runs':
+            for number, started_at, duration, kind, label, commit, branch in store.runs(args.kind, args.label, args.limit):
+                moment: str = time.strftime('%Y-%m-%d %H:%M', time.localtime(started_at))
+                print(f'{number:>6} {moment} {duration:>8.1f} с  {commit[:10]:<10} {branch:<20} {kind} {label}')
+            return
+        latest: List[Tuple[Any, ...]] = store.runs(args.kind, args.label, 1)
+        run_id: Optional[int] = getattr(args, 'run_id', None) or (latest[-1][0] if latest else None)
+        if args.command == 'show':
+            if run_id is None:
+                print('История пуста')
+                return
+            for name, value in sorted(store.aggregates(run_id, args.metric).items()):
+                print(f'{name[:59]:<60}{value:>10.1f}')
+        elif args.command == 'trend':
+            rows: List[Tuple[Any, ...]] = store.trend(args.name, args.metric, args.kind, args.label, args.limit)
+            print(format_trend(rows, args.name, args.metric))
+        else:
+            if run_id is None:
+                print('История пуста')
+                return
+            regressions: List[Regression] = store.detect_regressions(
+                run_id=run_id, metric=args.metric, window=args.window, min_runs=args.min_runs,
+                threshold=args.threshold, min_change=args.min_change
+            )
+            print(format_regressions(regressions) or 'Регрессий нет')
+            if regressions:
+                sys.exit(1)
+    finally:
+        store.close()
+
+
+def _filter(kind: Optional[str], label: Optional[str], prefix: str = '') -> Tuple[str, Tuple[str, ...]]:
+    """
+    Условие WHERE по виду и метке прогона.
+    """
+    conditions: List[str] = []
+    parameters: List[str] = []
+    if kind is not None:
+        conditions.append(f'{prefix}kind = ?')
+        parameters.append(kind)
+    if label is not None:
+        conditions.append(f'{prefix}label = ?')
+        parameters.append(label)
+    return ('WHERE ' + ' AND '.join(conditions) if conditions else ''), tuple(parameters)
+
+
+def _metric(metric: str) -> str:
+    """
+    Проверенное имя столбца метрики (подставляется в SQL).
+    """
+    if metric not in METRICS:
+        raise ValueError(f'Неизвестная метрика {metric!r}, доступны {", ".join(METRICS)}')
+    return metric
+
+
+def _git(*args: str) -> str:
+    """
+    Вывод команды git или 'unknown'.
+    """
+    try:
+        return subprocess.run(
+            ('git', *args), capture_output=True, text=True, timeout=5, check=True
+        ).stdout.strip() or 'unknown'
+    except (OSError, subprocess.SubprocessError):
+        return 'unknown'
+
+
+if __name__ == '__main__':
+    main()
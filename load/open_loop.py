@@ -0,0 +1,460 @@
+import argparse
+import math
+import os
+import queue
+import threading
+import time
+from typing import Optional, Dict, List, Callable, Any, Iterator, Tuple
+
+from helpers.account_helper import AccountHelper
+from load.driver import (
+    AccountHelperFactory, LoadDriver, Scenario, flush_records, load_scenario, start_soak_monitor
+)
+from load.histogram import LatencyHistogram, HistogramRecorder
+from load.history import save_run
+from load.soak import SoakMonitor, SoakPolicy
+from restclient import tracing
+from restclient.configuration import Configuration
+
+# Счетчики планировщика, передаваемые воркерами вместе с гистограммами
+SCHEDULED: str = 'scheduled'
+STARTED: str = 'started'
+LATE: str = 'late'
+DROPPED: str = 'dropped'
+
+# Запас времени на запуск процессов-воркеров до первого планового запуска
+STARTUP_DELAY: float = 0.5
+
+
+class Phase:
+    """
+    Фаза профиля нагрузки: интенсивность запусков сценария в течение заданного времени.
+
+    Интенсивность меняется линейно от rate до end_rate, поэтому из фаз
+    собираются разгон (0 -> N), ступени (N, затем M) и всплески (короткая
+    фаза с высокой интенсивностью).
+    """
+
+    def __init__(
+            self,
+            duration: float,
+            rate: float,
+            end_rate: Optional[float] = None
+    ) -> None:
+        """
+        Инициализация фазы.
+
+        Args:
+            duration (float): Длительность фазы в секундах
+            rate (float): Запусков сценария в секунду в начале фазы
+            end_rate (float, optional): Запусков в секунду в конце фазы. По умолчанию равна rate
+
+        Raises:
+            ValueError: Если длительность не положительна или интенсивность отрицательна
+        """
+        if duration <= 0 or rate < 0 or (end_rate is not None and end_rate < 0):
+            raise ValueError(f'Некорректная фаза: длительность {duration}, интенсивность {rate}-{end_rate}')
+        self.duration: float = duration
+        self.rate: float = rate
+        self.end_rate: float = rate if end_rate is None else end_rate
+
+    @property
+    def arrivals(self) -> float:
+        """
+        Ожидаемое число запусков за фазу.
+        """
+        return (self.rate + self.end_rate) / 2 * self.duration
+
+    def offset(self, arrival: float) -> float:
+        """
+        Момент запуска с заданным порядковым номером от начала фазы.
+
+        Решает уравнение rate * t + (end_rate - rate) * t^2 / (2 * duration) = arrival.
+
+        Args:
+            arrival (float): Порядковый номер запуска в фазе (с нуля)
+
+        Returns:
+            float: Смещение от начала фазы в секундах
+        """
+        slope: float = (self.end_rate - self.rate) / self.duration / 2
+        if abs(slope) < 1e-12:
+            return arrival / self.rate
+        return (-self.rate + math.sqrt(max(self.rate ** 2 + 4 * slope * arrival, 0.0))) / (2 * slope)
+
+    def __repr__(self) -> str:
+        if self.end_rate == self.rate:
+            return f'Phase({self.duration:g} с, {self.rate:g}/с)'
+        return f'Phase({self.duration:g} с, {self.rate:g}->{self.end_rate:g}/с)'
+
+
+def parse_profile(spec: str) -> List[Phase]:
+    """
+    Разбор профиля нагрузки из строки.
+
+    Формат: фазы через запятую, каждая — ``длительность:интенсивность`` или
+    ``длительность:начальная-конечная`` (секунды и запуски в секунду).
+    Например, '30:0-20,60:20,10:100,60:20' — разгон до 20/с, ступень,
+    всплеск до 100/с и возврат.
+
+    Args:
+        spec (str): Описание профиля
+
+    Returns:
+        list: Фазы профиля
+
+    Raises:
+        ValueError: Если строка не соответствует формату
+    """
+    phases: List[Phase] = []
+    for item in spec.split(','):
+        duration, _, rates = item.strip().partition(':')
+        rate, _, end_rate = rates.partition('-')
+        if not duration or not rate:
+            raise ValueError(f'Некорректная фаза профиля: {item!r}, ожидается длительность:интенсивность[-конечная]')
+        phases.append(Phase(float(duration), float(rate), float(end_rate) if end_rate else None))
+    return phases
+
+
+def iter_arrivals(
+        phases: List[Phase],
+        worker: int = 0,
+        workers: int = 1
+) -> Iterator[float]:
+    """
+    Плановые моменты запусков сценария по профилю.
+
+    Запуски нумеруются сквозным образом по всем фазам и распределяются
+    между воркерами по остатку от деления номера, поэтому суммарная
+    интенсивность всех воркеров равна профилю.
+
+    Args:
+        phases (list): Фазы профиля
+        worker (int, optional): Номер воркера. По умолчанию 0
+        workers (int, optional): Число воркеров. По умолчанию 1
+
+    Yields:
+        float: Смещение запуска от начала нагрузки в секундах
+    """
+    phase_start: float = 0.0
+    first: float = 0.0
+    for phase in phases:
+        last: float = first + phase.arrivals
+        index: int = math.ceil(first)
+        index += (worker - index) % workers
+        while index < last:
+            yield phase_start + phase.offset(index - first)
+            index += workers
+        first = last
+        phase_start += phase.duration
+
+
+class OpenLoopDriver(LoadDriver):
+    """
+    Генератор нагрузки с открытой моделью: запуски сценария с заданной интенсивностью.
+
+    В закрытой модели (LoadDriver) виртуальный пользователь не начинает
+    следующую итерацию, пока не закончилась предыдущая, поэтому при
+    замедлении сервиса нагрузка падает, а задержки занижаются (coordinated
+    omission). Здесь запуски идут по расписанию независимо от ответов:
+    задержка сценария отсчитывается от планового момента запуска, а
+    опоздания запусков (нет свободного пользователя или планировщик
+    отстал) и отброшенные запуски (очередь переполнена) считаются отдельно.
+
+    В отчете: '<сценарий>' — задержка от планового запуска, '<сценарий> [service]' —
+    время выполнения от фактического запуска, '<сценарий> [start lag]' —
+    опоздание запуска. HTTP-запросы и шаги AccountHelper измеряются от
+    фактической отправки.
+    """
+
+    def __init__(
+            self,
+            scenario: Scenario,
+            helper_factory: Callable[[], AccountHelper],
+            phases: List[Phase],
+            workers: Optional[int] = None,
+            users_per_worker: int = 50,
+            max_queue: Optional[int] = None,
+            late_threshold: float = 0.05,
+            report_interval: float = 5.0,
+            flush_interval: float = 1.0,
+            name: Optional[str] = None,
+            output: Callable[[str], None] = print,
+            soak: Optional[SoakPolicy] = None
+    ) -> None:
+        """
+        Инициализация генератора нагрузки.
+
+        Args:
+            scenario (Callable): Сценарий — функция, принимающая AccountHelper
+            helper_factory (Callable): Фабрика AccountHelper
+            phases (list): Фазы профиля нагрузки (см. Phase, parse_profile)
+            workers (int, optional): Число процессов. По умолчанию — число ядер
+            users_per_worker (int, optional): Предел одновременных итераций на процесс. По умолчанию 50
+            max_queue (int, optional): Предел ожидающих запусков на процесс, сверх него запуски
+                отбрасываются. По умолчанию равен users_per_worker
+            late_threshold (float, optional): Опоздание запуска в секундах, с которого он считается
+                опоздавшим. По умолчанию 0.05
+            report_interval (float, optional): Интервал вывода отчета в секундах. По умолчанию 5
+            flush_interval (float, optional): Интервал отправки замеров воркером в секундах. По умолчанию 1
+            name (str, optional): Имя сценария в отчете. По умолчанию — имя функции
+            output (Callable, optional): Функция вывода отчета. По умолчанию print
+            soak (SoakPolicy, optional): Снимки ресурсов воркеров для поиска утечек в длительном прогоне
+        """
+        super().__init__(
+            scenario=scenario,
+            helper_factory=helper_factory,
+            workers=workers,
+            users_per_worker=users_per_worker,
+            duration=sum(phase.duration for phase in phases) + STARTUP_DELAY,
+            report_interval=report_interval,
+            flush_interval=flush_interval,
+            name=name,
+            output=output,
+            soak=soak
+        )
+        self.phases: List[Phase] = phases
+        self.max_queue: int = users_per_worker if max_queue is None else max_queue
+        self.late_threshold: float = late_threshold
+        self._start_at: float = 0.0
+
+    def run(self) -> Dict[str, LatencyHistogram]:
+        """
+        Запуск нагрузки по профилю и ожидание завершения начатых итераций.
+
+        Returns:
+            dict: Итоговые гистограммы задержек по имени операции
+        """
+        # Общая точка отсчета расписания для всех воркеров
+        self._start_at = time.time() + STARTUP_DELAY
+        return super().run()
+
+    def _worker(self, index: int, records: Any, stop: Any) -> Tuple[Callable[..., None], tuple]:
+        """
+        Точка входа и аргументы процесса-воркера открытой модели.
+        """
+        return _open_loop_worker_main, (
+            self.scenario, self.helper_factory, self.phases, index, self.workers, self._start_at,
+            self.users_per_worker, self.max_queue, self.late_threshold, self.name, self.flush_interval, records, stop,
+            self._soak_run
+        )
+
+    def _report(
+            self,
+            histograms: Dict[str, LatencyHistogram],
+            stats: Dict[str, float],
+            elapsed: float,
+            title: str
+    ) -> str:
+        """
+        Текст отчета: таблица задержек, несовпадения ожиданий и счетчики запусков.
+        """
+        report: str = super()._report(histograms, stats, elapsed, title)
+        if SCHEDULED not in stats:
+            return report
+        return report + '\n' + format_schedule(stats, self.late_threshold)
+
+
+def format_schedule(stats: Dict[str, float], late_threshold: float) -> str:
+    """
+    Форматирование счетчиков запусков открытой модели.
+
+    Args:
+        stats (dict): Счетчики scheduled, started, late, dropped
+        late_threshold (float): Порог опоздания в секундах
+
+    Returns:
+        str: Строка отчета
+    """
+    scheduled: int = int(stats.get(SCHEDULED, 0))
+    late: int = int(stats.get(LATE, 0))
+    dropped: int = int(stats.get(DROPPED, 0))
+    share = (lambda value: f'{value / scheduled * 100:.1f}%') if scheduled else (lambda value: '-')
+    return (
+        f'Запуски: запланировано {scheduled}, начато {int(stats.get(STARTED, 0))}, '
+        f'опоздали > {late_threshold * 1000:.0f} мс {late} ({share(late)}), '
+        f'отброшено {dropped} ({share(dropped)})'
+    )
+
+
+class _Schedule:
+    """
+    Очередь запусков воркера и счетчики планировщика.
+    """
+
+    def __init__(self, max_queue: int) -> None:
+        self.arrivals: queue.Queue = queue.Queue(maxsize=max(max_queue, 1))
+        self.stats: Dict[str, float] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+
+    def drain(self) -> Dict[str, float]:
+        with self._lock:
+            stats: Dict[str, float] = self.stats
+            self.stats = {}
+        return stats
+
+
+def _open_loop_worker_main(
+        scenario: Scenario,
+        helper_factory: Callable[[], AccountHelper],
+        phases: List[Phase],
+        worker: int,
+        workers: int,
+        start_at: float,
+        users: int,
+        max_queue: int,
+        late_threshold: float,
+        name: str,
+        flush_interval: float,
+        records: Any,
+        stop: Any,
+        soak: Optional[SoakPolicy] = None
+) -> None:
+    """
+    Точка входа процесса-воркера: планировщик запусков, пул пользователей и отправка замеров.
+    """
+    recorder: HistogramRecorder = HistogramRecorder()
+    tracing.add_exporter(recorder)
+    monitor: Optional[SoakMonitor] = start_soak_monitor(soak)
+    schedule: _Schedule = _Schedule(max_queue)
+    # Точка отсчета переводится в монотонные часы процесса
+    origin: float = time.monotonic() + (start_at - time.time())
+    threads: List[threading.Thread] = [
+        threading.Thread(
+            target=_open_loop_user,
+            args=(scenario, helper_factory, name, late_threshold, recorder, schedule),
+            daemon=True
+        )
+        for _ in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    scheduler: threading.Thread = threading.Thread(
+        target=_schedule_arrivals, args=(phases, worker, workers, origin, schedule, stop), daemon=True
+    )
+    scheduler.start()
+    while scheduler.is_alive():
+        scheduler.join(flush_interval)
+        flush_records(recorder, records, schedule.drain())
+    for _ in threads:
+        schedule.arrivals.put(None)
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(flush_interval)
+        flush_records(recorder, records, schedule.drain())
+    flush_records(recorder, records, schedule.drain())
+    if monitor is not None:
+        monitor.stop()
+    records.put(None)
+
+
+def _schedule_arrivals(
+        phases: List[Phase],
+        worker: int,
+        workers: int,
+        origin: float,
+        schedule: _Schedule,
+        stop: Any
+) -> None:
+    """
+    Постановка запусков в очередь в плановые моменты; при переполнении очереди запуск отбрасывается.
+    """
+    for offset in iter_arrivals(phases, worker, workers):
+        if stop.is_set():
+            return
+        intended: float = origin + offset
+        delay: float = intended - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        schedule.count(SCHEDULED)
+        try:
+            schedule.arrivals.put_nowait(intended)
+        except queue.Full:
+            schedule.count(DROPPED)
+
+
+def _open_loop_user(
+        scenario: Scenario,
+        helper_factory: Callable[[], AccountHelper],
+        name: str,
+        late_threshold: float,
+        recorder: HistogramRecorder,
+        schedule: _Schedule
+) -> None:
+    """
+    Пользователь открытой модели: выполняет запуски из очереди, задержка — от планового момента.
+    """
+    helper: AccountHelper = helper_factory()
+    while True:
+        intended: Optional[float] = schedule.arrivals.get()
+        if intended is None:
+            return
+        started: float = time.monotonic()
+        lag: float = started - intended
+        schedule.count(STARTED)
+        if lag > late_threshold:
+            schedule.count(LATE)
+        recorder.record(f'{name} [start lag]', max(lag, 0.0))
+        try:
+            scenario(helper)
+        except Exception:
+            error: bool = True
+        else:
+            error = False
+        finished: float = time.monotonic()
+        recorder.record(name, finished - intended, error=error)
+        recorder.record(f'{name} [service]', finished - started, error=error)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Запуск генератора нагрузки открытой модели из командной строки.
+
+    Пример:
+        python -m load.open_loop --scenario load.scenarios:register_user --profile 30:0-20,120:20,10:60,60:20
+    """
+    parser = argparse.ArgumentParser(description='Генератор нагрузки на DM API с заданной интенсивностью запусков')
+    parser.add_argument('--scenario', default='load.scenarios:register_and_login',
+                        help='Сценарий вида модуль:функция или файл .toml/.yaml')
+    parser.add_argument('--profile', required=True,
+                        help='Фазы длительность:интенсивность[-конечная] через запятую, например 30:0-20,60:20')
+    parser.add_argument('--dm-host', default=os.getenv('API_HOST', 'http://5.63.153.31:5051'), help='URL DM API')
+    parser.add_argument('--mailhog-host', default=os.getenv('MAILHOG_HOST', 'http://5.63.153.31:5025'), help='URL MailHog')
+    parser.add_argument('--workers', type=int, default=None, help='Число процессов (по умолчанию — число ядер)')
+    parser.add_argument('--users', type=int, default=50, help='Предел одновременных итераций на процесс')
+    parser.add_argument('--max-queue', type=int, default=None, help='Предел ожидающих запусков на процесс')
+    parser.add_argument('--late-threshold', type=float, default=0.05, help='Порог опоздания запуска в секундах')
+    parser.add_argument('--report-interval', type=float, default=5.0, help='Интервал отчета в секундах')
+    parser.add_argument('--expectations', default=None,
+                        help='Ожидания к ответам DM API вида модуль:имя (например, load.scenarios:EXPECTATIONS)')
+    parser.add_argument('--history', default=os.getenv('RUN_HISTORY'),
+                        help='Файл SQLite истории прогонов для итоговых задержек (env RUN_HISTORY)')
+    args = parser.parse_args(argv)
+
+    driver: OpenLoopDriver = OpenLoopDriver(
+        scenario=load_scenario(args.scenario),
+        helper_factory=AccountHelperFactory(
+            dm_api_configuration=Configuration(
+                host=args.dm_host.split(','),
+                expectations=load_scenario(args.expectations) if args.expectations else None
+            ),
+            mailhog_configuration=Configuration(host=args.mailhog_host)
+        ),
+        phases=parse_profile(args.profile),
+        workers=args.workers,
+        users_per_worker=args.users,
+        max_queue=args.max_queue,
+        late_threshold=args.late_threshold,
+        report_interval=args.report_interval
+    )
+    started: float = time.time()
+    total: Dict[str, LatencyHistogram] = driver.run()
+    if args.history:
+        print(save_run(args.history, total, kind='load', label=driver.name, started_at=started))
+
+
+if __name__ == '__main__':
+    main()
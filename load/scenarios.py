@@ -0,0 +1,84 @@
+import itertools
+import os
+import threading
+import uuid
+from typing import Iterator
+
+from checkers.expectations import Expectation, ExpectationSet
+from dm_api_account.apis.account_api import AccountApi
+from dm_api_account.apis.login_api import LoginApi
+from dm_api_account.models.user_envelope import UserEnvelope
+from helpers.account_helper import AccountHelper
+from helpers.data_generator import CredentialPool, User
+
+# Размер пачки пула учетных данных виртуальных пользователей
+POOL_SIZE: int = 10000
+
+
+def is_load_login(login: str) -> bool:
+    """
+    Проверка, что логин создан нагрузочным сценарием.
+
+    Args:
+        login (str): Логин из ответа
+
+    Returns:
+        bool: True, если логин имеет префикс нагрузочных пользователей
+    """
+    return login.startswith('load_')
+
+
+# Ожидания к ответам DM API в сценариях регистрации и входа (--expectations load.scenarios:EXPECTATIONS)
+EXPECTATIONS: ExpectationSet = ExpectationSet({
+    AccountApi.POST_V1_ACCOUNT: Expectation(status=201),
+    AccountApi.PUT_V1_ACCOUNT_TOKEN: Expectation(model=UserEnvelope, fields={'resource.login': is_load_login}),
+    LoginApi.POST_V1_ACCOUNT_LOGIN: Expectation(
+        model=UserEnvelope, fields={'resource.login': is_load_login, 'resource.rating.enabled': True}
+    ),
+})
+
+_run_id: str = uuid.uuid4().hex[:6]
+_pools: threading.local = threading.local()
+_pool_numbers: Iterator[int] = itertools.count()
+
+
+def new_user() -> User:
+    """
+    Генерация данных уникального пользователя для нагрузочного сценария.
+
+    Данные берутся из пула, созданного отдельно для каждого потока
+    процесса-воркера: уникальность между пулами обеспечивает пространство
+    имен из идентификатора запуска, PID и порядкового номера пула.
+
+    Returns:
+        User: Логин, пароль и email нового пользователя
+    """
+    pool: CredentialPool = getattr(_pools, 'pool', None)
+    if pool is None or _pools.pid != os.getpid():
+        namespace: str = f'{_run_id}{os.getpid():x}p{next(_pool_numbers)}'
+        pool = _pools.pool = CredentialPool(size=POOL_SIZE, prefix='load', namespace=namespace)
+        _pools.pid = os.getpid()
+    return pool.user()
+
+
+def register_user(helper: AccountHelper) -> None:
+    """
+    Сценарий: регистрация и активация нового пользователя.
+
+    Args:
+        helper (AccountHelper): Helper виртуального пользователя
+    """
+    user: User = new_user()
+    helper.register_new_user(login=user.login, password=user.password, email=user.email)
+
+
+def register_and_login(helper: AccountHelper) -> None:
+    """
+    Сценарий: регистрация, активация и вход нового пользователя.
+
+    Args:
+        helper (AccountHelper): Helper виртуального пользователя
+    """
+    user: User = new_user()
+    helper.register_new_user(login=user.login, password=user.password, email=user.email)
+    helper.user_login(login=user.login, password=user.password)
@@ -0,0 +1,357 @@
+import argparse
+import gc
+import glob
+import json
+import os
+import resource
+import socket
+import threading
+import time
+import tracemalloc
+from typing import Optional, Dict, List, Any, Tuple
+
+import requests
+import structlog
+from pydantic import BaseModel
+from urllib3 import HTTPConnectionPool
+
+# Типы, число живых экземпляров которых отслеживается в длительном прогоне
+TRACKED_TYPES: Dict[str, type] = {
+    'requests.Session': requests.Session,
+    'requests.Response': requests.Response,
+    'urllib3.HTTPConnectionPool': HTTPConnectionPool,
+    'structlog.BoundLogger': structlog.BoundLoggerBase,
+    # Класс ленивого логгера не экспортируется structlog: берется тип того, что возвращает get_logger()
+    'structlog.BoundLoggerLazyProxy': type(structlog.get_logger()),
+    'pydantic.BaseModel': BaseModel,
+    'socket.socket': socket.socket,
+}
+
+# Метрики, рост которых проверяется в конце прогона (objects.* — все отслеживаемые типы)
+GROWTH_METRICS: Tuple[str, ...] = (
+    'rss_bytes', 'tracemalloc.current_bytes', 'open_sockets', 'open_fds',
+    'pools.connections', 'pools.idle', 'gc.objects'
+)
+
+
+class SoakPolicy:
+    """
+    Настройки длительного (soak) прогона: снимки ресурсов процесса и поиск утечек.
+
+    Каждые interval секунд в каждом процессе-воркере снимаются RSS, top
+    аллокаций tracemalloc, открытые сокеты и дескрипторы, размеры пулов
+    соединений urllib3 и число живых сессий, ответов, логгеров structlog и
+    моделей pydantic. Снимки пишутся временным рядом в JSON Lines; по
+    окончании прогона ряд проверяется на устойчивый рост.
+    """
+
+    def __init__(
+            self,
+            output_dir: str = 'soak',
+            interval: float = 60.0,
+            top: int = 10,
+            trace_frames: int = 1,
+            growth_threshold: float = 0.1,
+            warmup: int = 2,
+            min_samples: int = 5,
+            min_increase: float = 5
+    ) -> None:
+        """
+        Инициализация настроек.
+
+        Args:
+            output_dir (str, optional): Каталог временных рядов. По умолчанию 'soak'
+            interval (float, optional): Интервал снимков в секундах. По умолчанию 60
+            top (int, optional): Число строк top аллокаций tracemalloc. По умолчанию 10
+            trace_frames (int, optional): Глубина стека tracemalloc (0 — tracemalloc выключен). По умолчанию 1
+            growth_threshold (float, optional): Относительный рост метрики, считающийся утечкой. По умолчанию 0.1
+            warmup (int, optional): Число первых снимков, не участвующих в анализе (прогрев). По умолчанию 2
+            min_samples (int, optional): Минимум снимков после прогрева для анализа. По умолчанию 5
+            min_increase (float, optional): Минимальный абсолютный рост метрики (отсекает рост
+                счетчиков с нуля до числа пользователей). По умолчанию 5
+        """
+        self.output_dir: str = output_dir
+        self.interval: float = interval
+        self.top: int = top
+        self.trace_frames: int = trace_frames
+        self.growth_threshold: float = growth_threshold
+        self.warmup: int = warmup
+        self.min_samples: int = min_samples
+        self.min_increase: float = min_increase
+
+
+def _rss_bytes() -> int:
+    """
+    Текущий RSS процесса (Linux — /proc/self/status, иначе пиковый RSS из getrusage).
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _open_descriptors() -> Tuple[Optional[int], Optional[int]]:
+    """
+    Число открытых дескрипторов и сокетов процесса (None, если /proc недоступен).
+    """
+    try:
+        names: List[str] = os.listdir('/proc/self/fd')
+    except OSError:
+        return None, None
+    sockets: int = 0
+    for name in names:
+        try:
+            sockets += os.readlink(f'/proc/self/fd/{name}').startswith('socket:')
+        except OSError:
+            continue
+    return len(names), sockets
+
+
+def take_snapshot(top: int = 10) -> Dict[str, Any]:
+    """
+    Снимок ресурсов текущего процесса.
+
+    Args:
+        top (int, optional): Число строк top аллокаций tracemalloc. По умолчанию 10
+
+    Returns:
+        dict: Время, RSS, дескрипторы, пулы соединений, число объектов по типам, gc и tracemalloc
+    """
+    gc.collect()
+    objects: List[Any] = gc.get_objects()
+    counts: Dict[str, int] = dict.fromkeys(TRACKED_TYPES, 0)
+    connections: int = 0
+    idle: int = 0
+    for obj in objects:
+        for name, cls in TRACKED_TYPES.items():
+            if isinstance(obj, cls):
+                counts[name] += 1
+        if isinstance(obj, HTTPConnectionPool):
+            connections += obj.num_connections
+            # Очередь пула заполнена заглушками None, соединениями являются остальные элементы
+            idle += sum(connection is not None for connection in list(obj.pool.queue)) if obj.pool is not None else 0
+
+    open_fds, open_sockets = _open_descriptors()
+    snapshot: Dict[str, Any] = {
+        'time': time.time(),
+        'pid': os.getpid(),
+        'rss_bytes': _rss_bytes(),
+        'open_fds': open_fds,
+        'open_sockets': open_sockets,
+        'pools': {'connections': connections, 'idle': idle},
+        'objects': counts,
+        'gc': {'objects': len(objects), 'garbage': len(gc.garbage)},
+    }
+    del objects
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        statistics = tracemalloc.take_snapshot().statistics('lineno')[:top]
+        snapshot['tracemalloc'] = {
+            'current_bytes': current,
+            'peak_bytes': peak,
+            'top': [
+                {'location': str(stat.traceback), 'size_bytes': stat.size, 'count': stat.count}
+                for stat in statistics
+            ],
+        }
+    return snapshot
+
+
+class SoakMonitor:
+    """
+    Фоновая запись снимков ресурсов процесса во временной ряд (JSON Lines).
+
+    analyze() читает все ряды каталога, поэтому имя ряда по умолчанию
+    содержит PID и время запуска монитора, а start() начинает файл заново:
+    ряды разных прогонов не смешиваются, даже если PID повторился.
+    """
+
+    def __init__(self, policy: SoakPolicy, label: Optional[str] = None) -> None:
+        """
+        Инициализация монитора.
+
+        Args:
+            policy (SoakPolicy): Настройки прогона
+            label (str, optional): Имя файла ряда. По умолчанию 'process-<pid>-<время запуска>'
+        """
+        self.policy: SoakPolicy = policy
+        label = label or f'process-{os.getpid()}-{time.strftime("%Y%m%d-%H%M%S")}'
+        self.path: str = os.path.join(policy.output_dir, f'{label}.jsonl')
+        self._stop: threading.Event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Запуск tracemalloc (если включен) и фонового потока снимков; ряд с тем же именем перезаписывается.
+        """
+        os.makedirs(self.policy.output_dir, exist_ok=True)
+        open(self.path, 'w', encoding='utf-8').close()
+        if self.policy.trace_frames and not tracemalloc.is_tracing():
+            tracemalloc.start(self.policy.trace_frames)
+        self._thread = threading.Thread(target=self._run, name='soak-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Остановка потока с записью последнего снимка.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._write(take_snapshot(self.policy.top))
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.policy.interval):
+            self._write(take_snapshot(self.policy.top))
+
+    def _write(self, snapshot: Dict[str, Any]) -> None:
+        with open(self.path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(snapshot) + '\n')
+
+
+def _flatten(snapshot: Dict[str, Any], prefix: str = '') -> Dict[str, float]:
+    """
+    Числовые поля снимка в виде {'pools.connections': 3, ...}.
+    """
+    values: Dict[str, float] = {}
+    for key, value in snapshot.items():
+        name: str = f'{prefix}{key}'
+        if isinstance(value, dict):
+            values.update(_flatten(value, f'{name}.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and key not in ('time', 'pid'):
+            values[name] = value
+    return values
+
+
+def detect_growth(
+        snapshots: List[Dict[str, Any]],
+        policy: SoakPolicy
+) -> List[str]:
+    """
+    Поиск метрик с устойчивым ростом во временном ряду одного процесса.
+
+    Метрика считается растущей, если после прогрева ее последнее значение
+    превышает первое больше чем на growth_threshold и не меньше чем на
+    min_increase, медиана последней трети
+    ряда выше медианы первой трети, а не меньше 75% изменений между
+    соседними снимками — рост (ряд почти монотонен, а не колеблется).
+
+    Args:
+        snapshots (list): Снимки процесса в порядке записи
+        policy (SoakPolicy): Настройки анализа
+
+    Returns:
+        list: Описания растущих метрик
+    """
+    samples: List[Dict[str, float]] = [_flatten(snapshot) for snapshot in snapshots[policy.warmup:]]
+    if len(samples) < policy.min_samples:
+        return []
+    names: List[str] = [
+        name for name in samples[0]
+        if name in GROWTH_METRICS or name.startswith('objects.')
+    ]
+    findings: List[str] = []
+    third: int = max(len(samples) // 3, 1)
+    for name in names:
+        series: List[float] = [sample[name] for sample in samples if sample.get(name) is not None]
+        if len(series) < policy.min_samples:
+            continue
+        first, last = series[0], series[-1]
+        if last <= first * (1 + policy.growth_threshold) or last - first < policy.min_increase:
+            continue
+        head: float = sorted(series[:third])[third // 2]
+        tail: float = sorted(series[-third:])[third // 2]
+        steps: List[float] = [b - a for a, b in zip(series, series[1:]) if b != a]
+        rising: float = sum(step > 0 for step in steps) / len(steps) if steps else 0.0
+        if tail > head and rising >= 0.75:
+            growth: str = f'+{(last - first) / first * 100:.0f}%' if first else f'+{last - first:g}'
+            findings.append(f'{name}: {first:g} -> {last:g} ({growth}, рост в {rising * 100:.0f}% интервалов)')
+    return findings
+
+
+def analyze(output_dir: str, policy: Optional[SoakPolicy] = None) -> str:
+    """
+    Анализ временных рядов всех процессов прогона.
+
+    Args:
+        output_dir (str): Каталог временных рядов
+        policy (SoakPolicy, optional): Настройки анализа. По умолчанию — настройки по умолчанию
+
+    Returns:
+        str: Текст отчета: растущие метрики по процессам и top аллокаций последнего снимка
+    """
+    policy = policy or SoakPolicy(output_dir=output_dir)
+    lines: List[str] = [f'Анализ длительного прогона ({output_dir})']
+    for path in sorted(glob.glob(os.path.join(output_dir, '*.jsonl'))):
+        with open(path, encoding='utf-8') as file:
+            snapshots: List[Dict[str, Any]] = [json.loads(line) for line in file if line.strip()]
+        if not snapshots:
+            continue
+        label: str = os.path.splitext(os.path.basename(path))[0]
+        if len(snapshots) - policy.warmup < policy.min_samples:
+            lines.append(f'{label}: {len(snapshots)} снимков — недостаточно для анализа')
+            continue
+        findings: List[str] = detect_growth(snapshots, policy)
+        hours: float = (snapshots[-1]['time'] - snapshots[0]['time']) / 3600
+        if not findings:
+            lines.append(f'{label}: {len(snapshots)} снимков за {hours:.1f} ч, устойчивого роста нет')
+            continue
+        lines.append(f'{label}: {len(snapshots)} снимков за {hours:.1f} ч, ВОЗМОЖНАЯ УТЕЧКА:')
+        lines.extend(f'    {finding}' for finding in findings)
+        for allocation in snapshots[-1].get('tracemalloc', {}).get('top', [])[:5]:
+            lines.append(
+                f'    {allocation["size_bytes"] / 1024:>10.1f} КБ {allocation["count"]:>8} блоков  {allocation["location"]}'
+            )
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Длительный прогон сценария с записью снимков ресурсов или анализ готовых рядов.
+
+    Пример:
+        python -m load.soak --scenario load.scenarios:register_and_login --duration 14400 --interval 60
+        python -m load.soak --analyze soak
+    """
+    from load.driver import AccountHelperFactory, LoadDriver, load_scenario
+    from restclient.configuration import Configuration
+
+    parser = argparse.ArgumentParser(description='Длительный прогон DM API с поиском утечек памяти и соединений')
+    parser.add_argument('--analyze', metavar='DIR', default=None, help='Только анализ рядов из каталога')
+    parser.add_argument('--scenario', default='load.scenarios:register_and_login',
+                        help='Сценарий вида модуль:функция или файл .toml/.yaml')
+    parser.add_argument('--dm-host', default=os.getenv('API_HOST', 'http://5.63.153.31:5051'), help='URL DM API')
+    parser.add_argument('--mailhog-host', default=os.getenv('MAILHOG_HOST', 'http://5.63.153.31:5025'), help='URL MailHog')
+    parser.add_argument('--workers', type=int, default=1, help='Число процессов')
+    parser.add_argument('--users', type=int, default=5, help='Виртуальных пользователей на процесс')
+    parser.add_argument('--duration', type=float, default=3600.0, help='Длительность в секундах')
+    parser.add_argument('--interval', type=float, default=60.0, help='Интервал снимков в секундах')
+    parser.add_argument('--output-dir', default='soak', help='Каталог временных рядов')
+    parser.add_argument('--threshold', type=float, default=0.1, help='Относительный рост, считающийся утечкой')
+    parser.add_argument('--report-interval', type=float, default=300.0, help='Интервал отчета о задержках в секундах')
+    args = parser.parse_args(argv)
+
+    if args.analyze:
+        print(analyze(args.analyze, SoakPolicy(output_dir=args.analyze, growth_threshold=args.threshold)))
+        return
+    driver: LoadDriver = LoadDriver(
+        scenario=load_scenario(args.scenario),
+        helper_factory=AccountHelperFactory(
+            dm_api_configuration=Configuration(host=args.dm_host.split(',')),
+            mailhog_configuration=Configuration(host=args.mailhog_host)
+        ),
+        workers=args.workers,
+        users_per_worker=args.users,
+        duration=args.duration,
+        report_interval=args.report_interval,
+        soak=SoakPolicy(output_dir=args.output_dir, interval=args.interval, growth_threshold=args.threshold)
+    )
+    driver.run()
+
+
+if __name__ == '__main__':
+    main()
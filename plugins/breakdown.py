@@ -0,0 +1,84 @@
+import os
+from typing import Optional, Dict, List, Any, Generator
+
+import pytest
+
+from helpers.breakdown import Breakdown, BreakdownRecorder, format_table, write_report
+from restclient import tracing
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """
+    Регистрация опций разбивки времени тестов.
+    """
+    group = parser.getgroup('breakdown', 'Разбивка времени тестов')
+    group.addoption(
+        '--breakdown', default=os.getenv('TEST_BREAKDOWN'),
+        help='JSON-файл с разбивкой времени каждого теста на сеть, ожидание писем и CPU (env TEST_BREAKDOWN)'
+    )
+    group.addoption(
+        '--breakdown-top', type=int, default=int(os.getenv('BREAKDOWN_TOP', '15')),
+        help='Количество самых долгих тестов в таблице (env BREAKDOWN_TOP)'
+    )
+
+
+class BreakdownPlugin:
+    """
+    Плагин pytest, разбивающий время каждого теста на сеть, ожидание писем и клиентский CPU.
+
+    Разбивка выводится таблицей самых долгих тестов в итогах pytest и
+    записывается JSON-артефактом. При запуске через pytest-xdist воркеры
+    передают разбивки контроллеру, и артефакт содержит все тесты прогона.
+    """
+
+    def __init__(self, config: pytest.Config) -> None:
+        """
+        Инициализация плагина.
+
+        Args:
+            config (pytest.Config): Конфигурация pytest
+        """
+        self.config: pytest.Config = config
+        self.path: str = config.getoption('breakdown')
+        self.top: int = config.getoption('breakdown_top')
+        self.recorder: BreakdownRecorder = BreakdownRecorder()
+        self.results: List[Breakdown] = []
+        self.summary: Optional[str] = None
+
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        tracing.add_exporter(self.recorder)
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item, nextitem: Optional[pytest.Item]) -> Generator[None, Any, None]:
+        nodeid: str = item.nodeid
+        if item.get_closest_marker('xdist_group') is not None:
+            # xdist добавляет к идентификатору теста суффикс группы '@имя'
+            nodeid = nodeid.rsplit('@', 1)[0]
+        with self.recorder.measure(nodeid):
+            yield
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node: Any, error: Any) -> None:
+        results: List[Dict[str, Any]] = getattr(node, 'workeroutput', {}).get('breakdown', [])
+        self.results.extend(Breakdown.from_dict(data) for data in results)
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        tracing.remove_exporter(self.recorder)
+        self.recorder.close()
+        if hasattr(self.config, 'workerinput'):
+            self.config.workeroutput['breakdown'] = [breakdown.to_dict() for breakdown in self.recorder.results]
+            return
+        results: List[Breakdown] = self.results + self.recorder.results
+        if results:
+            write_report(self.path, results)
+            self.summary = f'{format_table(results, top=self.top)}\n\nФайл: {self.path}'
+
+    def pytest_terminal_summary(self, terminalreporter: Any) -> None:
+        if self.summary:
+            terminalreporter.write_sep('=', 'breakdown')
+            terminalreporter.write_line(self.summary)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if config.getoption('breakdown'):
+        config.pluginmanager.register(BreakdownPlugin(config), 'breakdown-plugin')
@@ -0,0 +1,60 @@
+import os
+import re
+from typing import Any, Generator
+
+import pytest
+
+from restclient.flight_recorder import recorder
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """
+    Регистрация опций самописца HTTP-клиентов.
+    """
+    group = parser.getgroup('flight-recorder', 'Самописец HTTP-клиентов')
+    group.addoption(
+        '--flight-dir', default=os.getenv('FLIGHT_DIR', 'flight_records'),
+        help='Каталог дампов последних запросов упавших тестов (env FLIGHT_DIR). '
+             'Размер буфера на поток задает FLIGHT_RECORDER_SIZE, 0 выключает запись'
+    )
+
+
+class FlightRecorderPlugin:
+    """
+    Плагин pytest, записывающий последние запросы и ответы упавшего теста.
+
+    Перед каждым тестом буферы самописца очищаются, а если тест (или его
+    фикстура) упал, обмены теста записываются в файл командами cURL с
+    ответами, и путь к файлу добавляется в отчет pytest.
+    """
+
+    def __init__(self, config: pytest.Config) -> None:
+        """
+        Инициализация плагина.
+
+        Args:
+            config (pytest.Config): Конфигурация pytest
+        """
+        self.output_dir: str = config.getoption('flight_dir')
+        worker: str = os.getenv('PYTEST_XDIST_WORKER', '')
+        self.suffix: str = f'-{worker}' if worker else ''
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item: pytest.Item) -> None:
+        recorder.clear()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item: pytest.Item, call: Any) -> Generator[None, Any, None]:
+        outcome = yield
+        report: pytest.TestReport = outcome.get_result()
+        if not report.failed:
+            return
+        name: str = re.sub(r'[^\w.-]+', '_', item.nodeid).strip('_')
+        path: str = os.path.join(self.output_dir, f'{name}{self.suffix}.log')
+        if recorder.dump(path, title=f'{item.nodeid} ({report.when})'):
+            report.sections.append(('flight recorder', f'Последние запросы и ответы: {path}'))
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if recorder.capacity:
+        config.pluginmanager.register(FlightRecorderPlugin(config), 'flight-recorder-plugin')
@@ -0,0 +1,77 @@
+import os
+import time
+from typing import Optional, Dict, Any
+
+import pytest
+
+from load.histogram import HistogramRecorder, LatencyHistogram
+from load.history import save_run
+from restclient import tracing
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """
+    Регистрация опций истории прогонов.
+    """
+    group = parser.getgroup('history', 'История задержек прогонов')
+    group.addoption(
+        '--history', default=os.getenv('RUN_HISTORY'),
+        help='Файл SQLite для задержек запросов и шагов AccountHelper прогона (env RUN_HISTORY)'
+    )
+    group.addoption(
+        '--history-label', default=os.getenv('RUN_HISTORY_LABEL'),
+        help='Метка для сравнения с похожими прогонами, по умолчанию — аргументы pytest (env RUN_HISTORY_LABEL)'
+    )
+
+
+class HistoryPlugin:
+    """
+    Плагин pytest, сохраняющий задержки прогона в историю и сравнивающий их с прошлыми прогонами.
+
+    Задержки HTTP-запросов и шагов AccountHelper собираются из span
+    трассировки. При запуске через pytest-xdist воркеры передают гистограммы
+    контроллеру, и в историю записывается один прогон.
+    """
+
+    def __init__(self, config: pytest.Config) -> None:
+        """
+        Инициализация плагина.
+
+        Args:
+            config (pytest.Config): Конфигурация pytest
+        """
+        self.config: pytest.Config = config
+        self.path: str = config.getoption('history')
+        self.label: str = config.getoption('history_label') or ' '.join(config.args)
+        self.recorder: HistogramRecorder = HistogramRecorder()
+        self.started: float = time.time()
+        self.summary: Optional[str] = None
+
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        tracing.add_exporter(self.recorder)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node: Any, error: Any) -> None:
+        histograms: Dict[str, Dict[str, Any]] = getattr(node, 'workeroutput', {}).get('history', {})
+        self.recorder.merge({name: LatencyHistogram.from_dict(data) for name, data in histograms.items()})
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        tracing.remove_exporter(self.recorder)
+        if hasattr(self.config, 'workerinput'):
+            self.config.workeroutput['history'] = {
+                name: histogram.to_dict() for name, histogram in self.recorder.snapshot().items()
+            }
+            return
+        histograms: Dict[str, LatencyHistogram] = self.recorder.snapshot()
+        if histograms:
+            self.summary = save_run(self.path, histograms, kind='pytest', label=self.label, started_at=self.started)
+
+    def pytest_terminal_summary(self, terminalreporter: Any) -> None:
+        if self.summary:
+            terminalreporter.write_sep('=', 'history')
+            terminalreporter.write_line(self.summary)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if config.getoption('history'):
+        config.pluginmanager.register(HistoryPlugin(config), 'history-plugin')
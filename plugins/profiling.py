@@ -0,0 +1,91 @@
+import os
+from typing import Optional, List, Callable, Any
+
+import pytest
+
+from helpers.account_helper import AccountHelper
+from helpers.profiling import create_profiler, profile_methods
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """
+    Регистрация опций профилирования.
+
+    Каждая опция дублируется переменной окружения, чтобы профилирование
+    можно было включить без изменения команды запуска.
+    """
+    group = parser.getgroup('profiling', 'Профилирование')
+    group.addoption(
+        '--profile', choices=('off', 'session', 'helpers'), default=os.getenv('PROFILE', 'off'),
+        help='Профилировать всю тестовую сессию или выбранные методы AccountHelper (env PROFILE)'
+    )
+    group.addoption(
+        '--profile-mode', choices=('sampling', 'deterministic'), default=os.getenv('PROFILE_MODE', 'sampling'),
+        help='Сэмплирующий или детерминированный (cProfile) профилировщик (env PROFILE_MODE)'
+    )
+    group.addoption(
+        '--profile-methods', default=os.getenv('PROFILE_METHODS', ''),
+        help='Методы AccountHelper через запятую, по умолчанию все публичные (env PROFILE_METHODS)'
+    )
+    group.addoption(
+        '--profile-dir', default=os.getenv('PROFILE_DIR', 'profiles'),
+        help='Каталог для результатов профилирования (env PROFILE_DIR)'
+    )
+    group.addoption(
+        '--profile-top', type=int, default=int(os.getenv('PROFILE_TOP', '20')),
+        help='Количество функций в сводке (env PROFILE_TOP)'
+    )
+
+
+class ProfilingPlugin:
+    """
+    Плагин pytest, оборачивающий тестовую сессию или методы AccountHelper в профилировщик.
+    """
+
+    def __init__(self, config: pytest.Config) -> None:
+        """
+        Инициализация плагина.
+
+        Args:
+            config (pytest.Config): Конфигурация pytest
+        """
+        self.scope: str = config.getoption('profile')
+        self.output_dir: str = config.getoption('profile_dir')
+        self.top: int = config.getoption('profile_top')
+        self.profiler: Any = create_profiler(mode=config.getoption('profile_mode'))
+        self.summary: Optional[str] = None
+        self._session_context: Any = None
+        self._restore: Optional[Callable[[], None]] = None
+        methods: str = config.getoption('profile_methods')
+        self.methods: List[str] = [name.strip() for name in methods.split(',') if name.strip()] or [
+            name for name, value in vars(AccountHelper).items() if callable(value) and not name.startswith('_')
+        ]
+
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        if self.scope == 'session':
+            self._session_context = self.profiler.activate()
+            self._session_context.__enter__()
+        else:
+            self._restore = profile_methods(AccountHelper, self.methods, self.profiler)
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        if self._session_context is not None:
+            self._session_context.__exit__(None, None, None)
+        if self._restore is not None:
+            self._restore()
+        self.profiler.close()
+        label: str = 'session' if self.scope == 'session' else 'helpers'
+        worker: Optional[str] = os.getenv('PYTEST_XDIST_WORKER')
+        if worker:
+            label = f'{label}-{worker}'
+        self.summary = self.profiler.write(output_dir=self.output_dir, label=label, top=self.top)
+
+    def pytest_terminal_summary(self, terminalreporter: Any) -> None:
+        if self.summary:
+            terminalreporter.write_sep('=', 'profiling')
+            terminalreporter.write_line(self.summary)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if config.getoption('profile') != 'off':
+        config.pluginmanager.register(ProfilingPlugin(config), 'profiling-plugin')
@@ -0,0 +1,252 @@
+import heapq
+import json
+import os
+import re
+import statistics
+from typing import Optional, Dict, List, Tuple, Any, Hashable
+
+import pytest
+
+# Скопы фикстур, которые создаются заново на каждом воркере, куда попал тест
+SHARED_SCOPES = frozenset({'class', 'module', 'package'})
+
+# Суффикс группы xdist в идентификаторе теста
+GROUP_SUFFIX = re.compile(r'@lpt-\d+$')
+
+# Вес нового замера при обновлении оценки длительности
+SMOOTHING: float = 0.5
+
+# Оценка длительности теста без истории, если история пуста
+DEFAULT_DURATION: float = 1.0
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """
+    Регистрация опций планирования тестов по длительности.
+    """
+    group = parser.getgroup('scheduling', 'Планирование по длительности')
+    group.addoption(
+        '--schedule', choices=('duration', 'off'), default=os.getenv('TEST_SCHEDULE', 'off'),
+        help='Распределение тестов по воркерам xdist по истории длительностей (env TEST_SCHEDULE). '
+             'По умолчанию выключено'
+    )
+    group.addoption(
+        '--durations-file', default=os.getenv('TEST_DURATIONS', '.test_durations.json'),
+        help='Файл истории длительностей тестов (env TEST_DURATIONS)'
+    )
+
+
+class SchedulingPlugin:
+    """
+    Плагин pytest, распределяющий тесты по воркерам xdist по длительности.
+
+    Длительность каждого теста (setup, call и teardown) записывается в файл
+    истории со сглаживанием. При запуске с -n тесты объединяются в единицы:
+    тесты, использующие общую фикстуру скопа class/module/package, попадают
+    в одну единицу, чтобы фикстура создавалась на одном воркере. Единицы
+    раскладываются по воркерам жадно, от самой длинной (LPT), и каждая
+    корзина получает свою группу xdist_group, поэтому воркеры завершают
+    работу примерно одновременно. Тесты без истории оцениваются медианой.
+
+    Плагин подключается только с --schedule=duration: он переписывает файл
+    истории после каждого прогона и переключает -n с --dist load на
+    loadgroup (о переключении сообщается в заголовке отчета).
+    """
+
+    def __init__(self, config: pytest.Config) -> None:
+        """
+        Инициализация плагина.
+
+        Args:
+            config (pytest.Config): Конфигурация pytest
+        """
+        self.config: pytest.Config = config
+        self.path: str = config.getoption('durations_file')
+        self.history: Dict[str, float] = load_durations(self.path)
+        self.measured: Dict[str, float] = {}
+        self.workers: Dict[str, float] = {}
+        self.is_worker: bool = hasattr(config, 'workerinput')
+        self.switched_dist: bool = False
+
+    def pytest_report_header(self, config: pytest.Config) -> Optional[str]:
+        if not self.switched_dist:
+            return None
+        return f'scheduling: --dist load заменен на loadgroup, длительности из {self.path}'
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, session: pytest.Session, config: pytest.Config, items: List[Any]) -> None:
+        workers: int = worker_count(config)
+        if workers < 2 or not config.getoption('loadgroup', False):
+            return
+        estimates: Dict[str, float] = estimate(self.history, [item.nodeid for item in items])
+        units: List[List[Any]] = group_items(items)
+        for index, unit in enumerate(assign(units, estimates, workers)):
+            for item in unit:
+                item.add_marker(pytest.mark.xdist_group(name=f'lpt-{index}'))
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node: Any) -> None:
+        node.workerinput['schedule_groups'] = self.config.getoption('dist', 'no') == 'loadgroup'
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        if self.is_worker:
+            return
+        nodeid: str = GROUP_SUFFIX.sub('', report.nodeid)
+        self.measured[nodeid] = self.measured.get(nodeid, 0.0) + report.duration
+        node: Any = getattr(report, 'node', None)
+        if node is not None:
+            worker: str = node.gateway.id
+            self.workers[worker] = self.workers.get(worker, 0.0) + report.duration
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        if self.is_worker or not self.measured:
+            return
+        for nodeid, duration in self.measured.items():
+            previous: Optional[float] = self.history.get(nodeid)
+            self.history[nodeid] = duration if previous is None else previous + SMOOTHING * (duration - previous)
+        save_durations(self.path, self.history)
+
+    def pytest_terminal_summary(self, terminalreporter: Any) -> None:
+        if len(self.workers) < 2:
+            return
+        loads: str = ', '.join(f'{worker} {seconds:.1f} с' for worker, seconds in sorted(self.workers.items()))
+        terminalreporter.write_sep('=', 'scheduling')
+        terminalreporter.write_line(f'Время тестов по воркерам: {loads}')
+
+
+def worker_count(config: pytest.Config) -> int:
+    """
+    Число воркеров xdist (в процессе-воркере — из его входных данных).
+    """
+    workerinput: Optional[Dict[str, Any]] = getattr(config, 'workerinput', None)
+    if workerinput is not None:
+        return int(workerinput.get('workercount', 1))
+    return int(config.getoption('numprocesses', 0) or 0)
+
+
+def estimate(history: Dict[str, float], nodeids: List[str]) -> Dict[str, float]:
+    """
+    Оценка длительности тестов: из истории или медианой известных.
+
+    Args:
+        history (dict): Сглаженные длительности по идентификатору теста
+        nodeids (list): Тесты
+
+    Returns:
+        dict: Оценка в секундах по идентификатору теста
+    """
+    known: List[float] = [history[nodeid] for nodeid in nodeids if nodeid in history]
+    fallback: float = statistics.median(known) if known else DEFAULT_DURATION
+    return {nodeid: history.get(nodeid, fallback) for nodeid in nodeids}
+
+
+def group_items(items: List[Any]) -> List[List[Any]]:
+    """
+    Объединение тестов, использующих общие фикстуры скопа class/module/package.
+
+    Args:
+        items (list): Тесты в порядке сбора
+
+    Returns:
+        list: Единицы планирования (тесты внутри — в порядке сбора)
+    """
+    parents: List[int] = list(range(len(items)))
+
+    def find(index: int) -> int:
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    owners: Dict[Hashable, int] = {}
+    for index, item in enumerate(items):
+        for key in _shared_fixtures(item):
+            owner: Optional[int] = owners.setdefault(key, index)
+            if owner != index:
+                parents[find(index)] = find(owner)
+    units: Dict[int, List[Any]] = {}
+    for index, item in enumerate(items):
+        units.setdefault(find(index), []).append(item)
+    return list(units.values())
+
+
+def assign(units: List[List[Any]], estimates: Dict[str, float], bins: int) -> List[List[Any]]:
+    """
+    Раскладка единиц по корзинам от самой длинной в наименее загруженную (LPT).
+
+    Args:
+        units (list): Единицы планирования
+        estimates (dict): Оценки длительности тестов
+        bins (int): Число корзин (воркеров)
+
+    Returns:
+        list: Тесты каждой корзины в порядке сбора
+    """
+    weighted: List[Tuple[float, int, List[Any]]] = sorted(
+        ((sum(estimates[item.nodeid] for item in unit), order, unit) for order, unit in enumerate(units)),
+        key=lambda entry: (-entry[0], entry[1])
+    )
+    heap: List[Tuple[float, int]] = [(0.0, index) for index in range(bins)]
+    assigned: List[List[Tuple[int, List[Any]]]] = [[] for _ in range(bins)]
+    for total, order, unit in weighted:
+        load, index = heapq.heappop(heap)
+        assigned[index].append((order, unit))
+        heapq.heappush(heap, (load + total, index))
+    return [[item for _, unit in sorted(entries, key=lambda entry: entry[0]) for item in unit] for entries in assigned]
+
+
+def load_durations(path: str) -> Dict[str, float]:
+    """
+    Чтение истории длительностей (пустая, если файла нет или он поврежден).
+    """
+    try:
+        with open(path, encoding='utf-8') as file:
+            data: Any = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return {str(nodeid): float(value) for nodeid, value in data.items()} if isinstance(data, dict) else {}
+
+
+def save_durations(path: str, durations: Dict[str, float]) -> None:
+    """
+    Запись истории длительностей через временный файл.
+    """
+    directory: str = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary: str = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump({nodeid: round(value, 4) for nodeid, value in sorted(durations.items())}, file, indent=1)
+    os.replace(temporary, path)
+
+
+def _shared_fixtures(item: Any) -> List[Hashable]:
+    """
+    Ключи фикстур теста скопа class/module/package: имя фикстуры и узел, на котором она кэшируется.
+    """
+    info: Any = getattr(item, '_fixtureinfo', None)
+    if info is None:
+        return []
+    keys: List[Hashable] = []
+    for name, definitions in info.name2fixturedefs.items():
+        scope: str = definitions[-1].scope if definitions else 'function'
+        if scope not in SHARED_SCOPES:
+            continue
+        node_type: Any = {'class': pytest.Class, 'module': pytest.Module, 'package': pytest.Package}[scope]
+        node: Any = item.getparent(node_type)
+        keys.append((name, node.nodeid if node is not None else ''))
+    return keys
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    if config.getoption('schedule') == 'off':
+        return
+    plugin: SchedulingPlugin = SchedulingPlugin(config)
+    if not plugin.is_worker and config.getoption('numprocesses', 0) and config.getoption('dist', 'no') == 'load':
+        # Группы корзин распределяются только планировщиком loadgroup
+        config.option.dist = 'loadgroup'
+        plugin.switched_dist = True
+    if getattr(config, 'workerinput', {}).get('schedule_groups'):
+        # Воркеры получают аргументы запуска без переключения планировщика
+        config.option.loadgroup = True
+    config.pluginmanager.register(plugin, 'scheduling-plugin')
@@ -0,0 +1,276 @@
+import itertools
+import os
+import threading
+import time
+from typing import Optional, Dict, List, Tuple, Iterator
+
+import requests
+
+STRATEGIES = ('round_robin', 'least_outstanding', 'ewma')
+
+
+class BalancingPolicy:
+    """
+    Настройки распределения запросов между несколькими хостами API.
+
+    Описывает стратегию выбора хоста, пассивные проверки (по ошибкам
+    реальных запросов) и активные проверки здоровья (фоновый опрос).
+    """
+
+    def __init__(
+            self,
+            strategy: str = 'round_robin',
+            failure_threshold: int = 3,
+            ejection_time: float = 10.0,
+            health_check_path: Optional[str] = None,
+            health_check_interval: float = 5.0,
+            health_check_timeout: float = 2.0,
+            ewma_decay: float = 0.3
+    ) -> None:
+        """
+        Инициализация настроек балансировки.
+
+        Args:
+            strategy (str, optional): 'round_robin', 'least_outstanding' или 'ewma'. По умолчанию 'round_robin'
+            failure_threshold (int, optional): Число ошибок подряд, после которого хост исключается. По умолчанию 3
+            ejection_time (float, optional): Время исключения хоста в секундах. По умолчанию 10
+            health_check_path (str, optional): Путь для активной проверки здоровья. Без него активные проверки выключены
+            health_check_interval (float, optional): Интервал активных проверок в секундах. По умолчанию 5
+            health_check_timeout (float, optional): Таймаут запроса проверки в секундах. По умолчанию 2
+            ewma_decay (float, optional): Вес нового замера в EWMA задержки. По умолчанию 0.3
+
+        Raises:
+            ValueError: Если стратегия неизвестна
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f'Неизвестная стратегия балансировки: {strategy}, допустимы {STRATEGIES}')
+        self.strategy: str = strategy
+        self.failure_threshold: int = failure_threshold
+        self.ejection_time: float = ejection_time
+        self.health_check_path: Optional[str] = health_check_path
+        self.health_check_interval: float = health_check_interval
+        self.health_check_timeout: float = health_check_timeout
+        self.ewma_decay: float = ewma_decay
+
+
+class Node:
+    """
+    Состояние одного хоста в пуле балансировщика.
+    """
+
+    def __init__(self, url: str) -> None:
+        """
+        Инициализация состояния хоста.
+
+        Args:
+            url (str): Базовый URL хоста
+        """
+        self.url: str = url
+        self.outstanding: int = 0
+        self.ewma: float = 0.0
+        self.consecutive_failures: int = 0
+        self.ejected_until: float = 0.0
+        self.requests: int = 0
+        self.failures: int = 0
+        self.ejections: int = 0
+
+    def is_available(self, now: float) -> bool:
+        """
+        Проверка, что хост не исключен из пула.
+
+        Args:
+            now (float): Текущее значение time.monotonic()
+
+        Returns:
+            bool: True, если хост может получать запросы
+        """
+        return self.ejected_until <= now
+
+
+class LoadBalancer:
+    """
+    Балансировщик запросов между репликами API.
+
+    Выбирает хост по стратегии из BalancingPolicy, учитывает задержку и
+    ошибки каждого запроса (пассивная проверка) и, если задан путь проверки,
+    периодически опрашивает исключенные и рабочие хосты (активная проверка).
+    Если исключены все хосты, запросы распределяются по всем, чтобы клиент
+    не блокировался полностью.
+    """
+
+    def __init__(
+            self,
+            hosts: List[str],
+            policy: Optional[BalancingPolicy] = None
+    ) -> None:
+        """
+        Инициализация балансировщика.
+
+        Args:
+            hosts (list): Базовые URL реплик API
+            policy (BalancingPolicy, optional): Настройки балансировки
+
+        Raises:
+            ValueError: Если список хостов пуст
+        """
+        if not hosts:
+            raise ValueError('Для балансировки нужен хотя бы один хост')
+        self.policy: BalancingPolicy = policy or BalancingPolicy()
+        self.nodes: List[Node] = [Node(url=host) for host in hosts]
+        self._counter: Iterator[int] = itertools.count()
+        self._lock: threading.Lock = threading.Lock()
+        self._stopped: threading.Event = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        if self.policy.health_check_path:
+            self._health_thread = threading.Thread(target=self._run_health_checks, name='health-checks', daemon=True)
+            self._health_thread.start()
+
+    def acquire(self) -> Node:
+        """
+        Выбор хоста для очередного запроса.
+
+        Returns:
+            Node: Выбранный хост (его счетчик активных запросов увеличен)
+        """
+        now: float = time.monotonic()
+        with self._lock:
+            return self._select([node for node in self.nodes if node.is_available(now)] or self.nodes)
+
+    def acquire_alternative(self, node: Node) -> Optional[Node]:
+        """
+        Выбор другого рабочего хоста, например для дублирующего (хеджированного) запроса.
+
+        Args:
+            node (Node): Хост, на который уже отправлен запрос
+
+        Returns:
+            Node или None: Другой не исключенный хост (его счетчик активных запросов увеличен)
+                или None, если других рабочих хостов нет
+        """
+        now: float = time.monotonic()
+        with self._lock:
+            candidates: List[Node] = [other for other in self.nodes if other is not node and other.is_available(now)]
+            return self._select(candidates) if candidates else None
+
+    def release(
+            self,
+            node: Node,
+            latency: Optional[float],
+            failed: bool = False
+    ) -> None:
+        """
+        Учет результата запроса к хосту (пассивная проверка здоровья).
+
+        Args:
+            node (Node): Хост, полученный из acquire()
+            latency (float, optional): Время выполнения запроса в секундах; None, если запрос не был отправлен
+            failed (bool, optional): Запрос завершился сетевой ошибкой или ответом 5xx
+        """
+        with self._lock:
+            node.outstanding -= 1
+            if latency is not None:
+                decay: float = self.policy.ewma_decay
+                node.ewma = latency if not node.ewma else decay * latency + (1 - decay) * node.ewma
+            if failed:
+                node.failures += 1
+                self._record_failure(node)
+            else:
+                node.consecutive_failures = 0
+
+    def close(self) -> None:
+        """
+        Остановка фоновых проверок здоровья.
+        """
+        self._stopped.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+            self._health_thread = None
+
+    def _select(self, candidates: List[Node]) -> Node:
+        """
+        Выбор хоста из кандидатов по стратегии и учет запроса (вызывается под блокировкой).
+        """
+        if self.policy.strategy == 'least_outstanding':
+            # Сдвиг списка по кругу распределяет запросы между хостами с равной нагрузкой
+            offset: int = next(self._counter) % len(candidates)
+            node: Node = min(candidates[offset:] + candidates[:offset], key=lambda n: n.outstanding)
+        elif self.policy.strategy == 'ewma':
+            node = min(candidates, key=lambda n: n.ewma * (n.outstanding + 1))
+        else:
+            node = candidates[next(self._counter) % len(candidates)]
+        node.outstanding += 1
+        node.requests += 1
+        return node
+
+    def _record_failure(self, node: Node) -> None:
+        """
+        Учет ошибки хоста и его исключение при превышении порога (вызывается под блокировкой).
+        """
+        node.consecutive_failures += 1
+        if node.consecutive_failures >= self.policy.failure_threshold:
+            node.ejected_until = time.monotonic() + self.policy.ejection_time
+            node.ejections += 1
+
+    def _run_health_checks(self) -> None:
+        """
+        Цикл активных проверок здоровья всех хостов.
+        """
+        with requests.Session() as health_session:
+            while not self._stopped.wait(self.policy.health_check_interval):
+                for node in self.nodes:
+                    try:
+                        response: requests.Response = health_session.get(
+                            node.url + self.policy.health_check_path,
+                            timeout=self.policy.health_check_timeout
+                        )
+                        healthy: bool = response.status_code < 500
+                    except requests.RequestException:
+                        healthy = False
+                    with self._lock:
+                        if healthy:
+                            node.consecutive_failures = 0
+                            node.ejected_until = 0.0
+                        else:
+                            # Активная проверка исключает хост сразу, не дожидаясь порога ошибок
+                            node.consecutive_failures = max(node.consecutive_failures, self.policy.failure_threshold - 1)
+                            self._record_failure(node)
+
+
+_balancers: Dict[Tuple[int, Tuple[str, ...]], LoadBalancer] = {}
+_registry_lock: threading.Lock = threading.Lock()
+
+
+def get_balancer(hosts: List[str], policy: Optional[BalancingPolicy] = None) -> LoadBalancer:
+    """
+    Получение общего для процесса балансировщика набора реплик.
+
+    Клиенты с одним набором хостов используют один балансировщик: состояние
+    хостов (исключения, задержки) общее, а фоновые проверки здоровья
+    выполняет один поток. Балансировщик создается при первом обращении;
+    параметры последующих обращений с тем же набором хостов игнорируются.
+    После fork процесс получает собственный балансировщик.
+
+    Args:
+        hosts (list): Базовые URL реплик API
+        policy (BalancingPolicy, optional): Настройки, используются при создании балансировщика
+
+    Returns:
+        LoadBalancer: Балансировщик
+    """
+    key: Tuple[int, Tuple[str, ...]] = (os.getpid(), tuple(hosts))
+    with _registry_lock:
+        balancer: Optional[LoadBalancer] = _balancers.get(key)
+        if balancer is None:
+            balancer = _balancers[key] = LoadBalancer(hosts=hosts, policy=policy)
+        return balancer
+
+
+def close_balancers() -> None:
+    """
+    Остановка проверок здоровья всех общих балансировщиков процесса.
+    """
+    with _registry_lock:
+        balancers: List[LoadBalancer] = list(_balancers.values())
+        _balancers.clear()
+    for balancer in balancers:
+        balancer.close()
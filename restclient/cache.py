@@ -0,0 +1,288 @@
+import threading
+import time
+from typing import Optional, Dict, Tuple, Callable, Any, Hashable
+
+from requests import Response
+
+from restclient.metrics import counters
+
+CacheKey = Tuple[Hashable, ...]
+
+
+class CachePolicy:
+    """
+    Настройки кэша ответов RestClient.
+
+    Кэшируются успешные ответы на безопасные запросы, ключ — метод, путь,
+    параметры и токен авторизации. По истечении TTL ответ с ETag или
+    Last-Modified проверяется условным запросом (If-None-Match /
+    If-Modified-Since), и ответ 304 продлевает запись без передачи тела.
+    """
+
+    def __init__(
+            self,
+            ttl: float = 1.0,
+            methods: Tuple[str, ...] = ('GET',),
+            auth_header: str = 'x-dm-auth-token',
+            max_entries: int = 1024
+    ) -> None:
+        """
+        Инициализация настроек кэша.
+
+        Args:
+            ttl (float, optional): Время жизни записи в секундах. По умолчанию 1
+            methods (tuple, optional): Кэшируемые методы. По умолчанию ('GET',)
+            auth_header (str, optional): Заголовок с токеном авторизации. По умолчанию 'x-dm-auth-token'
+            max_entries (int, optional): Максимальное число записей. По умолчанию 1024
+        """
+        self.ttl: float = ttl
+        self.methods: Tuple[str, ...] = methods
+        self.auth_header: str = auth_header
+        self.max_entries: int = max_entries
+
+
+class CacheEntry:
+    """
+    Запись кэша: ответ, срок годности и валидаторы для условного запроса.
+    """
+
+    __slots__ = ('response', 'expires_at', 'etag', 'last_modified')
+
+    def __init__(self, response: Response, ttl: float) -> None:
+        """
+        Инициализация записи.
+
+        Args:
+            response (requests.Response): Кэшируемый ответ
+            ttl (float): Время жизни в секундах
+        """
+        self.response: Response = response
+        self.expires_at: float = time.monotonic() + ttl
+        self.etag: Optional[str] = response.headers.get('ETag')
+        self.last_modified: Optional[str] = response.headers.get('Last-Modified')
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """
+        Заголовки условного запроса для проверки актуальности записи.
+
+        Returns:
+            dict: If-None-Match и/или If-Modified-Since
+        """
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class _Flight:
+    """
+    Выполняющийся запрос, результат которого ожидают совпадающие запросы.
+    """
+
+    __slots__ = ('done', 'response', 'error')
+
+    def __init__(self) -> None:
+        self.done: threading.Event = threading.Event()
+        self.response: Optional[Response] = None
+        self.error: Optional[BaseException] = None
+
+
+class ResponseCache:
+    """
+    Кэш ответов с TTL, условной проверкой и объединением одинаковых запросов.
+
+    Одновременные запросы с одним ключом объединяются (single-flight):
+    к сервису уходит один запрос, остальные получают его ответ. Небезопасные
+    запросы (PUT, POST, DELETE) сбрасывают все записи того же токена
+    авторизации — выход не оставляет устаревших данных. Запросы без токена
+    (смена email или пароля по логину и паролю в теле) могут изменить данные
+    любого пользователя, поэтому сбрасывают весь кэш хоста.
+    """
+
+    def __init__(self, policy: CachePolicy, name: str = '') -> None:
+        """
+        Инициализация кэша.
+
+        Args:
+            policy (CachePolicy): Настройки кэша
+            name (str, optional): Метка счетчиков (обычно хост клиента)
+        """
+        self.policy: CachePolicy = policy
+        self.name: str = name
+        self._entries: Dict[CacheKey, CacheEntry] = {}
+        self._flights: Dict[CacheKey, _Flight] = {}
+        self._generations: Dict[Optional[str], int] = {}
+        self._epoch: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def accepts(self, method: str, kwargs: Dict[str, Any]) -> bool:
+        """
+        Проверка, что запрос может обслуживаться кэшем.
+
+        Args:
+            method (str): HTTP-метод
+            kwargs (dict): Параметры запроса
+
+        Returns:
+            bool: True для кэшируемых методов без потокового чтения ответа
+        """
+        return method in self.policy.methods and not kwargs.get('stream')
+
+    def key(
+            self,
+            method: str,
+            path: str,
+            token: Optional[str],
+            params: Any = None
+    ) -> CacheKey:
+        """
+        Ключ записи кэша.
+
+        Args:
+            method (str): HTTP-метод
+            path (str): Путь запроса
+            token (str, optional): Токен авторизации
+            params: Параметры строки запроса
+
+        Returns:
+            tuple: Ключ записи
+        """
+        if isinstance(params, dict):
+            params = tuple(sorted(params.items()))
+        return token, method, path, params
+
+    def fetch(
+            self,
+            key: CacheKey,
+            send: Callable[[Dict[str, str]], Response]
+    ) -> Response:
+        """
+        Получение ответа из кэша или от сервиса.
+
+        Args:
+            key (tuple): Ключ записи (см. key())
+            send (Callable): Функция, выполняющая запрос с дополнительными заголовками
+
+        Returns:
+            requests.Response: Ответ из кэша или новый ответ сервиса
+        """
+        with self._lock:
+            entry: Optional[CacheEntry] = self._entries.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                counters.increment('cache.hit', self.name)
+                return entry.response
+            flight: Optional[_Flight] = self._flights.get(key)
+            leader: bool = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            generation: Tuple[int, int] = self._generation(key[0])
+
+        if not leader:
+            counters.increment('cache.coalesced', self.name)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.response
+
+        try:
+            flight.response = self._refresh(key, entry, generation, send)
+            return flight.response
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def invalidate(self, token: Optional[str]) -> None:
+        """
+        Сброс записей после изменяющего запроса.
+
+        Args:
+            token (str, optional): Токен авторизации запроса. None — запрос без токена,
+                сбрасываются записи всех токенов
+        """
+        with self._lock:
+            if token is None:
+                self._epoch += 1
+                keys = list(self._entries)
+            else:
+                self._generations[token] = self._generations.get(token, 0) + 1
+                keys = [key for key in self._entries if key[0] == token]
+            for key in keys:
+                del self._entries[key]
+        if keys:
+            counters.increment('cache.invalidated', self.name, len(keys))
+
+    def clear(self) -> None:
+        """
+        Сброс всех записей кэша.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def _generation(self, token: Optional[str]) -> Tuple[int, int]:
+        """
+        Поколение записей токена: меняется при каждом сбросе, затрагивающем токен.
+        """
+        return self._epoch, self._generations.get(token, 0)
+
+    def _refresh(
+            self,
+            key: CacheKey,
+            entry: Optional[CacheEntry],
+            generation: Tuple[int, int],
+            send: Callable[[Dict[str, str]], Response]
+    ) -> Response:
+        """
+        Запрос к сервису (условный, если у устаревшей записи есть валидаторы) и обновление записи.
+
+        Ответ не сохраняется, если за время запроса записи токена были сброшены
+        изменяющим запросом — иначе в кэш попали бы данные до изменения.
+        """
+        headers: Dict[str, str] = entry.conditional_headers() if entry is not None else {}
+        response: Response = send(headers)
+        if response.status_code == 304 and entry is not None:
+            counters.increment('cache.revalidated', self.name)
+            response = entry.response
+        else:
+            counters.increment('cache.miss', self.name)
+            if response.status_code != 200:
+                return response
+        with self._lock:
+            if self._generation(key[0]) != generation:
+                return response
+            if key not in self._entries and len(self._entries) >= self.policy.max_entries:
+                # Вытесняется самая старая запись (словарь сохраняет порядок вставки)
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = CacheEntry(response, self.policy.ttl)
+        return response
+
+
+_caches: Dict[str, ResponseCache] = {}
+_registry_lock: threading.Lock = threading.Lock()
+
+
+def get_cache(host: str, policy: CachePolicy) -> ResponseCache:
+    """
+    Получение общего для процесса кэша хоста.
+
+    Кэш общий для всех клиентов хоста, поэтому выход через LoginApi
+    сбрасывает записи, прочитанные через AccountApi. Параметры последующих
+    обращений с тем же хостом игнорируются.
+
+    Args:
+        host (str): Базовый URL хоста
+        policy (CachePolicy): Настройки, используются при создании кэша
+
+    Returns:
+        ResponseCache: Кэш ответов
+    """
+    with _registry_lock:
+        cache: Optional[ResponseCache] = _caches.get(host)
+        if cache is None:
+            cache = _caches[host] = ResponseCache(policy=policy, name=host)
+        return cache
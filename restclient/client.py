@@ -1,11 +1,43 @@
 
-from requests import (session, JSONDecodeError, Response, Session)
-import structlog
+from __future__ import annotations
+
+import time
 import uuid
-import curlify
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Tuple, TYPE_CHECKING
+from urllib.parse import urlencode
+
+from pydantic import BaseModel
 
+from restclient import tracing
+from restclient.compression import record_transfer, response_sizes
 from restclient.configuration import Configuration
+from restclient.deadline import Deadline, current_deadline
+from restclient.endpoint import Endpoint
+from restclient.lazy import lazy_import
+
+if TYPE_CHECKING:
+    from requests import PreparedRequest, Response, Session
+
+    from checkers.expectations import ExpectationSet
+    from restclient.balancer import LoadBalancer, Node
+    from restclient.cache import ResponseCache
+    from restclient.compression import CompressionPolicy
+    from restclient.flight_recorder import FlightRecorder
+    from restclient.hedging import Hedger
+    from restclient.limits import CircuitBreaker, CircuitBreakerPolicy, RateLimiter
+
+# Нужны только при выполнении запросов: загружаются при первом обращении. Модули настроек
+# (балансировка, кэш, ограничители, пулы, HTTP/2) импортируются в RestClient, только если настройка задана
+requests = lazy_import('requests')
+structlog = lazy_import('structlog')
+
+# Параметры запроса, при которых RestClient.call() отправляет копию подготовленного запроса
+PREPARED_KWARGS = frozenset({'data', 'headers', 'params', 'timeout', 'stream', 'verify'})
+
+# Атрибуты span запроса: время передачи запроса и получения ответа в секундах (без ожидания ограничителя,
+# логирования и разбора ответа) и процессорное время вызывающего потока за это время
+ROUND_TRIP_ATTRIBUTE: str = 'http.client.round_trip'
+ROUND_TRIP_CPU_ATTRIBUTE: str = 'http.client.round_trip.cpu'
 
 
 class RestClient:
@@ -27,20 +59,61 @@ class RestClient:
             configuration (Configuration): Конфигурация клиента, содержащая host, headers и настройки логирования
         """
         self.host: str = configuration.host
-        self.set_headers(configuration.headers)
         self.disable_log: bool = configuration.disable_log
-        self.session: Session = session()
+        self.timeout: Optional[float] = configuration.timeout
+        self.session: Session = requests.session()
+        if configuration.pool is not None:
+            from restclient.registry import get_pool
+            for host in configuration.hosts:
+                self.session.mount(host, get_pool(host, configuration.pool))
+        if configuration.http2 is not None:
+            from restclient.transport import get_transport
+            for host in configuration.hosts:
+                adapter = get_transport(host, configuration.http2)
+                if adapter is not None:
+                    self.session.mount(host, adapter)
+        self._headers_version: int = 0
+        self._prepared: Dict[Tuple[str, str], Tuple[int, PreparedRequest]] = {}
+        self._environment: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        self.set_headers(configuration.headers)
+        self.balancer: Optional[LoadBalancer] = None
+        if len(configuration.hosts) > 1 or configuration.balancing is not None:
+            from restclient.balancer import get_balancer
+            self.balancer = get_balancer(configuration.hosts, configuration.balancing)
+        self.hedger: Optional[Hedger] = None
+        if configuration.hedging is not None:
+            from restclient.hedging import Hedger
+            self.hedger = Hedger(configuration.hedging)
+        self.rate_limiter: Optional[RateLimiter] = None
+        if configuration.rate_limit is not None:
+            from restclient.limits import RateLimiter
+            self.rate_limiter = RateLimiter(configuration.rate_limit)
+        self.circuit_breaker: Optional[CircuitBreakerPolicy] = configuration.circuit_breaker
+        self.cache: Optional[ResponseCache] = None
+        if configuration.cache is not None:
+            from restclient.cache import get_cache
+            self.cache = get_cache(configuration.host, configuration.cache)
+        self.compression: Optional[CompressionPolicy] = configuration.compression
+        self.expectations: Optional[ExpectationSet] = configuration.expectations
+        self.flight_recorder: FlightRecorder = configuration.flight_recorder
+        if self.flight_recorder is None:
+            from restclient.flight_recorder import recorder
+            self.flight_recorder = recorder
         self.log = structlog.getLogger(__name__).bind(service='api')
 
     def set_headers(self, headers: Optional[Dict[str, str]]) -> None:
         """
         Установка HTTP-заголовков для всех запросов.
         
+        Подготовленные запросы методов API пересобираются при следующем вызове,
+        поэтому заголовки сессии следует менять только этим методом.
+        
         Args:
             headers (dict): Словарь с заголовками для установки
         """
         if headers:
             self.session.headers.update(headers)
+            self._headers_version += 1
 
     def post(
             self,
@@ -122,54 +195,464 @@ class RestClient:
         """
         return self._send_request(method='DELETE', path=path, **kwargs)
 
+    def call(
+            self,
+            endpoint: Endpoint,
+            body: Optional[BaseModel] = None,
+            path_params: Optional[Dict[str, Any]] = None,
+            **kwargs: Any
+    ) -> Response:
+        """
+        Выполнение запроса к методу API по его описанию.
+        
+        Путь, заголовки и кодировщик тела берутся из описания, запрос
+        проходит тот же конвейер, что и get/post/put/delete (логирование,
+        трассировка, дедлайн, кэш, ограничители), но отправляется копией
+        подготовленного запроса метода.
+        
+        Args:
+            endpoint (Endpoint): Описание метода API
+            body (BaseModel, optional): Модель тела запроса
+            path_params (dict, optional): Значения параметров пути
+            **kwargs: Дополнительные параметры запроса (headers, params и т.д.)
+            
+        Returns:
+            requests.Response: Ответ от сервера
+            
+        Raises:
+            requests.HTTPError: Если сервер вернул ошибку HTTP
+        """
+        headers: Optional[Dict[str, str]] = endpoint.headers
+        if body is not None:
+            kwargs['data'] = endpoint.encode(body)
+            headers = endpoint.body_headers
+        if kwargs.get('headers'):
+            headers = {**(headers or {}), **kwargs['headers']}
+        if headers is not None:
+            kwargs['headers'] = headers
+        return self._send_request(
+            method=endpoint.method,
+            path=endpoint.path(path_params),
+            path_template=endpoint.template,
+            endpoint=endpoint,
+            **kwargs
+        )
+
     def _send_request(self, method: str, path: str, **kwargs: Any) -> Response:
         """
         Внутренний метод для выполнения HTTP-запросов.
         
-        Выполняет запрос с логированием, генерацией cURL-команд и обработкой ошибок.
+        Выполняет запрос с логированием и обработкой ошибок. Обмен добавляется
+        в самописец (FlightRecorder), который записывает команды cURL только при падении.
+        Если трассировка включена, запрос оформляется дочерним span активного span,
+        а event_id запроса используется как идентификатор span. При включенном
+        кэше запросы на чтение обслуживаются кэшем, а изменяющие запросы
+        сбрасывают записи токена авторизации. Заданные ожидания к ответу
+        проверяются до raise_for_status и учитываются без исключения.
         
         Args:
             method (str): HTTP-метод (GET, POST, PUT, DELETE)
             path (str): Путь запроса
-            **kwargs: Параметры запроса
+            **kwargs: Параметры запроса; path_template (str) — шаблон пути для трассировки
             
         Returns:
             requests.Response: Ответ от сервера
             
         Raises:
             requests.HTTPError: Если сервер вернул ошибку HTTP
+            DeadlineExceeded: Если активный дедлайн истек до или во время запроса
         """
-        log = self.log.bind(event_id=str(uuid.uuid4()))
-        full_url: str = self.host + path
+        event_id: str = str(uuid.uuid4())
+        path_template: str = kwargs.pop('path_template', path)
+        span_name: str = f'{method} {path_template}'
+
+        with tracing.start_span(
+                name=span_name,
+                span_id=event_id,
+                kind=tracing.SPAN_KIND_CLIENT,
+                attributes={'http.request.method': method, 'url.template': path_template}
+        ) as span:
+            if self.cache is None:
+                rest_response: Response = self._exchange(method, path, span_name, event_id, span, **kwargs)
+            elif self.cache.accepts(method, kwargs):
+                exchanged: bool = False
+
+                def send(conditional_headers: Dict[str, str]) -> Response:
+                    nonlocal exchanged
+                    exchanged = True
+                    request_kwargs: Dict[str, Any] = kwargs
+                    if conditional_headers:
+                        request_kwargs = {**kwargs, 'headers': {**(kwargs.get('headers') or {}), **conditional_headers}}
+                    return self._exchange(method, path, span_name, event_id, span, **request_kwargs)
+
+                rest_response = self.cache.fetch(
+                    self.cache.key(method, path, self._auth_token(kwargs), kwargs.get('params')), send
+                )
+                if span is not None:
+                    span.set_attribute('http.response.cached', not exchanged)
+            else:
+                try:
+                    rest_response = self._exchange(method, path, span_name, event_id, span, **kwargs)
+                finally:
+                    self.cache.invalidate(self._auth_token(kwargs))
 
-        if self.disable_log:
-            rest_response: Response = self.session.request(method=method, url=full_url, **kwargs)
+            self._trace_response(span, rest_response, streamed=kwargs.get('stream', False))
+            if self.expectations is not None:
+                self.expectations.verify(span_name, rest_response, streamed=kwargs.get('stream', False))
             rest_response.raise_for_status()  # Метод выбрасывает исключение если ответ от сервера отличается от 200
             return rest_response
 
-        log.msg(
-            event='Request',
-            method=method,
-            full_url=full_url,
-            params=kwargs.get('params'),
-            headers=kwargs.get('headers'),
-            json=kwargs.get('json'),
-            data=kwargs.get('data'),
-        )
-        rest_response: Response = self.session.request(method=method, url=full_url, **kwargs)
+    def _exchange(
+            self,
+            method: str,
+            path: str,
+            operation: str,
+            event_id: str,
+            span: Optional[tracing.Span] = None,
+            **kwargs: Any
+    ) -> Response:
+        """
+        Обращение к сервису: выбор хоста, логирование и отправка запроса.
+        
+        Args:
+            method (str): HTTP-метод
+            path (str): Путь запроса
+            operation (str): Имя операции (метод и шаблон пути)
+            event_id (str): Идентификатор запроса в логах
+            span (Span, optional): Span запроса (None, если трассировка выключена)
+            **kwargs: Параметры запроса
+            
+        Returns:
+            requests.Response: Ответ от сервера
+            
+        Raises:
+            DeadlineExceeded: Если активный дедлайн истек до или во время запроса
+        """
+        log = self.log.bind(event_id=event_id)
+        deadline: Optional[Deadline] = current_deadline()
+        node: Optional[Node] = self.balancer.acquire() if self.balancer is not None else None
+        host: str = node.url if node is not None else self.host
+        full_url: str = host + path
+        if span is not None:
+            span.set_attribute('server.address', host)
 
-        curl: str = curlify.to_curl(rest_response.request)
-        print(curl)
+        if not self.disable_log:
+            log.msg(
+                event='Request',
+                method=method,
+                full_url=full_url,
+                params=kwargs.get('params'),
+                headers=kwargs.get('headers'),
+                json=kwargs.get('json'),
+                data=kwargs.get('data'),
+            )
+        original_body: Optional[bytes] = None
+        if self.compression is not None:
+            from restclient.compression import compress_request
+            kwargs, original_body = compress_request(method, kwargs, self.compression)
+            if original_body is not None and span is not None:
+                span.set_attribute('http.request.body.uncompressed_size', len(original_body))
+        started: float = time.perf_counter()
+        try:
+            rest_response: Response = self._dispatch(
+                method=method, host=host, path=path, operation=operation, node=node, span=span, **kwargs
+            )
+        except requests.RequestException as e:
+            elapsed: float = time.perf_counter() - started
+            if e.request is not None:
+                self.flight_recorder.record(e.request, error=e, original_body=original_body, elapsed=elapsed)
+            if isinstance(e, requests.Timeout) and deadline is not None and deadline.expired:
+                raise deadline.exceeded(stage=operation) from e
+            raise
+        elapsed = time.perf_counter() - started
+        self.flight_recorder.record(rest_response.request, rest_response, original_body=original_body, elapsed=elapsed)
+        if not kwargs.get('stream'):
+            record_transfer(host, rest_response, original_body)
 
-        log.msg(
-            event='Response',
-            status_code=rest_response.status_code,
-            headers=rest_response.headers,
-            json=self._get_json(rest_response)
-        )
-        rest_response.raise_for_status()  # Метод выбрасывает исключение если ответ от сервера отличается от 200
+        if not self.disable_log:
+            log.msg(
+                event='Response',
+                status_code=rest_response.status_code,
+                headers=rest_response.headers,
+                json=self._get_json(rest_response) if not kwargs.get('stream') else None
+            )
         return rest_response
 
+    def _dispatch(
+            self,
+            method: str,
+            host: str,
+            path: str,
+            operation: str,
+            node: Optional[Node] = None,
+            span: Optional[tracing.Span] = None,
+            **kwargs: Any
+    ) -> Response:
+        """
+        Отправка запроса на выбранный хост.
+        
+        Перед отправкой запрос проходит ограничитель частоты и автомат защиты
+        хоста (если они настроены). Таймаут запроса берется из конфигурации и
+        сокращается до остатка активного дедлайна уже после ожидания
+        ограничителя, чтобы ожидание не продлевало дедлайн. Результат запроса
+        (задержка, ошибка, ответ 5xx или 429) учитывается автоматом защиты
+        и балансировщиком при любом исходе, включая исключения не из requests.
+        
+        Время передачи запроса (с хеджированием, но без ожидания ограничителя)
+        и процессорное время потока за это время записываются в атрибуты span
+        ROUND_TRIP_ATTRIBUTE и ROUND_TRIP_CPU_ATTRIBUTE.
+        
+        Args:
+            method (str): HTTP-метод
+            host (str): Базовый URL хоста
+            path (str): Путь запроса
+            operation (str): Имя операции (метод и шаблон пути)
+            node (Node, optional): Хост, выбранный балансировщиком
+            span (Span, optional): Span запроса (None, если трассировка выключена)
+            **kwargs: Параметры запроса
+            
+        Returns:
+            requests.Response: Ответ от сервера
+            
+        Raises:
+            RateLimitExceeded: Если разрешение ограничителя не получено за допустимое время
+            CircuitOpenError: Если автомат защиты хоста разомкнут
+            DeadlineExceeded: Если активный дедлайн истек до отправки запроса
+        """
+        breaker: Optional[CircuitBreaker] = None
+        deadline: Optional[Deadline] = current_deadline()
+        try:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(
+                    host, operation, timeout=deadline.remaining() if deadline is not None else None
+                )
+            if 'timeout' not in kwargs:
+                kwargs['timeout'] = (
+                    deadline.timeout(self.timeout, stage=operation) if deadline is not None else self.timeout
+                )
+            if self.circuit_breaker is not None:
+                from restclient.limits import get_breaker
+                breaker = get_breaker(host, self.circuit_breaker)
+                breaker.allow()
+        except BaseException:
+            if node is not None:
+                # Автомат получается последним, поэтому исключение при заданном breaker — CircuitOpenError
+                self.balancer.release(node, None, failed=breaker is not None)
+            raise
+
+        started: float = time.perf_counter()
+        cpu_started: float = time.thread_time()
+        try:
+            rest_response: Response = self._transmit(
+                method=method, host=host, path=path, operation=operation, node=node, **kwargs
+            )
+        except BaseException:
+            # Исход учитывается при любом исключении: иначе пробный запрос
+            # полуразомкнутого автомата остался бы незавершенным навсегда
+            if breaker is not None:
+                breaker.record(failed=True)
+            if node is not None:
+                self.balancer.release(node, time.perf_counter() - started, failed=True)
+            raise
+        finally:
+            if span is not None:
+                span.set_attribute(ROUND_TRIP_ATTRIBUTE, time.perf_counter() - started)
+                span.set_attribute(ROUND_TRIP_CPU_ATTRIBUTE, time.thread_time() - cpu_started)
+        if breaker is not None:
+            breaker.record(failed=rest_response.status_code >= 500 or rest_response.status_code == 429)
+        if node is not None:
+            self.balancer.release(node, time.perf_counter() - started, failed=rest_response.status_code >= 500)
+        return rest_response
+
+    def _transmit(
+            self,
+            method: str,
+            host: str,
+            path: str,
+            operation: str,
+            node: Optional[Node] = None,
+            **kwargs: Any
+    ) -> Response:
+        """
+        Передача запроса через сессию requests.
+        
+        Идемпотентные запросы (GET, HEAD, OPTIONS) при включенном хеджировании
+        дублируются, если ответ задерживается дольше перцентиля задержек операции.
+        Дубликат отправляется на другой рабочий хост балансировщика, а если
+        такого нет — на тот же хост.
+        
+        Args:
+            method (str): HTTP-метод
+            host (str): Базовый URL хоста
+            path (str): Путь запроса
+            operation (str): Имя операции (метод и шаблон пути)
+            node (Node, optional): Хост, выбранный балансировщиком
+            **kwargs: Параметры запроса; endpoint (Endpoint) — описание метода API для отправки
+                копии подготовленного запроса
+            
+        Returns:
+            requests.Response: Ответ от сервера
+        """
+        endpoint: Optional[Endpoint] = kwargs.pop('endpoint', None)
+        if endpoint is not None and PREPARED_KWARGS.issuperset(kwargs) and not self.session.cookies:
+            send_to = lambda target: self._send_prepared(endpoint, target, path, **kwargs)
+        else:
+            send_to = lambda target: self.session.request(method=method, url=target + path, **kwargs)
+        if self.hedger is not None and not kwargs.get('stream'):
+            from restclient.hedging import IDEMPOTENT_METHODS
+            if method in IDEMPOTENT_METHODS:
+                hedge = (lambda: self._send_hedge(node, send_to)) if node is not None else None
+                return self.hedger.send(operation, lambda: send_to(host), hedge=hedge)
+        return send_to(host)
+
+    def _send_hedge(self, node: Node, send_to: Callable[[str], Response]) -> Response:
+        """
+        Отправка дублирующего запроса на другой хост балансировщика.
+        
+        Другой хост выбирается в момент отправки дубликата, чтобы не учитывать
+        его как занятый, пока дубликат не нужен. Хост с разомкнутым автоматом
+        защиты пропускается. Результат учитывается балансировщиком и автоматом
+        защиты другого хоста так же, как результат основного запроса.
+        
+        Args:
+            node (Node): Хост основного запроса
+            send_to (Callable): Функция, отправляющая запрос на хост с заданным базовым URL
+            
+        Returns:
+            requests.Response: Ответ от сервера
+        """
+        alternative: Optional[Node] = self.balancer.acquire_alternative(node)
+        if alternative is None:
+            return send_to(node.url)
+        breaker: Optional[CircuitBreaker] = None
+        if self.circuit_breaker is not None:
+            from restclient.limits import CircuitOpenError, get_breaker
+            breaker = get_breaker(alternative.url, self.circuit_breaker)
+            try:
+                breaker.allow()
+            except CircuitOpenError:
+                self.balancer.release(alternative, None, failed=True)
+                return send_to(node.url)
+
+        started: float = time.perf_counter()
+        try:
+            rest_response: Response = send_to(alternative.url)
+        except BaseException:
+            if breaker is not None:
+                breaker.record(failed=True)
+            self.balancer.release(alternative, time.perf_counter() - started, failed=True)
+            raise
+        if breaker is not None:
+            breaker.record(failed=rest_response.status_code >= 500 or rest_response.status_code == 429)
+        self.balancer.release(alternative, time.perf_counter() - started, failed=rest_response.status_code >= 500)
+        return rest_response
+
+    def _send_prepared(
+            self,
+            endpoint: Endpoint,
+            host: str,
+            path: str,
+            data: Optional[bytes] = None,
+            headers: Optional[Dict[str, str]] = None,
+            params: Optional[Dict[str, Any]] = None,
+            timeout: Optional[float] = None,
+            stream: bool = False,
+            verify: Optional[bool] = None
+    ) -> Response:
+        """
+        Отправка копии подготовленного запроса метода API.
+        
+        Подготовленный запрос (заголовки сессии и метода) собирается один раз
+        на метод и хост и пересобирается после set_headers(). При вызове
+        подставляются только URL, тело и заголовки вызова. Настройки окружения
+        (прокси, сертификаты) также вычисляются один раз на хост.
+        
+        Args:
+            endpoint (Endpoint): Описание метода API
+            host (str): Базовый URL хоста
+            path (str): Путь запроса с подставленными параметрами
+            data (bytes, optional): Тело запроса
+            headers (dict, optional): Заголовки метода и вызова
+            params (dict, optional): Параметры строки запроса
+            timeout (float, optional): Таймаут запроса
+            stream (bool, optional): Потоковое чтение ответа
+            verify (bool, optional): Проверка сертификата
+            
+        Returns:
+            requests.Response: Ответ от сервера
+        """
+        full_url: str = host + path
+        key: Tuple[str, str] = (endpoint.operation, host)
+        cached: Optional[Tuple[int, PreparedRequest]] = self._prepared.get(key)
+        if cached is None or cached[0] != self._headers_version:
+            template: PreparedRequest = self.session.prepare_request(
+                requests.Request(method=endpoint.method, url=full_url)
+            )
+            cached = self._prepared[key] = (self._headers_version, template)
+        prepared: PreparedRequest = cached[1].copy()
+        prepared.url = f'{full_url}?{urlencode(params, doseq=True)}' if params else full_url
+        if headers:
+            prepared.headers.update(headers)
+        if data is not None:
+            prepared.body = data
+            prepared.headers['Content-Length'] = str(len(data))
+
+        environment: Optional[Dict[str, Any]] = self._environment.get((host, verify))
+        if environment is None:
+            environment = self._environment[(host, verify)] = self.session.merge_environment_settings(
+                full_url, {}, None, verify, None
+            )
+        return self.session.send(
+            prepared,
+            timeout=timeout,
+            allow_redirects=True,
+            stream=stream,
+            verify=environment['verify'],
+            proxies=environment['proxies'],
+            cert=environment['cert']
+        )
+
+    def _auth_token(self, kwargs: Dict[str, Any]) -> Optional[str]:
+        """
+        Токен авторизации запроса (из заголовков вызова или сессии) для ключа кэша.
+        """
+        name: str = self.cache.policy.auth_header
+        headers: Dict[str, str] = {key.lower(): value for key, value in (kwargs.get('headers') or {}).items()}
+        return headers.get(name.lower()) or self.session.headers.get(name)
+
+    @staticmethod
+    def _trace_response(
+            span: Optional[tracing.Span],
+            rest_response: Response,
+            streamed: bool = False
+    ) -> None:
+        """
+        Запись статуса и объема переданных данных в span запроса.
+
+        Args:
+            span (Span, optional): Span запроса (None, если трассировка выключена)
+            rest_response (requests.Response): HTTP-ответ
+            streamed (bool, optional): Ответ читается потоком — тело не загружается ради подсчета байт
+        """
+        if span is None:
+            return
+        body = rest_response.request.body
+        span.set_attribute('http.response.status_code', rest_response.status_code)
+        span.set_attribute('http.request.body.size', len(body) if body else 0)
+        if streamed:
+            span.set_attribute('http.response.body.size', int(rest_response.headers.get('Content-Length', 0)))
+        else:
+            wire_size, decoded_size = response_sizes(rest_response)
+            span.set_attribute('http.response.body.size', wire_size)
+            if decoded_size != wire_size:
+                span.set_attribute('http.response.body.uncompressed_size', decoded_size)
+        version: Optional[int] = getattr(rest_response.raw, 'version', None)
+        if version:
+            span.set_attribute('network.protocol.version', '2' if version == 20 else '1.1')
+        if rest_response.status_code >= 400:
+            span.status_code = tracing.STATUS_ERROR
+            span.status_message = f'HTTP {rest_response.status_code}'
+
     @staticmethod
     def _get_json(rest_response: Response) -> Dict[str, Any]:
         """
@@ -183,5 +666,5 @@ class RestClient:
         """
         try:
             return rest_response.json()
-        except JSONDecodeError:
+        except requests.JSONDecodeError:
             return {}
\ No newline at end of file
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import gzip
+import json
+from typing import Optional, Dict, Any, Tuple, TYPE_CHECKING
+
+from restclient.metrics import counters
+
+if TYPE_CHECKING:
+    from requests import Response
+
+
+class CompressionPolicy:
+    """
+    Настройки сжатия тела запросов RestClient.
+
+    Тело запроса сжимается gzip и отправляется с заголовком
+    Content-Encoding: gzip, если его размер не меньше min_size. Сервис должен
+    поддерживать сжатые запросы, поэтому сжатие включается явно. Сжатие
+    ответов requests согласует всегда: Accept-Encoding содержит gzip и
+    deflate, а также br, если установлен пакет brotli.
+    """
+
+    def __init__(
+            self,
+            min_size: int = 1024,
+            level: int = 6,
+            methods: Tuple[str, ...] = ('POST', 'PUT')
+    ) -> None:
+        """
+        Инициализация настроек сжатия.
+
+        Args:
+            min_size (int, optional): Минимальный размер тела в байтах для сжатия. По умолчанию 1024
+            level (int, optional): Уровень сжатия gzip (1-9). По умолчанию 6
+            methods (tuple, optional): Методы, тело которых сжимается. По умолчанию ('POST', 'PUT')
+        """
+        self.min_size: int = min_size
+        self.level: int = level
+        self.methods: Tuple[str, ...] = methods
+
+
+def compress_request(
+        method: str,
+        kwargs: Dict[str, Any],
+        policy: CompressionPolicy
+) -> Tuple[Dict[str, Any], Optional[bytes]]:
+    """
+    Сжатие тела запроса (json или data) по настройкам политики.
+
+    Args:
+        method (str): HTTP-метод
+        kwargs (dict): Параметры запроса
+        policy (CompressionPolicy): Настройки сжатия
+
+    Returns:
+        tuple: Параметры запроса (новый словарь, если тело сжато) и исходное тело
+            (None, если тело не сжималось)
+    """
+    if method not in policy.methods:
+        return kwargs, None
+    headers: Dict[str, str] = dict(kwargs.get('headers') or {})
+    if kwargs.get('json') is not None:
+        body: bytes = json.dumps(kwargs['json'], allow_nan=False).encode('utf-8')
+        headers.setdefault('Content-Type', 'application/json')
+    elif isinstance(kwargs.get('data'), (str, bytes)):
+        body = kwargs['data'].encode('utf-8') if isinstance(kwargs['data'], str) else kwargs['data']
+    else:
+        return kwargs, None
+    if len(body) < policy.min_size:
+        return kwargs, None
+    headers['Content-Encoding'] = 'gzip'
+    compressed: Dict[str, Any] = {key: value for key, value in kwargs.items() if key not in ('json', 'data')}
+    compressed['data'] = gzip.compress(body, compresslevel=policy.level)
+    compressed['headers'] = headers
+    return compressed, body
+
+
+def response_sizes(rest_response: Response) -> Tuple[int, int]:
+    """
+    Размер тела ответа на проводе и после распаковки.
+
+    Args:
+        rest_response (requests.Response): Ответ с прочитанным телом
+
+    Returns:
+        tuple: Размер на проводе и размер после распаковки в байтах
+    """
+    decoded: int = len(rest_response.content)
+    tell = getattr(rest_response.raw, 'tell', None)
+    return (tell() if tell is not None else decoded), decoded
+
+
+def record_transfer(
+        host: str,
+        rest_response: Response,
+        original_body: Optional[bytes] = None
+) -> None:
+    """
+    Учет переданных байт тела запроса и ответа: на проводе и после распаковки.
+
+    Счетчики http.request.wire_bytes / http.request.bytes и
+    http.response.wire_bytes / http.response.bytes с меткой хоста.
+
+    Args:
+        host (str): Базовый URL хоста
+        rest_response (requests.Response): Полученный ответ с прочитанным телом
+        original_body (bytes, optional): Исходное тело запроса, если оно было сжато
+    """
+    body = rest_response.request.body
+    wire_request: int = len(body) if body else 0
+    counters.increment('http.request.wire_bytes', host, wire_request)
+    counters.increment('http.request.bytes', host, len(original_body) if original_body is not None else wire_request)
+    wire_response, decoded_response = response_sizes(rest_response)
+    counters.increment('http.response.wire_bytes', host, wire_response)
+    counters.increment('http.response.bytes', host, decoded_response)
@@ -1,4 +1,18 @@
-from typing import Optional, Dict
+from __future__ import annotations
+
+from typing import Optional, Dict, List, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # Модули настроек загружает тот, кто их задает: конфигурация без них не тянет requests
+    from checkers.expectations import ExpectationSet
+    from restclient.balancer import BalancingPolicy
+    from restclient.cache import CachePolicy
+    from restclient.compression import CompressionPolicy
+    from restclient.flight_recorder import FlightRecorder
+    from restclient.hedging import HedgingPolicy
+    from restclient.limits import RateLimitPolicy, CircuitBreakerPolicy
+    from restclient.registry import PoolPolicy
+    from restclient.transport import Http2Policy
 
 
 class Configuration:
@@ -11,18 +25,54 @@ class Configuration:
 
     def __init__(
             self,
-            host: str,
+            host: Union[str, List[str]],
             headers: Optional[Dict[str, str]] = None,
-            disable_log: bool = True
+            disable_log: bool = True,
+            timeout: Optional[float] = 30.0,
+            balancing: Optional[BalancingPolicy] = None,
+            hedging: Optional[HedgingPolicy] = None,
+            rate_limit: Optional[RateLimitPolicy] = None,
+            circuit_breaker: Optional[CircuitBreakerPolicy] = None,
+            cache: Optional[CachePolicy] = None,
+            compression: Optional[CompressionPolicy] = None,
+            expectations: Optional[ExpectationSet] = None,
+            http2: Optional[Http2Policy] = None,
+            pool: Optional[PoolPolicy] = None,
+            flight_recorder: Optional[FlightRecorder] = None
     ) -> None:
         """
         Инициализация конфигурации.
         
         Args:
-            host (str): Базовый URL API-сервера (например, 'http://api.example.com')
+            host (str или list): Базовый URL API-сервера (например, 'http://api.example.com')
+                или список URL реплик, между которыми распределяются запросы
             headers (dict, optional): Дополнительные HTTP-заголовки для всех запросов
             disable_log (bool, optional): Отключение логирования запросов. По умолчанию True
+            timeout (float, optional): Таймаут запроса в секундах (None — без таймаута). По умолчанию 30
+            balancing (BalancingPolicy, optional): Настройки балансировки между репликами
+            hedging (HedgingPolicy, optional): Настройки хеджирования идемпотентных запросов
+            rate_limit (RateLimitPolicy, optional): Ограничение частоты запросов на хост и по операциям
+            circuit_breaker (CircuitBreakerPolicy, optional): Настройки автомата защиты хоста
+            cache (CachePolicy, optional): Настройки кэша ответов на чтение (None — без кэша)
+            compression (CompressionPolicy, optional): Настройки сжатия тела запросов (None — без сжатия)
+            expectations (ExpectationSet, optional): Ожидания к ответам, проверяемые без исключений
+                (None — без проверки)
+            http2 (Http2Policy, optional): Транспорт HTTP/2 с мультиплексированием запросов (None — HTTP/1.1)
+            pool (PoolPolicy, optional): Общий для клиентов хоста пул соединений HTTP/1.1 (None — пул сессии)
+            flight_recorder (FlightRecorder, optional): Буфер последних обменов для дампа при падении (None — общий)
         """
-        self.host: str = host
+        self.hosts: List[str] = [host] if isinstance(host, str) else list(host)
+        self.host: str = self.hosts[0]
         self.headers: Optional[Dict[str, str]] = headers
-        self.disable_log: bool = disable_log
\ No newline at end of file
+        self.disable_log: bool = disable_log
+        self.timeout: Optional[float] = timeout
+        self.balancing: Optional[BalancingPolicy] = balancing
+        self.hedging: Optional[HedgingPolicy] = hedging
+        self.rate_limit: Optional[RateLimitPolicy] = rate_limit
+        self.circuit_breaker: Optional[CircuitBreakerPolicy] = circuit_breaker
+        self.cache: Optional[CachePolicy] = cache
+        self.compression: Optional[CompressionPolicy] = compression
+        self.expectations: Optional[ExpectationSet] = expectations
+        self.http2: Optional[Http2Policy] = http2
+        self.pool: Optional[PoolPolicy] = pool
+        self.flight_recorder: Optional[FlightRecorder] = flight_recorder
@@ -0,0 +1,196 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Optional, Generator, Tuple
+
+_current_deadline: ContextVar[Optional['Deadline']] = ContextVar('current_deadline', default=None)
+_current_stage: ContextVar[Optional[str]] = ContextVar('current_stage', default=None)
+# Токены активации дедлайнов текущего контекста: дедлайн может быть общим для нескольких потоков
+_activations: ContextVar[Tuple[Token, ...]] = ContextVar('deadline_activations', default=())
+
+# Наименьший таймаут запроса: при меньшем остатке дедлайн считается истекшим (requests не принимает 0)
+MIN_TIMEOUT: float = 0.001
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Исключение, выбрасываемое при истечении общего бюджета времени операции.
+
+    Содержит этап, на котором истек дедлайн, чтобы по ошибке было видно,
+    какая часть многошагового сценария заняла время.
+    """
+
+    def __init__(
+            self,
+            stage: str,
+            budget: float,
+            elapsed: float
+    ) -> None:
+        """
+        Инициализация исключения.
+
+        Args:
+            stage (str): Этап, на котором истек дедлайн
+            budget (float): Общий бюджет времени в секундах
+            elapsed (float): Прошедшее время в секундах
+        """
+        self.stage: str = stage
+        self.budget: float = budget
+        self.elapsed: float = elapsed
+        super().__init__(f"Дедлайн {budget:.2f} с истек на этапе '{stage}' (прошло {elapsed:.2f} с)")
+
+
+class Deadline:
+    """
+    Общий бюджет времени многошаговой операции.
+
+    Передается в методы AccountHelper или активируется блоком ``with``:
+    RestClient сокращает таймаут каждого запроса до оставшегося времени,
+    ожидание письма сокращает число и интервал опросов MailHog, а при
+    истечении бюджета выбрасывается DeadlineExceeded с указанием этапа.
+
+    Example:
+        >>> with Deadline(10):
+        ...     account_helper.change_password(login, email, old_password, new_password)
+    """
+
+    def __init__(self, seconds: float) -> None:
+        """
+        Инициализация дедлайна, отсчет начинается сразу.
+
+        Args:
+            seconds (float): Бюджет времени в секундах
+        """
+        self.budget: float = seconds
+        self.started: float = time.monotonic()
+        self.expires_at: float = self.started + seconds
+
+    def remaining(self) -> float:
+        """
+        Оставшееся время.
+
+        Returns:
+            float: Оставшееся время в секундах (не меньше 0)
+        """
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        """
+        Признак истечения дедлайна.
+        """
+        return time.monotonic() >= self.expires_at
+
+    def check(self, stage: Optional[str] = None) -> None:
+        """
+        Проверка, что дедлайн не истек.
+
+        Args:
+            stage (str, optional): Этап для сообщения, если текущий этап не задан через stage()
+
+        Raises:
+            DeadlineExceeded: Если дедлайн истек
+        """
+        if self.expired:
+            raise self.exceeded(stage)
+
+    def exceeded(self, stage: Optional[str] = None) -> DeadlineExceeded:
+        """
+        Создание исключения об истечении дедлайна на текущем этапе.
+
+        Args:
+            stage (str, optional): Этап, если текущий этап не задан через stage()
+
+        Returns:
+            DeadlineExceeded: Исключение с атрибуцией этапа
+        """
+        return DeadlineExceeded(
+            stage=_current_stage.get() or stage or 'unknown',
+            budget=self.budget,
+            elapsed=time.monotonic() - self.started
+        )
+
+    def timeout(
+            self,
+            default: Optional[float] = None,
+            stage: Optional[str] = None
+    ) -> float:
+        """
+        Таймаут очередного запроса с учетом оставшегося времени.
+
+        Args:
+            default (float, optional): Таймаут запроса без учета дедлайна
+            stage (str, optional): Этап для сообщения об ошибке
+
+        Returns:
+            float: Минимум из default и оставшегося времени
+
+        Raises:
+            DeadlineExceeded: Если дедлайн истек или до его истечения осталось меньше MIN_TIMEOUT
+        """
+        remaining: float = self.remaining()
+        if remaining < MIN_TIMEOUT:
+            raise self.exceeded(stage)
+        return remaining if default is None else min(default, remaining)
+
+    def __enter__(self) -> 'Deadline':
+        _activations.set(_activations.get() + (_current_deadline.set(self),))
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        activations: Tuple[Token, ...] = _activations.get()
+        _activations.set(activations[:-1])
+        _current_deadline.reset(activations[-1])
+
+
+def current_deadline() -> Optional[Deadline]:
+    """
+    Получение активного дедлайна текущего контекста.
+
+    Returns:
+        Deadline или None: Активный дедлайн
+    """
+    return _current_deadline.get()
+
+
+@contextmanager
+def use_deadline(deadline: Optional[Deadline]) -> Generator[Optional[Deadline], None, None]:
+    """
+    Активация дедлайна, переданного в метод, на время его выполнения.
+
+    Если дедлайн не передан, остается активным внешний дедлайн (если он есть).
+
+    Args:
+        deadline (Deadline, optional): Дедлайн метода
+
+    Yields:
+        Deadline или None: Действующий дедлайн
+    """
+    if deadline is None:
+        yield _current_deadline.get()
+        return
+    with deadline:
+        yield deadline
+
+
+@contextmanager
+def stage(name: str) -> Generator[None, None, None]:
+    """
+    Отметка этапа многошаговой операции для атрибуции истечения дедлайна.
+
+    Перед началом этапа проверяет, что активный дедлайн не истек.
+
+    Args:
+        name (str): Имя этапа
+
+    Raises:
+        DeadlineExceeded: Если активный дедлайн истек до начала этапа
+    """
+    token = _current_stage.set(name)
+    try:
+        deadline: Optional[Deadline] = _current_deadline.get()
+        if deadline is not None:
+            deadline.check()
+        yield
+    finally:
+        _current_stage.reset(token)
@@ -0,0 +1,78 @@
+from string import Formatter
+from typing import Optional, Dict, Any, Tuple
+from urllib.parse import quote
+
+from pydantic import BaseModel
+
+JSON_HEADERS: Dict[str, str] = {'Content-Type': 'application/json'}
+
+
+class Endpoint:
+    """
+    Описание метода API, вычисляемое один раз при объявлении клиента.
+
+    Хранит HTTP-метод, шаблон пути, заголовки метода и кодировщик тела,
+    поэтому при вызове остается только подставить параметры пути и
+    сериализовать модель. RestClient.call() по описанию также кэширует
+    подготовленный запрос (PreparedRequest) и при каждом вызове копирует его
+    вместо повторной сборки через Session.request.
+
+    Example:
+        >>> PUT_V1_ACCOUNT_TOKEN = Endpoint('PUT', '/v1/account/{token}', headers={'accept': 'text/plain'})
+        >>> self.call(PUT_V1_ACCOUNT_TOKEN, path_params={'token': token})
+    """
+
+    __slots__ = ('method', 'template', 'operation', 'headers', 'body_headers', 'path_params')
+
+    def __init__(
+            self,
+            method: str,
+            template: str,
+            headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Инициализация описания метода API.
+
+        Args:
+            method (str): HTTP-метод
+            template (str): Шаблон пути, например '/v1/account/{token}'
+            headers (dict, optional): Заголовки, отправляемые с каждым запросом метода
+        """
+        self.method: str = method
+        self.template: str = template
+        self.operation: str = f'{method} {template}'
+        self.headers: Optional[Dict[str, str]] = dict(headers) if headers else None
+        self.body_headers: Dict[str, str] = {**JSON_HEADERS, **(headers or {})}
+        self.path_params: Tuple[str, ...] = tuple(
+            name for _, name, _, _ in Formatter().parse(template) if name is not None
+        )
+
+    def path(self, path_params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Путь запроса с подставленными параметрами.
+
+        Args:
+            path_params (dict, optional): Значения параметров пути
+
+        Returns:
+            str: Путь запроса (значения параметров экранируются)
+
+        Raises:
+            KeyError: Если не передан параметр, указанный в шаблоне
+        """
+        if not self.path_params:
+            return self.template
+        return self.template.format(**{name: quote(str(path_params[name]), safe='') for name in self.path_params})
+
+    @staticmethod
+    def encode(body: BaseModel) -> bytes:
+        """
+        Сериализация модели запроса в JSON без промежуточного словаря.
+
+        Args:
+            body (BaseModel): Модель тела запроса
+
+        Returns:
+            bytes: Тело запроса в UTF-8
+        """
+        return body.model_dump_json(exclude_none=True, by_alias=True).encode('utf-8')
@@ -0,0 +1,279 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, Dict, List, Set, Tuple, Any, Deque, Iterator, TextIO
+
+from requests import PreparedRequest, Response
+from requests.structures import CaseInsensitiveDict
+
+from restclient.lazy import lazy_import
+
+# Нужен только при записи на диск: загружается при первом обращении
+curlify = lazy_import('curlify')
+
+
+class Record:
+    """
+    Запись самописца: обмен с телами, усеченными до max_body байт при записи.
+
+    Запись не ссылается на запрос и ответ requests, поэтому буфер не удерживает
+    полные тела ответов и соединения до вытеснения записи.
+    """
+
+    __slots__ = (
+        'timestamp', 'thread', 'method', 'url', 'request_headers', 'request_body', 'request_size',
+        'status_code', 'reason', 'response_headers', 'response_body', 'response_size', 'streamed', 'error', 'elapsed'
+    )
+
+    def __init__(
+            self,
+            request: PreparedRequest,
+            response: Optional[Response],
+            error: Optional[BaseException],
+            original_body: Optional[bytes],
+            elapsed: float,
+            max_body: int
+    ) -> None:
+        """
+        Снимок обмена.
+
+        Args:
+            request (PreparedRequest): Отправленный запрос
+            response (requests.Response, optional): Ответ (None, если запрос завершился исключением)
+            error (BaseException, optional): Исключение транспорта
+            original_body (bytes, optional): Тело запроса до сжатия
+            elapsed (float): Длительность обмена в секундах
+            max_body (int): Максимальный размер сохраняемого тела в байтах
+        """
+        self.timestamp: float = time.time()
+        self.thread: str = threading.current_thread().name
+        self.method: Optional[str] = request.method
+        self.url: Optional[str] = request.url
+        self.request_headers: Dict[str, str] = dict(request.headers)
+        body: Any = request.body
+        if original_body is not None:
+            # В дамп попадает исходное тело: команда cURL воспроизводит запрос без сжатия
+            body = original_body
+            self.request_headers.pop('Content-Encoding', None)
+            self.request_headers['Content-Length'] = str(len(original_body))
+        self.request_body: Any
+        self.request_size: int
+        self.request_body, self.request_size = _clip(body, max_body)
+        self.status_code: Optional[int] = None
+        self.reason: Optional[str] = None
+        self.response_headers: Dict[str, str] = {}
+        self.response_body: Any = None
+        self.response_size: int = 0
+        # Тело потокового ответа не сохраняется: оно читается частями после записи
+        self.streamed: bool = response is not None and response._content is False
+        if response is not None:
+            self.status_code = response.status_code
+            self.reason = response.reason
+            self.response_headers = dict(response.headers)
+            if not self.streamed:
+                self.response_body, self.response_size = _clip(response._content, max_body)
+        # Исключение хранится текстом: его traceback удерживал бы кадры с ответами и сессией
+        self.error: Optional[str] = f'{type(error).__name__}: {error}' if error is not None else None
+        self.elapsed: float = elapsed
+
+    @property
+    def outcome(self) -> str:
+        """
+        Статус ответа или имя исключения.
+        """
+        return str(self.status_code) if self.status_code is not None else str(self.error).split(':', 1)[0]
+
+
+def _clip(body: Any, max_body: int) -> Tuple[Any, int]:
+    """
+    Тело, усеченное до max_body байт, и его полный размер.
+
+    Тела, которые нельзя прочитать повторно (генераторы, файлы), заменяются
+    строкой с именем типа.
+    """
+    if body is None:
+        return None, 0
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    if not isinstance(body, bytes):
+        return f'<{type(body).__name__}>', 0
+    return body[:max_body], len(body)
+
+
+class FlightRecorder:
+    """
+    Бортовой самописец HTTP-клиентов: последние запросы и ответы каждого потока.
+
+    На каждый обмен в кольцевой буфер потока добавляется снимок запроса и
+    ответа с телами, усеченными до max_body байт, поэтому буфер не удерживает
+    большие ответы. Команды cURL формируются только при записи на диск, когда
+    тест или прогон упал.
+
+    Буферы отдельные для каждого потока, поэтому параллельные потоки
+    (массовые операции, виртуальные пользователи) не вытесняют записи друг друга.
+    Буферы завершившихся потоков удаляются при очистке (clear()): до нее их
+    записи попадают в дамп.
+    """
+
+    def __init__(self, capacity: int = 50, max_body: int = 2048) -> None:
+        """
+        Инициализация самописца.
+
+        Args:
+            capacity (int, optional): Число хранимых обменов на поток (0 — запись выключена). По умолчанию 50
+            max_body (int, optional): Максимальный размер тела в записи в байтах. По умолчанию 2048
+        """
+        self.capacity: int = capacity
+        self.max_body: int = max_body
+        self._local: threading.local = threading.local()
+        self._buffers: Dict[int, Deque[Record]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def record(
+            self,
+            request: PreparedRequest,
+            response: Optional[Response] = None,
+            error: Optional[BaseException] = None,
+            original_body: Optional[bytes] = None,
+            elapsed: float = 0.0
+    ) -> None:
+        """
+        Добавление обмена в буфер текущего потока.
+
+        Args:
+            request (PreparedRequest): Отправленный запрос
+            response (requests.Response, optional): Ответ (None, если запрос завершился исключением)
+            error (BaseException, optional): Исключение транспорта
+            original_body (bytes, optional): Тело запроса до сжатия
+            elapsed (float, optional): Длительность обмена в секундах
+        """
+        if not self.capacity:
+            return
+        buffer: Optional[Deque[Record]] = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = deque(maxlen=self.capacity)
+            with self._lock:
+                # Идентификатор завершившегося потока может быть выдан новому: буфер заменяется
+                self._buffers[threading.get_ident()] = buffer
+        buffer.append(Record(request, response, error, original_body, elapsed, self.max_body))
+
+    def clear(self) -> None:
+        """
+        Очистка буферов всех потоков (например, перед очередным тестом).
+
+        Буферы завершившихся потоков удаляются.
+        """
+        alive: Set[Optional[int]] = {thread.ident for thread in threading.enumerate()}
+        with self._lock:
+            for ident in [ident for ident in self._buffers if ident not in alive]:
+                del self._buffers[ident]
+            buffers: List[Deque[Record]] = list(self._buffers.values())
+        for buffer in buffers:
+            buffer.clear()
+
+    def records(self) -> List[Record]:
+        """
+        Записи всех потоков в порядке времени.
+
+        Returns:
+            list: Записи
+        """
+        with self._lock:
+            buffers: List[Deque[Record]] = list(self._buffers.values())
+        return sorted((record for buffer in buffers for record in list(buffer)), key=lambda record: record.timestamp)
+
+    def dump(self, path: str, title: str = '') -> Optional[str]:
+        """
+        Запись буферов в файл в виде команд cURL с ответами.
+
+        Args:
+            path (str): Путь к файлу (каталоги создаются)
+            title (str, optional): Заголовок дампа (например, идентификатор теста)
+
+        Returns:
+            str или None: Путь к файлу или None, если записей нет
+        """
+        records: List[Record] = self.records()
+        if not records:
+            return None
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            if title:
+                file.write(f'# {title}\n\n')
+            for record in records:
+                self._write(file, record)
+        return path
+
+    def _write(self, file: TextIO, record: Record) -> None:
+        """
+        Запись одного обмена.
+        """
+        timestamp: float = record.timestamp
+        moment: str = time.strftime('%H:%M:%S', time.localtime(timestamp)) + f'.{int(timestamp * 1000) % 1000:03d}'
+        file.write(f'=== {moment} [{record.thread}] {record.method} {record.url} ')
+        file.write(f'-> {record.outcome} ({record.elapsed:.3f} s)\n')
+        request: PreparedRequest = PreparedRequest()
+        request.method = record.method
+        request.url = record.url
+        request.headers = CaseInsensitiveDict(record.request_headers)
+        request.body = self._body(record.request_body, record.request_size) or None
+        try:
+            file.write(curlify.to_curl(request) + '\n')
+        except Exception:
+            file.write(f'curl -X {request.method} {request.url!r}\n{request.body or ""}\n')
+        if record.error is not None:
+            file.write(f'--- {record.error}\n')
+        if record.status_code is not None:
+            file.write(f'--- {record.status_code} {record.reason}\n')
+            for name, value in record.response_headers.items():
+                file.write(f'{name}: {value}\n')
+            if record.streamed:
+                file.write('\n<потоковый ответ, тело не сохранено>\n')
+            elif record.response_body:
+                file.write('\n' + self._body(record.response_body, record.response_size) + '\n')
+        file.write('\n')
+
+    def _body(self, body: Any, size: int) -> str:
+        """
+        Текст сохраненного тела с пометкой полного размера, если тело усечено.
+        """
+        if body is None:
+            return ''
+        if isinstance(body, str):
+            return body
+        text: str = body.decode('utf-8', errors='replace')
+        if size > len(body):
+            text += f'... ({size} байт)'
+        return text
+
+
+# Общий самописец клиентов процесса
+recorder: FlightRecorder = FlightRecorder(capacity=int(os.getenv('FLIGHT_RECORDER_SIZE', '50')))
+
+
+@contextmanager
+def dump_on_failure(path: str, title: str = '') -> Iterator[FlightRecorder]:
+    """
+    Запись самописца в файл, если блок завершился исключением.
+
+    Буферы очищаются при входе, поэтому дамп содержит только обмены блока.
+
+    Args:
+        path (str): Путь к файлу дампа
+        title (str, optional): Заголовок дампа
+
+    Yields:
+        FlightRecorder: Общий самописец
+
+    Example:
+        >>> with dump_on_failure('flight/run.log'):
+        ...     account_helper.register_new_user(login, password, email)
+    """
+    recorder.clear()
+    try:
+        yield recorder
+    except BaseException as e:
+        recorder.dump(path, title=title or f'{type(e).__name__}: {e}')
+        raise
@@ -0,0 +1,233 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, TimeoutError as FutureTimeout, wait
+from contextvars import copy_context
+from typing import Optional, Dict, Deque, Callable, List
+
+from requests import Response
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+RECOMPUTE_EVERY: int = 50
+
+
+class HedgingPolicy:
+    """
+    Настройки хеджирования идемпотентных запросов.
+
+    Если ответ на запрос не получен за задержку, равную заданному перцентилю
+    недавних задержек этой операции, отправляется дублирующий запрос и
+    используется первый полученный ответ. Доля дублирующих запросов
+    ограничена, чтобы хеджирование не усиливало нагрузку на сервис.
+    """
+
+    def __init__(
+            self,
+            percentile: float = 95.0,
+            min_delay: float = 0.01,
+            initial_delay: float = 0.2,
+            max_hedge_ratio: float = 0.05,
+            window: int = 1000,
+            min_samples: int = 20,
+            max_workers: int = 16
+    ) -> None:
+        """
+        Инициализация настроек хеджирования.
+
+        Args:
+            percentile (float, optional): Перцентиль задержки, после которого отправляется дубль. По умолчанию 95
+            min_delay (float, optional): Минимальная задержка перед дублем в секундах. По умолчанию 0.01
+            initial_delay (float, optional): Задержка, пока замеров меньше min_samples. По умолчанию 0.2
+            max_hedge_ratio (float, optional): Максимальная доля дублирующих запросов. По умолчанию 0.05
+            window (int, optional): Число последних замеров для расчета перцентиля. По умолчанию 1000
+            min_samples (int, optional): Минимум замеров для расчета перцентиля. По умолчанию 20
+            max_workers (int, optional): Размер общего пула потоков процесса для параллельных запросов
+                (используется при создании пула). По умолчанию 16
+        """
+        self.percentile: float = percentile
+        self.min_delay: float = min_delay
+        self.initial_delay: float = initial_delay
+        self.max_hedge_ratio: float = max_hedge_ratio
+        self.window: int = window
+        self.min_samples: int = min_samples
+        self.max_workers: int = max_workers
+
+
+class Hedger:
+    """
+    Исполнитель хеджированных запросов.
+
+    Ведет окно последних задержек по каждой операции, вычисляет задержку
+    перед дублем и ограничивает долю дублей бюджетом: каждый запрос
+    пополняет бюджет на max_hedge_ratio, каждый дубль расходует единицу.
+    Проигравший запрос отменяется, если еще не начат, иначе его ответ
+    закрывается по завершении, а соединение возвращается в пул.
+
+    Если бюджет не позволяет отправить дубль, запрос выполняется в
+    вызывающем потоке без передачи в пул. Иначе основной запрос и дубль
+    выполняются в общем для процесса пуле потоков (get_executor()): ответ
+    блокирующего запроса нельзя дождаться досрочно в том же потоке, в
+    котором ждет его дубль.
+    """
+
+    def __init__(self, policy: HedgingPolicy) -> None:
+        """
+        Инициализация исполнителя.
+
+        Args:
+            policy (HedgingPolicy): Настройки хеджирования
+        """
+        self.policy: HedgingPolicy = policy
+        self.requests: int = 0
+        self.hedges: int = 0
+        self.hedge_wins: int = 0
+        self._budget: float = 0.0
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._delays: Dict[str, float] = {}
+        self._samples: Dict[str, int] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def delay(self, operation: str) -> float:
+        """
+        Задержка перед отправкой дубля для операции.
+
+        Args:
+            operation (str): Имя операции (метод и шаблон пути)
+
+        Returns:
+            float: Задержка в секундах
+        """
+        return self._delays.get(operation, self.policy.initial_delay)
+
+    def send(
+            self,
+            operation: str,
+            call: Callable[[], Response],
+            hedge: Optional[Callable[[], Response]] = None
+    ) -> Response:
+        """
+        Выполнение запроса с хеджированием.
+
+        Args:
+            operation (str): Имя операции (метод и шаблон пути)
+            call (Callable): Функция, выполняющая запрос
+            hedge (Callable, optional): Функция, выполняющая дублирующий запрос
+                (например, на другой хост); по умолчанию call
+
+        Returns:
+            requests.Response: Первый полученный ответ
+        """
+        with self._lock:
+            self.requests += 1
+            self._budget = min(self._budget + self.policy.max_hedge_ratio, 1.0)
+            hedgeable: bool = self._budget >= 1.0
+        if not hedgeable:
+            return self._timed(operation, call)
+        primary: Future = self._submit(operation, call)
+        try:
+            return primary.result(timeout=self.delay(operation))
+        except FutureTimeout:
+            pass
+        with self._lock:
+            if self._budget < 1.0:
+                allowed: bool = False
+            else:
+                self._budget -= 1.0
+                self.hedges += 1
+                allowed = True
+        if not allowed:
+            return primary.result()
+
+        duplicate: Future = self._submit(operation, hedge or call)
+        done, _ = wait([primary, duplicate], return_when=FIRST_COMPLETED)
+        winner: Future = primary if primary in done else duplicate
+        loser: Future = duplicate if winner is primary else primary
+        if winner.exception() is not None:
+            # Первый завершившийся запрос упал — ждем второй, при двух ошибках выбрасываем ошибку основного
+            if loser.exception() is not None:
+                return primary.result()
+            winner, loser = loser, winner
+        if winner is duplicate:
+            with self._lock:
+                self.hedge_wins += 1
+        if not loser.cancel():
+            loser.add_done_callback(_close_response)
+        return winner.result()
+
+    def _timed(self, operation: str, call: Callable[[], Response]) -> Response:
+        """
+        Выполнение запроса с замером задержки.
+        """
+        started: float = time.perf_counter()
+        response: Response = call()
+        self._record(operation, time.perf_counter() - started)
+        return response
+
+    def _submit(self, operation: str, call: Callable[[], Response]) -> Future:
+        """
+        Запуск запроса в общем пуле с сохранением контекста (трассировка, дедлайн) и замером задержки.
+        """
+        executor: ThreadPoolExecutor = get_executor(self.policy.max_workers)
+        return executor.submit(copy_context().run, self._timed, operation, call)
+
+    def _record(self, operation: str, latency: float) -> None:
+        """
+        Добавление замера задержки операции в окно.
+        """
+        with self._lock:
+            latencies: Optional[Deque[float]] = self._latencies.get(operation)
+            if latencies is None:
+                latencies = self._latencies[operation] = deque(maxlen=self.policy.window)
+            latencies.append(latency)
+            self._samples[operation] = samples = self._samples.get(operation, 0) + 1
+            # Перцентиль пересчитывается при накоплении минимума замеров и далее раз в RECOMPUTE_EVERY замеров
+            if samples == self.policy.min_samples or (samples > self.policy.min_samples and not samples % RECOMPUTE_EVERY):
+                ordered = sorted(latencies)
+                index: int = min(int(len(ordered) * self.policy.percentile / 100), len(ordered) - 1)
+                self._delays[operation] = max(ordered[index], self.policy.min_delay)
+
+
+def _close_response(future: Future) -> None:
+    """
+    Закрытие ответа проигравшего запроса.
+    """
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+_executors: Dict[int, ThreadPoolExecutor] = {}
+_registry_lock: threading.Lock = threading.Lock()
+
+
+def get_executor(max_workers: int = 16) -> ThreadPoolExecutor:
+    """
+    Получение общего для процесса пула потоков хеджированных запросов.
+
+    Пул создается при первом обращении; размер последующих обращений
+    игнорируется. После fork процесс получает собственный пул.
+
+    Args:
+        max_workers (int, optional): Размер пула. По умолчанию 16
+
+    Returns:
+        ThreadPoolExecutor: Пул потоков
+    """
+    with _registry_lock:
+        executor: Optional[ThreadPoolExecutor] = _executors.get(os.getpid())
+        if executor is None:
+            executor = _executors[os.getpid()] = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix='hedging'
+            )
+        return executor
+
+
+def shutdown_executors() -> None:
+    """
+    Остановка общих пулов потоков хеджирования (незавершенные запросы дорабатывают в фоне).
+    """
+    with _registry_lock:
+        executors: List[ThreadPoolExecutor] = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False)
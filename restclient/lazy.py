@@ -0,0 +1,35 @@
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Отложенный импорт модуля.
+
+    Модуль регистрируется в sys.modules сразу, а выполняется при первом
+    обращении к его атрибуту. Подходит для зависимостей, которые нужны
+    только при выполнении запросов (логирование, curl, повторные попытки):
+    короткие запуски CLI и процессы нагрузки не платят за их загрузку.
+    Уже загруженный модуль возвращается как есть.
+
+    Args:
+        name (str): Полное имя модуля
+
+    Returns:
+        ModuleType: Модуль, загружаемый при первом обращении
+
+    Raises:
+        ModuleNotFoundError: Если модуль не установлен
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f'No module named {name!r}', name=name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
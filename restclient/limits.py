@@ -0,0 +1,315 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, Deque, Tuple, Hashable
+
+from requests import RequestException
+
+from restclient.metrics import counters
+
+CLOSED: str = 'closed'
+OPEN: str = 'open'
+HALF_OPEN: str = 'half_open'
+
+
+class RateLimitExceeded(RequestException):
+    """
+    Исключение, выбрасываемое, если токен ограничителя не получен за допустимое время ожидания.
+    """
+
+
+class CircuitOpenError(RequestException):
+    """
+    Исключение, выбрасываемое без обращения к сервису, пока автомат хоста разомкнут.
+    """
+
+
+class RateLimitPolicy:
+    """
+    Настройки клиентского ограничения частоты запросов.
+
+    Ограничение действует на хост в целом и, дополнительно, на отдельные
+    операции. Ведра токенов общие для всех клиентов процесса, обращающихся
+    к одному хосту, поэтому ограничение соблюдается независимо от числа фикстур.
+    """
+
+    def __init__(
+            self,
+            rate: Optional[float] = None,
+            burst: Optional[int] = None,
+            endpoint_rates: Optional[Dict[str, float]] = None,
+            max_wait: Optional[float] = None
+    ) -> None:
+        """
+        Инициализация настроек ограничения.
+
+        Args:
+            rate (float, optional): Запросов в секунду на хост. None — без ограничения на хост
+            burst (int, optional): Емкость ведра (допустимый всплеск). По умолчанию равна rate
+            endpoint_rates (dict, optional): Запросов в секунду по операциям, например {'POST /v1/account': 5}
+            max_wait (float, optional): Максимальное ожидание токена в секундах. None — ждать без ограничения
+        """
+        self.rate: Optional[float] = rate
+        self.burst: Optional[int] = burst
+        self.endpoint_rates: Dict[str, float] = endpoint_rates or {}
+        self.max_wait: Optional[float] = max_wait
+
+
+class CircuitBreakerPolicy:
+    """
+    Настройки автомата защиты (circuit breaker) хоста.
+
+    Автомат размыкается, если в скользящем окне набралось не меньше
+    min_requests запросов и доля ошибок (сетевые ошибки, 5xx, 429) превысила
+    порог. В разомкнутом состоянии запросы сразу завершаются CircuitOpenError,
+    по истечении open_time пропускается пробный запрос.
+    """
+
+    def __init__(
+            self,
+            error_rate_threshold: float = 0.5,
+            min_requests: int = 20,
+            window: float = 10.0,
+            open_time: float = 5.0
+    ) -> None:
+        """
+        Инициализация настроек автомата.
+
+        Args:
+            error_rate_threshold (float, optional): Доля ошибок для размыкания. По умолчанию 0.5
+            min_requests (int, optional): Минимум запросов в окне для оценки. По умолчанию 20
+            window (float, optional): Длина скользящего окна в секундах. По умолчанию 10
+            open_time (float, optional): Время в разомкнутом состоянии в секундах. По умолчанию 5
+        """
+        self.error_rate_threshold: float = error_rate_threshold
+        self.min_requests: int = min_requests
+        self.window: float = window
+        self.open_time: float = open_time
+
+
+class TokenBucket:
+    """
+    Ведро токенов: равномерное пополнение с заданной скоростью и ограниченной емкостью.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        """
+        Инициализация ведра (изначально заполнено).
+
+        Args:
+            rate (float): Скорость пополнения, токенов в секунду
+            capacity (float, optional): Емкость ведра. По умолчанию max(rate, 1)
+        """
+        self.rate: float = rate
+        self.capacity: float = capacity or max(rate, 1.0)
+        self._tokens: float = self.capacity
+        self._updated: float = time.monotonic()
+        self._lock: threading.Lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        Получение токена с ожиданием.
+
+        Токен резервируется сразу, поэтому конкурирующие потоки выстраиваются
+        в очередь без повторных проверок.
+
+        Args:
+            timeout (float, optional): Максимальное ожидание в секундах. None — без ограничения
+
+        Returns:
+            float: Время ожидания в секундах
+
+        Raises:
+            RateLimitExceeded: Если токен не освободится за timeout
+        """
+        with self._lock:
+            now: float = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait: float = max(-(self._tokens - 1) / self.rate, 0.0)
+            if timeout is not None and wait > timeout:
+                raise RateLimitExceeded(f'Токен ограничителя освободится через {wait:.3f} с, допустимо {timeout:.3f} с')
+            self._tokens -= 1
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """
+    Автомат защиты хоста с оценкой доли ошибок в скользящем окне.
+    """
+
+    def __init__(self, name: str, policy: CircuitBreakerPolicy) -> None:
+        """
+        Инициализация автомата в замкнутом состоянии.
+
+        Args:
+            name (str): Имя автомата (хост), используется как метка счетчиков
+            policy (CircuitBreakerPolicy): Настройки автомата
+        """
+        self.name: str = name
+        self.policy: CircuitBreakerPolicy = policy
+        self.state: str = CLOSED
+        self._opened_at: float = 0.0
+        self._probe_in_flight: bool = False
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._errors: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def allow(self) -> None:
+        """
+        Проверка, можно ли отправить запрос.
+
+        Raises:
+            CircuitOpenError: Если автомат разомкнут или пробный запрос уже выполняется
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.policy.open_time:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+        counters.increment('circuit_breaker.rejected', self.name)
+        raise CircuitOpenError(f'Автомат защиты хоста {self.name} разомкнут, запрос не отправлен')
+
+    def record(self, failed: bool) -> None:
+        """
+        Учет результата запроса.
+
+        Args:
+            failed (bool): Запрос завершился сетевой ошибкой, ответом 5xx или 429
+        """
+        with self._lock:
+            now: float = time.monotonic()
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._open(now)
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                    self._errors = 0
+                    counters.increment('circuit_breaker.closed', self.name)
+                return
+            self._outcomes.append((now, failed))
+            self._errors += failed
+            while self._outcomes and now - self._outcomes[0][0] > self.policy.window:
+                self._errors -= self._outcomes.popleft()[1]
+            total: int = len(self._outcomes)
+            if (
+                    self.state == CLOSED
+                    and total >= self.policy.min_requests
+                    and self._errors / total >= self.policy.error_rate_threshold
+            ):
+                self._open(now)
+
+    def _open(self, now: float) -> None:
+        """
+        Размыкание автомата (вызывается под блокировкой).
+        """
+        self.state = OPEN
+        self._opened_at = now
+        counters.increment('circuit_breaker.opened', self.name)
+
+
+_buckets: Dict[Tuple[int, Hashable], TokenBucket] = {}
+_breakers: Dict[Tuple[int, str], CircuitBreaker] = {}
+_registry_lock: threading.Lock = threading.Lock()
+
+
+def get_bucket(key: Hashable, rate: float, capacity: Optional[float] = None) -> TokenBucket:
+    """
+    Получение общего для процесса ведра токенов.
+
+    Ведро создается при первом обращении; параметры последующих обращений
+    с тем же ключом игнорируются. После fork процесс получает собственное
+    ведро, поэтому N процессов (воркеры xdist, генератора нагрузки) вместе
+    отправляют до N × rate запросов в секунду.
+
+    Args:
+        key: Ключ ведра (хост или пара хост/операция)
+        rate (float): Скорость пополнения, токенов в секунду
+        capacity (float, optional): Емкость ведра
+
+    Returns:
+        TokenBucket: Ведро токенов
+    """
+    registry_key: Tuple[int, Hashable] = (os.getpid(), key)
+    with _registry_lock:
+        bucket: Optional[TokenBucket] = _buckets.get(registry_key)
+        if bucket is None:
+            bucket = _buckets[registry_key] = TokenBucket(rate=rate, capacity=capacity)
+        return bucket
+
+
+def get_breaker(host: str, policy: CircuitBreakerPolicy) -> CircuitBreaker:
+    """
+    Получение общего для процесса автомата защиты хоста (после fork — собственного).
+
+    Args:
+        host (str): Базовый URL хоста
+        policy (CircuitBreakerPolicy): Настройки, используются при создании автомата
+
+    Returns:
+        CircuitBreaker: Автомат защиты
+    """
+    key: Tuple[int, str] = (os.getpid(), host)
+    with _registry_lock:
+        breaker: Optional[CircuitBreaker] = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(name=host, policy=policy)
+        return breaker
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов клиента по хосту и по операциям.
+    """
+
+    def __init__(self, policy: RateLimitPolicy) -> None:
+        """
+        Инициализация ограничителя.
+
+        Args:
+            policy (RateLimitPolicy): Настройки ограничения
+        """
+        self.policy: RateLimitPolicy = policy
+
+    def acquire(
+            self,
+            host: str,
+            operation: str,
+            timeout: Optional[float] = None
+    ) -> None:
+        """
+        Ожидание разрешения на запрос.
+
+        Args:
+            host (str): Базовый URL хоста
+            operation (str): Имя операции (метод и шаблон пути)
+            timeout (float, optional): Дополнительное ограничение ожидания (например, остаток дедлайна)
+
+        Raises:
+            RateLimitExceeded: Если разрешение не получено за допустимое время
+        """
+        limits = [value for value in (self.policy.max_wait, timeout) if value is not None]
+        max_wait: Optional[float] = min(limits) if limits else None
+        waited: float = 0.0
+        try:
+            if self.policy.rate:
+                waited += get_bucket(host, self.policy.rate, self.policy.burst).acquire(max_wait)
+            endpoint_rate: Optional[float] = self.policy.endpoint_rates.get(operation)
+            if endpoint_rate:
+                remaining: Optional[float] = None if max_wait is None else max_wait - waited
+                waited += get_bucket((host, operation), endpoint_rate).acquire(remaining)
+        except RateLimitExceeded:
+            counters.increment('rate_limit.rejected', host)
+            raise
+        if waited:
+            counters.increment('rate_limit.delayed', host)
+            counters.increment('rate_limit.wait_seconds', host, waited)
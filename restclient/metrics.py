@@ -0,0 +1,79 @@
+import threading
+from collections import defaultdict
+from typing import Dict, DefaultDict
+
+
+class Counters:
+    """
+    Потокобезопасные счетчики событий HTTP-клиента.
+
+    Счетчики группируются по имени события и метке (обычно хосту),
+    например ``rate_limit.delayed`` для ``http://api:5051``.
+    """
+
+    def __init__(self) -> None:
+        """
+        Инициализация пустого набора счетчиков.
+        """
+        self._values: DefaultDict[str, DefaultDict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._lock: threading.Lock = threading.Lock()
+
+    def increment(self, name: str, label: str = '', value: float = 1) -> None:
+        """
+        Увеличение счетчика.
+
+        Args:
+            name (str): Имя события
+            label (str, optional): Метка (хост, операция)
+            value (float, optional): Приращение. По умолчанию 1
+        """
+        with self._lock:
+            self._values[name][label] += value
+
+    def get(self, name: str, label: str = '') -> float:
+        """
+        Текущее значение счетчика.
+
+        Args:
+            name (str): Имя события
+            label (str, optional): Метка
+
+        Returns:
+            float: Значение счетчика (0, если событий не было)
+        """
+        with self._lock:
+            return self._values.get(name, {}).get(label, 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """
+        Копия всех счетчиков.
+
+        Returns:
+            dict: Значения по имени события и метке
+        """
+        with self._lock:
+            return {name: dict(labels) for name, labels in self._values.items()}
+
+    def drain(self, name: str) -> Dict[str, float]:
+        """
+        Значения счетчика по меткам с обнулением.
+
+        Args:
+            name (str): Имя события
+
+        Returns:
+            dict: Значения по метке (пустой, если событий не было)
+        """
+        with self._lock:
+            return dict(self._values.pop(name, {}))
+
+    def reset(self) -> None:
+        """
+        Обнуление всех счетчиков.
+        """
+        with self._lock:
+            self._values.clear()
+
+
+# Общие счетчики всех клиентов процесса
+counters: Counters = Counters()
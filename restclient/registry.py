@@ -0,0 +1,204 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Tuple, Any, Callable, Hashable, Type, TypeVar
+
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError
+
+from restclient.metrics import counters
+
+Service = TypeVar('Service')
+
+
+class PoolPolicy:
+    """
+    Настройки общего пула соединений HTTP/1.1.
+
+    Все клиенты хоста в процессе используют один пул keep-alive соединений,
+    поэтому клиент, созданный для отдельного теста, получает уже открытые
+    соединения. При создании пула можно заранее открыть несколько соединений
+    (prewarm), чтобы первые запросы тестов не тратили время на установку TCP.
+    """
+
+    def __init__(self, maxsize: int = 10, prewarm: int = 0, connect_timeout: float = 5.0) -> None:
+        """
+        Инициализация настроек пула.
+
+        Args:
+            maxsize (int, optional): Число сохраняемых keep-alive соединений с хостом. По умолчанию 10
+            prewarm (int, optional): Число соединений, открываемых заранее (не больше maxsize). По умолчанию 0
+            connect_timeout (float, optional): Таймаут открытия соединения при прогреве в секундах. По умолчанию 5
+        """
+        self.maxsize: int = maxsize
+        self.prewarm: int = min(prewarm, maxsize)
+        self.connect_timeout: float = connect_timeout
+
+
+class SharedHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter, общий для сессий всех клиентов хоста.
+
+    Закрытие отдельной сессии не закрывает соединения других клиентов,
+    пул закрывается только методом shutdown().
+    """
+
+    def close(self) -> None:
+        """
+        Закрытие сессии, в которую смонтирован адаптер (соединения сохраняются).
+        """
+
+    def shutdown(self) -> None:
+        """
+        Закрытие всех соединений пула.
+        """
+        super().close()
+
+    def prewarm(self, host: str, count: int, timeout: float = 5.0) -> int:
+        """
+        Открытие соединений с хостом и возврат их в пул.
+
+        Соединения открываются параллельно; ошибки не прерывают работу
+        (запрос откроет соединение сам) и учитываются счетчиком pool.prewarm_failed.
+
+        У urllib3 нет публичного способа положить открытое соединение в пул,
+        поэтому используются внутренние HTTPConnectionPool._get_conn() и
+        _put_conn() (есть в urllib3 1.26 и 2.x, версия закреплена в
+        requirements.txt). Если их нет, прогрев пропускается со счетчиком
+        pool.prewarm_unsupported.
+
+        Args:
+            host (str): Базовый URL хоста
+            count (int): Число соединений
+            timeout (float, optional): Таймаут открытия соединения в секундах. По умолчанию 5
+
+        Returns:
+            int: Число открытых соединений
+        """
+        pool = self.poolmanager.connection_from_url(host)
+        get_conn: Optional[Callable[[], Any]] = getattr(pool, '_get_conn', None)
+        put_conn: Optional[Callable[[Any], None]] = getattr(pool, '_put_conn', None)
+        if get_conn is None or put_conn is None:
+            counters.increment('pool.prewarm_unsupported', host)
+            return 0
+        connections = [get_conn() for _ in range(count)]
+
+        def connect(connection: Any) -> bool:
+            connection.timeout = timeout
+            try:
+                connection.connect()
+                return True
+            except (OSError, HTTPError):
+                connection.close()
+                return False
+
+        try:
+            with ThreadPoolExecutor(max_workers=count, thread_name_prefix='prewarm') as executor:
+                results = list(executor.map(connect, connections))
+        finally:
+            for connection in connections:
+                put_conn(connection)
+        opened: int = sum(results)
+        counters.increment('pool.prewarmed', host, opened)
+        if opened < count:
+            counters.increment('pool.prewarm_failed', host, count - opened)
+        return opened
+
+
+_pools: Dict[Tuple[int, str], SharedHTTPAdapter] = {}
+_services: Dict[Tuple[int, Type, Hashable], Any] = {}
+_registry_lock: threading.Lock = threading.Lock()
+
+
+def get_pool(host: str, policy: PoolPolicy) -> SharedHTTPAdapter:
+    """
+    Получение общего для процесса пула соединений хоста.
+
+    Пул создается при первом обращении (и, если задано, сразу прогревается);
+    параметры последующих обращений с тем же хостом игнорируются. После fork
+    процесс получает собственный пул. Прогрев выполняется вне блокировки
+    реестра: пулы других хостов и сервисы доступны во время прогрева, а
+    клиенты того же хоста сразу получают пул и при необходимости открывают
+    соединения сами.
+
+    Args:
+        host (str): Базовый URL хоста
+        policy (PoolPolicy): Настройки, используются при создании пула
+
+    Returns:
+        SharedHTTPAdapter: Адаптер с пулом соединений
+    """
+    key: Tuple[int, str] = (os.getpid(), host)
+    with _registry_lock:
+        adapter: Optional[SharedHTTPAdapter] = _pools.get(key)
+        created: bool = adapter is None
+        if created:
+            adapter = _pools[key] = SharedHTTPAdapter(pool_connections=1, pool_maxsize=policy.maxsize)
+    if created and policy.prewarm:
+        adapter.prewarm(host, policy.prewarm, policy.connect_timeout)
+    return adapter
+
+
+def get_service(service: Type[Service], configuration: Any) -> Service:
+    """
+    Получение общего для процесса сервиса (DMApiAccount, MailHogApi) по конфигурации.
+
+    Конфигурации с одинаковыми значениями параметров дают один и тот же
+    экземпляр сервиса. Заголовки сессий общего сервиса меняются у всех его
+    пользователей, поэтому клиенту с собственной авторизацией нужен отдельный
+    экземпляр; соединения он получит из общего пула (Configuration(pool=...)).
+
+    Args:
+        service (Type): Класс сервиса, принимающий configuration
+        configuration (Configuration): Конфигурация подключения
+
+    Returns:
+        Экземпляр сервиса
+    """
+    key: Tuple[int, Type, Hashable] = (os.getpid(), service, configuration_key(configuration))
+    with _registry_lock:
+        instance: Optional[Service] = _services.get(key)
+    if instance is None:
+        created: Service = service(configuration=configuration)
+        with _registry_lock:
+            instance = _services.setdefault(key, created)
+    return instance
+
+
+def configuration_key(value: Any) -> Hashable:
+    """
+    Ключ конфигурации по значениям ее параметров (включая вложенные настройки).
+
+    Объекты сравниваются по атрибутам, изменяемые объекты без атрибутов
+    (очереди, блокировки) — по идентичности.
+
+    Args:
+        value: Конфигурация или значение ее параметра
+
+    Returns:
+        Hashable: Ключ
+    """
+    if value is None or isinstance(value, (str, int, float, bool, bytes, type)) or callable(value):
+        return value
+    if isinstance(value, dict):
+        return tuple(sorted(
+            ((key, configuration_key(item)) for key, item in value.items()), key=lambda pair: str(pair[0])
+        ))
+    if isinstance(value, (list, tuple)):
+        return tuple(configuration_key(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(configuration_key(item) for item in value)
+    if hasattr(value, '__dict__'):
+        return type(value), configuration_key(vars(value))
+    return type(value), id(value)
+
+
+def shutdown_pools() -> None:
+    """
+    Закрытие соединений всех общих пулов процесса.
+    """
+    with _registry_lock:
+        adapters = list(_pools.values())
+        _pools.clear()
+    for adapter in adapters:
+        adapter.shutdown()
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import codecs
+import re
+from json import JSONDecoder
+from typing import Optional, Dict, List, Tuple, Any, Callable, Iterator, Match, Pattern, Sequence, TYPE_CHECKING
+
+from restclient.lazy import lazy_import
+
+if TYPE_CHECKING:
+    from requests import Response
+
+# Ответ уже получен через requests, поэтому модуль загружен к моменту разбора
+requests = lazy_import('requests')
+
+CHUNK_SIZE: int = 16 * 1024
+_WHITESPACE: Pattern[str] = re.compile(r'[\s,]*')
+_STRUCTURE: Pattern[str] = re.compile(r'["\[\]{}]')
+_STRING_SPECIAL: Pattern[str] = re.compile(r'["\\]')
+_SCALAR_END: Pattern[str] = re.compile(r'[\s,\]}]')
+
+
+class _ItemScanner:
+    """
+    Поиск конца элемента JSON-массива по порциям текста.
+
+    Состояние (глубина вложенности, строка, экранирование) сохраняется между
+    порциями, поэтому каждый символ элемента просматривается один раз,
+    а разбор выполняется только после получения элемента целиком.
+    """
+
+    __slots__ = ('scalar', 'depth', 'in_string', 'escaped')
+
+    def __init__(self) -> None:
+        self.scalar: Optional[bool] = None
+        self.depth: int = 0
+        self.in_string: bool = False
+        self.escaped: bool = False
+
+    def feed(self, text: str, start: int = 0) -> int:
+        """
+        Просмотр очередной порции.
+
+        Args:
+            text (str): Порция текста
+            start (int, optional): Позиция начала просмотра (для первой порции — начало элемента)
+
+        Returns:
+            int: Позиция в text сразу после конца элемента или -1, если элемент не закончился
+        """
+        if self.scalar is None:
+            self.scalar = text[start] not in '{["'
+        if self.scalar:
+            match: Optional[Match[str]] = _SCALAR_END.search(text, start)
+            return match.start() if match is not None else -1
+        position: int = start
+        while position < len(text):
+            if self.escaped:
+                position += 1
+                self.escaped = False
+                continue
+            if self.in_string:
+                match = _STRING_SPECIAL.search(text, position)
+                if match is None:
+                    return -1
+                position = match.end()
+                if match.group() == '\\':
+                    self.escaped = True
+                    continue
+                self.in_string = False
+                if not self.depth:
+                    return position
+                continue
+            match = _STRUCTURE.search(text, position)
+            if match is None:
+                return -1
+            position = match.end()
+            char: str = match.group()
+            if char == '"':
+                self.in_string = True
+            elif char in '[{':
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if not self.depth:
+                    return position
+        return -1
+
+
+def iter_json_items(
+        response: Response,
+        key: str,
+        chunk_size: int = CHUNK_SIZE,
+        fields: Optional[Sequence[str]] = None
+) -> Iterator[Any]:
+    """
+    Потоковый разбор элементов массива из JSON-ответа.
+
+    Читает ответ, полученный с stream=True, порциями и возвращает элементы
+    массива верхнего уровня ``key`` по одному, не загружая тело ответа
+    целиком. Элемент, не поместившийся в прочитанные порции, не разбирается
+    заново после каждой порции: его конец ищется сканером по мере чтения,
+    и элемент декодируется один раз. Проекция на fields освобождает
+    ненужные части элемента (например, Raw и MIME письма) сразу после
+    разбора. Если перебор прекращен досрочно, оставшаяся часть ответа не
+    читается; закрытие ответа остается за вызывающим кодом.
+
+    Args:
+        response (requests.Response): Ответ, полученный с stream=True
+        key (str): Ключ массива в объекте верхнего уровня (например, 'items')
+        chunk_size (int, optional): Размер порции чтения в байтах. По умолчанию 16 КБ
+        fields (Sequence[str], optional): Поля элемента, которые нужно вернуть, через точку
+            (например, ('ID', 'Content.Body')). По умолчанию элемент возвращается целиком
+
+    Yields:
+        Элементы массива (или их проекции на fields) в порядке следования в ответе
+
+    Raises:
+        requests.exceptions.JSONDecodeError: Если ответ не содержит массива key или поврежден
+    """
+    decoder: JSONDecoder = JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    array_start: Pattern[str] = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    chunks: Iterator[bytes] = response.iter_content(chunk_size=chunk_size)
+    paths: Optional[List[Tuple[str, ...]]] = [tuple(field.split('.')) for field in fields] if fields else None
+    buffer: str = ''
+    position: int = -1
+
+    def read() -> str:
+        chunk: bytes = next(chunks, b'')
+        if not chunk:
+            return text_decoder.decode(b'', final=True)
+        return text_decoder.decode(chunk) or read()
+
+    while position < 0:
+        match = array_start.search(buffer)
+        if match is not None:
+            position = match.end()
+            continue
+        text: str = read()
+        if not text:
+            raise requests.JSONDecodeError(f'Массив "{key}" не найден в ответе', buffer, 0)
+        buffer += text
+
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        if position >= len(buffer):
+            buffer, position = read(), 0
+            if not buffer:
+                break
+            continue
+        if buffer[position] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+            # Число в конце прочитанного текста может продолжаться в следующей порции
+            complete: bool = end < len(buffer) or buffer[position] in '{["'
+        except ValueError:
+            complete = False
+        if not complete:
+            item, rest = _read_item(buffer, position, read, decoder, key)
+            buffer, end = rest, 0
+        yield _project(item, paths) if paths is not None else item
+        position = end
+    raise requests.JSONDecodeError(f'Ответ оборван внутри массива "{key}"', buffer, position)
+
+
+def _read_item(
+        buffer: str,
+        position: int,
+        read: Callable[[], str],
+        decoder: JSONDecoder,
+        key: str
+) -> Tuple[Any, str]:
+    """
+    Дочитывание элемента, продолжающегося в следующих порциях.
+
+    Конец элемента ищется сканером, который просматривает каждую порцию один
+    раз; элемент декодируется после склейки.
+
+    Returns:
+        tuple: Элемент и непрочитанный остаток последней порции
+    """
+    scanner: _ItemScanner = _ItemScanner()
+    end: int = scanner.feed(buffer, position)
+    pieces: List[str] = [buffer[position:] if end < 0 else buffer[position:end]]
+    rest: str = buffer[end:] if end >= 0 else ''
+    while end < 0:
+        text: str = read()
+        if not text:
+            if scanner.scalar:
+                # Число в конце ответа: массив все равно оборван, ошибку сообщает вызывающий код
+                break
+            raise requests.JSONDecodeError(f'Ответ оборван внутри массива "{key}"', ''.join(pieces), 0)
+        end = scanner.feed(text)
+        pieces.append(text if end < 0 else text[:end])
+        rest = text[end:] if end >= 0 else ''
+    source: str = ''.join(pieces)
+    try:
+        return decoder.decode(source), rest
+    except ValueError as e:
+        raise requests.JSONDecodeError(f'Поврежден элемент массива "{key}": {e.args[0]}', source, 0) from e
+
+
+def _project(item: Any, paths: List[Tuple[str, ...]]) -> Any:
+    """
+    Проекция элемента-объекта на заданные поля (отсутствующие поля пропускаются).
+    """
+    if not isinstance(item, dict):
+        return item
+    result: Dict[str, Any] = {}
+    for path in paths:
+        value: Any = item
+        for part in path:
+            if not isinstance(value, dict) or part not in value:
+                break
+            value = value[part]
+        else:
+            target: Dict[str, Any] = result
+            for part in path[:-1]:
+                target = target.setdefault(part, {})
+            target[path[-1]] = value
+    return result
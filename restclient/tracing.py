@@ -0,0 +1,323 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Optional, Dict, Any, List, Callable, Generator, TextIO
+
+SPAN_KIND_INTERNAL: int = 1
+SPAN_KIND_CLIENT: int = 3
+
+STATUS_UNSET: int = 0
+STATUS_OK: int = 1
+STATUS_ERROR: int = 2
+
+
+class Span:
+    """
+    Отрезок трассировки (span) в терминах OpenTelemetry.
+
+    Хранит идентификаторы трассы и родителя, время начала и окончания
+    в наносекундах, атрибуты и статус выполнения операции.
+    """
+
+    __slots__ = (
+        'name', 'trace_id', 'span_id', 'parent', 'kind', 'attributes',
+        'start_time_ns', 'end_time_ns', 'status_code', 'status_message',
+    )
+
+    def __init__(
+            self,
+            name: str,
+            trace_id: str,
+            span_id: str,
+            parent: Optional['Span'] = None,
+            kind: int = SPAN_KIND_INTERNAL,
+            attributes: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Инициализация span.
+
+        Args:
+            name (str): Имя операции
+            trace_id (str): Идентификатор трассы (32 hex-символа)
+            span_id (str): Идентификатор span (например, event_id запроса)
+            parent (Span, optional): Родительский span
+            kind (int, optional): Вид span (SPAN_KIND_INTERNAL или SPAN_KIND_CLIENT)
+            attributes (dict, optional): Начальные атрибуты span
+        """
+        self.name: str = name
+        self.trace_id: str = trace_id
+        self.span_id: str = span_id
+        self.parent: Optional[Span] = parent
+        self.kind: int = kind
+        self.attributes: Dict[str, Any] = attributes or {}
+        self.start_time_ns: int = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.status_code: int = STATUS_UNSET
+        self.status_message: str = ''
+
+    @property
+    def duration(self) -> float:
+        """
+        Длительность span в секундах (0, если span еще не завершен).
+        """
+        if self.end_time_ns is None:
+            return 0.0
+        return (self.end_time_ns - self.start_time_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """
+        Установка атрибута span.
+
+        Args:
+            key (str): Имя атрибута
+            value: Значение атрибута (str, int, float или bool)
+        """
+        self.attributes[key] = value
+
+    def set_error(self, error: BaseException) -> None:
+        """
+        Отметка span как завершившегося с ошибкой.
+
+        Args:
+            error (BaseException): Исключение, прервавшее операцию
+        """
+        self.status_code = STATUS_ERROR
+        self.status_message = f'{type(error).__name__}: {error}'
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """
+        Представление span в формате OTLP/JSON.
+
+        OpenTelemetry требует 8-байтовый spanId, поэтому идентификатор на основе
+        UUID (event_id из логов RestClient) укорачивается до 16 hex-символов,
+        а полное значение сохраняется в атрибуте ``event_id``.
+
+        Returns:
+            dict: Span в формате OTLP/JSON
+        """
+        attributes: Dict[str, Any] = dict(self.attributes)
+        attributes.setdefault('event_id', self.span_id)
+        otlp: Dict[str, Any] = {
+            'traceId': self.trace_id,
+            'spanId': _to_otlp_span_id(self.span_id),
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_time_ns),
+            'endTimeUnixNano': str(self.end_time_ns),
+            'attributes': [
+                {'key': key, 'value': _to_otlp_value(value)} for key, value in attributes.items()
+            ],
+            'status': {'code': self.status_code},
+        }
+        if self.parent is not None:
+            otlp['parentSpanId'] = _to_otlp_span_id(self.parent.span_id)
+        if self.status_message:
+            otlp['status']['message'] = self.status_message
+        return otlp
+
+
+class FileSpanExporter:
+    """
+    Экспортер span в локальный файл.
+
+    Каждый завершенный span записывается отдельной строкой в формате
+    OTLP/JSON (ExportTraceServiceRequest), что позволяет загрузить файл
+    в otel-collector (file receiver) или просмотреть его вручную.
+    """
+
+    def __init__(
+            self,
+            file_path: str,
+            service_name: str = 'new-api-framework'
+    ) -> None:
+        """
+        Инициализация файлового экспортера.
+
+        Args:
+            file_path (str): Путь к файлу для записи span
+            service_name (str, optional): Значение атрибута ресурса service.name
+        """
+        directory: str = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file_path: str = file_path
+        self.resource: Dict[str, Any] = {
+            'attributes': [{'key': 'service.name', 'value': {'stringValue': service_name}}]
+        }
+        self._file: TextIO = open(file_path, 'a', encoding='utf-8')
+        self._lock: threading.Lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        """
+        Запись завершенного span в файл.
+
+        Args:
+            span (Span): Завершенный span
+        """
+        line: str = json.dumps(
+            {
+                'resourceSpans': [{
+                    'resource': self.resource,
+                    'scopeSpans': [{'scope': {'name': __name__}, 'spans': [span.to_otlp()]}],
+                }]
+            },
+            ensure_ascii=False
+        )
+        with self._lock:
+            self._file.write(line + '\n')
+
+    def shutdown(self) -> None:
+        """
+        Сброс буфера и закрытие файла.
+        """
+        with self._lock:
+            self._file.close()
+
+
+_exporters: List[Any] = []
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+
+def add_exporter(exporter: Any) -> None:
+    """
+    Подключение экспортера span.
+
+    Пока не подключен ни один экспортер, трассировка не создает span
+    и не влияет на время выполнения запросов.
+
+    Args:
+        exporter: Объект с методом ``export(span)``
+    """
+    _exporters.append(exporter)
+
+
+def remove_exporter(exporter: Any) -> None:
+    """
+    Отключение ранее подключенного экспортера.
+
+    Args:
+        exporter: Экспортер, переданный в add_exporter
+    """
+    if exporter in _exporters:
+        _exporters.remove(exporter)
+
+
+def is_enabled() -> bool:
+    """
+    Проверка, включена ли трассировка.
+
+    Returns:
+        bool: True, если подключен хотя бы один экспортер
+    """
+    return bool(_exporters)
+
+
+def current_span() -> Optional[Span]:
+    """
+    Получение активного span текущего контекста.
+
+    Returns:
+        Span или None: Активный span
+    """
+    return _current_span.get()
+
+
+@contextmanager
+def start_span(
+        name: str,
+        span_id: Optional[str] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None
+) -> Generator[Optional[Span], None, None]:
+    """
+    Контекстный менеджер, открывающий дочерний span активного span.
+
+    Если трассировка выключена, возвращает None и ничего не записывает.
+
+    Args:
+        name (str): Имя операции
+        span_id (str, optional): Идентификатор span. По умолчанию генерируется UUID
+        kind (int, optional): Вид span
+        attributes (dict, optional): Начальные атрибуты
+
+    Yields:
+        Span или None: Открытый span
+    """
+    if not _exporters:
+        yield None
+        return
+    parent: Optional[Span] = _current_span.get()
+    trace_id: str = parent.trace_id if parent is not None else uuid.uuid4().hex
+    span: Span = Span(
+        name=name,
+        trace_id=trace_id,
+        span_id=span_id or str(uuid.uuid4()),
+        parent=parent,
+        kind=kind,
+        attributes=attributes
+    )
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.set_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end_time_ns = time.time_ns()
+        for exporter in list(_exporters):
+            exporter.export(span)
+
+
+def traced(name: Optional[str] = None) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Декоратор, оборачивающий вызов функции в span.
+
+    Используется для методов AccountHelper: span метода становится
+    родительским для span всех HTTP-запросов, выполненных внутри него.
+
+    Args:
+        name (str, optional): Имя span. По умолчанию — имя функции
+
+    Returns:
+        Callable: Декоратор
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        span_name: str = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _exporters:
+                return func(*args, **kwargs)
+            with start_span(name=span_name, attributes={'code.function': func.__qualname__}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _to_otlp_span_id(span_id: str) -> str:
+    """
+    Преобразование идентификатора span к 16 hex-символам формата OTLP.
+    """
+    return span_id.replace('-', '')[:16]
+
+
+def _to_otlp_value(value: Any) -> Dict[str, Any]:
+    """
+    Преобразование значения атрибута к AnyValue формата OTLP.
+    """
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
@@ -0,0 +1,330 @@
+import importlib.util
+import os
+import threading
+from typing import Optional, Dict, Tuple, Union, Any, Iterator, Set
+from urllib.parse import urlsplit
+
+from requests import ConnectionError, ConnectTimeout, PreparedRequest, ReadTimeout, Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from restclient.hedging import IDEMPOTENT_METHODS
+from restclient.lazy import lazy_import
+from restclient.metrics import counters
+
+# Нужен только для предупреждений о переходе на HTTP/1.1: загружается при первом обращении
+structlog = lazy_import('structlog')
+
+# Заголовки соединения HTTP/1.1, запрещенные в HTTP/2
+HOP_BY_HOP_HEADERS = frozenset({'connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade'})
+
+Timeout = Union[None, float, Tuple[Optional[float], Optional[float]]]
+
+
+def http2_available() -> bool:
+    """
+    Проверка наличия необязательных зависимостей HTTP/2 (httpx и h2).
+
+    Returns:
+        bool: True, если транспорт HTTP/2 можно использовать
+    """
+    return importlib.util.find_spec('httpx') is not None and importlib.util.find_spec('h2') is not None
+
+
+class Http2Policy:
+    """
+    Настройки транспорта HTTP/2.
+
+    Запросы всех клиентов процесса к хосту мультиплексируются в несколько
+    соединений HTTP/2 вместо отдельного соединения HTTP/1.1 на каждый
+    одновременный запрос. Для http:// соединение открывается сразу в HTTP/2
+    (prior knowledge, h2c), для https:// протокол согласуется через ALPN.
+    Если хост не поддерживает HTTP/2 или не установлены httpx и h2,
+    запросы отправляются обычным HTTP/1.1 через requests.
+    """
+
+    def __init__(
+            self,
+            max_connections: int = 4,
+            keepalive_expiry: float = 30.0,
+            prior_knowledge: bool = True,
+            fallback: bool = True
+    ) -> None:
+        """
+        Инициализация настроек транспорта HTTP/2.
+
+        Args:
+            max_connections (int, optional): Предел соединений с хостом на процесс. По умолчанию 4
+            keepalive_expiry (float, optional): Время жизни простаивающего соединения в секундах. По умолчанию 30
+            prior_knowledge (bool, optional): HTTP/2 без согласования для http:// (h2c). По умолчанию True
+            fallback (bool, optional): Переход на HTTP/1.1, если хост не принял HTTP/2. По умолчанию True
+        """
+        self.max_connections: int = max_connections
+        self.keepalive_expiry: float = keepalive_expiry
+        self.prior_knowledge: bool = prior_knowledge
+        self.fallback: bool = fallback
+
+
+class Http2Adapter(BaseAdapter):
+    """
+    Транспортный адаптер requests, отправляющий запросы через httpx по HTTP/2.
+
+    Монтируется в сессию RestClient на URL хоста, поэтому подготовленные
+    запросы, хеджирование, кэш и ограничители работают без изменений, а
+    ответ возвращается обычным requests.Response. Ошибки httpx переводятся
+    в исключения requests (ConnectTimeout, ReadTimeout, ConnectionError).
+
+    Если соединение с хостом установлено, но хост ответил не кадрами HTTP/2
+    (ошибка протокола, хост не понимает HTTP/2), хост переводится на
+    HTTP/1.1. Идемпотентный запрос (IDEMPOTENT_METHODS) при этом повторяется
+    через HTTPAdapter, а остальные завершаются ConnectionError: тело уже
+    могло быть отправлено и обработано, и повтор зарегистрировал бы
+    пользователя или сменил пароль дважды. Обрывы чтения и записи
+    (ReadError, WriteError) считаются временными: хост не переводится на
+    HTTP/1.1, запрос не повторяется. После первого успешного ответа по
+    HTTP/2 ошибки протокола также не считаются признаком отсутствия
+    поддержки. Cookie из ответов HTTP/2 в сессию не переносятся.
+    """
+
+    def __init__(self, policy: Http2Policy, name: str = '') -> None:
+        """
+        Инициализация адаптера.
+
+        Args:
+            policy (Http2Policy): Настройки транспорта
+            name (str, optional): Имя для счетчиков (обычно хост)
+        """
+        super().__init__()
+        self.policy: Http2Policy = policy
+        self.name: str = name
+        self.fallback: HTTPAdapter = HTTPAdapter()
+        self._clients: Dict[Tuple[int, bool, Any], Any] = {}
+        self._http1_origins: Set[str] = set()
+        self._http2_origins: Set[str] = set()
+        self._lock: threading.Lock = threading.Lock()
+
+    def send(
+            self,
+            request: PreparedRequest,
+            stream: bool = False,
+            timeout: Timeout = None,
+            verify: Union[bool, str] = True,
+            cert: Any = None,
+            proxies: Optional[Dict[str, str]] = None
+    ) -> Response:
+        """
+        Отправка подготовленного запроса.
+
+        Args:
+            request (PreparedRequest): Запрос
+            stream (bool, optional): Не читать тело ответа сразу
+            timeout (float или tuple, optional): Таймаут (общий или на соединение и чтение)
+            verify (bool или str, optional): Проверка сертификата
+            cert: Клиентский сертификат (передается только HTTP/1.1)
+            proxies (dict, optional): Прокси (передаются только HTTP/1.1)
+
+        Returns:
+            requests.Response: Ответ
+
+        Raises:
+            requests.ConnectTimeout: Если соединение не установлено за таймаут
+            requests.ReadTimeout: Если ответ не получен за таймаут
+            requests.ConnectionError: При прочих ошибках транспорта, в том числе при переходе хоста
+                на HTTP/1.1 во время неидемпотентного запроса
+        """
+        origin: str = _origin(request.url)
+        if origin in self._http1_origins or cert is not None or proxies:
+            return self.fallback.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        httpx = lazy_import('httpx')
+        client = self._client(request.url.startswith('https://'), verify)
+        headers: Dict[str, str] = {
+            name: value for name, value in request.headers.items() if name.lower() not in HOP_BY_HOP_HEADERS
+        }
+        try:
+            http2_response = client.send(
+                client.build_request(
+                    request.method, request.url, headers=headers, content=request.body, timeout=_timeout(timeout)
+                ),
+                stream=True
+            )
+        except httpx.ConnectTimeout as e:
+            raise ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise ReadTimeout(e, request=request)
+        except httpx.RemoteProtocolError as e:
+            # Хост HTTP/1.1 отвечает на преамбулу HTTP/2 не кадрами HTTP/2 или закрывает соединение
+            if not self.policy.fallback or origin in self._http2_origins:
+                raise ConnectionError(e, request=request)
+            with self._lock:
+                self._http1_origins.add(origin)
+            counters.increment('http2.fallback', origin)
+            _warn_once(
+                f'http2.fallback {origin}', 'Host does not accept HTTP/2, using HTTP/1.1', origin=origin, error=str(e)
+            )
+            if request.method not in IDEMPOTENT_METHODS:
+                raise ConnectionError(e, request=request)
+            return self.fallback.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        except httpx.TransportError as e:
+            raise ConnectionError(e, request=request)
+        if origin not in self._http2_origins and http2_response.http_version == 'HTTP/2':
+            with self._lock:
+                self._http2_origins.add(origin)
+        response: Response = self.build_response(request, http2_response)
+        if not stream:
+            response.content  # Тело читается сразу, как в HTTPAdapter, и соединение освобождается
+        return response
+
+    def build_response(self, request: PreparedRequest, http2_response: Any) -> Response:
+        """
+        Преобразование ответа httpx в requests.Response.
+
+        Args:
+            request (PreparedRequest): Отправленный запрос
+            http2_response (httpx.Response): Ответ httpx с непрочитанным телом
+
+        Returns:
+            requests.Response: Ответ
+        """
+        response: Response = Response()
+        response.status_code = http2_response.status_code
+        response.headers = CaseInsensitiveDict(http2_response.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = http2_response.reason_phrase
+        response.raw = _RawStream(http2_response, request)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self) -> None:
+        """
+        Закрытие сессии, в которую смонтирован адаптер.
+
+        Адаптер общий для всех клиентов хоста в процессе, поэтому соединения
+        закрываются только при завершении процесса.
+        """
+
+    def _client(self, https: bool, verify: Union[bool, str]) -> Any:
+        """
+        Клиент httpx для схемы и проверки сертификата (отдельный в каждом процессе после fork).
+        """
+        key: Tuple[int, bool, Any] = (os.getpid(), https, verify)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    httpx = lazy_import('httpx')
+                    client = self._clients[key] = httpx.Client(
+                        http1=https or not self.policy.prior_knowledge,
+                        http2=True,
+                        verify=verify,
+                        limits=httpx.Limits(
+                            max_connections=self.policy.max_connections,
+                            max_keepalive_connections=self.policy.max_connections,
+                            keepalive_expiry=self.policy.keepalive_expiry
+                        ),
+                        trust_env=False
+                    )
+        return client
+
+
+class _RawStream:
+    """
+    Тело ответа httpx в интерфейсе Response.raw, который использует requests.
+    """
+
+    def __init__(self, http2_response: Any, request: PreparedRequest) -> None:
+        self._response = http2_response
+        self._request: PreparedRequest = request
+        self.version: int = 20 if http2_response.http_version == 'HTTP/2' else 11
+
+    def stream(self, amt: int = 65536, decode_content: bool = True) -> Iterator[bytes]:
+        """
+        Чтение тела частями (распакованного, как в urllib3 при decode_content=True).
+        """
+        httpx = lazy_import('httpx')
+        try:
+            yield from self._response.iter_bytes(chunk_size=amt)
+        except httpx.TransportError as e:
+            raise ConnectionError(e, request=self._request)
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        """
+        Чтение оставшегося тела целиком.
+        """
+        return b''.join(self.stream())
+
+    def tell(self) -> int:
+        """
+        Число байт тела, полученных по сети (до распаковки).
+        """
+        return self._response.num_bytes_downloaded
+
+    def close(self) -> None:
+        self._response.close()
+
+
+_transports: Dict[str, Http2Adapter] = {}
+_warned: Set[str] = set()
+_registry_lock: threading.Lock = threading.Lock()
+
+
+def get_transport(host: str, policy: Http2Policy) -> Optional[Http2Adapter]:
+    """
+    Получение общего для процесса адаптера HTTP/2 хоста.
+
+    Все клиенты хоста в процессе используют общий пул соединений, поэтому
+    число соединений не растет с числом клиентов (виртуальных пользователей).
+    Параметры последующих обращений с тем же хостом игнорируются.
+
+    Args:
+        host (str): Базовый URL хоста
+        policy (Http2Policy): Настройки, используются при создании адаптера
+
+    Returns:
+        Http2Adapter или None: Адаптер или None, если httpx и h2 не установлены (остается HTTP/1.1)
+    """
+    if not http2_available():
+        counters.increment('http2.unavailable', host)
+        _warn_once(
+            'http2.unavailable', 'HTTP/2 unavailable: httpx and h2 are not installed, using HTTP/1.1',
+            hint='pip install -r requirements-http2.txt'
+        )
+        return None
+    with _registry_lock:
+        adapter: Optional[Http2Adapter] = _transports.get(host)
+        if adapter is None:
+            adapter = _transports[host] = Http2Adapter(policy=policy, name=host)
+        return adapter
+
+
+def _warn_once(key: str, event: str, **fields: Any) -> None:
+    """
+    Предупреждение в логе один раз на процесс для ключа (счетчики при этом растут на каждое событие).
+    """
+    with _registry_lock:
+        if key in _warned:
+            return
+        _warned.add(key)
+    structlog.getLogger(__name__).warning(event, **fields)
+
+
+def _origin(url: str) -> str:
+    """
+    Схема, хост и порт URL.
+    """
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.netloc}'
+
+
+def _timeout(timeout: Timeout) -> Any:
+    """
+    Таймаут requests (общий или пара соединение/чтение) в формате httpx.
+    """
+    httpx = lazy_import('httpx')
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(connect=connect, read=read, write=read, pool=connect)
+    return httpx.Timeout(timeout)
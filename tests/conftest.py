@@ -1,14 +1,29 @@
+import os
+import time
+from typing import List, Any, Iterable
+
 import pytest
 import structlog
-from faker import Faker
-from datetime import datetime
-from collections import namedtuple
 from helpers.account_helper import AccountHelper
+from helpers.data_generator import CredentialPool
+from restclient import tracing
 from restclient.configuration import Configuration as MailhogConfiguration
+from restclient.limits import RateLimitPolicy, CircuitBreakerPolicy
 from restclient.configuration import Configuration as DmApiConfiguration
+from restclient.balancer import close_balancers
+from restclient.hedging import shutdown_executors
+from restclient.registry import PoolPolicy, get_service, shutdown_pools
 from services.dm_api_account import DMApiAccount
 from services.api_mailhog import MailHogApi
 
+pytest_plugins = [
+    'plugins.profiling',
+    'plugins.flight_recorder',
+    'plugins.history',
+    'plugins.scheduling',
+    'plugins.breakdown',
+]
+
 # Настройка структурированного логирования
 structlog.configure(
     processors=[
@@ -21,19 +36,141 @@ structlog.configure(
 )
 
 
+class CleanupReporter:
+    """
+    Вывод итогов очистки пользователей (фикстура cleanup_users) в сводке pytest.
+
+    Очистка выполняется при завершении сессии, после вывода результатов
+    тестов, поэтому итоги копятся и печатаются в pytest_terminal_summary.
+    Воркеры pytest-xdist передают свои итоги контроллеру.
+    """
+
+    def __init__(self, config: pytest.Config) -> None:
+        """
+        Инициализация пустого отчета.
+
+        Args:
+            config (pytest.Config): Конфигурация pytest
+        """
+        self.config: pytest.Config = config
+        self.lines: List[str] = []
+
+    def add(self, results: Iterable[Any]) -> None:
+        """
+        Добавление итогов очистки.
+
+        Args:
+            results (Iterable[BulkResult]): Итоги AccountHelper.cleanup_users()
+        """
+        for result in results:
+            self.lines.append(str(result))
+            self.lines.extend(f'  {item}: {error}' for item, error in result.errors)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node: Any, error: Any) -> None:
+        self.lines.extend(getattr(node, 'workeroutput', {}).get('cleanup', []))
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        # trylast: фикстуры сессии (и очистка) завершаются в pytest_sessionfinish раннера pytest
+        if hasattr(self.config, 'workerinput'):
+            self.config.workeroutput['cleanup'] = self.lines
+
+    def pytest_terminal_summary(self, terminalreporter: Any) -> None:
+        if not self.lines:
+            return
+        terminalreporter.write_sep('=', 'cleanup')
+        for line in self.lines:
+            terminalreporter.write_line(line)
+
+
+def pytest_configure(config):
+    config.pluginmanager.register(CleanupReporter(config), 'cleanup-reporter')
+
+
+def dm_api_limits():
+    """
+    Ограничения нагрузки на общий стенд DM API.
+    
+    Включаются переменными окружения, когда несколько человек одновременно
+    запускают тесты: API_RATE_LIMIT — запросов в секунду на хост от всего
+    прогона, API_CIRCUIT_BREAKER — автомат защиты, прекращающий запросы при
+    массовых ошибках. Ведро токенов у каждого процесса свое, поэтому при
+    запуске с -n лимит делится между воркерами xdist поровну.
+    
+    Returns:
+        dict: Параметры rate_limit и circuit_breaker для Configuration
+    """
+    limits = {}
+    if os.getenv('API_RATE_LIMIT'):
+        workers = int(os.getenv('PYTEST_XDIST_WORKER_COUNT', '1'))
+        limits['rate_limit'] = RateLimitPolicy(rate=float(os.environ['API_RATE_LIMIT']) / workers)
+    if os.getenv('API_CIRCUIT_BREAKER'):
+        limits['circuit_breaker'] = CircuitBreakerPolicy()
+    return limits
+
+
+def connection_pool():
+    """
+    Общий пул соединений клиентов тестовой сессии.
+    
+    Клиенты, создаваемые для каждого теста, берут соединения из общего пула,
+    а при создании пула заранее открывается API_PREWARM соединений (по умолчанию 2),
+    чтобы первые запросы тестов не тратили время на установку TCP.
+    
+    Returns:
+        PoolPolicy: Настройки пула
+    """
+    return PoolPolicy(prewarm=int(os.getenv('API_PREWARM', '2')))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def shared_pools():
+    """
+    Фикстура закрытия общих пулов соединений, балансировщиков и потоков хеджирования в конце тестовой сессии.
+    """
+    yield
+    shutdown_pools()
+    close_balancers()
+    shutdown_executors()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def trace_exporter():
+    """
+    Фикстура для записи трассировки запросов в локальный файл.
+    
+    Включается переменной окружения TRACE_FILE (путь к файлу span в формате OTLP/JSON).
+    Без нее трассировка выключена и не влияет на время выполнения тестов.
+    
+    Yields:
+        FileSpanExporter или None: Подключенный экспортер
+    """
+    trace_file = os.getenv('TRACE_FILE')
+    if not trace_file:
+        yield None
+        return
+    exporter = tracing.FileSpanExporter(trace_file)
+    tracing.add_exporter(exporter)
+    yield exporter
+    tracing.remove_exporter(exporter)
+    exporter.shutdown()
+
+
 @pytest.fixture(scope="session")
 def mailhog_api():
     """
     Фикстура для создания клиента MailHog API.
     
     Создает клиент для работы с тестовым почтовым сервером MailHog.
+    Клиент берется из общего реестра процесса по конфигурации.
     Область действия - сессия (создается один раз на всю тестовую сессию).
     
     Returns:
         MailHogApi: Клиент MailHog API
     """
-    mailhog_configuration = MailhogConfiguration(host='http://5.63.153.31:5025')
-    mailhog_client = MailHogApi(configuration=mailhog_configuration)
+    mailhog_configuration = MailhogConfiguration(host='http://5.63.153.31:5025', pool=connection_pool())
+    mailhog_client = get_service(MailHogApi, mailhog_configuration)
     return mailhog_client
 
 
@@ -43,39 +180,74 @@ def account_api():
     Фикстура для создания клиента API аккаунтов.
     
     Создает клиент для работы с API управления аккаунтами пользователей.
+    Клиент берется из общего реестра процесса по конфигурации.
     Область действия - сессия (создается один раз на всю тестовую сессию).
     
     Returns:
         DMApiAccount: Клиент API аккаунтов
     """
-    dm_api_configuration = DmApiConfiguration(host='http://5.63.153.31:5051', disable_log=False)
-    account = DMApiAccount(configuration=dm_api_configuration)
+    dm_api_configuration = DmApiConfiguration(
+        host='http://5.63.153.31:5051', disable_log=False, pool=connection_pool(), **dm_api_limits()
+    )
+    account = get_service(DMApiAccount, dm_api_configuration)
     return account
 
 
+@pytest.fixture(scope="session")
+def cleanup_users(account_helper, pytestconfig):
+    """
+    Фикстура для массовой очистки после тестовой сессии.
+    
+    Тесты регистрируют токены авторизованных клиентов и адреса созданных
+    пользователей; в конце сессии пользователи параллельно выходят из системы,
+    а их письма удаляются из MailHog. Включается переменной окружения
+    TEST_CLEANUP, без нее данные только собираются.
+    
+    Итоги очистки выводятся в сводке pytest (CleanupReporter).
+    
+    Args:
+        account_helper: Helper для работы с аккаунтами (внедряется автоматически)
+        pytestconfig: Конфигурация pytest (внедряется автоматически)
+        
+    Yields:
+        dict: Множества 'tokens' и 'emails' для регистрации
+    """
+    registry = {'tokens': set(), 'emails': set()}
+    yield registry
+    if not os.getenv('TEST_CLEANUP'):
+        return
+    results = account_helper.cleanup_users(tokens=registry['tokens'], emails=registry['emails'])
+    pytestconfig.pluginmanager.get_plugin('cleanup-reporter').add(results)
+
+
 @pytest.fixture(scope="function")
-def auth_account_helper(mailhog_api):
+def auth_account_helper(mailhog_api, cleanup_users):
     """
     Фикстура для создания предварительно аутентифицированного AccountHelper.
     
     Создает AccountHelper с уже выполненной аутентификацией пользователя.
+    Клиент новый для каждого теста, но использует прогретый общий пул соединений.
     Область действия - функция (создается для каждого теста).
     
     Args:
         mailhog_api: Клиент MailHog API (внедряется автоматически)
+        cleanup_users: Реестр очистки (внедряется автоматически)
         
     Returns:
         AccountHelper: Предварительно аутентифицированный helper
     """
     dm_api_configuration = DmApiConfiguration(
-        host='http://5.63.153.31:5051', disable_log=False
+        host='http://5.63.153.31:5051', disable_log=False, pool=connection_pool(), **dm_api_limits()
     )
+    # Отдельный экземпляр: заголовок авторизации не должен попасть в общий клиент,
+    # соединения берутся из общего пула хоста
     account = DMApiAccount(configuration=dm_api_configuration)
     account_helper = AccountHelper(dm_account_api=account, mailhog=mailhog_api)
     account_helper.auth_client(
         login="golovan010",
         password="112233"
     )
+    cleanup_users['tokens'].add(account.account_api.session.headers['x-dm-auth-token'])
     return account_helper
 
 
@@ -101,38 +273,42 @@ def account_helper(
     return account_helper
 
 
-@pytest.fixture
-def prepare_user():
+@pytest.fixture(scope="session")
+def credentials():
     """
-    Фикстура для создания уникального тестового пользователя.
+    Фикстура пула учетных данных тестовых пользователей.
     
-    Генерирует уникальные данные пользователя с временной меткой,
-    что позволяет избежать конфликтов при параллельном выполнении тестов.
-    Область действия - функция (создается для каждого теста).
+    Данные генерируются пачками один раз на сессию. Переменная окружения
+    TEST_DATA_SEED делает последовательность воспроизводимой; уникальность
+    логинов между запусками обеспечивает пространство имен пула из времени
+    создания, а между воркерами xdist, которые с одним seed генерируют
+    одинаковые логины, — имя воркера в нем.
+    Область действия - сессия (создается один раз на всю тестовую сессию).
     
     Returns:
-        namedtuple: Объект с полями login, password, email
-    """
-    now = datetime.now()
-    data = now.strftime("%d_%m_%Y_%H_%M_%S_%f")
-    login = f'golovan_{data}'
-    password = '112233'
-    email = f'{login}@mail.ru'
-    User = namedtuple("User", ["login", "password", "email"])
-    user = User(login=login, password=password, email=email)
-    return user
+        CredentialPool: Пул учетных данных
+    """
+    seed = os.getenv('TEST_DATA_SEED')
+    namespace = f"{time.time_ns() // 1000:x}{os.getenv('PYTEST_XDIST_WORKER', '')}"
+    return CredentialPool(seed=int(seed) if seed else None, namespace=namespace)
 
 
-@pytest.fixture(name="fake")
-def fake_data():
+@pytest.fixture
+def prepare_user(credentials, cleanup_users):
     """
-    Фикстура для генерации тестовых данных.
+    Фикстура для создания уникального тестового пользователя.
     
-    Создает экземпляр Faker для генерации реалистичных тестовых данных
-    (имена, email, пароли и т.д.).
+    Берет из пула уникальные логин, пароль и email, что позволяет избежать
+    конфликтов при параллельном выполнении тестов.
+    Область действия - функция (создается для каждого теста).
     
+    Args:
+        credentials: Пул учетных данных (внедряется автоматически)
+        cleanup_users: Реестр очистки (внедряется автоматически)
+        
     Returns:
-        Faker: Генератор тестовых данных
+        User: Объект с полями login, password, email
     """
-    fake = Faker()
-    return fake
+    user = credentials.user()
+    cleanup_users['emails'].add(user.email)
+    return user
@@ -0,0 +1,12 @@
+import os
+
+import pytest
+
+from load.declarative import FLOWS_DIR, load_scenario_file
+
+ACCOUNT_FLOWS = load_scenario_file(os.path.join(FLOWS_DIR, 'account.toml'))
+
+
+@pytest.mark.parametrize('flow', ACCOUNT_FLOWS.flows, ids=lambda flow: flow.name)
+def test_account_flow(account_helper, prepare_user, flow):
+    flow.run(account_helper, bindings={'user': prepare_user}, think=False)
@@ -1,9 +1,8 @@
-import random
 from datetime import datetime
 import pytest
-from faker import Faker
 from hamcrest import assert_that, has_property, starts_with, all_of, instance_of, has_properties, equal_to
 from checkers.http_checkers import check_status_code_http
+from helpers.data_generator import CredentialPool
 
 def test_post_v1_account(account_helper, prepare_user):
     login = prepare_user.login
@@ -32,21 +31,14 @@ def test_post_v1_account(account_helper, prepare_user):
         )
     )
 
-fake = Faker()
+invalid_users = CredentialPool(size=1, seed=0)
 
 
 @pytest.mark.parametrize(
     "login, password, email, expected_status_code, expected_message", [
-        pytest.param(
-            fake.name(), fake.password(length=5), fake.email(), 400, "Validation failed", id="Invalid password"
-        ),
-        pytest.param(
-            '1', fake.password(length=random.randint(6, 8)), fake.email(), 400, "Validation failed", id='Invalid login'
-        ),
-        pytest.param(
-            fake.name(), fake.password(length=random.randint(6, 8)), "example.com", 400, "Validation failed",
-            id='Invalid email'
-        ),
+        pytest.param(*invalid_users.invalid('password'), 400, "Validation failed", id="Invalid password"),
+        pytest.param(*invalid_users.invalid('login'), 400, "Validation failed", id='Invalid login'),
+        pytest.param(*invalid_users.invalid('email'), 400, "Validation failed", id='Invalid email'),
     ]
 )
 def test_negative_post_v1_account(account_helper, login, password, email, expected_status_code, expected_message):
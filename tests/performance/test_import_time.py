@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Бюджет холодного импорта стека клиентов в долях от холодного импорта его сторонних зависимостей
+# (минимум из нескольких запусков). Измерено около 0.65, стек с импортом requests сразу — около 1.2
+IMPORT_RATIO = float(os.getenv('IMPORT_TIME_RATIO', '0.9'))
+RUNS = 5
+
+# Зависимости, которые стек загружал при импорте до перехода на отложенную загрузку
+REFERENCE = '''
+import json, time
+started = time.perf_counter()
+import pydantic, requests, structlog, curlify, retrying
+print(json.dumps({'elapsed': time.perf_counter() - started}))
+'''
+
+COLD_START = '''
+import json, sys, time
+started = time.perf_counter()
+import helpers.account_helper
+elapsed = time.perf_counter() - started
+from dm_api_account.models.user_details_envelope import UserDetailsEnvelope
+print(json.dumps({
+    'elapsed': elapsed,
+    'loaded': [name for name in ('requests', 'structlog', 'curlify', 'retrying')
+               if type(sys.modules.get(name)).__name__ == 'module'],
+    'schema_built': UserDetailsEnvelope.__pydantic_complete__,
+}))
+'''
+
+
+def cold_start(script=COLD_START):
+    output = subprocess.run(
+        [sys.executable, '-c', script], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def test_client_stack_cold_import_within_budget():
+    elapsed, reference = float('inf'), float('inf')
+    for _ in range(RUNS):
+        elapsed = min(elapsed, cold_start()['elapsed'])
+        reference = min(reference, cold_start(REFERENCE)['elapsed'])
+    assert elapsed < IMPORT_RATIO * reference, (
+        f'Импорт стека клиентов занял {elapsed:.3f} с, {elapsed / reference:.2f} от импорта зависимостей '
+        f'({reference:.3f} с), бюджет {IMPORT_RATIO}'
+    )
+
+
+def test_client_stack_import_is_lazy():
+    result = cold_start()
+    assert result['loaded'] == [], f'Зависимости загружены при импорте: {result["loaded"]}'
+    assert result['schema_built'] is False, 'Схема UserDetailsEnvelope построена при импорте'
@@ -0,0 +1,82 @@
+import http.server
+import json
+import threading
+import time
+
+import pytest
+
+
+class StubServer:
+    """
+    Локальный HTTP-сервер для модульных тестов клиента.
+
+    Ответы задаются по методу и пути: статус, тело (dict сериализуется в JSON)
+    задержка и дополнительные заголовки. Все принятые запросы сохраняются в requests:
+    метод, путь, заголовки, тело и исходная строка запроса (с параметрами).
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                path = self.path.split('?')[0]
+                with server.lock:
+                    server.requests.append((self.command, path, dict(self.headers), body, self.path))
+                status, payload, delay, headers = server.routes.get((self.command, path), (404, {}, 0.0, {}))
+                if callable(payload):
+                    payload = payload()
+                if delay:
+                    time.sleep(delay)
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+        self.httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        # Клиент может закрыть соединение раньше ответа (таймауты, хеджирование)
+        self.httpd.handle_error = lambda request, client_address: None
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def route(self, method, path, status=200, payload=None, delay=0.0, headers=None):
+        self.routes[(method, path)] = (status, {} if payload is None else payload, delay, headers or {})
+
+    def calls(self, method, path):
+        with self.lock:
+            return [request for request in self.requests if request[0] == method and request[1] == path]
+
+
+def serve():
+    server = StubServer()
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    yield from serve()
+
+
+@pytest.fixture
+def second_stub_server():
+    yield from serve()
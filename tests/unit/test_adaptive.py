@@ -0,0 +1,46 @@
+from load.adaptive import AdaptiveDriver, ConcurrencyPolicy
+from load.histogram import LatencyHistogram
+
+RATE = 100
+ITERATION = 0.3
+FLUSH = 0.5
+STEP = 0.01
+
+
+class Limit:
+    def __init__(self, value):
+        self.value = value
+
+
+def scenario(helper):
+    pass
+
+
+def histogram(count, seconds):
+    result = LatencyHistogram()
+    for _ in range(count):
+        result.record(seconds)
+    return result
+
+
+def test_throughput_is_credited_to_limit_at_iteration_start():
+    policy = ConcurrencyPolicy(latency_target=1.0, interval=1.0, min_samples=1, maximum=16)
+    driver = AdaptiveDriver(scenario, helper_factory=lambda: None, policy=policy, workers=1, output=lambda text: None)
+    driver._limit = Limit(policy.initial)
+    pending = []
+    for step in range(1200):
+        now = step * STEP
+        pending.append((now + ITERATION, driver._limit.value))
+        flushed = [item for item in pending if item[0] <= now - now % FLUSH]
+        pending = [item for item in pending if item not in flushed]
+        delta = {}
+        for _, limit in flushed:
+            per_step = RATE * STEP
+            delta.setdefault(f'{limit}:{driver.name}', LatencyHistogram()).merge(histogram(round(per_step), ITERATION))
+            delta.setdefault(f'{limit}:GET /v1/account', LatencyHistogram()).merge(histogram(1, 0.05))
+        driver._observe(delta)
+        driver._tick(now)
+
+    assert [point.concurrency for point in driver.points] == [1, 2, 4, 8, 16]
+    for point in driver.points[:-1]:
+        assert abs(point.throughput - RATE) / RATE < 0.05
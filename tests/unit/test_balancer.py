@@ -0,0 +1,26 @@
+import uuid
+
+from restclient.balancer import BalancingPolicy, close_balancers, get_balancer
+from restclient.client import RestClient
+from restclient.configuration import Configuration
+
+
+def test_clients_of_same_hosts_share_balancer():
+    hosts = [f'http://replica-{index}-{uuid.uuid4().hex}.test' for index in range(2)]
+
+    first = RestClient(Configuration(host=hosts, disable_log=True))
+    second = RestClient(Configuration(host=hosts, disable_log=True))
+
+    assert first.balancer is second.balancer
+    assert first.balancer is get_balancer(hosts)
+
+
+def test_close_balancers_stops_health_checks():
+    hosts = [f'http://replica-{uuid.uuid4().hex}.test']
+    balancer = get_balancer(hosts, BalancingPolicy(health_check_path='/health', health_check_interval=60))
+    assert balancer._health_thread.is_alive()
+
+    close_balancers()
+
+    assert balancer._health_thread is None
+    assert get_balancer(hosts) is not balancer
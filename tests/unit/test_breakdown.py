@@ -0,0 +1,57 @@
+import time
+
+from helpers.breakdown import Breakdown, BreakdownRecorder
+from restclient import tracing
+from restclient.client import RestClient, ROUND_TRIP_ATTRIBUTE, ROUND_TRIP_CPU_ATTRIBUTE
+from restclient.configuration import Configuration
+from restclient.limits import RateLimitPolicy
+
+
+class Collector:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def test_round_trip_excludes_rate_limiter_wait(stub_server):
+    stub_server.route('GET', '/v1/account', payload={})
+    client = RestClient(
+        Configuration(host=stub_server.url, rate_limit=RateLimitPolicy(rate=5, burst=1), disable_log=True)
+    )
+    collector = Collector()
+    tracing.add_exporter(collector)
+    try:
+        client.get('/v1/account')
+        started = time.perf_counter()
+        client.get('/v1/account')
+        elapsed = time.perf_counter() - started
+    finally:
+        tracing.remove_exporter(collector)
+
+    round_trip = collector.spans[-1].attributes[ROUND_TRIP_ATTRIBUTE]
+    assert elapsed >= 0.15
+    assert round_trip < 0.1
+    assert 0.0 <= collector.spans[-1].attributes[ROUND_TRIP_CPU_ATTRIBUTE] <= round_trip + 0.01
+
+
+def test_cpu_inside_round_trips_is_not_counted_twice():
+    recorder = BreakdownRecorder()
+    span = tracing.Span('GET /v1/account', trace_id='0' * 32, span_id='1')
+    span.set_attribute(ROUND_TRIP_ATTRIBUTE, 0.05)
+    try:
+        with recorder.measure('test_busy') as breakdown:
+            started = time.thread_time()
+            while time.thread_time() - started < 0.05:
+                pass
+            span.set_attribute(ROUND_TRIP_CPU_ATTRIBUTE, time.thread_time() - started)
+            recorder.export(span)
+    finally:
+        recorder.close()
+
+    assert breakdown.network == 0.05
+    assert breakdown.requests == 1
+    assert breakdown.network_cpu >= 0.05
+    assert breakdown.cpu < 0.02
+    assert Breakdown.from_dict(breakdown.to_dict()).network_cpu == round(breakdown.network_cpu, 6)
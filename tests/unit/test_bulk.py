@@ -0,0 +1,113 @@
+import contextvars
+import threading
+
+from helpers.bulk import run_bulk
+from restclient import tracing
+from restclient.client import RestClient
+from restclient.configuration import Configuration
+from restclient.deadline import Deadline, current_deadline
+
+tenant = contextvars.ContextVar('tenant', default=None)
+
+
+class Collector:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def client(stub_server):
+    return RestClient(Configuration(host=stub_server.url, disable_log=True))
+
+
+def test_skip_statuses_count_as_skipped(stub_server):
+    stub_server.route('GET', '/v1/account/ok')
+    stub_server.route('GET', '/v1/account/expired', status=401)
+    stub_server.route('GET', '/v1/account/broken', status=500)
+    rest = client(stub_server)
+    items = ['ok', 'expired', 'ok', 'broken', 'expired']
+
+    result = run_bulk('logout', items, lambda item: rest.get(f'/v1/account/{item}'), skip_statuses=(401,))
+
+    assert (result.succeeded, result.skipped, result.failed) == (2, 2, 1)
+    assert result.errors[0][0] == 'broken'
+    assert 'HTTPError' in result.errors[0][1]
+    assert len(stub_server.requests) == 5
+
+
+def test_without_skip_statuses_http_errors_fail(stub_server):
+    stub_server.route('GET', '/v1/account/expired', status=401)
+    rest = client(stub_server)
+
+    result = run_bulk('logout', ['expired'] * 3, lambda item: rest.get(f'/v1/account/{item}'))
+
+    assert (result.succeeded, result.skipped, result.failed) == (0, 0, 3)
+
+
+def test_false_outcome_is_skipped():
+    result = run_bulk('purge', range(10), lambda item: item % 2 == 0 or False)
+
+    assert (result.succeeded, result.skipped, result.failed, result.done) == (5, 5, 0, 10)
+
+
+def test_errors_are_capped_at_twenty():
+    def action(item):
+        raise ValueError(item)
+
+    result = run_bulk('cleanup', range(50), action, max_workers=4)
+
+    assert result.failed == 50
+    assert len(result.errors) == 20
+    assert all(error.startswith('ValueError(') for _, error in result.errors)
+
+
+def test_progress_is_reported_every_n_and_at_end():
+    reports = []
+
+    result = run_bulk(
+        'cleanup', range(25), lambda item: None, progress=lambda state: reports.append(state.done), progress_every=10
+    )
+
+    assert reports == [10, 20, 25]
+    assert str(result).startswith('cleanup: 25/25 за ')
+
+
+def test_progress_runs_in_calling_thread():
+    threads = set()
+
+    run_bulk('cleanup', range(5), lambda item: None, progress=lambda state: threads.add(threading.get_ident()),
+             progress_every=1)
+
+    assert threads == {threading.get_ident()}
+
+
+def test_actions_run_in_caller_context(stub_server):
+    stub_server.route('GET', '/v1/account')
+    rest = client(stub_server)
+    collector = Collector()
+    seen = []
+    lock = threading.Lock()
+
+    def action(item):
+        with lock:
+            seen.append((tenant.get(), current_deadline(), threading.current_thread().name))
+        rest.get('/v1/account')
+
+    token = tenant.set('unit')
+    deadline = Deadline(30)
+    tracing.add_exporter(collector)
+    try:
+        with deadline, tracing.start_span(name='bulk') as span:
+            result = run_bulk('cleanup', range(6), action, max_workers=3)
+    finally:
+        tracing.remove_exporter(collector)
+        tenant.reset(token)
+
+    assert result.succeeded == 6
+    assert {(name, current) for name, current, _ in seen} == {('unit', deadline)}
+    assert all(thread.startswith('cleanup') for _, _, thread in seen)
+    exchanges = [exported for exported in collector.spans if exported is not span]
+    assert len(exchanges) == 6
+    assert all(exported.parent is span and exported.trace_id == span.trace_id for exported in exchanges)
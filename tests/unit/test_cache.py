@@ -0,0 +1,46 @@
+from restclient.cache import CachePolicy
+from restclient.client import RestClient
+from restclient.configuration import Configuration
+
+
+def make_client(host, token=None):
+    headers = {'x-dm-auth-token': token} if token else None
+    return RestClient(Configuration(host=host, headers=headers, cache=CachePolicy(ttl=60), disable_log=True))
+
+
+def test_get_is_served_from_cache(stub_server):
+    stub_server.route('GET', '/v1/account', payload={'login': 'user'})
+    client = make_client(stub_server.url, token='token-1')
+
+    client.get('/v1/account')
+    client.get('/v1/account')
+
+    assert len(stub_server.calls('GET', '/v1/account')) == 1
+
+
+def test_write_with_token_invalidates_only_own_entries(stub_server):
+    stub_server.route('GET', '/v1/account', payload={'login': 'user'})
+    stub_server.route('DELETE', '/v1/account/login')
+    first = make_client(stub_server.url, token='token-1')
+    second = make_client(stub_server.url, token='token-2')
+    first.get('/v1/account')
+    second.get('/v1/account')
+
+    first.delete('/v1/account/login')
+    first.get('/v1/account')
+    second.get('/v1/account')
+
+    assert len(stub_server.calls('GET', '/v1/account')) == 3
+
+
+def test_write_without_token_invalidates_host_cache(stub_server):
+    stub_server.route('GET', '/v1/account', payload={'login': 'user'})
+    stub_server.route('PUT', '/v1/account/email', payload={'login': 'user'})
+    authorized = make_client(stub_server.url, token='token-1')
+    anonymous = make_client(stub_server.url)
+    authorized.get('/v1/account')
+
+    anonymous.put('/v1/account/email', json={'login': 'user', 'password': 'secret', 'email': 'new@mail.ru'})
+    authorized.get('/v1/account')
+
+    assert len(stub_server.calls('GET', '/v1/account')) == 2
@@ -0,0 +1,112 @@
+import gzip
+import json
+
+import pytest
+
+from restclient.client import RestClient
+from restclient.compression import CompressionPolicy, compress_request
+from restclient.configuration import Configuration
+from restclient.metrics import counters
+
+POLICY = CompressionPolicy(min_size=64)
+
+
+@pytest.fixture(autouse=True)
+def isolated_counters():
+    for name in ('http.request.wire_bytes', 'http.request.bytes', 'http.response.wire_bytes', 'http.response.bytes'):
+        counters.drain(name)
+
+
+def transfer(host):
+    return {
+        name: counters.get(f'http.{name}', host)
+        for name in ('request.wire_bytes', 'request.bytes', 'response.wire_bytes', 'response.bytes')
+    }
+
+
+def test_body_below_min_size_is_untouched():
+    kwargs = {'json': {'login': 'user'}, 'headers': {'X-Test': '1'}}
+
+    result, original = compress_request('POST', kwargs, POLICY)
+
+    assert result is kwargs and original is None
+    assert kwargs == {'json': {'login': 'user'}, 'headers': {'X-Test': '1'}}
+
+
+@pytest.mark.parametrize('method', ['GET', 'DELETE'])
+def test_other_methods_are_untouched(method):
+    kwargs = {'data': 'x' * 1000}
+
+    assert compress_request(method, kwargs, POLICY) == (kwargs, None)
+
+
+@pytest.mark.parametrize('data', ['ж' * 100, b'\x00\x01' * 100])
+def test_data_as_str_and_bytes(data):
+    expected = data.encode('utf-8') if isinstance(data, str) else data
+
+    result, original = compress_request('PUT', {'data': data, 'params': {'a': 1}}, POLICY)
+
+    assert original == expected
+    assert gzip.decompress(result['data']) == expected
+    assert result['params'] == {'a': 1}
+    assert result['headers'] == {'Content-Encoding': 'gzip'}
+
+
+def test_json_body_is_serialized_before_compression():
+    body = {'login': 'user', 'items': list(range(50))}
+
+    result, original = compress_request('POST', {'json': body}, POLICY)
+
+    assert 'json' not in result
+    assert json.loads(gzip.decompress(result['data'])) == body == json.loads(original)
+    assert result['headers']['Content-Type'] == 'application/json'
+
+
+def test_header_merge_does_not_mutate_caller_headers():
+    headers = {'X-Test': '1', 'Content-Type': 'application/vnd.dm+json'}
+    kwargs = {'json': {'items': list(range(50))}, 'headers': headers}
+
+    result, _ = compress_request('POST', kwargs, POLICY)
+
+    assert headers == {'X-Test': '1', 'Content-Type': 'application/vnd.dm+json'}
+    assert kwargs['headers'] is headers and 'json' in kwargs
+    assert result['headers'] == {
+        'X-Test': '1', 'Content-Type': 'application/vnd.dm+json', 'Content-Encoding': 'gzip'
+    }
+
+
+def test_unsupported_body_is_untouched():
+    kwargs = {'data': {'login': 'user' * 100}}
+
+    assert compress_request('POST', kwargs, POLICY) == (kwargs, None)
+
+
+def test_client_counts_wire_and_decoded_bytes(stub_server):
+    payload = json.dumps({'items': ['x' * 10] * 200}).encode()
+    stub_server.route('POST', '/v1/account', payload=gzip.compress(payload), headers={'Content-Encoding': 'gzip'})
+    client = RestClient(Configuration(host=stub_server.url, compression=POLICY, disable_log=True))
+    body = {'items': ['y' * 10] * 200}
+
+    response = client.post('/v1/account', json=body)
+
+    sent = stub_server.calls('POST', '/v1/account')[0]
+    assert sent[2]['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(sent[3])) == body
+    assert response.json() == json.loads(payload)
+    assert transfer(stub_server.url) == {
+        'request.wire_bytes': len(sent[3]),
+        'request.bytes': len(json.dumps(body)),
+        'response.wire_bytes': len(gzip.compress(payload)),
+        'response.bytes': len(payload),
+    }
+
+
+def test_uncompressed_exchange_counts_equal_sizes(stub_server):
+    stub_server.route('POST', '/v1/account', payload={'login': 'user'})
+    client = RestClient(Configuration(host=stub_server.url, disable_log=True))
+
+    client.post('/v1/account', data='short')
+
+    sizes = transfer(stub_server.url)
+    assert sizes['request.wire_bytes'] == sizes['request.bytes'] == 5
+    assert sizes['response.wire_bytes'] == sizes['response.bytes'] == len(json.dumps({'login': 'user'}))
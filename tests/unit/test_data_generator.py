@@ -0,0 +1,69 @@
+import pytest
+
+from helpers.data_generator import MAX_PASSWORD_LENGTH, MIN_PASSWORD_LENGTH, CredentialPool
+
+
+def valid_login(user):
+    return len(user.login) >= 2
+
+
+def valid_password(user):
+    return MIN_PASSWORD_LENGTH <= len(user.password) <= MAX_PASSWORD_LENGTH
+
+
+def valid_email(user):
+    return '@' in user.email
+
+
+def test_same_seed_and_namespace_give_same_sequence():
+    first = CredentialPool(size=50, seed=7, namespace='ns')
+    second = CredentialPool(size=50, seed=7, namespace='ns')
+
+    assert first.users(120) == second.users(120)
+    assert first.invalid('password') == second.invalid('password')
+
+
+def test_different_seed_gives_different_sequence():
+    assert CredentialPool(size=10, seed=1, namespace='ns').users(10) != CredentialPool(
+        size=10, seed=2, namespace='ns'
+    ).users(10)
+
+
+def test_logins_are_unique_across_refills():
+    pool = CredentialPool(size=16, seed=3, namespace='ns')
+
+    users = pool.users(16 * 10)
+    invalid = [pool.invalid('email') for _ in range(40)]
+
+    logins = [user.login for user in users + invalid]
+    assert len(set(logins)) == len(logins)
+    assert all(login.startswith('golovan_ns_') for login in logins)
+
+
+def test_valid_user_passes_every_check():
+    for user in CredentialPool(size=100, seed=5).users(100):
+        assert valid_login(user) and valid_password(user) and valid_email(user)
+        assert user.email == f'{user.login}@mail.ru'
+
+
+@pytest.mark.parametrize('field, check', [
+    ('login', valid_login), ('password', valid_password), ('email', valid_email),
+])
+def test_invalid_breaks_only_requested_field(field, check):
+    pool = CredentialPool(size=30, seed=11)
+    checks = {valid_login, valid_password, valid_email}
+
+    for _ in range(60):
+        user = pool.invalid(field)
+        assert not check(user)
+        assert all(other(user) for other in checks - {check})
+
+
+def test_unknown_invalid_field_raises():
+    with pytest.raises(ValueError):
+        CredentialPool(size=1).invalid('phone')
+
+
+def test_non_positive_size_raises():
+    with pytest.raises(ValueError):
+        CredentialPool(size=0)
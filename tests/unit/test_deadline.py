@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+from restclient.deadline import MIN_TIMEOUT, Deadline, DeadlineExceeded, current_deadline
+
+
+def test_timeout_is_clamped_to_remaining_time():
+    deadline = Deadline(0.5)
+
+    assert deadline.timeout(30) <= 0.5
+    assert deadline.timeout(0.1) == 0.1
+
+
+def test_timeout_raises_instead_of_returning_zero():
+    deadline = Deadline(MIN_TIMEOUT / 2)
+
+    with pytest.raises(DeadlineExceeded):
+        deadline.timeout(30, stage='GET /v1/account')
+
+
+def test_nested_activation_restores_outer_deadline():
+    outer, inner = Deadline(10), Deadline(5)
+
+    with outer:
+        with inner:
+            assert current_deadline() is inner
+        assert current_deadline() is outer
+    assert current_deadline() is None
+
+
+def test_deadline_shared_between_threads():
+    deadline = Deadline(10)
+    first_entered, second_entered, first_exited = threading.Event(), threading.Event(), threading.Event()
+    errors = []
+
+    def first():
+        with deadline:
+            first_entered.set()
+            second_entered.wait(5)
+        first_exited.set()
+
+    def second():
+        first_entered.wait(5)
+        with deadline:
+            second_entered.set()
+            first_exited.wait(5)
+            assert current_deadline() is deadline
+        assert current_deadline() is None
+
+    def run(target):
+        try:
+            target()
+        except BaseException as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(target,)) for target in (first, second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
@@ -0,0 +1,209 @@
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+from dm_api_account.models.login_credentials import LoginCredentials
+from helpers.data_generator import User
+from load.declarative import Flow, ScenarioFile, Step, compile_value, load_scenario_file
+
+SCENARIO = '''
+name = "unit"
+
+[[flows]]
+name = "register"
+weight = 3
+data = { user = "user" }
+
+[[flows.steps]]
+call = "helper.register_new_user"
+args = { login = "${user.login}", password = "${user.password}", email = "${user.email}" }
+
+[[flows]]
+name = "login"
+weight = 1
+think = [0.1, 0.2]
+
+[[flows.steps]]
+call = "login.post_v1_account_login"
+
+[flows.steps.args.login_credentials]
+"$model" = "dm_api_account.models.login_credentials:LoginCredentials"
+login = "a"
+password = "b"
+remember_me = true
+'''
+
+
+class FakeHelper:
+    def __init__(self):
+        self.calls = []
+        self.dm_account_api = SimpleNamespace(
+            account_api=SimpleNamespace(get_v1_account=self.recorder('get_v1_account')),
+            login_api=SimpleNamespace(post_v1_account_login=self.recorder('post_v1_account_login')),
+        )
+
+    def recorder(self, name):
+        def call(**kwargs):
+            self.calls.append((name, kwargs))
+            return SimpleNamespace(token=f'token-{len(self.calls)}', name=name)
+        return call
+
+    def register_new_user(self, **kwargs):
+        return self.recorder('register_new_user')(**kwargs)
+
+    def user_login(self, **kwargs):
+        return self.recorder('user_login')(**kwargs)
+
+
+def flow(*steps, **spec):
+    return Flow({'name': 'unit', 'steps': list(steps), **spec})
+
+
+def test_steps_run_against_helper_and_api_clients():
+    helper = FakeHelper()
+    user = User(login='golovan_1', password='secret1', email='golovan_1@mail.ru')
+
+    context = flow(
+        {'call': 'helper.register_new_user', 'args': {'login': '${user.login}'}, 'save': 'registered'},
+        {'call': 'account.get_v1_account', 'args': {'token': '${registered.token}'}},
+    ).run(helper, bindings={'user': user}, think=False)
+
+    assert helper.calls == [
+        ('register_new_user', {'login': 'golovan_1'}),
+        ('get_v1_account', {'token': 'token-1'}),
+    ]
+    assert context['registered'].name == 'register_new_user'
+
+
+@pytest.mark.parametrize('spec', [
+    {'call': 'helper.user_login', 'retries': 3},
+    {'call': 'helper.user_login', 'argz': {}},
+])
+def test_unknown_step_keys_raise(spec):
+    with pytest.raises(ValueError, match='неизвестные поля шага'):
+        Step(spec)
+
+
+def test_unknown_flow_keys_raise():
+    with pytest.raises(ValueError, match='неизвестные поля потока'):
+        Flow({'name': 'unit', 'stepz': [], 'steps': [{'call': 'helper.user_login'}]})
+
+
+@pytest.mark.parametrize('call', ['', 'helper', 'helper.', 'admin.get_v1_account', 'helper.no_such_method',
+                                  'account.post_v1_account_login', 'helper.MAIL_WAIT_ATTEMPTS'])
+def test_bad_call_target_raises(call):
+    with pytest.raises(ValueError):
+        Step({'call': call})
+
+
+@pytest.mark.parametrize('spec', [
+    {'name': 'unit', 'steps': []},
+    {'name': 'unit', 'weight': 0, 'steps': [{'call': 'helper.user_login'}]},
+    {'name': 'unit', 'data': {'user': 'admin'}, 'steps': [{'call': 'helper.user_login'}]},
+])
+def test_malformed_flow_raises(spec):
+    with pytest.raises(ValueError):
+        Flow(spec)
+
+
+def test_reference_resolves_through_mapping_and_attribute():
+    context = {
+        'response': {'resource': SimpleNamespace(login='golovan_1', rating={'quantity': 3})},
+    }
+
+    assert compile_value('${response.resource.login}')(context) == 'golovan_1'
+    assert compile_value('${ response.resource.rating.quantity }')(context) == 3
+
+
+def test_missing_reference_raises_at_run():
+    resolve = compile_value('${user.login}')
+
+    with pytest.raises(KeyError):
+        resolve({})
+    with pytest.raises(AttributeError):
+        resolve({'user': SimpleNamespace()})
+
+
+def test_mixed_text_template():
+    user = User(login='golovan_1', password='secret1', email='golovan_1@mail.ru')
+
+    resolve = compile_value('ant${user.email}/${user.login}:${count}')
+
+    assert resolve({'user': user, 'count': 2}) == 'antgolovan_1@mail.ru/golovan_1:2'
+
+
+def test_plain_values_are_returned_as_is():
+    context = {'user': User(login='golovan_1', password='p', email='e')}
+
+    assert compile_value('plain $text')(context) == 'plain $text'
+    assert compile_value(5)(context) == 5
+    assert compile_value(['${user.login}', {'nested': '${user.email}'}])(context) == ['golovan_1', {'nested': 'e'}]
+
+
+def test_model_key_builds_request_model():
+    resolve = compile_value({
+        '$model': 'dm_api_account.models.login_credentials:LoginCredentials',
+        'login': '${user.login}',
+        'password': '${user.password}',
+        'remember_me': True,
+    })
+
+    model = resolve({'user': User(login='golovan_1', password='secret1', email='e')})
+
+    assert model == LoginCredentials(login='golovan_1', password='secret1', remember_me=True)
+
+
+@pytest.mark.parametrize('think, low, high', [(0.25, 0.25, 0.25), ([0.1, 0.3], 0.1, 0.3), ([1, 1], 1, 1)])
+def test_think_ranges(think, low, high):
+    step = Step({'call': 'helper.user_login', 'think': think})
+
+    assert all(low <= step.think() <= high for _ in range(100))
+
+
+def test_flow_think_applies_to_steps_without_own():
+    compiled = flow({'call': 'helper.user_login'}, {'call': 'helper.user_login', 'think': 0}, think=[1, 2])
+
+    assert 1 <= compiled.steps[0].think() <= 2
+    assert compiled.steps[1].think is None
+
+
+@pytest.mark.parametrize('think', ['fast', [1], [1, 2, 3], {'min': 1}])
+def test_malformed_think_raises(think):
+    with pytest.raises(ValueError, match='think'):
+        Step({'call': 'helper.user_login', 'think': think})
+
+
+def test_choose_respects_weights(monkeypatch):
+    scenario = ScenarioFile({'flows': [
+        {'name': 'heavy', 'weight': 3, 'steps': [{'call': 'helper.user_login'}]},
+        {'name': 'light', 'weight': 1, 'steps': [{'call': 'helper.user_login'}]},
+    ]})
+    draws = iter([0.0, 0.74, 0.75, 0.99])
+    monkeypatch.setattr('load.declarative.random.random', lambda: next(draws))
+
+    assert [scenario.choose().name for _ in range(4)] == ['heavy', 'heavy', 'light', 'light']
+
+
+def test_reduce_recompiles_from_path(tmp_path):
+    path = tmp_path / 'unit.toml'
+    path.write_text(SCENARIO, encoding='utf-8')
+    scenario = load_scenario_file(str(path))
+
+    restored = pickle.loads(pickle.dumps(scenario))
+
+    assert restored is not scenario
+    assert restored.__name__ == 'unit'
+    assert restored.path == str(path)
+    assert [(item.name, item.weight) for item in restored.flows] == [('register', 3.0), ('login', 1.0)]
+    helper = FakeHelper()
+    restored.flow('login').run(helper, think=False)
+    assert helper.calls[0][1]['login_credentials'].login == 'a'
+
+
+def test_unsupported_file_extension_raises(tmp_path):
+    path = tmp_path / 'unit.json'
+    path.write_text('{}', encoding='utf-8')
+
+    with pytest.raises(ValueError, match='.toml'):
+        load_scenario_file(str(path))
@@ -0,0 +1,103 @@
+import pytest
+
+from dm_api_account.apis.account_api import AccountApi
+from dm_api_account.models.change_email import ChangeEmail
+from restclient.client import RestClient
+from restclient.configuration import Configuration
+from restclient.endpoint import JSON_HEADERS, Endpoint
+
+TOKEN = {'x-dm-auth-token': 'session-token'}
+
+
+def clients(stub_server, monkeypatch, headers=TOKEN):
+    configuration = Configuration(host=stub_server.url, headers=headers, disable_log=True)
+    prepared = AccountApi(configuration)
+    # Запросы методов API не должны собираться через Session.request
+    monkeypatch.setattr(prepared.session, 'request', lambda **kwargs: pytest.fail('prepared path not used'))
+    return prepared, RestClient(configuration)
+
+
+def received(stub_server):
+    return [(method, target, headers, body) for method, _, headers, body, target in stub_server.requests]
+
+
+def assert_same_requests(stub_server, prepared_response, plain_response):
+    fast, slow = received(stub_server)
+    assert fast == slow
+    assert prepared_response.request.url == plain_response.request.url
+    assert dict(prepared_response.request.headers) == dict(plain_response.request.headers)
+    assert prepared_response.request.body == plain_response.request.body
+
+
+def test_get_matches_session_request(stub_server, monkeypatch):
+    stub_server.route('GET', '/v1/account', payload={'resource': None})
+    prepared, plain = clients(stub_server, monkeypatch)
+
+    fast = prepared.call(AccountApi.GET_V1_ACCOUNT, params={'expand': ['rating', 'settings'], 'q': 'a b'})
+    slow = plain.get('/v1/account', params={'expand': ['rating', 'settings'], 'q': 'a b'})
+
+    assert_same_requests(stub_server, fast, slow)
+    assert stub_server.requests[0][4] == '/v1/account?expand=rating&expand=settings&q=a+b'
+
+
+def test_body_and_endpoint_headers_match_session_request(stub_server, monkeypatch):
+    stub_server.route('PUT', '/v1/account/email')
+    prepared, plain = clients(stub_server, monkeypatch)
+    body = ChangeEmail(login='golovan_1', password='secret1', email='new@mail.ru')
+
+    fast = prepared.call(AccountApi.PUT_V1_ACCOUNT_EMAIL, body=body)
+    slow = plain.put('/v1/account/email', data=Endpoint.encode(body), headers=JSON_HEADERS)
+
+    assert_same_requests(stub_server, fast, slow)
+    assert stub_server.requests[0][2]['Content-Type'] == 'application/json'
+
+
+def test_path_params_and_method_headers_match_session_request(stub_server, monkeypatch):
+    stub_server.route('PUT', '/v1/account/a%2Fb%20c', payload={'resource': None})
+    prepared, plain = clients(stub_server, monkeypatch)
+
+    fast = prepared.call(AccountApi.PUT_V1_ACCOUNT_TOKEN, path_params={'token': 'a/b c'})
+    slow = plain.put('/v1/account/a%2Fb%20c', headers={'accept': 'text/plain'})
+
+    assert_same_requests(stub_server, fast, slow)
+    assert stub_server.requests[0][2]['accept'] == 'text/plain'
+
+
+def test_per_call_headers_override_session_headers(stub_server, monkeypatch):
+    stub_server.route('DELETE', '/v1/account/login', status=204)
+    prepared, plain = clients(stub_server, monkeypatch)
+
+    prepared.delete_v1_account_login(headers={'x-dm-auth-token': 'user-token'})
+    plain.delete('/v1/account/login', headers={'x-dm-auth-token': 'user-token'})
+
+    fast, slow = received(stub_server)
+    assert fast == slow
+    assert fast[2]['x-dm-auth-token'] == 'user-token'
+
+
+def test_per_call_headers_do_not_leak_into_next_call(stub_server, monkeypatch):
+    stub_server.route('DELETE', '/v1/account/login', status=204)
+    prepared, _ = clients(stub_server, monkeypatch)
+
+    prepared.delete_v1_account_login(headers={'x-dm-auth-token': 'user-token', 'X-Trace': '1'})
+    prepared.delete_v1_account_login()
+
+    first, second = received(stub_server)
+    assert first[2]['x-dm-auth-token'] == 'user-token' and first[2]['X-Trace'] == '1'
+    assert second[2]['x-dm-auth-token'] == 'session-token' and 'X-Trace' not in second[2]
+
+
+def test_set_headers_rebuilds_prepared_request(stub_server, monkeypatch):
+    stub_server.route('GET', '/v1/account', payload={'resource': None})
+    prepared, plain = clients(stub_server, monkeypatch, headers=None)
+
+    prepared.call(AccountApi.GET_V1_ACCOUNT)
+    prepared.set_headers({'x-dm-auth-token': 'new-token'})
+    plain.set_headers({'x-dm-auth-token': 'new-token'})
+    fast = prepared.call(AccountApi.GET_V1_ACCOUNT)
+    slow = plain.get('/v1/account')
+
+    before, after, reference = received(stub_server)
+    assert 'x-dm-auth-token' not in before[2]
+    assert after == reference
+    assert dict(fast.request.headers) == dict(slow.request.headers)
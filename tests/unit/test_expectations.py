@@ -0,0 +1,155 @@
+import json
+
+import pytest
+from hamcrest import greater_than, starts_with
+from requests import Response
+
+from checkers.expectations import CHECKED, MISMATCHED, Expectation, ExpectationSet, drain_stats, format_stats
+from dm_api_account.apis.account_api import AccountApi
+from dm_api_account.models.user_details_envelope import UserDetailsEnvelope
+from restclient.client import RestClient
+from restclient.configuration import Configuration
+
+DETAILS = {
+    'resource': {
+        'login': 'golovan_1',
+        'rating': {'enabled': True, 'quality': 0, 'quantity': 3},
+        'settings': {'colorSchema': 'Modern', 'paging': {'postsPerPage': 10}},
+        'mediumPictureUrl': None,
+    },
+}
+
+
+def response(status=200, body=DETAILS):
+    result = Response()
+    result.status_code = status
+    result._content = body if isinstance(body, bytes) else json.dumps(body).encode()
+    return result
+
+
+@pytest.fixture(autouse=True)
+def isolated_counters():
+    drain_stats()
+    yield
+    drain_stats()
+
+
+def test_alias_path_resolves_through_nested_models():
+    expectation = Expectation(model=UserDetailsEnvelope, fields={
+        'resource.settings.paging.posts_per_page': 10,
+        'resource.settings.color_schema': 'Modern',
+        'resource.medium_picture_url': None,
+    })
+
+    assert [keys for _, keys, _ in expectation._checks] == [
+        ('resource', 'settings', 'paging', 'postsPerPage'),
+        ('resource', 'settings', 'colorSchema'),
+        ('resource', 'mediumPictureUrl'),
+    ]
+    assert expectation.check(response()) is None
+
+
+def test_unknown_model_path_raises():
+    with pytest.raises(ValueError, match='posts'):
+        Expectation(model=UserDetailsEnvelope, fields={'resource.settings.paging.posts': 10})
+
+
+def test_path_without_model_uses_json_keys():
+    assert Expectation(fields={'resource.settings.paging.postsPerPage': 10}).check(response()) is None
+
+
+def test_missing_field_is_reported_by_path():
+    expectation = Expectation(model=UserDetailsEnvelope, fields={'resource.settings.paging.topics_per_page': 5})
+
+    assert expectation.check(response()) == 'resource.settings.paging.topics_per_page'
+
+
+def test_predicate_and_hamcrest_values():
+    expectation = Expectation(fields={
+        'resource.login': starts_with('golovan'),
+        'resource.rating.quantity': lambda value: value > 1,
+    })
+
+    assert expectation.check(response()) is None
+    assert Expectation(fields={'resource.rating.quantity': greater_than(5)}).check(response()) == (
+        'resource.rating.quantity'
+    )
+    assert Expectation(fields={'resource.login': lambda value: value.no_such}).check(response()) == 'resource.login'
+
+
+@pytest.mark.parametrize('status, expected, reason', [
+    (200, 200, None),
+    (201, (200, 201), None),
+    (204, {200, 201}, 'status 204'),
+    (500, None, None),
+    (400, 200, 'status 400'),
+])
+def test_status_sets(status, expected, reason):
+    assert Expectation(status=expected).check(response(status)) == reason
+
+
+def test_title_and_broken_body():
+    expectation = Expectation(status=400, title='Validation failed')
+
+    assert expectation.check(response(400, {'title': 'Validation failed'})) is None
+    assert expectation.check(response(400, {'title': 'Other'})) == 'title'
+    assert expectation.check(response(400, b'<html>')) == 'body'
+
+
+def test_streamed_response_checks_status_only():
+    expectation = Expectation(fields={'resource.login': 'someone'})
+
+    assert expectation.check(response(), streamed=True) is None
+    assert expectation.check(response(), streamed=False) == 'resource.login'
+    assert expectation.check(response(500), streamed=True) == 'status 500'
+
+
+def test_mismatch_counter_labels():
+    expectations = ExpectationSet(
+        {AccountApi.GET_V1_ACCOUNT: Expectation(fields={'resource.login': 'someone'})},
+        default=Expectation(status=201),
+    )
+
+    expectations.verify('GET /v1/account', response())
+    expectations.verify('GET /v1/account', response(403))
+    expectations.verify('POST /v1/account', response(201))
+    expectations.verify('POST /v1/account', response(200))
+
+    stats = drain_stats()
+    assert stats == {
+        f'{CHECKED}|GET /v1/account': 2,
+        f'{CHECKED}|POST /v1/account': 2,
+        f'{MISMATCHED}|GET /v1/account | resource.login': 1,
+        f'{MISMATCHED}|GET /v1/account | status 403': 1,
+        f'{MISMATCHED}|POST /v1/account | status 200': 1,
+    }
+    assert list(expectations.samples) == [
+        ('GET /v1/account', 'resource.login', 200),
+        ('GET /v1/account', 'status 403', 403),
+        ('POST /v1/account', 'status 200', 200),
+    ]
+    assert drain_stats() == {}
+    table = format_stats(stats).splitlines()
+    assert table[2].split()[:4] == ['GET', '/v1/account', '2', '2']
+    assert table[3].split()[:4] == ['POST', '/v1/account', '2', '1']
+
+
+def test_operation_without_expectation_is_not_counted():
+    assert ExpectationSet({}).verify('GET /v1/account', response(500)) is None
+    assert drain_stats() == {}
+
+
+def test_client_verifies_responses_without_raising_on_mismatch(stub_server):
+    stub_server.route('GET', '/v1/account', payload=DETAILS)
+    expectations = ExpectationSet({
+        AccountApi.GET_V1_ACCOUNT: Expectation(model=UserDetailsEnvelope, fields={'resource.login': 'someone'}),
+    })
+    client = RestClient(Configuration(host=stub_server.url, expectations=expectations, disable_log=True))
+
+    client.get('/v1/account')
+    client.get('/v1/account', stream=True).close()
+
+    assert drain_stats() == {
+        f'{CHECKED}|GET /v1/account': 2,
+        f'{MISMATCHED}|GET /v1/account | resource.login': 1,
+    }
@@ -0,0 +1,51 @@
+import threading
+
+from restclient.client import RestClient
+from restclient.compression import CompressionPolicy
+from restclient.configuration import Configuration
+from restclient.flight_recorder import FlightRecorder
+
+
+def make_client(host, recorder, **kwargs):
+    return RestClient(Configuration(host=host, flight_recorder=recorder, disable_log=True, **kwargs))
+
+
+def test_bodies_are_truncated_at_record_time(stub_server):
+    stub_server.route('GET', '/v1/account', payload=b'x' * 1000)
+    recorder = FlightRecorder(capacity=5, max_body=100)
+    make_client(stub_server.url, recorder).get('/v1/account')
+
+    record = recorder.records()[0]
+
+    assert record.status_code == 200
+    assert record.response_body == b'x' * 100
+    assert record.response_size == 1000
+    assert not hasattr(record, 'response')
+
+
+def test_dump_contains_uncompressed_request_body(stub_server, tmp_path):
+    stub_server.route('POST', '/v1/account', status=201)
+    recorder = FlightRecorder(capacity=5)
+    client = make_client(stub_server.url, recorder, compression=CompressionPolicy(min_size=10))
+    client.post('/v1/account', json={'login': 'user_login', 'password': 'secret'})
+
+    path = recorder.dump(str(tmp_path / 'dump.log'))
+
+    text = open(path, encoding='utf-8').read()
+    assert '"login": "user_login"' in text
+    assert 'Content-Encoding' not in text.split('---')[0]
+    assert '--- 201' in text
+
+
+def test_clear_drops_buffers_of_finished_threads(stub_server):
+    stub_server.route('GET', '/v1/account')
+    recorder = FlightRecorder(capacity=5)
+    client = make_client(stub_server.url, recorder)
+    thread = threading.Thread(target=client.get, args=('/v1/account',))
+    thread.start()
+    thread.join()
+    assert len(recorder.records()) == 1
+
+    recorder.clear()
+
+    assert recorder._buffers == {}
@@ -0,0 +1,123 @@
+import threading
+import time
+
+from requests import Response
+
+from restclient.balancer import LoadBalancer
+from restclient.client import RestClient
+from restclient.configuration import Configuration
+from restclient.hedging import Hedger, HedgingPolicy
+
+
+class Raw:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def release_conn(self):
+        pass
+
+
+def make_response():
+    response = Response()
+    response.status_code = 200
+    response.raw = Raw()
+    return response
+
+
+def test_hedges_are_capped_by_budget():
+    hedger = Hedger(HedgingPolicy(initial_delay=0.01, max_hedge_ratio=0.25))
+
+    def call():
+        time.sleep(0.03)
+        return make_response()
+
+    for _ in range(8):
+        hedger.send('GET /v1/account', call)
+
+    assert hedger.requests == 8
+    assert hedger.hedges == 2
+
+
+def test_request_runs_on_caller_thread_without_budget():
+    hedger = Hedger(HedgingPolicy(max_hedge_ratio=0.1))
+    threads = []
+
+    def call():
+        threads.append(threading.current_thread())
+        return make_response()
+
+    hedger.send('GET /v1/account', call)
+
+    assert threads == [threading.current_thread()]
+
+
+def test_slow_primary_loses_to_hedge_and_is_closed():
+    hedger = Hedger(HedgingPolicy(initial_delay=0.02, max_hedge_ratio=1.0))
+    responses = []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            first = not responses
+            response = make_response()
+            responses.append(response)
+        time.sleep(0.3 if first else 0.0)
+        return response
+
+    winner = hedger.send('GET /v1/account', call)
+    time.sleep(0.4)
+
+    assert winner is responses[1]
+    assert hedger.hedge_wins == 1
+    assert responses[0].raw.closed
+    assert not responses[1].raw.closed
+
+
+def test_alternative_node_excludes_primary_and_ejected_nodes():
+    balancer = LoadBalancer(['http://a.test', 'http://b.test', 'http://c.test'])
+    primary = balancer.acquire()
+    balancer.nodes[2].ejected_until = time.monotonic() + 60
+
+    alternative = balancer.acquire_alternative(primary)
+
+    assert alternative is balancer.nodes[1]
+    assert alternative.outstanding == 1
+    assert balancer.acquire_alternative(alternative) is primary
+    single = LoadBalancer(['http://a.test'])
+    assert single.acquire_alternative(single.acquire()) is None
+
+
+def hedging_client(*servers):
+    for server in servers:
+        server.route('GET', '/v1/account', delay=0.3)
+    hosts = [server.url for server in servers]
+    return RestClient(Configuration(
+        host=hosts, hedging=HedgingPolicy(initial_delay=0.02, max_hedge_ratio=1.0), disable_log=True
+    ))
+
+
+def test_hedge_goes_to_another_healthy_node(stub_server, second_stub_server):
+    client = hedging_client(stub_server, second_stub_server)
+
+    client.get('/v1/account')
+    time.sleep(0.4)
+
+    assert client.hedger.hedges == 1
+    assert len(stub_server.requests) == len(second_stub_server.requests) == 1
+    assert [node.outstanding for node in client.balancer.nodes] == [0, 0]
+    assert [node.requests for node in client.balancer.nodes] == [1, 1]
+
+
+def test_hedge_falls_back_to_same_node_without_another_healthy_one(stub_server, second_stub_server):
+    client = hedging_client(stub_server, second_stub_server)
+    client.balancer.nodes[1].ejected_until = time.monotonic() + 60
+
+    client.get('/v1/account')
+    time.sleep(0.4)
+
+    assert client.hedger.hedges == 1
+    assert len(stub_server.requests) == 2
+    assert second_stub_server.requests == []
@@ -0,0 +1,90 @@
+import json
+import math
+import random
+
+import pytest
+
+from load.histogram import LatencyHistogram
+
+
+def histogram(values):
+    result = LatencyHistogram()
+    for value in values:
+        result.record(value)
+    return result
+
+
+def exact_percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(len(ordered) * percent / 100) - 1, 0)]
+
+
+def latencies(seed, count=20000):
+    generator = random.Random(seed)
+    return [generator.lognormvariate(math.log(0.05), 1.0) for _ in range(count)]
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+@pytest.mark.parametrize('percent', [1, 25, 50, 90, 95, 99, 99.9, 100])
+def test_percentile_within_three_percent_of_exact(seed, percent):
+    values = latencies(seed)
+
+    estimate = histogram(values).percentile(percent)
+
+    exact = exact_percentile(values, percent)
+    assert abs(estimate - exact) <= exact * 0.03 + 1e-6
+
+
+def test_small_values_are_exact():
+    values = [index / 1_000_000 for index in range(1, 64)]
+
+    assert histogram(values).percentile(50) == exact_percentile(values, 50)
+
+
+def test_merge_is_associative_and_commutative():
+    first, second, third = (histogram(latencies(seed, 2000)) for seed in (4, 5, 6))
+
+    left = LatencyHistogram()
+    for part in (first, second):
+        left.merge(part)
+    left.merge(third)
+    grouped = LatencyHistogram()
+    grouped.merge(second)
+    grouped.merge(third)
+    right = LatencyHistogram()
+    right.merge(grouped)
+    right.merge(first)
+
+    assert left.to_dict() == right.to_dict()
+    assert left.count == 6000
+
+
+def test_merge_equals_recording_everything_in_one():
+    parts = [latencies(seed, 1000) for seed in (7, 8)]
+    merged = histogram(parts[0])
+    merged.merge(histogram(parts[1]))
+    merged.record(0.5, error=True)
+
+    single = histogram(parts[0] + parts[1])
+    single.record(0.5, error=True)
+
+    assert merged.to_dict() == single.to_dict()
+    assert merged.errors == 1
+
+
+def test_dict_round_trip_through_json():
+    original = histogram(latencies(9, 1000))
+    original.record(1.5, error=True)
+
+    restored = LatencyHistogram.from_dict(json.loads(json.dumps(original.to_dict())))
+
+    assert restored.to_dict() == original.to_dict()
+    assert restored.percentile(99) == original.percentile(99)
+    assert restored.mean == original.mean
+
+
+def test_empty_histogram():
+    empty = LatencyHistogram()
+
+    assert empty.percentile(99) == 0.0
+    assert empty.mean == 0.0
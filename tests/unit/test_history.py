@@ -0,0 +1,65 @@
+import math
+
+import pytest
+
+from load.histogram import LatencyHistogram
+from load.history import HistoryStore
+
+
+def histogram(latency, count=10):
+    result = LatencyHistogram()
+    for _ in range(count):
+        result.record(latency)
+    return result
+
+
+@pytest.fixture
+def store(tmp_path):
+    result = HistoryStore(str(tmp_path / 'history.sqlite'))
+    yield result
+    result.close()
+
+
+def record(store, latencies, started_at=1000.0):
+    run_id = None
+    for index, latency in enumerate(latencies):
+        run_id = store.record_run(
+            {'GET /v1/account': histogram(latency)}, kind='pytest', label='unit',
+            started_at=started_at + index, commit='abc', branch='main'
+        )
+    return run_id
+
+
+def test_identical_baseline_gives_finite_score(store):
+    run_id = record(store, [0.1] * 6 + [0.15])
+
+    regressions = store.detect_regressions(run_id)
+
+    assert [regression.name for regression in regressions] == ['GET /v1/account']
+    assert regressions[0].mad == 0
+    assert math.isfinite(regressions[0].score)
+    assert regressions[0].score > 3.5
+
+
+def test_growth_within_histogram_precision_is_not_a_regression(store):
+    run_id = record(store, [0.1] * 6 + [0.104])
+
+    assert store.detect_regressions(run_id, min_change=0.0) == []
+
+
+def test_small_relative_change_is_ignored(store):
+    run_id = record(store, [0.1, 0.101, 0.099, 0.1, 0.1, 0.11])
+
+    assert store.detect_regressions(run_id) == []
+
+
+def test_noisy_baseline_absorbs_outlier(store):
+    run_id = record(store, [0.1, 0.2, 0.1, 0.2, 0.1, 0.2, 0.25])
+
+    assert store.detect_regressions(run_id) == []
+
+
+def test_short_baseline_is_skipped(store):
+    run_id = record(store, [0.1, 0.1, 0.5])
+
+    assert store.detect_regressions(run_id) == []
@@ -0,0 +1,148 @@
+import time
+import uuid
+
+import pytest
+from requests import Timeout
+
+from restclient.client import RestClient
+from restclient.configuration import Configuration
+from restclient.deadline import Deadline, DeadlineExceeded
+from restclient.limits import (
+    CLOSED, OPEN, HALF_OPEN, CircuitBreaker, CircuitBreakerPolicy, CircuitOpenError, RateLimitExceeded,
+    RateLimitPolicy, TokenBucket, get_breaker, get_bucket
+)
+
+
+def make_breaker(open_time=60.0):
+    policy = CircuitBreakerPolicy(error_rate_threshold=0.5, min_requests=4, window=60.0, open_time=open_time)
+    return CircuitBreaker(name=f'breaker-{uuid.uuid4().hex}', policy=policy)
+
+
+def trip(breaker):
+    for _ in range(breaker.policy.min_requests):
+        breaker.record(failed=True)
+
+
+def test_breaker_stays_closed_below_min_requests():
+    breaker = make_breaker()
+
+    for _ in range(breaker.policy.min_requests - 1):
+        breaker.record(failed=True)
+
+    assert breaker.state == CLOSED
+    breaker.allow()
+
+
+def test_breaker_opens_when_error_rate_exceeds_threshold():
+    breaker = make_breaker()
+    breaker.record(failed=False)
+    breaker.record(failed=True)
+    breaker.record(failed=False)
+
+    breaker.record(failed=True)
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+
+def test_breaker_lets_single_probe_through_after_open_time():
+    breaker = make_breaker(open_time=0.0)
+    trip(breaker)
+
+    breaker.allow()
+
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+
+def test_successful_probe_closes_breaker():
+    breaker = make_breaker(open_time=0.0)
+    trip(breaker)
+    breaker.allow()
+
+    breaker.record(failed=False)
+
+    assert breaker.state == CLOSED
+    breaker.record(failed=True)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = make_breaker(open_time=0.0)
+    trip(breaker)
+    breaker.allow()
+
+    breaker.record(failed=True)
+
+    assert breaker.state == OPEN
+
+
+def test_outcomes_outside_window_are_forgotten():
+    breaker = CircuitBreaker(
+        name=f'breaker-{uuid.uuid4().hex}', policy=CircuitBreakerPolicy(min_requests=2, window=0.05)
+    )
+    breaker.record(failed=True)
+    time.sleep(0.1)
+
+    breaker.record(failed=False)
+
+    assert breaker.state == CLOSED
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate=50, capacity=1)
+    bucket.acquire()
+
+    waited = bucket.acquire()
+
+    assert 0.0 < waited <= 0.03
+
+
+def test_token_bucket_rejects_wait_longer_than_timeout():
+    bucket = TokenBucket(rate=1, capacity=1)
+    bucket.acquire()
+
+    with pytest.raises(RateLimitExceeded):
+        bucket.acquire(timeout=0.1)
+
+
+def test_non_request_error_completes_half_open_probe(stub_server):
+    stub_server.route('GET', '/v1/account')
+    policy = CircuitBreakerPolicy(min_requests=1, open_time=0.0)
+    client = RestClient(Configuration(host=stub_server.url, circuit_breaker=policy, disable_log=True))
+    breaker = get_breaker(stub_server.url, policy)
+    trip(breaker)
+
+    with pytest.raises(ValueError):
+        client.get('/v1/account', timeout=0.0)
+
+    assert breaker.state == OPEN
+    client.get('/v1/account')
+    assert breaker.state == CLOSED
+
+
+def test_request_timeout_is_clamped_after_rate_limit_wait(stub_server):
+    stub_server.route('GET', '/v1/account')
+    client = RestClient(
+        Configuration(host=stub_server.url, timeout=5, rate_limit=RateLimitPolicy(rate=2, burst=1), disable_log=True)
+    )
+    client.get('/v1/account')
+    stub_server.route('GET', '/v1/account', delay=0.5)
+
+    started = time.monotonic()
+    with pytest.raises((DeadlineExceeded, Timeout)):
+        with Deadline(0.7):
+            client.get('/v1/account')
+
+    assert time.monotonic() - started < 0.9
+
+
+def test_registries_are_per_process(monkeypatch):
+    bucket = get_bucket('http://fork.test', rate=1.0)
+    breaker = get_breaker('http://fork.test', CircuitBreakerPolicy())
+    monkeypatch.setattr('os.getpid', lambda: -1)
+
+    assert get_bucket('http://fork.test', rate=1.0) is not bucket
+    assert get_breaker('http://fork.test', CircuitBreakerPolicy()) is not breaker
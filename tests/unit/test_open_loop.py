@@ -0,0 +1,76 @@
+import math
+
+import pytest
+
+from load.open_loop import Phase, iter_arrivals, parse_profile
+
+
+def arrivals(phases, workers=1):
+    return [list(iter_arrivals(phases, worker, workers)) for worker in range(workers)]
+
+
+@pytest.mark.parametrize('spec', ['10:5', '30:0-20,60:20,10:100,60:20', '20:20-0', '7:3,5:1-4'])
+@pytest.mark.parametrize('workers', [1, 3, 8])
+def test_total_arrivals_match_profile(spec, workers):
+    phases = parse_profile(spec)
+
+    total = sum(len(offsets) for offsets in arrivals(phases, workers))
+
+    assert total == math.ceil(sum(phase.arrivals for phase in phases))
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_offsets_are_monotonic_per_worker(workers):
+    phases = parse_profile('10:0-20,10:20,2:100,10:20-0')
+
+    for offsets in arrivals(phases, workers):
+        assert offsets == sorted(offsets)
+        assert 0 <= offsets[0] and offsets[-1] <= sum(phase.duration for phase in phases)
+
+
+def test_workers_split_arrivals_without_overlap():
+    phases = parse_profile('10:10')
+
+    offsets = arrivals(phases, 3)
+
+    assert sorted(sum(offsets, [])) == arrivals(phases)[0]
+    assert max(len(worker) for worker in offsets) - min(len(worker) for worker in offsets) <= 1
+
+
+def test_ramp_up_from_zero():
+    offsets = arrivals([Phase(10, 0, 20)])[0]
+
+    assert len(offsets) == 100
+    assert offsets[0] == 0
+    # Интенсивность растет линейно: вторая половина запусков укладывается в последние 29% фазы
+    assert offsets[50] == pytest.approx(10 * math.sqrt(0.5))
+    gaps = [second - first for first, second in zip(offsets, offsets[1:])]
+    assert gaps == sorted(gaps, reverse=True)
+
+
+def test_ramp_down_to_zero():
+    offsets = arrivals([Phase(10, 20, 0)])[0]
+
+    assert len(offsets) == 100
+    assert offsets[-1] <= 10
+    gaps = [second - first for first, second in zip(offsets, offsets[1:])]
+    assert gaps == sorted(gaps)
+    assert offsets[50] == pytest.approx(10 * (1 - math.sqrt(0.5)))
+
+
+def test_phase_offset_inverts_arrivals():
+    phase = Phase(30, 2, 12)
+
+    assert phase.offset(phase.arrivals) == pytest.approx(phase.duration)
+    assert phase.offset(0) == 0
+
+
+@pytest.mark.parametrize('spec', ['', '10', '10:', ':5', 'abc:5', '10:x', '10:5-y', '0:5', '10:5,,5:1', '-1:5'])
+def test_malformed_profile_raises(spec):
+    with pytest.raises(ValueError):
+        parse_profile(spec)
+
+
+def test_negative_rate_raises():
+    with pytest.raises(ValueError):
+        Phase(10, -1)
@@ -0,0 +1,49 @@
+import os
+import threading
+
+from restclient import registry
+from restclient.metrics import counters
+from restclient.registry import PoolPolicy, SharedHTTPAdapter, get_pool
+
+
+def test_prewarm_opens_connections(stub_server):
+    adapter = SharedHTTPAdapter(pool_connections=1, pool_maxsize=4)
+    try:
+        assert adapter.prewarm(stub_server.url, 3, timeout=1.0) == 3
+        pool = adapter.poolmanager.connection_from_url(stub_server.url)
+        assert pool.pool.qsize() == 4
+        assert sum(connection is not None and connection.sock is not None for connection in pool.pool.queue) == 3
+    finally:
+        adapter.shutdown()
+
+
+def test_prewarm_without_private_pool_api_is_skipped(monkeypatch):
+    adapter = SharedHTTPAdapter(pool_connections=1, pool_maxsize=4)
+    monkeypatch.setattr(adapter.poolmanager, 'connection_from_url', lambda url: object())
+    before = counters.get('pool.prewarm_unsupported', 'http://unsupported')
+
+    assert adapter.prewarm('http://unsupported', 2) == 0
+    assert counters.get('pool.prewarm_unsupported', 'http://unsupported') == before + 1
+
+
+def test_prewarm_does_not_hold_registry_lock(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_prewarm(adapter, host, count, timeout=5.0):
+        started.set()
+        release.wait(5)
+        return 0
+
+    monkeypatch.setattr(SharedHTTPAdapter, 'prewarm', slow_prewarm)
+    warming = threading.Thread(target=get_pool, args=('http://slow', PoolPolicy(prewarm=2)))
+    warming.start()
+    try:
+        assert started.wait(5)
+        assert registry._registry_lock.acquire(timeout=1)
+        registry._registry_lock.release()
+        assert get_pool('http://slow', PoolPolicy(prewarm=2)) is get_pool('http://slow', PoolPolicy())
+    finally:
+        release.set()
+        warming.join(5)
+        registry._pools.pop((os.getpid(), 'http://slow')).shutdown()
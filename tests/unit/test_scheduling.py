@@ -0,0 +1,116 @@
+import pytest
+
+from plugins.scheduling import DEFAULT_DURATION, assign, estimate, group_items, load_durations, save_durations
+
+pytest_plugins = ['pytester']
+
+SHARED_MODULE = '''
+import pytest
+
+@pytest.fixture(scope='module')
+def stand():
+    return object()
+
+def test_first(stand):
+    pass
+
+def test_plain():
+    pass
+
+def test_second(stand):
+    pass
+
+class TestGroup:
+    @pytest.fixture(scope='class')
+    def session_state(self):
+        return {}
+
+    def test_one(self, session_state):
+        pass
+
+    def test_two(self, session_state):
+        pass
+'''
+
+
+class Item:
+    def __init__(self, nodeid):
+        self.nodeid = nodeid
+
+
+def names(bins):
+    return [[item.nodeid for item in unit] for unit in bins]
+
+
+def test_module_fixture_users_form_one_unit(pytester):
+    items = pytester.getitems(SHARED_MODULE)
+
+    units = [[item.name for item in unit] for unit in group_items(items)]
+
+    assert units == [['test_first', 'test_second'], ['test_plain'], ['test_one', 'test_two']]
+
+
+def test_unit_lands_in_one_bin(pytester):
+    items = pytester.getitems(SHARED_MODULE)
+    estimates = {item.nodeid: 1.0 for item in items}
+
+    bins = assign(group_items(items), estimates, 3)
+
+    placement = {item.name: index for index, unit in enumerate(bins) for item in unit}
+    assert placement['test_first'] == placement['test_second']
+    assert placement['test_one'] == placement['test_two']
+    assert len({placement['test_first'], placement['test_one'], placement['test_plain']}) == 3
+
+
+def test_lpt_balances_bins():
+    durations = [7, 6, 5, 4, 3, 3, 2, 2, 1, 1]
+    items = [Item(f't{index}') for index in range(len(durations))]
+    estimates = {item.nodeid: duration for item, duration in zip(items, durations)}
+
+    bins = assign([[item] for item in items], estimates, 3)
+
+    loads = sorted(sum(estimates[item.nodeid] for item in unit) for unit in bins)
+    assert sum(loads) == sum(durations)
+    assert loads[-1] - loads[0] <= max(durations) / 3
+    assert loads[-1] <= sum(durations) / 3 * 4 / 3
+
+
+def test_bin_keeps_collection_order():
+    items = [Item(f't{index}') for index in range(4)]
+    estimates = {'t0': 1, 't1': 5, 't2': 1, 't3': 5}
+
+    bins = assign([[item] for item in items], estimates, 2)
+
+    assert names(bins) == [['t0', 't1'], ['t2', 't3']]
+
+
+def test_unknown_tests_get_median_estimate():
+    history = {'a': 1.0, 'b': 3.0, 'c': 10.0, 'stale': 100.0}
+
+    estimates = estimate(history, ['a', 'b', 'c', 'new'])
+
+    assert estimates == {'a': 1.0, 'b': 3.0, 'c': 10.0, 'new': 3.0}
+
+
+def test_empty_history_uses_default_estimate():
+    assert estimate({}, ['new']) == {'new': DEFAULT_DURATION}
+
+
+@pytest.mark.parametrize('content', ['{"a": ', '[1, 2]', '', 'not json'])
+def test_corrupt_durations_file_is_empty_history(tmp_path, content):
+    path = tmp_path / 'durations.json'
+    path.write_text(content, encoding='utf-8')
+
+    assert load_durations(str(path)) == {}
+
+
+def test_missing_durations_file_is_empty_history(tmp_path):
+    assert load_durations(str(tmp_path / 'missing.json')) == {}
+
+
+def test_durations_round_trip(tmp_path):
+    path = str(tmp_path / 'nested' / 'durations.json')
+
+    save_durations(path, {'b': 0.123456, 'a': 2.0})
+
+    assert load_durations(path) == {'a': 2.0, 'b': 0.1235}
@@ -0,0 +1,85 @@
+import json
+import os
+import random
+
+from load.soak import SoakMonitor, SoakPolicy, analyze, detect_growth
+
+
+def snapshots(series, metric='rss_bytes'):
+    return [{'time': index * 60.0, 'pid': 1, metric: value, 'objects': {'requests.Session': 5}}
+            for index, value in enumerate(series)]
+
+
+def policy(**options):
+    return SoakPolicy(warmup=2, min_samples=5, **options)
+
+
+def test_monotonic_growth_is_reported():
+    series = [100e6 + index * 2e6 for index in range(30)]
+
+    findings = detect_growth(snapshots(series), policy())
+
+    assert len(findings) == 1
+    assert findings[0].startswith('rss_bytes: ')
+    assert 'рост в 100% интервалов' in findings[0]
+
+
+def test_growth_with_small_dips_is_reported():
+    generator = random.Random(1)
+    series = [100 + index * 5 + generator.uniform(-4, 4) for index in range(40)]
+
+    assert [finding.split(':')[0] for finding in detect_growth(snapshots(series, 'open_sockets'), policy())] == [
+        'open_sockets'
+    ]
+
+
+def test_noisy_flat_series_is_not_reported():
+    generator = random.Random(2)
+    series = [100e6 + generator.uniform(-15e6, 15e6) for _ in range(60)]
+
+    assert detect_growth(snapshots(series), policy()) == []
+
+
+def test_step_after_warmup_is_not_reported():
+    series = [50] * 3 + [100] + [100] * 20 + [111]
+
+    assert detect_growth(snapshots(series, 'open_fds'), policy()) == []
+
+
+def test_growth_below_min_increase_is_ignored():
+    series = [0, 0, 0, 1, 1, 2, 2, 3, 3, 4]
+
+    assert detect_growth(snapshots(series, 'pools.connections'), policy()) == []
+
+
+def test_short_series_is_skipped():
+    assert detect_growth(snapshots([1, 2, 3, 4, 5, 6]), policy()) == []
+
+
+def test_monitor_series_is_per_run(tmp_path):
+    soak = SoakPolicy(output_dir=str(tmp_path), trace_frames=0, interval=3600)
+    first = SoakMonitor(soak)
+
+    assert os.path.dirname(first.path) == str(tmp_path)
+    assert os.path.basename(first.path).startswith(f'process-{os.getpid()}-')
+
+    first.start()
+    first.stop()
+    repeated = SoakMonitor(soak, label=os.path.splitext(os.path.basename(first.path))[0])
+    repeated.start()
+    repeated.stop()
+
+    with open(repeated.path, encoding='utf-8') as file:
+        assert len([json.loads(line) for line in file]) == 1
+
+
+def test_analyze_reports_each_series(tmp_path):
+    for label, series in (('worker-1', [100e6 + index * 2e6 for index in range(10)]), ('worker-2', [100e6] * 10)):
+        with open(tmp_path / f'{label}.jsonl', 'w', encoding='utf-8') as file:
+            file.writelines(json.dumps(snapshot) + '\n' for snapshot in snapshots(series))
+
+    report = analyze(str(tmp_path)).splitlines()
+
+    assert report[1].startswith('worker-1: 10 снимков') and 'ВОЗМОЖНАЯ УТЕЧКА' in report[1]
+    assert report[2].startswith('    rss_bytes: ')
+    assert report[3].startswith('worker-2: 10 снимков') and 'устойчивого роста нет' in report[3]
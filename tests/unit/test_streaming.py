@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from requests import JSONDecodeError, Response
+
+from restclient.streaming import iter_json_items
+
+MESSAGES = [
+    {'ID': '1', 'Content': {'Headers': {'To': ['a@mail.ru']}, 'Body': '{"Login": "first"}'}, 'Raw': {'Data': 'x' * 99}},
+    {'ID': '2', 'Content': {'Headers': {}, 'Body': '{"Login": "sec\\\\ond ]} \\"quoted\\""}'}, 'Raw': {'Data': '['}},
+    {'ID': '3', 'Content': {'Headers': {}, 'Body': '{"Login": "third"}'}, 'Raw': {}},
+]
+
+
+class Raw:
+    def __init__(self, data, chunk_size):
+        self.chunks = [data[index:index + chunk_size] for index in range(0, len(data), chunk_size)]
+
+    def stream(self, chunk_size, decode_content=True):
+        yield from self.chunks
+
+
+def make_response(payload, chunk_size):
+    response = Response()
+    response.status_code = 200
+    response.encoding = 'utf-8'
+    response.raw = Raw(payload if isinstance(payload, bytes) else json.dumps(payload).encode(), chunk_size)
+    return response
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64, 100000])
+def test_items_are_decoded_across_chunk_boundaries(chunk_size):
+    payload = {'total': 3, 'items': MESSAGES + [42, 'text', None]}
+
+    items = list(iter_json_items(make_response(payload, chunk_size), 'items'))
+
+    assert items == payload['items']
+
+
+def test_items_are_projected_on_fields():
+    items = list(iter_json_items(make_response({'items': MESSAGES}, 16), 'items', fields=('ID', 'Content.Body')))
+
+    assert items[0] == {'ID': '1', 'Content': {'Body': '{"Login": "first"}'}}
+
+
+def test_number_split_between_chunks_is_not_cut():
+    items = list(iter_json_items(make_response(b'{"items": [12345, 678]}', 14), 'items'))
+
+    assert items == [12345, 678]
+
+
+def test_truncated_response_raises():
+    data = json.dumps({'items': MESSAGES}).encode()[:-40]
+
+    with pytest.raises(JSONDecodeError):
+        list(iter_json_items(make_response(data, 32), 'items'))
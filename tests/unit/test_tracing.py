@@ -0,0 +1,118 @@
+import json
+import re
+import time
+
+import pytest
+
+from restclient import tracing
+
+HEX = re.compile(r'[0-9a-f]+')
+
+
+class Collector:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def collector(monkeypatch):
+    result = Collector()
+    monkeypatch.setattr(tracing, '_exporters', [result])
+    return result
+
+
+def test_child_spans_link_to_parent(collector):
+    with tracing.start_span(name='register') as parent:
+        with tracing.start_span(name='POST /v1/account', kind=tracing.SPAN_KIND_CLIENT) as child:
+            assert tracing.current_span() is child
+        with tracing.start_span(name='PUT /v1/account/{token}') as sibling:
+            pass
+        assert tracing.current_span() is parent
+    assert tracing.current_span() is None
+
+    assert collector.spans == [child, sibling, parent]
+    assert child.parent is parent and sibling.parent is parent and parent.parent is None
+    assert child.trace_id == sibling.trace_id == parent.trace_id
+    assert len({child.span_id, sibling.span_id, parent.span_id}) == 3
+    assert parent.start_time_ns <= child.start_time_ns <= child.end_time_ns <= parent.end_time_ns
+
+
+def test_separate_roots_start_separate_traces(collector):
+    with tracing.start_span(name='first') as first:
+        pass
+    with tracing.start_span(name='second') as second:
+        pass
+
+    assert first.trace_id != second.trace_id
+
+
+def test_error_is_recorded_and_reraised(collector):
+    with pytest.raises(ValueError):
+        with tracing.start_span(name='login'):
+            raise ValueError('bad password')
+
+    assert collector.spans[0].status_code == tracing.STATUS_ERROR
+    assert collector.spans[0].status_message == 'ValueError: bad password'
+
+
+def test_file_exporter_writes_otlp_json(tmp_path, monkeypatch):
+    exporter = tracing.FileSpanExporter(str(tmp_path / 'traces' / 'spans.jsonl'), service_name='unit')
+    monkeypatch.setattr(tracing, '_exporters', [exporter])
+    started = time.time_ns()
+    with tracing.start_span(name='register', attributes={'user.count': 2}):
+        with tracing.start_span(name='POST /v1/account', kind=tracing.SPAN_KIND_CLIENT) as child:
+            child.set_attribute('http.status_code', 201)
+            child.set_attribute('retry', False)
+            child.set_attribute('elapsed', 0.25)
+    exporter.shutdown()
+
+    with open(exporter.file_path, encoding='utf-8') as file:
+        lines = [json.loads(line) for line in file]
+    spans = [line['resourceSpans'][0]['scopeSpans'][0]['spans'][0] for line in lines]
+    assert lines[0]['resourceSpans'][0]['resource']['attributes'] == [
+        {'key': 'service.name', 'value': {'stringValue': 'unit'}}
+    ]
+    child_otlp, parent_otlp = spans
+    for span in spans:
+        assert len(span['traceId']) == 32 and HEX.fullmatch(span['traceId'])
+        assert len(span['spanId']) == 16 and HEX.fullmatch(span['spanId'])
+        assert isinstance(span['startTimeUnixNano'], str) and isinstance(span['endTimeUnixNano'], str)
+        assert started <= int(span['startTimeUnixNano']) <= int(span['endTimeUnixNano']) <= time.time_ns()
+    assert child_otlp['traceId'] == parent_otlp['traceId']
+    assert child_otlp['parentSpanId'] == parent_otlp['spanId']
+    assert 'parentSpanId' not in parent_otlp
+    assert child_otlp['kind'] == tracing.SPAN_KIND_CLIENT
+    assert child_otlp['status'] == {'code': tracing.STATUS_UNSET}
+    attributes = {attribute['key']: attribute['value'] for attribute in child_otlp['attributes']}
+    assert attributes['http.status_code'] == {'intValue': '201'}
+    assert attributes['retry'] == {'boolValue': False}
+    assert attributes['elapsed'] == {'doubleValue': 0.25}
+    assert attributes['event_id'] == {'stringValue': child.span_id}
+
+
+def test_traced_without_exporters_skips_span_creation(monkeypatch):
+    monkeypatch.setattr(tracing, '_exporters', [])
+    monkeypatch.setattr(tracing, 'start_span', lambda **kwargs: pytest.fail('span created without exporters'))
+
+    @tracing.traced()
+    def register(login):
+        return login, tracing.current_span()
+
+    assert register('user') == ('user', None)
+    assert register.__name__ == 'register'
+
+
+def test_traced_with_exporter_wraps_call(collector):
+    @tracing.traced('helper.register')
+    def register():
+        with tracing.start_span(name='POST /v1/account'):
+            return tracing.current_span().parent
+
+    parent = register()
+
+    assert [span.name for span in collector.spans] == ['POST /v1/account', 'helper.register']
+    assert parent is collector.spans[1]
+    assert collector.spans[1].attributes['code.function'].endswith('register')
@@ -0,0 +1,117 @@
+import os
+
+import httpx
+import pytest
+from requests import Request, ConnectionError
+
+from restclient.transport import Http2Adapter, Http2Policy
+
+
+def mount_mock(adapter, handler):
+    adapter._clients[(os.getpid(), False, True)] = httpx.Client(transport=httpx.MockTransport(handler))
+
+
+def prepare(url, method='GET', body=None):
+    return Request(method, url, data=body, headers={'Connection': 'keep-alive', 'X-Test': '1'}).prepare()
+
+
+def test_response_is_converted_to_requests_response():
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        headers = {'Content-Type': 'application/json; charset=utf-8'}
+        return httpx.Response(201, headers=headers, content=b'{"ok": true}')
+
+    adapter = Http2Adapter(Http2Policy())
+    mount_mock(adapter, handler)
+
+    response = adapter.send(prepare('http://h2.test/v1/account', 'POST', b'{}'), timeout=5)
+
+    assert response.status_code == 201
+    assert response.json() == {'ok': True}
+    assert response.encoding == 'utf-8'
+    assert seen[0].headers['x-test'] == '1'
+    assert seen[0].content == b'{}'
+
+
+def test_streamed_body_is_read_through_raw_stream():
+    adapter = Http2Adapter(Http2Policy())
+    mount_mock(adapter, lambda request: httpx.Response(200, stream=httpx.ByteStream(b'x' * 10000)))
+
+    response = adapter.send(prepare('http://h2.test/big'), stream=True, timeout=5)
+
+    assert b''.join(response.iter_content(chunk_size=1024)) == b'x' * 10000
+    assert response.raw.tell() == 10000
+    assert response.raw.version == 11
+
+
+def test_protocol_error_falls_back_to_http1(stub_server):
+    stub_server.route('GET', '/v1/account', payload={'login': 'user'})
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.RemoteProtocolError('Server disconnected', request=request)
+
+    adapter = Http2Adapter(Http2Policy())
+    mount_mock(adapter, handler)
+
+    first = adapter.send(prepare(stub_server.url + '/v1/account'), timeout=5)
+    second = adapter.send(prepare(stub_server.url + '/v1/account'), timeout=5)
+
+    assert first.json() == second.json() == {'login': 'user'}
+    assert len(calls) == 1
+    assert len(stub_server.calls('GET', '/v1/account')) == 2
+
+
+def test_protocol_error_without_fallback_raises():
+    def handler(request):
+        raise httpx.RemoteProtocolError('Server disconnected', request=request)
+
+    adapter = Http2Adapter(Http2Policy(fallback=False))
+    mount_mock(adapter, handler)
+
+    with pytest.raises(ConnectionError):
+        adapter.send(prepare('http://h2.test/v1/account'), timeout=5)
+
+
+def test_post_is_not_replayed_after_protocol_error(stub_server):
+    stub_server.route('POST', '/v1/account', status=201)
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.RemoteProtocolError('Server disconnected', request=request)
+
+    adapter = Http2Adapter(Http2Policy())
+    mount_mock(adapter, handler)
+
+    with pytest.raises(ConnectionError):
+        adapter.send(prepare(stub_server.url + '/v1/account', 'POST', b'{}'), timeout=5)
+    assert stub_server.calls('POST', '/v1/account') == []
+
+    response = adapter.send(prepare(stub_server.url + '/v1/account', 'POST', b'{}'), timeout=5)
+
+    assert response.status_code == 201
+    assert len(calls) == 1
+    assert len(stub_server.calls('POST', '/v1/account')) == 1
+
+
+def test_read_error_does_not_switch_host_to_http1():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ReadError('Connection reset', request=request)
+        return httpx.Response(200, content=b'ok')
+
+    adapter = Http2Adapter(Http2Policy())
+    mount_mock(adapter, handler)
+
+    with pytest.raises(ConnectionError):
+        adapter.send(prepare('http://h2.test/v1/account'), timeout=5)
+
+    assert adapter.send(prepare('http://h2.test/v1/account'), timeout=5).content == b'ok'
+    assert len(calls) == 2